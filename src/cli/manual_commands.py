@@ -47,7 +47,11 @@ def manual_command(action: str, **kwargs) -> bool:
         
     elif action == "analyze":
         # 分析趋势
-        return tools.analyze_trends()
+        return tools.analyze_trends(
+            since=kwargs.get('since'),
+            until=kwargs.get('until'),
+            as_json=kwargs.get('as_json', False)
+        )
         
     elif action == "backup":
         # 备份数据
@@ -124,7 +128,21 @@ def add_manual_parser(subparsers):
     )
     
     # 分析命令
-    manual_subparsers.add_parser("analyze", help="分析数据趋势")
+    analyze_parser = manual_subparsers.add_parser("analyze", help="分析数据趋势")
+    analyze_parser.add_argument(
+        "--since",
+        help="起始日期，如 2025-01-01 (默认: 不限)"
+    )
+    analyze_parser.add_argument(
+        "--until",
+        help="结束日期，包含当天 (默认: 不限)"
+    )
+    analyze_parser.add_argument(
+        "--json",
+        dest="as_json",
+        action="store_true",
+        help="输出完整的JSON分析结果"
+    )
     
     # 备份命令
     backup_parser = manual_subparsers.add_parser("backup", help="备份数据和cookies")
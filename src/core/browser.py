@@ -17,24 +17,47 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from .config import XHSConfig
 from .exceptions import BrowserError, handle_exception
+from .browser_executor import BrowserExecutor, get_browser_executor, release_browser_executor
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 浏览器配置档：发布使用完整配置，数据采集使用屏蔽图片、字体、媒体的轻量配置
+PROFILE_DEFAULT = "default"
+PROFILE_COLLECTOR = "collector"
+
+# 采集配置档通过CDP屏蔽的资源（图片另由blink设置禁用）
+COLLECTOR_BLOCKED_URLS = [
+    # 字体
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # 音视频
+    "*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3", "*.m4a", "*.flv",
+    # 图片（CDN图片URL带扩展名时直接屏蔽请求）
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.avif",
+    # 第三方统计脚本
+    "*google-analytics.com*", "*googletagmanager.com*", "*hm.baidu.com*"
+]
+
 
 class ChromeDriverManager:
     """Chrome浏览器驱动管理器"""
     
-    def __init__(self, config: XHSConfig):
+    def __init__(self, config: XHSConfig, profile: str = PROFILE_DEFAULT):
         """
         初始化浏览器驱动管理器
         
         Args:
             config: 配置管理器实例
+            profile: 浏览器配置档，PROFILE_COLLECTOR为数据采集使用的轻量配置
         """
         self.config = config
+        self.profile = profile
         self.driver: Optional[webdriver.Chrome] = None
         self.is_initialized = False
+        # 无头模式的调试端口（会话池同时运行多个浏览器时设为0，由Chrome自动选择空闲端口）
+        self.debugging_port = 9222
+        # 当前驱动是否从浏览器会话池租用（租用的驱动由会话池负责关闭）
+        self._leased = False
     
     @handle_exception
     def create_driver(self) -> webdriver.Chrome:
@@ -70,6 +93,9 @@ class ChromeDriverManager:
             
             self.is_initialized = True
             
+            if self.profile == PROFILE_COLLECTOR:
+                self._apply_resource_blocking()
+            
             logger.info("✅ Chrome浏览器驱动初始化成功")
             logger.debug(f"Chrome版本: {self.driver.capabilities['browserVersion']}")
             logger.debug(f"ChromeDriver版本: {self.driver.capabilities['chrome']['chromedriverVersion']}")
@@ -100,8 +126,10 @@ class ChromeDriverManager:
         chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
-        # 无头模式配置
-        if self.config.headless:
+        collector = self.profile == PROFILE_COLLECTOR
+        
+        # 无头模式配置（采集配置档默认使用无头模式）
+        if self.config.headless or (collector and self.config.collector_headless):
             # 强制无头模式 - 双重保险
             chrome_options.add_argument('--headless=new')  # 新版Chrome支持
             chrome_options.add_argument('--headless')      # 传统支持
@@ -124,7 +152,7 @@ class ChromeDriverManager:
             chrome_options.add_argument('--disable-features=TranslateUI')
             
             # 添加调试端口（有助于无头模式稳定性）
-            chrome_options.add_argument('--remote-debugging-port=9222')
+            chrome_options.add_argument(f'--remote-debugging-port={self.debugging_port}')
             
             # 窗口设置（即使无头模式也设置）
             chrome_options.add_argument('--start-maximized')
@@ -140,24 +168,33 @@ class ChromeDriverManager:
         chrome_options.add_argument('--disable-webrtc')
         
         # 禁用密码保存提示
-        chrome_options.add_experimental_option("prefs", {
+        prefs = {
             "credentials_enable_service": False,
             "profile.password_manager_enabled": False
-        })
+        }
         
-        # 禁用图片加载以加快速度（可选）
-        if self.config.disable_images:
-            chrome_options.add_experimental_option("prefs", {
-                "profile.managed_default_content_settings.images": 2
-            })
+        # 禁用图片加载以加快速度（可选，采集配置档始终禁用）
+        if self.config.disable_images or collector:
+            prefs["profile.managed_default_content_settings.images"] = 2
             logger.debug("已禁用图片加载")
+        chrome_options.add_experimental_option("prefs", prefs)
         
         # 窗口大小
         chrome_options.add_argument('--window-size=1920,1080')
+        
+        # 记录网络日志，数据采集可直接读取接口响应（可选）
+        if self.config.enable_network_capture:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            # 只记录网络事件，减少日志量
+            chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+            logger.debug("已启用网络日志记录")
 
         # 添加文件保存位置（本地模式下使用Chrome默认目录）
         # chrome_options.add_argument(f'--user-data-dir=/home/seluser/google-chrome-data')
         
+        if collector:
+            self._add_collector_options(chrome_options)
+        
         # 调试选项
         if self.config.debug_mode:
             chrome_options.add_argument('--enable-logging')
@@ -167,6 +204,38 @@ class ChromeDriverManager:
         logger.debug("本地浏览器选项配置完成")
         return chrome_options
     
+    def _add_collector_options(self, chrome_options: Options) -> None:
+        """数据采集配置档：关闭不需要的资源加载和浏览器功能，降低页面加载时间和内存占用"""
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_argument('--disable-sync')
+        chrome_options.add_argument('--disable-component-update')
+        chrome_options.add_argument('--disable-default-apps')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--autoplay-policy=user-gesture-required')
+        chrome_options.add_argument('--disable-features=TranslateUI,MediaRouter,OptimizationHints,AutofillServerCommunication')
+        
+        # 限制JS堆内存
+        if self.config.collector_js_heap_mb > 0:
+            chrome_options.add_argument(f'--js-flags=--max-old-space-size={self.config.collector_js_heap_mb}')
+        
+        logger.info("🪶 使用数据采集轻量浏览器配置")
+    
+    def _apply_resource_blocking(self) -> None:
+        """通过CDP屏蔽字体、媒体等采集不需要的资源（远程浏览器不支持CDP命令时跳过）"""
+        if not hasattr(self.driver, 'execute_cdp_cmd'):
+            logger.debug("当前浏览器不支持CDP命令，跳过资源屏蔽")
+            return
+        
+        patterns = COLLECTOR_BLOCKED_URLS + self.config.collector_blocked_urls
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            logger.debug(f"已屏蔽 {len(patterns)} 类资源请求")
+        except Exception as e:
+            logger.warning(f"⚠️ 设置资源屏蔽失败: {e}")
+    
     def _create_chrome_service(self) -> Service:
         """创建Chrome服务"""
         service_args = []
@@ -337,8 +406,43 @@ class ChromeDriverManager:
         except Exception as e:
             raise BrowserError(f"等待元素失败: {str(e)}", browser_action="wait_element") from e
     
+    @property
+    def executor(self) -> BrowserExecutor:
+        """
+        当前驱动的专用执行线程，WebDriver调用通过它执行以免阻塞事件循环
+        
+        Raises:
+            BrowserError: 驱动未初始化
+        """
+        if not self.driver:
+            raise BrowserError("浏览器驱动未初始化", browser_action="executor")
+        return get_browser_executor(self.driver)
+    
+    def attach(self, driver: webdriver.Chrome) -> None:
+        """
+        使用从浏览器会话池租用的驱动
+        
+        Args:
+            driver: 已创建的Chrome WebDriver实例
+        """
+        if self.driver and not self._leased:
+            self.close_driver()
+        self.driver = driver
+        self.is_initialized = True
+        self._leased = True
+    
+    def detach(self) -> None:
+        """归还租用的驱动（不关闭浏览器）"""
+        self.driver = None
+        self.is_initialized = False
+        self._leased = False
+    
     def close_driver(self) -> None:
-        """关闭浏览器驱动"""
+        """关闭浏览器驱动（租用的驱动只解除关联，由会话池回收）"""
+        if self._leased:
+            self.detach()
+            return
+        
         if self.driver:
             try:
                 logger.debug("🔒 正在关闭浏览器驱动...")
@@ -347,6 +451,7 @@ class ChromeDriverManager:
             except Exception as e:
                 logger.warning(f"⚠️ 关闭浏览器驱动时出错: {e}")
             finally:
+                release_browser_executor(self.driver)
                 self.driver = None
                 self.is_initialized = False
     
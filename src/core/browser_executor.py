@@ -0,0 +1,196 @@
+"""
+浏览器会话专用执行线程
+
+WebDriver的方法都是阻塞的网络调用，直接在事件循环中调用会让MCP服务在自动化执行期间无法响应。
+每个浏览器会话分配一个专用线程，该会话的所有WebDriver调用都在这个线程中按顺序执行：
+1. 事件循环只等待结果，不被阻塞，可以同时处理其他请求和其他浏览器会话
+2. 同一会话的调用不会并发执行，保持WebDriver原有的单线程使用方式
+3. 会话关闭时线程随之释放
+
+使用方式:
+    browser = get_browser_executor(driver)
+    await browser.get(url)
+    elements = await browser.find_elements(By.CSS_SELECTOR, ".item")
+    result = await browser.run(collect_fans_data, driver)  # 整段同步采集逻辑
+"""
+
+import asyncio
+import functools
+import itertools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 执行线程编号
+_thread_ids = itertools.count(1)
+
+
+class BrowserExecutor:
+    """单个浏览器会话的专用执行线程，提供可await的WebDriver操作"""
+    
+    def __init__(self, driver: webdriver.Chrome):
+        """
+        初始化执行线程
+        
+        Args:
+            driver: Chrome WebDriver实例
+        """
+        # 弱引用，避免执行线程表中的驱动无法被回收
+        self._driver_ref = weakref.ref(driver)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"xhs-browser-{next(_thread_ids)}"
+        )
+        self._closed = False
+    
+    @property
+    def driver(self) -> webdriver.Chrome:
+        """关联的驱动"""
+        driver = self._driver_ref()
+        if driver is None:
+            raise RuntimeError("浏览器驱动已被回收")
+        return driver
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        在会话线程中执行同步函数
+        
+        Args:
+            func: 同步函数（可以是一段完整的同步采集逻辑）
+            *args: 位置参数
+            **kwargs: 关键字参数
+        
+        Returns:
+            Any: 函数返回值
+        
+        Raises:
+            RuntimeError: 执行线程已关闭
+        """
+        if self._closed:
+            raise RuntimeError("浏览器执行线程已关闭")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def get(self, url: str) -> None:
+        """打开URL"""
+        await self.run(self.driver.get, url)
+    
+    async def current_url(self) -> str:
+        """当前页面URL"""
+        driver = self.driver
+        return await self.run(lambda: driver.current_url)
+    
+    async def page_source(self) -> str:
+        """当前页面源码"""
+        driver = self.driver
+        return await self.run(lambda: driver.page_source)
+    
+    async def find_element(self, by: str, value: str) -> WebElement:
+        """查找单个元素（未找到时抛出NoSuchElementException）"""
+        return await self.run(self.driver.find_element, by, value)
+    
+    async def find_elements(self, by: str, value: str) -> List[WebElement]:
+        """查找元素列表"""
+        return await self.run(self.driver.find_elements, by, value)
+    
+    async def execute_script(self, script: str, *args: Any) -> Any:
+        """执行JavaScript"""
+        return await self.run(self.driver.execute_script, script, *args)
+    
+    async def wait_until(self, condition: Callable[[Any], Any], timeout: float) -> Any:
+        """
+        在会话线程中等待条件满足
+        
+        Args:
+            condition: expected_conditions条件或接收driver的函数
+            timeout: 超时时间（秒）
+        
+        Returns:
+            Any: 条件的返回值
+        
+        Raises:
+            TimeoutException: 超时未满足条件
+        """
+        return await self.run(WebDriverWait(self.driver, timeout).until, condition)
+    
+    async def click(self, element: WebElement) -> None:
+        """点击元素"""
+        await self.run(element.click)
+    
+    async def clear(self, element: WebElement) -> None:
+        """清空输入框"""
+        await self.run(element.clear)
+    
+    async def send_keys(self, element: WebElement, *values: str) -> None:
+        """向元素输入内容"""
+        await self.run(element.send_keys, *values)
+    
+    def shutdown(self) -> None:
+        """关闭执行线程（不等待正在执行的调用）"""
+        if not self._closed:
+            self._closed = True
+            self._executor.shutdown(wait=False)
+
+
+# 驱动 -> 执行线程（驱动被回收后自动移除）
+_executors: "weakref.WeakKeyDictionary[webdriver.Chrome, BrowserExecutor]" = weakref.WeakKeyDictionary()
+_executors_lock = threading.Lock()
+
+
+def get_browser_executor(driver: webdriver.Chrome) -> BrowserExecutor:
+    """
+    获取浏览器会话的专用执行线程（同一驱动始终返回同一实例）
+    
+    Args:
+        driver: Chrome WebDriver实例
+    
+    Returns:
+        BrowserExecutor: 执行线程
+    """
+    with _executors_lock:
+        executor = _executors.get(driver)
+        if executor is None or executor._closed:
+            executor = BrowserExecutor(driver)
+            _executors[driver] = executor
+        return executor
+
+
+def release_browser_executor(driver: Optional[webdriver.Chrome]) -> None:
+    """
+    浏览器关闭后释放其执行线程
+    
+    Args:
+        driver: Chrome WebDriver实例
+    """
+    if driver is None:
+        return
+    with _executors_lock:
+        executor = _executors.pop(driver, None)
+    if executor is not None:
+        executor.shutdown()
+        logger.debug("🧵 浏览器执行线程已释放")
+
+
+async def run_in_browser(driver: webdriver.Chrome, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    在驱动的专用执行线程中执行同步函数
+    
+    Args:
+        driver: Chrome WebDriver实例
+        func: 同步函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+    
+    Returns:
+        Any: 函数返回值
+    """
+    return await get_browser_executor(driver).run(func, *args, **kwargs)
@@ -70,12 +70,35 @@ class XHSConfig:
         self.disable_images = os.getenv("DISABLE_IMAGES", "false").lower() == "true"
         self.debug_mode = os.getenv("DEBUG_MODE", "false").lower() == "true"
         self.headless = os.getenv("HEADLESS", "false").lower() == "true"  # 无头浏览器模式
+        # 记录浏览器网络日志，数据采集直接读取创作者中心接口响应
+        self.enable_network_capture = os.getenv("ENABLE_NETWORK_CAPTURE", "false").lower() == "true"
+        
+        # 数据采集浏览器配置（屏蔽图片、字体、媒体等资源的轻量配置档）
+        self.collector_headless = os.getenv("COLLECTOR_HEADLESS", "true").lower() == "true"
+        self.collector_js_heap_mb = int(os.getenv("COLLECTOR_JS_HEAP_MB", "512"))
+        self.collector_blocked_urls = [
+            pattern.strip() for pattern in os.getenv("COLLECTOR_BLOCKED_URLS", "").split(",") if pattern.strip()
+        ]
         
         # 远程浏览器连接配置
         self.enable_remote_browser = os.getenv("ENABLE_REMOTE_BROWSER", "false").lower() == "true"
         self.remote_browser_host = os.getenv("REMOTE_BROWSER_HOST", "localhost")
         self.remote_browser_port = int(os.getenv("REMOTE_BROWSER_PORT", "9222"))
         
+        # 浏览器会话池配置
+        self.enable_driver_pool = os.getenv("ENABLE_DRIVER_POOL", "true").lower() == "true"
+        self.driver_pool_min_size = int(os.getenv("DRIVER_POOL_MIN_SIZE", "0"))
+        self.driver_pool_max_size = int(os.getenv("DRIVER_POOL_MAX_SIZE", "2"))
+        self.driver_pool_max_uses = int(os.getenv("DRIVER_POOL_MAX_USES", "20"))
+        self.driver_pool_idle_timeout = float(os.getenv("DRIVER_POOL_IDLE_TIMEOUT", "600"))
+        
+        # 发布任务执行器配置（并发数为0时与浏览器会话池最多数量一致）
+        self.publish_max_workers = int(os.getenv("PUBLISH_MAX_WORKERS", "0"))
+        self.publish_queue_size = int(os.getenv("PUBLISH_QUEUE_SIZE", "20"))
+        self.publish_task_timeout = float(os.getenv("PUBLISH_TASK_TIMEOUT", "600"))
+        # 单次发布中等待页面元素的总时间预算（秒）
+        self.publish_wait_budget = float(os.getenv("PUBLISH_WAIT_BUDGET", "300"))
+        
         # 其他配置
         self.timeout = int(os.getenv("TIMEOUT", "30"))
     
@@ -200,6 +223,21 @@ class XHSConfig:
                 issues.append("远程浏览器主机地址不能为空")
             logger.debug(f"远程浏览器配置验证: {self.remote_browser_host}:{self.remote_browser_port}")
         
+        # 浏览器会话池配置验证（仅在启用时验证）
+        if self.enable_driver_pool:
+            if self.driver_pool_max_size < 1:
+                issues.append(f"浏览器会话池最大数量必须大于0: {self.driver_pool_max_size}")
+            if not (0 <= self.driver_pool_min_size <= self.driver_pool_max_size):
+                issues.append(f"浏览器会话池最少数量无效: {self.driver_pool_min_size}")
+            if self.driver_pool_max_uses < 1:
+                issues.append(f"浏览器会话最大使用次数必须大于0: {self.driver_pool_max_uses}")
+        
+        if self.collector_js_heap_mb < 0:
+            issues.append(f"采集浏览器JS堆内存上限不能为负数: {self.collector_js_heap_mb}")
+        
+        if self.publish_wait_budget <= 0:
+            issues.append(f"发布等待时间预算必须大于0: {self.publish_wait_budget}")
+        
         return {
             "valid": len(issues) == 0,
             "issues": issues
@@ -236,6 +274,16 @@ DISABLE_IMAGES=false
 DEBUG_MODE=false
 # 无头浏览器模式（true=启用无头模式，false=显示浏览器界面）
 HEADLESS=false
+# 数据采集读取创作者中心接口响应（true=从网络日志解析JSON，失败时回退到页面解析；远程浏览器不支持）
+ENABLE_NETWORK_CAPTURE=false
+
+# 数据采集浏览器配置（屏蔽图片、字体、媒体等资源的轻量浏览器，发布不受影响）
+# 采集浏览器是否使用无头模式
+COLLECTOR_HEADLESS=true
+# 采集浏览器JS堆内存上限（MB，0=不限制）
+COLLECTOR_JS_HEAP_MB=512
+# 额外屏蔽的资源URL模式（逗号分隔，支持*通配符）
+COLLECTOR_BLOCKED_URLS=
 
 # 远程浏览器连接配置
 # 是否启用远程浏览器连接（true=连接远程浏览器，false=启动本地浏览器）
@@ -245,6 +293,27 @@ REMOTE_BROWSER_HOST=localhost
 # 远程浏览器调试端口（Chrome启动时的--remote-debugging-port参数）
 REMOTE_BROWSER_PORT=9222
 
+# 浏览器会话池（发布和数据采集复用已启动并加载好cookies的浏览器，避免每次冷启动）
+ENABLE_DRIVER_POOL=true
+# 常驻的最少浏览器数（大于0时启动后预热）
+DRIVER_POOL_MIN_SIZE=0
+# 同时存在的最多浏览器数
+DRIVER_POOL_MAX_SIZE=2
+# 每个浏览器使用多少次后重建
+DRIVER_POOL_MAX_USES=20
+# 空闲超过该时间（秒）的浏览器会被关闭（保留最少浏览器数）
+DRIVER_POOL_IDLE_TIMEOUT=600
+
+# 发布任务执行器
+# 同时执行的发布任务数（0=与浏览器会话池最多数量一致）
+PUBLISH_MAX_WORKERS=0
+# 排队任务数上限，超过时拒绝新任务并提示重试时间
+PUBLISH_QUEUE_SIZE=20
+# 单个发布任务的执行超时（秒，0=不限）
+PUBLISH_TASK_TIMEOUT=600
+# 单次发布中等待页面元素（页面加载、上传完成、发布结果）的总时间预算（秒）
+PUBLISH_WAIT_BUDGET=300
+
 # 超时设置（秒）
 TIMEOUT=30
 """
@@ -282,9 +351,22 @@ TIMEOUT=30
             "disable_images": self.disable_images,
             "debug_mode": self.debug_mode,
             "headless": self.headless,
+            "enable_network_capture": self.enable_network_capture,
+            "collector_headless": self.collector_headless,
+            "collector_js_heap_mb": self.collector_js_heap_mb,
+            "collector_blocked_urls": self.collector_blocked_urls,
             "enable_remote_browser": self.enable_remote_browser,
             "remote_browser_host": self.remote_browser_host,
             "remote_browser_port": self.remote_browser_port,
+            "enable_driver_pool": self.enable_driver_pool,
+            "driver_pool_min_size": self.driver_pool_min_size,
+            "driver_pool_max_size": self.driver_pool_max_size,
+            "driver_pool_max_uses": self.driver_pool_max_uses,
+            "driver_pool_idle_timeout": self.driver_pool_idle_timeout,
+            "publish_max_workers": self.publish_max_workers,
+            "publish_queue_size": self.publish_queue_size,
+            "publish_task_timeout": self.publish_task_timeout,
+            "publish_wait_budget": self.publish_wait_budget,
             "timeout": self.timeout,
             "platform": platform.system(),
             "python_version": platform.python_version()
@@ -0,0 +1,282 @@
+"""
+事件驱动的页面等待
+
+用页面内的MutationObserver代替固定sleep和定时轮询：
+1. 通过execute_async_script在页面中注册观察器，DOM一旦出现目标状态立即返回
+2. 多个条件可以同时等待，返回先满足的条件序号（例如上传成功/上传失败）
+3. 同一次发布的所有等待共享一个时间预算，整个发布流程的等待总时长有上限
+
+使用方式:
+    waiter = DomWaiter(browser_manager.executor, WaitBudget(300))
+    index = await waiter.wait_for([DomCondition.of_css(".upload-success"), DomCondition.of_css(".upload-error")], timeout=60)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from .browser_executor import BrowserExecutor
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 页面跳转等导致观察脚本中断后，重新注册前的间隔（秒）
+RETRY_INTERVAL = 0.2
+
+# 查询URL、页面加载状态等无法在页面中观察的状态时的轮询间隔（秒）
+POLL_INTERVAL = 0.1
+
+# 页面内的等待脚本：先检查一次，未满足时用MutationObserver监听DOM变化，
+# 另有低频兜底检查，覆盖不产生DOM变化的可见性变化（如样式表动画）
+WAIT_SCRIPT = """
+var conditions = arguments[0];
+var timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+
+function isVisible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) {
+        return false;
+    }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+function isEnabled(el) {
+    return !el.disabled && !(el.classList && el.classList.contains('disabled'));
+}
+
+function findElements(c) {
+    if (c.xpath) {
+        var result = document.evaluate(c.xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+        return nodes;
+    }
+    return document.querySelectorAll(c.css);
+}
+
+function matches(c) {
+    var elements = findElements(c);
+    for (var i = 0; i < elements.length; i++) {
+        var el = elements[i];
+        if (c.visible && !isVisible(el)) continue;
+        if (c.enabled && !isEnabled(el)) continue;
+        if (c.text && (el.innerText || el.textContent || '').indexOf(c.text) < 0) continue;
+        return true;
+    }
+    return false;
+}
+
+function check() {
+    for (var i = 0; i < conditions.length; i++) {
+        var hit = matches(conditions[i]);
+        if (conditions[i].absent ? !hit : hit) return i;
+    }
+    return -1;
+}
+
+var first = check();
+if (first >= 0) {
+    done(first);
+    return;
+}
+
+var finished = false;
+var observer, fallback, timer;
+function finish(value) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearInterval(fallback);
+    clearTimeout(timer);
+    done(value);
+}
+observer = new MutationObserver(function() {
+    var index = check();
+    if (index >= 0) finish(index);
+});
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+fallback = setInterval(function() {
+    var index = check();
+    if (index >= 0) finish(index);
+}, 500);
+timer = setTimeout(function() { finish(-1); }, timeoutMs);
+"""
+
+
+@dataclass
+class DomCondition:
+    """页面等待条件"""
+    css: str = ""
+    xpath: str = ""
+    text: str = ""  # 元素文字需包含的内容
+    visible: bool = True  # 元素需可见
+    enabled: bool = False  # 元素需可用（未禁用）
+    absent: bool = False  # 反向条件：没有满足条件的元素时成立
+    
+    @classmethod
+    def of_css(cls, selector: str, **options: Any) -> 'DomCondition':
+        """CSS选择器条件"""
+        return cls(css=selector, **options)
+    
+    @classmethod
+    def of_xpath(cls, expression: str, **options: Any) -> 'DomCondition':
+        """XPath条件"""
+        return cls(xpath=expression, **options)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为传给页面脚本的参数"""
+        return asdict(self)
+
+
+class WaitBudget:
+    """一次操作中所有等待共享的时间预算"""
+    
+    def __init__(self, total_seconds: float):
+        """
+        初始化时间预算
+        
+        Args:
+            total_seconds: 总时间（秒）
+        """
+        self.total_seconds = total_seconds
+        self.deadline = time.monotonic() + total_seconds
+    
+    def remaining(self) -> float:
+        """剩余时间（秒）"""
+        return max(0.0, self.deadline - time.monotonic())
+    
+    @property
+    def exhausted(self) -> bool:
+        """时间预算是否已用完"""
+        return self.remaining() <= 0
+    
+    def cap(self, timeout: Optional[float]) -> float:
+        """单次等待的超时时间，不超过剩余预算"""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+    
+    @property
+    def elapsed(self) -> float:
+        """已用时间（秒）"""
+        return self.total_seconds - self.remaining()
+
+
+class DomWaiter:
+    """基于MutationObserver的页面等待器"""
+    
+    def __init__(self, browser: BrowserExecutor, budget: Optional[WaitBudget] = None):
+        """
+        初始化等待器
+        
+        Args:
+            browser: 浏览器会话的执行线程
+            budget: 时间预算，为空时每次等待只受自身超时限制
+        """
+        self.browser = browser
+        self.budget = budget
+    
+    def _timeout(self, timeout: Optional[float]) -> float:
+        """计算本次等待的实际超时时间"""
+        if self.budget is None:
+            return timeout if timeout is not None else 30.0
+        return self.budget.cap(timeout)
+    
+    @staticmethod
+    def _observe(driver, conditions: List[Dict[str, Any]], timeout: float) -> int:
+        """在页面中注册观察器并等待结果（在浏览器线程中执行），结束后恢复驱动原来的脚本超时"""
+        previous = driver.timeouts.script
+        # 脚本超时比页面内超时稍长，正常情况下总是由页面内计时器先返回
+        driver.set_script_timeout(timeout + 5)
+        try:
+            return driver.execute_async_script(WAIT_SCRIPT, conditions, int(timeout * 1000))
+        except TimeoutException:
+            return -1
+        finally:
+            driver.set_script_timeout(previous)
+    
+    async def wait_for(self, conditions: Sequence[DomCondition], timeout: Optional[float] = None) -> Optional[int]:
+        """
+        等待任一条件满足
+        
+        Args:
+            conditions: 条件列表
+            timeout: 超时时间（秒），同时受时间预算限制
+        
+        Returns:
+            Optional[int]: 先满足的条件序号，超时返回None
+        """
+        deadline = time.monotonic() + self._timeout(timeout)
+        payload = [condition.to_dict() for condition in conditions]
+        driver = self.browser.driver
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                index = await self.browser.run(self._observe, driver, payload, remaining)
+                return index if index is not None and index >= 0 else None
+            except WebDriverException as e:
+                # 页面跳转或刷新会中断脚本，在新页面上重新等待
+                logger.debug(f"⏳ 页面等待脚本中断，重新等待: {getattr(e, 'msg', e)}")
+                await asyncio.sleep(RETRY_INTERVAL)
+    
+    async def wait_for_css(self, selector: str, timeout: Optional[float] = None, **options: Any) -> bool:
+        """
+        等待CSS选择器匹配的元素满足条件
+        
+        Args:
+            selector: CSS选择器
+            timeout: 超时时间（秒）
+            **options: DomCondition的其他选项（text、visible、enabled、absent）
+        
+        Returns:
+            bool: 是否在超时前满足
+        """
+        return await self.wait_for([DomCondition.of_css(selector, **options)], timeout) is not None
+    
+    async def wait_until(self, predicate: Callable[[Any], Any], timeout: Optional[float] = None) -> bool:
+        """
+        等待驱动状态满足条件（用于URL、页面加载状态等无法在页面中观察的状态）
+        
+        Args:
+            predicate: 接收driver的函数，返回真值时结束等待
+            timeout: 超时时间（秒）
+        
+        Returns:
+            bool: 是否在超时前满足
+        """
+        deadline = time.monotonic() + self._timeout(timeout)
+        driver = self.browser.driver
+        
+        def check() -> bool:
+            try:
+                return bool(predicate(driver))
+            except WebDriverException:
+                return False
+        
+        while True:
+            if await self.browser.run(check):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(POLL_INTERVAL)
+    
+    async def wait_for_url(self, fragment: str, timeout: Optional[float] = None) -> bool:
+        """等待当前URL包含指定内容"""
+        return await self.wait_until(lambda driver: fragment in driver.current_url, timeout)
+    
+    async def wait_for_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待页面加载完成（document.readyState为complete）"""
+        return await self.wait_until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete",
+            timeout
+        )
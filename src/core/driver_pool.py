@@ -0,0 +1,432 @@
+"""
+小红书工具包浏览器会话池
+
+Chrome冷启动加上导航、注入cookies每次需要数秒，发布任务和数据采集都从会话池租用浏览器：
+1. 会话创建后导航到创作者中心并加载cookies，归还后保留登录状态供下次使用
+2. 租用前检查浏览器是否存活，cookies文件更新后重新注入
+3. 使用次数达到上限、任务出错或空闲超时的会话会被关闭重建
+4. 会话数量在最少/最多数量之间，全部被占用时等待归还
+5. 每个浏览器配置档一个会话池：数据采集使用轻量配置档的浏览器，不与发布共用
+"""
+
+import atexit
+import asyncio
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from selenium import webdriver
+
+from .browser import ChromeDriverManager, PROFILE_DEFAULT
+from .config import XHSConfig
+from .exceptions import BrowserError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 归还会话时导航到空白页，释放上一个任务的页面
+BLANK_PAGE_URL = "about:blank"
+
+
+class PooledDriver:
+    """会话池中的浏览器会话"""
+    
+    def __init__(self, manager: ChromeDriverManager):
+        """
+        初始化浏览器会话
+        
+        Args:
+            manager: 持有该浏览器驱动的管理器
+        """
+        self.manager = manager
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # 注入cookies时cookies文件的修改时间，文件更新后需要重新注入
+        self.cookies_mtime: Optional[int] = None
+    
+    @property
+    def driver(self) -> webdriver.Chrome:
+        """浏览器驱动"""
+        return self.manager.driver
+
+
+class DriverPool:
+    """浏览器会话池"""
+    
+    def __init__(self, config: XHSConfig,
+                 cookie_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+                 min_size: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 max_uses: Optional[int] = None,
+                 idle_timeout: Optional[float] = None,
+                 profile: str = PROFILE_DEFAULT):
+        """
+        初始化浏览器会话池
+        
+        Args:
+            config: 配置管理器实例
+            cookie_loader: 加载cookies的函数，默认使用CookieManager读取cookies文件
+            min_size: 常驻的最少会话数，默认从配置DRIVER_POOL_MIN_SIZE读取
+            max_size: 最多会话数，默认从配置DRIVER_POOL_MAX_SIZE读取
+            max_uses: 每个会话的最大使用次数，默认从配置DRIVER_POOL_MAX_USES读取
+            idle_timeout: 空闲会话的保留时间（秒），默认从配置DRIVER_POOL_IDLE_TIMEOUT读取
+            profile: 会话使用的浏览器配置档
+        """
+        self.config = config
+        self.profile = profile
+        self.min_size = config.driver_pool_min_size if min_size is None else min_size
+        self.max_size = max(1, config.driver_pool_max_size if max_size is None else max_size)
+        self.max_uses = config.driver_pool_max_uses if max_uses is None else max_uses
+        self.idle_timeout = config.driver_pool_idle_timeout if idle_timeout is None else idle_timeout
+        
+        if cookie_loader is None:
+            from ..auth.cookie_manager import CookieManager
+            cookie_loader = CookieManager(config).load_cookies
+        self._cookie_loader = cookie_loader
+        
+        self._idle: List[PooledDriver] = []
+        # 已创建和正在创建的会话总数
+        self._size = 0
+        self._leased = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def _cookies_mtime(self) -> Optional[int]:
+        """获取cookies文件的修改时间"""
+        try:
+            return Path(self.config.cookies_file).stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _inject_cookies(self, session: PooledDriver) -> None:
+        """导航到创作者中心并注入cookies"""
+        session.cookies_mtime = self._cookies_mtime()
+        session.manager.navigate_to_creator_center()
+        cookies = self._cookie_loader()
+        if cookies:
+            session.manager.load_cookies(cookies)
+        else:
+            logger.warning("⚠️ 未找到cookies，浏览器会话未登录")
+    
+    def _create_session(self) -> PooledDriver:
+        """创建浏览器会话并注入cookies"""
+        manager = ChromeDriverManager(self.config, profile=self.profile)
+        if self.max_size > 1:
+            manager.debugging_port = 0
+        
+        session = PooledDriver(manager)
+        manager.create_driver()
+        try:
+            self._inject_cookies(session)
+        except Exception:
+            manager.close_driver()
+            raise
+        
+        logger.info("🌐 浏览器会话已创建并加载cookies")
+        return session
+    
+    @staticmethod
+    def _is_healthy(session: PooledDriver) -> bool:
+        """检查浏览器是否仍可响应"""
+        try:
+            return session.driver is not None and bool(session.driver.window_handles)
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _reset(session: PooledDriver) -> bool:
+        """
+        归还前清理会话状态：关闭多余窗口、关闭弹窗并导航到空白页
+        
+        Returns:
+            bool: 清理是否成功，失败的会话不再复用
+        """
+        driver = session.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            
+            try:
+                driver.switch_to.alert.accept()
+            except Exception:
+                pass
+            
+            driver.get(BLANK_PAGE_URL)
+            return True
+        except Exception as e:
+            logger.debug(f"清理浏览器会话失败: {e}")
+            return False
+    
+    def _take_expired_locked(self) -> List[PooledDriver]:
+        """取出空闲超时的会话（调用方持有锁，会话数不少于最少数量）"""
+        if self.idle_timeout <= 0:
+            return []
+        
+        now = time.monotonic()
+        expired = []
+        for session in list(self._idle):
+            if self._size - len(expired) <= self.min_size:
+                break
+            if now - session.last_used > self.idle_timeout:
+                self._idle.remove(session)
+                expired.append(session)
+        self._size -= len(expired)
+        return expired
+    
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """
+        租用浏览器会话
+        
+        Args:
+            timeout: 所有会话都被占用时的最长等待时间（秒），None表示一直等待
+        
+        Returns:
+            PooledDriver: 已加载cookies的浏览器会话
+        
+        Raises:
+            BrowserError: 会话池已关闭、等待超时或创建浏览器失败时
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        expired: List[PooledDriver] = []
+        error: Optional[str] = None
+        session: Optional[PooledDriver] = None
+        
+        with self._condition:
+            while True:
+                if self._closed:
+                    error = "浏览器会话池已关闭"
+                    break
+                
+                expired.extend(self._take_expired_locked())
+                if self._idle:
+                    # 优先复用最近归还的会话
+                    session = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # 占用一个名额，在锁外创建浏览器
+                    self._size += 1
+                    break
+                
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    error = "等待浏览器会话超时"
+                    break
+                self._condition.wait(remaining)
+            
+            if error is None:
+                self._leased += 1
+        
+        self._close_sessions(expired)
+        if error is not None:
+            raise BrowserError(error, browser_action="acquire")
+        
+        try:
+            if session is not None and not self._is_healthy(session):
+                logger.info("♻️ 浏览器会话已失效，重新创建")
+                self._close_sessions([session])
+                session = None
+            
+            if session is None:
+                session = self._create_session()
+            elif session.cookies_mtime != self._cookies_mtime():
+                logger.info("🍪 cookies文件已更新，重新注入")
+                self._inject_cookies(session)
+        
+        except Exception as e:
+            if session is not None:
+                self._close_sessions([session])
+            with self._condition:
+                self._size -= 1
+                self._leased -= 1
+                self._condition.notify()
+            if isinstance(e, BrowserError):
+                raise
+            raise BrowserError(f"创建浏览器会话失败: {str(e)}", browser_action="acquire") from e
+        
+        return session
+    
+    def release(self, session: PooledDriver, discard: bool = False) -> None:
+        """
+        归还浏览器会话
+        
+        Args:
+            session: 租用的会话
+            discard: 是否直接关闭该会话（任务出错后页面状态不确定时使用）
+        """
+        session.uses += 1
+        session.last_used = time.monotonic()
+        
+        if self._closed or session.uses >= self.max_uses:
+            discard = True
+        if not discard:
+            discard = not self._reset(session)
+        
+        with self._condition:
+            self._leased -= 1
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append(session)
+            self._condition.notify()
+        
+        if discard:
+            self._close_sessions([session])
+            self.warm_up()
+    
+    @staticmethod
+    def _close_sessions(sessions: List[PooledDriver]) -> None:
+        """关闭浏览器会话"""
+        for session in sessions:
+            session.manager.close_driver()
+    
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[webdriver.Chrome]:
+        """
+        在with语句中租用浏览器驱动，退出时归还（出错时关闭该会话）
+        
+        Args:
+            timeout: 等待空闲会话的最长时间（秒）
+        
+        Yields:
+            Chrome WebDriver实例
+        """
+        session = self.acquire(timeout)
+        try:
+            yield session.driver
+        except BaseException:
+            self.release(session, discard=True)
+            raise
+        else:
+            self.release(session)
+    
+    @asynccontextmanager
+    async def lease_async(self, timeout: Optional[float] = None) -> AsyncIterator[webdriver.Chrome]:
+        """
+        在async with语句中租用浏览器驱动，等待和创建浏览器在线程池中进行，不阻塞事件循环
+        
+        Args:
+            timeout: 等待空闲会话的最长时间（秒）
+        
+        Yields:
+            Chrome WebDriver实例
+        """
+        loop = asyncio.get_running_loop()
+        session = await loop.run_in_executor(None, self.acquire, timeout)
+        try:
+            yield session.driver
+        except BaseException:
+            await loop.run_in_executor(None, self.release, session, True)
+            raise
+        else:
+            await loop.run_in_executor(None, self.release, session)
+    
+    def warm_up(self) -> None:
+        """在后台线程中创建会话，补足最少会话数"""
+        if self._closed or self._size >= self.min_size:
+            return
+        threading.Thread(target=self._fill_to_min_size, name="xhs-driver-pool-warmup", daemon=True).start()
+    
+    def _fill_to_min_size(self) -> None:
+        """创建会话直到达到最少会话数"""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            
+            try:
+                session = self._create_session()
+            except Exception as e:
+                logger.warning(f"⚠️ 预热浏览器会话失败: {e}")
+                with self._condition:
+                    self._size -= 1
+                return
+            
+            with self._condition:
+                if self._closed:
+                    self._size -= 1
+                    discard = True
+                else:
+                    self._idle.append(session)
+                    self._condition.notify()
+                    discard = False
+            if discard:
+                self._close_sessions([session])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取会话池状态
+        
+        Returns:
+            Dict[str, Any]: 会话数、空闲数、租用数和配置
+        """
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "leased": self._leased,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "max_uses": self.max_uses,
+                "profile": self.profile,
+                "closed": self._closed
+            }
+    
+    def shutdown(self) -> None:
+        """关闭会话池和所有空闲浏览器，租用中的浏览器在归还时关闭"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        
+        self._close_sessions(idle)
+        if idle:
+            logger.info(f"🧹 浏览器会话池已关闭，关闭 {len(idle)} 个浏览器")
+
+
+# 进程内共享的浏览器会话池（每个配置档一个）
+_driver_pools: Dict[str, DriverPool] = {}
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool(config: XHSConfig, profile: str = PROFILE_DEFAULT) -> Optional[DriverPool]:
+    """
+    获取进程内共享的浏览器会话池
+    
+    Args:
+        config: 配置管理器实例（仅首次调用时用于创建会话池）
+        profile: 浏览器配置档，非默认配置档的会话池不预热常驻浏览器
+    
+    Returns:
+        Optional[DriverPool]: 会话池，未启用ENABLE_DRIVER_POOL时返回None
+    """
+    if not config.enable_driver_pool:
+        return None
+    
+    with _driver_pool_lock:
+        pool = _driver_pools.get(profile)
+        if pool is None or pool.get_stats()["closed"]:
+            min_size = None if profile == PROFILE_DEFAULT else 0
+            pool = DriverPool(config, min_size=min_size, profile=profile)
+            _driver_pools[profile] = pool
+            atexit.register(pool.shutdown)
+            pool.warm_up()
+            logger.info(f"🏊 浏览器会话池已启用({profile}): 最少 {pool.min_size}, 最多 {pool.max_size}, "
+                        f"每个会话最多使用 {pool.max_uses} 次")
+        return pool
+
+
+def shutdown_driver_pool() -> None:
+    """关闭进程内共享的所有浏览器会话池"""
+    with _driver_pool_lock:
+        for pool in _driver_pools.values():
+            pool.shutdown()
@@ -72,6 +72,13 @@ class ValidationError(XHSToolkitError):
         super().__init__(message, "VALIDATION_ERROR", {"field_name": field_name, "field_value": field_value})
 
 
+class TaskQueueFullError(XHSToolkitError):
+    """任务队列已满"""
+    
+    def __init__(self, message: str, queued: Optional[int] = None, retry_after: Optional[int] = None):
+        super().__init__(message, "QUEUE_FULL", {"queued": queued, "retry_after": retry_after})
+
+
 def handle_exception(func: Callable) -> Callable:
     """
     异常处理装饰器
@@ -1,19 +1,29 @@
 """
 小红书工具包数据存储模块
 
-提供数据持久化功能，支持CSV和PostgreSQL存储
+提供数据持久化功能，支持CSV、Parquet、SQLite和PostgreSQL存储
 """
 
 from .storage.csv_storage import CSVStorage
 from .storage.pg_storage import PostgreSQLStorage
+from .storage.parquet_storage import ParquetStorage
+from .storage.sqlite_storage import SQLiteStorage
 from .storage.base import BaseStorage
 from .storage_manager import storage_manager
 from .scheduler import data_scheduler
+from .analytics import TrendAnalyzer
+from .records import DashboardRecord, FansRecord, NoteAnalyticsRecord
 
 __all__ = [
     'CSVStorage',
     'PostgreSQLStorage', 
+    'ParquetStorage',
+    'SQLiteStorage',
     'BaseStorage',
     'storage_manager',
-    'data_scheduler'
+    'data_scheduler',
+    'TrendAnalyzer',
+    'DashboardRecord',
+    'FansRecord',
+    'NoteAnalyticsRecord'
 ] 
\ No newline at end of file
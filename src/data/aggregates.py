@@ -0,0 +1,428 @@
+"""
+增量汇总表
+
+StorageManager每次保存数据时增量维护以下汇总，读取汇总指标时无需扫描原始数据：
+1. 按天汇总：每天每个统计维度（内容分析为全部笔记）的指标合计
+2. 运行平均：按天汇总的累计和与天数，平均值 = 累计和 / 天数
+3. 历史最大值：按天汇总指标的历史最大值
+4. 单篇笔记汇总：首次/最近采集日期、各指标历史最大值、按天平均值、最新值
+
+CSV存储同一天多次保存只保留最后一次，汇总表采用相同语义：
+重复保存当天数据时先减去当天原有的贡献再加上新数据，结果与只保存一次一致；
+当天原来是历史最大值时，根据按天汇总重新计算最大值。
+
+汇总表保存在CSV目录下的 .aggregates.json，每次保存只向 .aggregates.journal
+追加一条更新记录（只含汇总用到的字段），读取时重放日志中尚未合并的记录。
+日志累计 COMPACT_EVERY 条后才把汇总表整体写回（先写临时文件再原子替换）并清空日志。
+写入时持有跨进程文件锁。
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .storage.base import coerce_int
+from .storage.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_VERSION = 1
+
+# 日志累计多少条更新后合并写回汇总表文件
+COMPACT_EVERY = 100
+
+# 各数据类型参与汇总的指标
+AGGREGATE_METRICS = {
+    'dashboard': ['views', 'likes', 'collects', 'comments', 'shares', 'interactions'],
+    'content_analysis': ['views', 'likes', 'comments', 'collects', 'shares', 'fans_growth', 'danmu_count'],
+    'fans': ['total_fans', 'new_fans', 'lost_fans']
+}
+
+# 内容分析数据的按天汇总不区分维度
+ALL_NOTES = 'all'
+
+
+def _empty_aggregates() -> Dict[str, Any]:
+    """创建空的汇总表"""
+    return {
+        'version': AGGREGATES_VERSION,
+        'daily': {data_type: {} for data_type in AGGREGATE_METRICS},
+        'running': {data_type: {} for data_type in AGGREGATE_METRICS},
+        'maxima': {data_type: {} for data_type in AGGREGATE_METRICS},
+        'notes': {},
+        # 已合并到汇总表的最后一条日志记录的序号
+        'seq': 0
+    }
+
+
+class AggregateStore:
+    """增量汇总表"""
+    
+    def __init__(self, path: Path):
+        """
+        初始化汇总表
+        
+        Args:
+            path: 汇总表文件路径
+        """
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(f"{self.path.stem}.journal")
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.path)
+        self._data: Dict[str, Any] = _empty_aggregates()
+        self._stat_key = None
+        # 日志中已读取的字节数和记录数
+        self._journal_offset = 0
+        self._journal_entries = 0
+    
+    def exists(self) -> bool:
+        """检查汇总表文件或更新日志是否存在"""
+        return self.path.exists() or self.journal_path.exists()
+    
+    def _current_stat_key(self):
+        """获取汇总表文件的(大小, 修改时间)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _reload(self) -> None:
+        """汇总表文件被其他进程更新后重新加载，并重放日志中新增的记录"""
+        key = self._current_stat_key()
+        if key != self._stat_key:
+            data = _empty_aggregates()
+            if key is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        loaded = json.load(f)
+                except Exception as e:
+                    logger.warning(f"⚠️ 读取汇总表失败: {e}")
+                    return
+                if loaded.get('version') == AGGREGATES_VERSION:
+                    data = {**data, **loaded}
+                else:
+                    logger.warning("⚠️ 汇总表版本不匹配，将重新累计")
+            self._data = data
+            self._stat_key = key
+            self._journal_offset = 0
+            self._journal_entries = 0
+        
+        self._replay_journal()
+    
+    def _replay_journal(self) -> None:
+        """应用日志中尚未读取的记录（序号不大于汇总表序号的记录已合并，跳过）"""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self._journal_offset:
+                    # 日志已被其他进程合并清空
+                    self._journal_offset = 0
+                    self._journal_entries = 0
+                f.seek(self._journal_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+        
+        # 只读取完整的行，末尾不完整的记录是写入中断留下的
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning("⚠️ 跳过汇总表日志中损坏的记录")
+                continue
+            self._journal_entries += 1
+            if entry['seq'] > self._data['seq']:
+                self._apply(entry['type'], entry['day'], entry['rows'])
+                self._data['seq'] = entry['seq']
+        self._journal_offset += end
+    
+    def _append_journal(self, entry: Dict[str, Any]) -> None:
+        """向日志追加一条更新记录（调用方持有锁）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.journal_path, 'ab') as f:
+            if f.tell() > self._journal_offset:
+                # 截掉上次写入中断留下的不完整记录
+                f.truncate(self._journal_offset)
+            f.write(line)
+        self._journal_offset += len(line)
+        self._journal_entries += 1
+    
+    def _save(self) -> None:
+        """把汇总表整体写回文件（先写临时文件再原子替换）并清空日志"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._stat_key = self._current_stat_key()
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        
+        # 汇总表已包含日志中的全部记录（在此之前中断时按序号跳过已合并的记录）
+        with open(self.journal_path, 'wb'):
+            pass
+        self._journal_offset = 0
+        self._journal_entries = 0
+    
+    @staticmethod
+    def _group_key(data_type: str, row: Dict[str, Any]) -> str:
+        """获取数据行所属的汇总分组"""
+        if data_type == 'content_analysis':
+            return ALL_NOTES
+        return str(row.get('dimension', '') or ALL_NOTES)
+    
+    @staticmethod
+    def _metrics(data_type: str, row: Dict[str, Any]) -> Dict[str, int]:
+        """提取数据行的汇总指标"""
+        return {metric: coerce_int(row.get(metric, 0)) for metric in AGGREGATE_METRICS[data_type]}
+    
+    @classmethod
+    def _journal_row(cls, data_type: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """只保留汇总用到的字段（写入日志）"""
+        if data_type == 'content_analysis':
+            compact = {'title': str(row.get('title', '') or ''), 'publish_time': str(row.get('publish_time', '') or '')}
+        else:
+            compact = {'dimension': str(row.get('dimension', '') or '')}
+        compact.update(cls._metrics(data_type, row))
+        return compact
+    
+    def update(self, data_type: str, data: List[Dict[str, Any]], day: Optional[str] = None) -> None:
+        """
+        用一次保存的数据更新汇总表（替换当天已有的数据）
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            data: 本次保存的数据列表
+            day: 数据所属日期，默认为今天
+        """
+        if data_type not in AGGREGATE_METRICS:
+            return
+        
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        rows = [self._journal_row(data_type, row) for row in data]
+        with self._lock, self._file_lock:
+            self._reload()
+            seq = self._data['seq'] + 1
+            self._append_journal({'seq': seq, 'type': data_type, 'day': day, 'rows': rows})
+            self._apply(data_type, day, rows)
+            self._data['seq'] = seq
+            if self._journal_entries >= COMPACT_EVERY:
+                self._save()
+    
+    def _apply(self, data_type: str, day: str, data: List[Dict[str, Any]]) -> None:
+        """在内存中应用一次保存"""
+        metrics = AGGREGATE_METRICS[data_type]
+        
+        # 按分组计算当天的合计
+        totals: Dict[str, Dict[str, int]] = {}
+        for row in data:
+            group = totals.setdefault(self._group_key(data_type, row), {**dict.fromkeys(metrics, 0), 'records': 0})
+            for metric, value in self._metrics(data_type, row).items():
+                group[metric] += value
+            group['records'] += 1
+        
+        daily = self._data['daily'][data_type]
+        previous = daily.get(day, {})
+        running = self._data['running'][data_type]
+        maxima = self._data['maxima'][data_type]
+        
+        # 先撤销当天原有的贡献，再累计新数据
+        for group, old in previous.items():
+            stats = running.get(group)
+            if stats:
+                stats['days'] -= 1
+                for metric in metrics:
+                    stats['sum'][metric] -= old.get(metric, 0)
+        
+        for group, new in totals.items():
+            stats = running.setdefault(group, {'days': 0, 'sum': dict.fromkeys(metrics, 0)})
+            stats['days'] += 1
+            for metric in metrics:
+                stats['sum'][metric] += new[metric]
+            
+        daily[day] = totals
+        
+        for group in set(previous) | set(totals):
+            group_max = maxima.setdefault(group, {})
+            new = totals.get(group)
+            for metric in metrics:
+                current = group_max.get(metric)
+                if current and current['date'] == day and (new is None or new[metric] < current['value']):
+                    # 被替换的当天数据原来是最大值，根据按天汇总重新计算
+                    self._recompute_max(daily, group, group_max, metric)
+                elif new is not None and new[metric] > (current or {}).get('value', float('-inf')):
+                    group_max[metric] = {'value': new[metric], 'date': day}
+            if not group_max:
+                del maxima[group]
+        
+        if data_type == 'content_analysis':
+            self._apply_notes(day, data)
+    
+    @staticmethod
+    def _recompute_max(daily: Dict[str, Dict[str, Any]], group: str,
+                       group_max: Dict[str, Any], metric: str) -> None:
+        """根据按天汇总重新计算分组某个指标的历史最大值"""
+        best = None
+        for day in sorted(daily):
+            totals = daily[day].get(group)
+            if totals and (best is None or totals[metric] > best['value']):
+                best = {'value': totals[metric], 'date': day}
+        if best is None:
+            group_max.pop(metric, None)
+        else:
+            group_max[metric] = best
+    
+    def _apply_notes(self, day: str, data: List[Dict[str, Any]]) -> None:
+        """更新单篇笔记的汇总"""
+        metrics = AGGREGATE_METRICS['content_analysis']
+        notes = self._data['notes']
+        
+        for row in data:
+            title = str(row.get('title', '') or '')
+            if not title:
+                continue
+            values = self._metrics('content_analysis', row)
+            note = notes.get(title)
+            
+            if note is None:
+                note = {
+                    'publish_time': row.get('publish_time', ''),
+                    'first_seen': day,
+                    'last_seen': day,
+                    'days': 0,
+                    'sum': dict.fromkeys(metrics, 0),
+                    'max': dict.fromkeys(metrics, 0),
+                    # 不含最近采集日期的历史最大值（当天重复保存时据此重新计算最大值）
+                    'max_before': dict.fromkeys(metrics, 0),
+                    'latest': {}
+                }
+                notes[title] = note
+            
+            if note['last_seen'] == day and note['latest']:
+                # 当天重复保存：撤销上一次的贡献
+                for metric in metrics:
+                    note['sum'][metric] -= note['latest'].get(metric, 0)
+                note['max'] = dict(note.get('max_before', note['max']))
+            else:
+                note['days'] += 1
+                note['max_before'] = dict(note['max'])
+            
+            for metric in metrics:
+                note['sum'][metric] += values[metric]
+                note['max'][metric] = max(note['max'][metric], values[metric])
+            
+            note['latest'] = values
+            note['last_seen'] = max(note['last_seen'], day)
+            if row.get('publish_time'):
+                note['publish_time'] = row['publish_time']
+    
+    def rebuild(self, history: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        根据历史数据重建汇总表
+        
+        Args:
+            history: {数据类型: 按创建时间升序排列的全部数据行}
+        """
+        with self._lock, self._file_lock:
+            self._reload()
+            seq = self._data['seq']
+            self._data = _empty_aggregates()
+            # 保留日志序号，重建前写入日志的记录不会再被重放
+            self._data['seq'] = seq
+            for data_type, rows in history.items():
+                by_day: Dict[str, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    day = str(row.get('created_at', ''))[:10]
+                    if len(day) == 10:
+                        by_day.setdefault(day, []).append(row)
+                for day in sorted(by_day):
+                    self._apply(data_type, day, by_day[day])
+            self._save()
+        logger.info(f"📊 已根据历史数据重建汇总表: {self.path.name}")
+    
+    def get_summary(self, data_type: str) -> Dict[str, Any]:
+        """
+        获取数据类型的汇总指标
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+        
+        Returns:
+            Dict[str, Any]: {分组: {latest_date, latest, days, average, max}}
+        """
+        with self._lock:
+            self._reload()
+            daily = self._data['daily'].get(data_type, {})
+            latest_date = max(daily) if daily else None
+            
+            summary = {}
+            for group, stats in self._data['running'].get(data_type, {}).items():
+                if stats['days'] <= 0:
+                    continue
+                summary[group] = {
+                    'latest_date': latest_date,
+                    'latest': daily.get(latest_date, {}).get(group),
+                    'days': stats['days'],
+                    'average': {
+                        metric: round(total / stats['days'], 2) for metric, total in stats['sum'].items()
+                    },
+                    'max': self._data['maxima'][data_type].get(group, {})
+                }
+            return summary
+    
+    def get_daily_totals(self, data_type: str, day: str) -> Dict[str, Any]:
+        """
+        获取某一天的指标合计
+        
+        Args:
+            data_type: 数据类型
+            day: 日期（YYYY-MM-DD）
+        
+        Returns:
+            Dict[str, Any]: {分组: 指标合计}
+        """
+        with self._lock:
+            self._reload()
+            return self._data['daily'].get(data_type, {}).get(day, {})
+    
+    def get_note_summary(self, title: str) -> Optional[Dict[str, Any]]:
+        """
+        获取单篇笔记的汇总
+        
+        Args:
+            title: 笔记标题
+        
+        Returns:
+            Optional[Dict[str, Any]]: 笔记汇总，未采集过时返回None
+        """
+        with self._lock:
+            self._reload()
+            note = self._data['notes'].get(title)
+            if note is None:
+                return None
+            return {
+                'title': title,
+                'publish_time': note['publish_time'],
+                'first_seen': note['first_seen'],
+                'last_seen': note['last_seen'],
+                'days': note['days'],
+                'latest': note['latest'],
+                'max': note['max'],
+                'average': {
+                    metric: round(total / note['days'], 2) for metric, total in note['sum'].items()
+                } if note['days'] else {}
+            }
+    
+    def note_count(self) -> int:
+        """获取已采集过的笔记数"""
+        with self._lock:
+            self._reload()
+            return len(self._data['notes'])
@@ -0,0 +1,314 @@
+"""
+创作者数据趋势分析
+
+基于存储的仪表板、粉丝和内容分析历史数据计算趋势指标：
+1. 按天的环比变化（day-over-day）
+2. 7天/30天滚动窗口
+3. 单篇笔记的互动率及全部笔记的分位数分布
+
+全部计算使用pandas/NumPy向量化操作，不逐行循环，
+数万条笔记日数据也能在毫秒级完成。
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .storage.csv_storage import CSVStorage
+
+logger = logging.getLogger(__name__)
+
+# 滚动窗口（天）
+ROLLING_WINDOWS = (7, 30)
+# 笔记指标分位数
+PERCENTILES = (0.5, 0.75, 0.9, 0.99)
+# 仪表板指标
+DASHBOARD_METRICS = ['views', 'likes', 'collects', 'comments', 'shares', 'interactions']
+# 计入笔记互动数的指标
+ENGAGEMENT_FIELDS = ['likes', 'comments', 'collects', 'shares']
+# 分位数统计的笔记指标
+NOTE_METRICS = ['views', 'likes', 'comments', 'collects', 'shares', 'interactions', 'engagement_rate']
+
+
+def _to_builtin(value: Any) -> Any:
+    """将NumPy/pandas标量转换为可JSON序列化的Python类型，缺失值转换为None"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return None if np.isnan(value) else round(float(value), 4)
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+def _map_values(series: pd.Series, func) -> pd.Series:
+    """
+    对文本列做向量化转换
+    
+    通过列式缓存读取的文本列为分类类型，只需对去重后的分类值计算一次，
+    再按编码展开到每一行，避免为每一行构造字符串
+    
+    Args:
+        series: 文本列（分类类型或普通类型）
+        func: 接收字符串Series、返回等长Series的向量化函数
+    
+    Returns:
+        pd.Series: 转换结果，缺失值对应NaN
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        mapped = func(pd.Series(series.cat.categories.astype(str)))
+        codes = series.cat.codes.to_numpy()
+        result = pd.Series(mapped.to_numpy()[np.maximum(codes, 0)], index=series.index)
+        return result.where(codes >= 0)
+    return func(series.astype(str))
+
+
+def _row_dict(row: pd.Series) -> Dict[str, Any]:
+    """将一行数据转换为可JSON序列化的字典"""
+    return {str(key): _to_builtin(value) for key, value in row.items()}
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """将数据表转换为可JSON序列化的字典列表"""
+    return [
+        {str(key): _to_builtin(value) for key, value in record.items()}
+        for record in frame.to_dict('records')
+    ]
+
+
+class TrendAnalyzer:
+    """创作者数据趋势分析器"""
+    
+    def __init__(self, csv_storage: CSVStorage):
+        """
+        初始化趋势分析器
+        
+        Args:
+            csv_storage: CSV存储实例，通过其列式缓存读取历史数据
+        """
+        self.csv_storage = csv_storage
+    
+    def _load(self, data_type: str, since: Optional[str], until: Optional[str]) -> pd.DataFrame:
+        """
+        读取数据并按创建时间过滤，添加date列（按天）
+        
+        Args:
+            data_type: 数据类型
+            since: 起始时间（ISO格式，包含）
+            until: 结束时间（ISO格式，包含，按until的精度比较）
+        
+        Returns:
+            pd.DataFrame: 过滤后的数据表
+        """
+        frame = self.csv_storage.load_frame(data_type)
+        if frame.empty or 'created_at' not in frame.columns:
+            return pd.DataFrame()
+        
+        created_at = frame['created_at']
+        mask = pd.Series(True, index=frame.index)
+        if since:
+            mask &= _map_values(created_at, lambda s: s >= since).fillna(False).astype(bool)
+        if until:
+            mask &= _map_values(created_at, lambda s: s.str[:len(until)] <= until).fillna(False).astype(bool)
+        
+        frame = frame.loc[mask].copy()
+        # 解析为时间类型用于排序，date为所在日期
+        frame['created_at'] = pd.to_datetime(
+            _map_values(frame['created_at'], lambda s: pd.to_datetime(s, errors='coerce'))
+        )
+        frame['date'] = frame['created_at'].dt.normalize()
+        return frame.dropna(subset=['date'])
+    
+    @staticmethod
+    def _daily_snapshots(frame: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """每个键每天只保留最后一次采集的数据，按键和日期排序"""
+        frame = frame.sort_values('created_at', kind='stable')
+        frame = frame.drop_duplicates(subset=keys + ['date'], keep='last')
+        return frame.sort_values(keys + ['date'], kind='stable').reset_index(drop=True)
+    
+    @staticmethod
+    def _numeric(frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """将指标列转换为数值类型（无法解析的值视为0）"""
+        for column in columns:
+            if column not in frame.columns:
+                frame[column] = 0
+            elif not pd.api.types.is_numeric_dtype(frame[column]):
+                frame[column] = _map_values(frame[column], lambda s: pd.to_numeric(s, errors='coerce')).fillna(0)
+        return frame
+    
+    @staticmethod
+    def _series_trend(daily: pd.DataFrame, metrics: List[str], rolling: str) -> Dict[str, Any]:
+        """
+        计算一组按天指标的最新值、环比变化和滚动窗口
+        
+        Args:
+            daily: 以date为索引、每天一行的数据表
+            metrics: 指标列
+            rolling: 滚动窗口的聚合方式（mean或sum）
+        
+        Returns:
+            Dict[str, Any]: 趋势结果
+        """
+        values = daily[metrics]
+        # 按相邻采集日计算变化，并折算为每天的变化量（采集中断时不会放大环比）
+        day_gaps = daily.index.to_series().diff().dt.days
+        delta = values.diff()
+        delta_per_day = delta.div(day_gaps, axis=0)
+        
+        result = {
+            'days': len(daily),
+            'first_date': daily.index[0].strftime('%Y-%m-%d'),
+            'latest_date': daily.index[-1].strftime('%Y-%m-%d'),
+            'latest': _row_dict(values.iloc[-1]),
+            'day_over_day': _row_dict(delta_per_day.iloc[-1]),
+            'day_over_day_pct': _row_dict(
+                (delta.iloc[-1] / values.iloc[-2].replace(0, np.nan) * 100) if len(values) > 1
+                else values.iloc[-1] * np.nan
+            )
+        }
+        for window in ROLLING_WINDOWS:
+            rolled = getattr(values.rolling(f'{window}D'), rolling)()
+            result[f'rolling_{window}d_{rolling}'] = _row_dict(rolled.iloc[-1])
+        return result
+    
+    def analyze_dashboard(self, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        分析仪表板数据（按统计维度分别计算）
+        
+        Returns:
+            Dict[str, Any]: {统计维度: 趋势结果}
+        """
+        frame = self._load('dashboard', since, until)
+        if frame.empty:
+            return {}
+        
+        frame = self._numeric(frame, DASHBOARD_METRICS)
+        frame['engagement_rate'] = (frame['interactions'] / frame['views'].replace(0, np.nan))
+        daily = self._daily_snapshots(frame, ['dimension'])
+        
+        metrics = DASHBOARD_METRICS + ['engagement_rate']
+        return {
+            str(dimension): self._series_trend(group.set_index('date'), metrics, 'mean')
+            for dimension, group in daily.groupby('dimension', observed=True, sort=True)
+        }
+    
+    def analyze_fans(self, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        分析粉丝数据（按统计维度分别计算）
+        
+        Returns:
+            Dict[str, Any]: {统计维度: 趋势结果}，滚动窗口为总粉丝数变化量之和
+        """
+        frame = self._load('fans', since, until)
+        if frame.empty:
+            return {}
+        
+        frame = self._numeric(frame, ['total_fans', 'new_fans', 'lost_fans'])
+        frame['net_fans'] = frame['new_fans'] - frame['lost_fans']
+        daily = self._daily_snapshots(frame, ['dimension'])
+        
+        result = {}
+        for dimension, group in daily.groupby('dimension', observed=True, sort=True):
+            group = group.set_index('date')
+            trend = self._series_trend(group, ['total_fans', 'new_fans', 'lost_fans', 'net_fans'], 'mean')
+            # 总粉丝数在滚动窗口内的实际增长
+            growth = group['total_fans'].diff()
+            for window in ROLLING_WINDOWS:
+                trend[f'total_fans_growth_{window}d'] = _to_builtin(growth.rolling(f'{window}D').sum().iloc[-1])
+            result[str(dimension)] = trend
+        return result
+    
+    def analyze_content(self, since: Optional[str] = None, until: Optional[str] = None,
+                        top_n: int = 5) -> Dict[str, Any]:
+        """
+        分析内容数据：单篇笔记互动率、指标分位数、笔记浏览增长趋势
+        
+        Args:
+            since: 起始时间
+            until: 结束时间
+            top_n: 排行榜返回的笔记数
+        
+        Returns:
+            Dict[str, Any]: 内容分析结果
+        """
+        frame = self._load('content_analysis', since, until)
+        if frame.empty:
+            return {}
+        
+        frame = self._numeric(frame, ENGAGEMENT_FIELDS + ['views'])
+        notes = self._daily_snapshots(frame, ['title'])
+        
+        notes['interactions'] = notes[ENGAGEMENT_FIELDS].sum(axis=1)
+        notes['engagement_rate'] = notes['interactions'] / notes['views'].replace(0, np.nan)
+        # 笔记指标为累计值，相邻采集日之差即为期间增长
+        by_note = notes.groupby('title', sort=False, observed=True)
+        notes['views_delta'] = by_note['views'].diff()
+        notes['interactions_delta'] = by_note['interactions'].diff()
+        
+        # 每篇笔记的最新数据（已按标题、日期排序）
+        latest = notes.drop_duplicates(subset=['title'], keep='last')
+        percentiles = latest[NOTE_METRICS].quantile(list(PERCENTILES))
+        percentiles.index = [f'p{int(q * 100)}' for q in PERCENTILES]
+        
+        # 全部笔记每天的浏览和互动增长
+        daily_growth = notes.groupby('date')[['views_delta', 'interactions_delta']].sum(min_count=1)
+        daily_growth.columns = ['views', 'interactions']
+        growth = {}
+        if not daily_growth.dropna(how='all').empty:
+            growth['latest_date'] = daily_growth.index[-1].strftime('%Y-%m-%d')
+            growth['latest'] = _row_dict(daily_growth.iloc[-1])
+            for window in ROLLING_WINDOWS:
+                growth[f'rolling_{window}d_sum'] = _row_dict(daily_growth.rolling(f'{window}D').sum().iloc[-1])
+        
+        columns = ['title', 'publish_time', 'date', 'views', 'interactions', 'engagement_rate', 'views_delta']
+        columns = [column for column in columns if column in latest.columns]
+        # 互动率排行只统计有一定浏览量的笔记，避免个位数浏览量的笔记排在前面
+        qualified = latest[latest['views'] >= latest['views'].median()]
+        
+        return {
+            'notes': int(latest['title'].nunique()),
+            'note_days': len(notes),
+            'latest_date': notes['date'].max().strftime('%Y-%m-%d'),
+            'totals': _row_dict(latest[['views'] + ENGAGEMENT_FIELDS + ['interactions']].sum()),
+            'engagement_rate': _to_builtin(
+                latest['interactions'].sum() / latest['views'].sum() if latest['views'].sum() else np.nan
+            ),
+            'percentiles': {
+                metric: _row_dict(percentiles[metric]) for metric in NOTE_METRICS
+            },
+            'daily_growth': growth,
+            'top_by_views': _records(latest.nlargest(top_n, 'views')[columns]),
+            'top_by_engagement': _records(qualified.nlargest(top_n, 'engagement_rate')[columns]),
+            'top_by_growth': _records(latest.dropna(subset=['views_delta']).nlargest(top_n, 'views_delta')[columns])
+        }
+    
+    def analyze(self, since: Optional[str] = None, until: Optional[str] = None,
+                top_n: int = 5) -> Dict[str, Any]:
+        """
+        执行全部趋势分析
+        
+        Args:
+            since: 起始时间（ISO格式，包含），None表示不限
+            until: 结束时间（ISO格式，包含；只给日期时包含当天全部数据），None表示不限
+            top_n: 笔记排行榜返回的数量
+        
+        Returns:
+            Dict[str, Any]: 可JSON序列化的分析结果
+        """
+        started = datetime.now()
+        result = {
+            'generated_at': started.isoformat(),
+            'range': {'since': since, 'until': until},
+            'dashboard': self.analyze_dashboard(since, until),
+            'fans': self.analyze_fans(since, until),
+            'content': self.analyze_content(since, until, top_n)
+        }
+        logger.debug(f"趋势分析完成，耗时 {(datetime.now() - started).total_seconds():.3f} 秒")
+        return result
@@ -0,0 +1,95 @@
+"""
+采集断点
+
+内容分析逐页采集耗时较长，浏览器崩溃或页面超时会丢失整次采集的进度。
+每采集完一页，把已完成的页码和已采集的笔记写入断点文件；
+同一天再次采集时从断点的下一页继续，采集全部完成后删除断点。
+
+断点只在当天有效：采集数据按天保存，跨天的进度没有意义。
+断点文件保存在CSV目录下（如 .content_analysis_checkpoint.json），先写临时文件再原子替换。
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+class CollectionCheckpoint:
+    """分页采集断点"""
+    
+    def __init__(self, path: Path):
+        """
+        初始化采集断点
+        
+        Args:
+            path: 断点文件路径
+        """
+        self.path = Path(path)
+    
+    @staticmethod
+    def _today() -> str:
+        """当天日期"""
+        return datetime.now().strftime('%Y-%m-%d')
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        读取当天的断点
+        
+        Returns:
+            Optional[Dict[str, Any]]: 包含page（已完成的页码）和notes（已采集的笔记）的断点，
+            没有断点、断点不是当天的或文件损坏时返回None
+        """
+        if not self.path.exists():
+            return None
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ 读取采集断点失败，将重新开始采集: {e}")
+            return None
+        
+        if data.get('version') != CHECKPOINT_VERSION or data.get('date') != self._today():
+            return None
+        return data
+    
+    def save(self, page: int, notes: List[Dict[str, Any]]) -> None:
+        """
+        保存断点（先写临时文件再原子替换）
+        
+        Args:
+            page: 已完成的页码
+            notes: 截至该页已采集的全部笔记
+        """
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'date': self._today(),
+            'page': page,
+            'notes': notes,
+            'updated_at': datetime.now().isoformat()
+        }
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                # 笔记数据中可能有不可序列化的值（如元素引用），按字符串保存
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def clear(self) -> None:
+        """采集完成后删除断点"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
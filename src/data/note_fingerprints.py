@@ -0,0 +1,176 @@
+"""
+笔记指纹表
+
+内容分析采集中最耗时的是逐篇打开详情页。多数历史笔记的列表指标已不再变化，
+其详情数据（观众来源、观众画像）也基本不变。本模块为每篇笔记保存上次采集详情时的指纹：
+1. 标识：标题 + 发布时间
+2. 列表指标：采集详情时列表行中的曝光、观看、点赞等数值
+3. 详情数据：上次采集到的详情页字段
+
+下次采集时只为新笔记、列表指标变化超过阈值或详情数据过期的笔记打开详情页，
+其余笔记沿用保存的详情数据，采集耗时随账号活跃度而不是笔记总数增长。
+
+指纹表保存在CSV目录下的 .note_fingerprints.json，写入时持有跨进程文件锁，
+先写临时文件再原子替换。
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .storage.base import coerce_int
+from .storage.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINTS_VERSION = 1
+
+# 参与变化判断的列表指标
+FINGERPRINT_METRICS = ['exposure', 'views', 'likes', 'comments', 'collects', 'fans_growth', 'shares', 'danmu_count']
+
+
+class NoteFingerprintStore:
+    """笔记指纹表"""
+    
+    def __init__(self, path: Path):
+        """
+        初始化指纹表
+        
+        Args:
+            path: 指纹表文件路径
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.path)
+        self._notes: Dict[str, Dict[str, Any]] = {}
+        self._stat_key = None
+    
+    @staticmethod
+    def note_key(note: Dict[str, Any]) -> str:
+        """笔记标识（标题 + 发布时间）"""
+        return f"{str(note.get('title', '') or '').strip()}|{str(note.get('publish_time', '') or '').strip()}"
+    
+    def _current_stat_key(self):
+        """获取指纹表文件的(大小, 修改时间)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _reload(self) -> None:
+        """指纹表文件被其他进程更新后重新加载"""
+        key = self._current_stat_key()
+        if key is None or key == self._stat_key:
+            return
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == FINGERPRINTS_VERSION:
+                self._notes = data.get('notes', {})
+            else:
+                logger.warning("⚠️ 笔记指纹表版本不匹配，将重新采集全部详情")
+                self._notes = {}
+            self._stat_key = key
+        except Exception as e:
+            logger.warning(f"⚠️ 读取笔记指纹表失败: {e}")
+    
+    def _save(self) -> None:
+        """保存指纹表（先写临时文件再原子替换）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': FINGERPRINTS_VERSION, 'notes': self._notes}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._stat_key = self._current_stat_key()
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    @staticmethod
+    def _changed(old: Dict[str, int], new: Dict[str, int], threshold: float) -> bool:
+        """列表指标的相对变化是否超过阈值"""
+        for metric in FINGERPRINT_METRICS:
+            before, after = old.get(metric, 0), new.get(metric, 0)
+            if before == after:
+                continue
+            if before == 0 or abs(after - before) / abs(before) > threshold:
+                return True
+        return False
+    
+    def carried_detail(self, note: Dict[str, Any], threshold: float = 0.05,
+                       max_age_days: float = 7) -> Optional[Dict[str, Any]]:
+        """
+        获取可沿用的详情数据
+        
+        Args:
+            note: 本次采集到的列表行数据
+            threshold: 列表指标相对变化阈值，任一指标变化超过阈值时需要重新采集
+            max_age_days: 详情数据的最长沿用天数，超过后需要重新采集
+        
+        Returns:
+            Optional[Dict[str, Any]]: 可沿用的详情数据；新笔记、指标有变化或已过期时返回None
+        """
+        with self._lock:
+            self._reload()
+            entry = self._notes.get(self.note_key(note))
+        
+        if not entry or not entry.get('detail'):
+            return None
+        
+        try:
+            collected_at = datetime.fromisoformat(entry['collected_at'])
+        except (KeyError, ValueError):
+            return None
+        if datetime.now() - collected_at > timedelta(days=max_age_days):
+            return None
+        
+        metrics = {metric: coerce_int(note.get(metric, 0)) for metric in FINGERPRINT_METRICS}
+        if self._changed(entry.get('metrics', {}), metrics, threshold):
+            return None
+        
+        return dict(entry['detail'])
+    
+    def record(self, notes: Iterable[Dict[str, Any]], detail_fields: List[str]) -> int:
+        """
+        记录本次重新采集了详情的笔记指纹
+        
+        Args:
+            notes: 已采集详情的笔记数据（列表字段 + 详情字段）
+            detail_fields: 详情数据字段名
+        
+        Returns:
+            int: 记录的笔记数量
+        """
+        now = datetime.now().isoformat()
+        entries = {}
+        for note in notes:
+            detail = {field: note[field] for field in detail_fields if field in note}
+            if not note.get('title') or not detail:
+                continue
+            entries[self.note_key(note)] = {
+                'metrics': {metric: coerce_int(note.get(metric, 0)) for metric in FINGERPRINT_METRICS},
+                'detail': detail,
+                'collected_at': now
+            }
+        
+        if not entries:
+            return 0
+        
+        with self._lock, self._file_lock:
+            self._reload()
+            self._notes.update(entries)
+            self._save()
+        return len(entries)
+    
+    def note_count(self) -> int:
+        """已记录指纹的笔记数量"""
+        with self._lock:
+            self._reload()
+            return len(self._notes)
@@ -0,0 +1,165 @@
+"""
+采集数据记录类型
+
+数据采集器输出的记录使用 __slots__ 定义的固定字段类型，代替逐字段拷贝的字典：
+1. 字段顺序与存储字段定义一致（不含created_at/updated_at，由存储后端在保存时添加）
+2. 存储后端可直接按顺序取出字段值批量写入，无需重新按字段名组装字典
+3. 每种记录带有结构版本号，字段定义变化时递增
+
+记录同时提供 get() / [] 按字段名读取，兼容原有按字典读取数据的代码。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, Mapping, Tuple
+
+from .storage.base import (
+    DASHBOARD_FIELDS, CONTENT_ANALYSIS_FIELDS, FANS_FIELDS,
+    TEXT_FIELDS, PERCENT_FIELDS, field_default
+)
+
+# 记录结构版本（字段定义变化时递增）
+SCHEMA_VERSION = 1
+
+# 存储后端在保存时添加的时间戳字段，不属于采集记录
+STORAGE_TIMESTAMP_FIELDS = ('created_at', 'updated_at')
+
+
+def _record_fields(fields) -> Tuple[str, ...]:
+    """去掉存储时间戳字段，得到采集记录的字段顺序"""
+    return tuple(field for field in fields if field not in STORAGE_TIMESTAMP_FIELDS)
+
+
+def _coerce(field: str, value: Any) -> Any:
+    """数值字段中的纯数字字符串转换为整数，其余值保持不变"""
+    if field in TEXT_FIELDS or field in PERCENT_FIELDS:
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+class BaseRecord:
+    """采集记录基类"""
+    
+    __slots__ = ()
+    
+    # 数据类型 (dashboard, content_analysis, fans)
+    DATA_TYPE = ''
+    # 记录字段（与存储字段定义的顺序一致）
+    FIELDS: Tuple[str, ...] = ()
+    SCHEMA_VERSION = SCHEMA_VERSION
+    
+    def __init__(self, **values: Any):
+        """
+        创建记录，未提供的字段使用缺省值
+        
+        Args:
+            **values: 字段值
+        
+        Raises:
+            TypeError: 包含未定义的字段
+        """
+        unknown = set(values) - set(self.FIELDS)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} 不包含字段: {', '.join(sorted(unknown))}")
+        
+        for field in self.FIELDS:
+            setattr(self, field, _coerce(field, values.get(field, field_default(field))))
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'BaseRecord':
+        """
+        从字典创建记录，忽略未定义的字段
+        
+        Args:
+            data: 原始数据
+        
+        Returns:
+            BaseRecord: 记录
+        """
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+    
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """按FIELDS顺序返回全部字段值"""
+        return tuple(getattr(self, field) for field in self.FIELDS)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return dict(zip(self.FIELDS, self.as_tuple()))
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        """按字段名读取，字段不存在时返回default"""
+        if field in self.FIELDS:
+            return getattr(self, field)
+        return default
+    
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+    
+    def __contains__(self, field: str) -> bool:
+        return field in self.FIELDS
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+    
+    def keys(self) -> Tuple[str, ...]:
+        """字段名列表（兼容dict(record)）"""
+        return self.FIELDS
+    
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+    
+    def __repr__(self) -> str:
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+
+class DashboardRecord(BaseRecord):
+    """账号概览记录（一个统计维度一条）"""
+    
+    DATA_TYPE = 'dashboard'
+    FIELDS = _record_fields(DASHBOARD_FIELDS)
+    __slots__ = FIELDS
+
+
+class FansRecord(BaseRecord):
+    """粉丝数据记录（一个统计维度一条）"""
+    
+    DATA_TYPE = 'fans'
+    FIELDS = _record_fields(FANS_FIELDS)
+    __slots__ = FIELDS
+
+
+class NoteAnalyticsRecord(BaseRecord):
+    """单篇笔记的内容分析记录"""
+    
+    DATA_TYPE = 'content_analysis'
+    FIELDS = _record_fields(CONTENT_ANALYSIS_FIELDS)
+    __slots__ = FIELDS
+    
+    @classmethod
+    def from_note(cls, note: Mapping[str, Any]) -> 'NoteAnalyticsRecord':
+        """
+        从采集到的笔记数据创建记录
+        
+        Args:
+            note: 笔记列表和详情页采集到的数据
+        
+        Returns:
+            NoteAnalyticsRecord: 记录
+        """
+        values = {field: note[field] for field in cls.FIELDS if field in note}
+        values['timestamp'] = note.get('extract_time') or datetime.now().isoformat()
+        values.setdefault('note_type', '图文')  # 默认类型，后续可以根据内容判断
+        return cls(**values)
+
+
+# 各数据类型对应的记录类型
+RECORD_TYPES = {
+    record_type.DATA_TYPE: record_type
+    for record_type in (DashboardRecord, NoteAnalyticsRecord, FansRecord)
+}
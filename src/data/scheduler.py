@@ -14,6 +14,8 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.executors.asyncio import AsyncIOExecutor
 
 from .storage_manager import storage_manager
+from ..core.browser import PROFILE_COLLECTOR
+from ..core.browser_executor import run_in_browser
 
 logger = logging.getLogger(__name__)
 
@@ -166,78 +168,57 @@ class DataCollectionScheduler:
                 logger.error(f"备用导入方式也失败: {e2}")
                 return
         
-        # 创建WebDriver实例用于数据采集
-        driver = None
+        # 获取已加载cookies的采集浏览器会话（轻量配置档；启用会话池时复用常驻浏览器，用完归还）
         try:
-            driver = self.client.browser_manager.create_driver()
-            
-            # 加载cookies
-            cookies = self.client.cookie_manager.load_cookies()
-            if cookies:
-                # 先访问小红书主页以设置域名
-                driver.get("https://www.xiaohongshu.com")
+            async with self.client.browser_session(PROFILE_COLLECTOR) as driver:
+                # 采集仪表板数据
+                if collect_dashboard:
+                    total_count += 1
+                    try:
+                        logger.info("采集仪表板数据...")
+                        result = await run_in_browser(driver, collect_dashboard_data, driver, save_data=True)
+                        if result.get("success", False):
+                            success_count += 1
+                            logger.info("✅ 仪表板数据采集完成")
+                        else:
+                            logger.error(f"❌ 仪表板数据采集失败: {result.get('error', '未知错误')}")
+                    except Exception as e:
+                        logger.error(f"❌ 仪表板数据采集失败: {e}")
                 
-                # 加载cookies
-                cookie_result = self.client.browser_manager.load_cookies(cookies)
-                logger.info(f"🍪 Cookies加载结果: {cookie_result}")
-            else:
-                logger.warning("⚠️ 未找到cookies，数据采集可能失败")
-        
+                # 采集内容分析数据
+                if collect_content:
+                    total_count += 1
+                    try:
+                        logger.info("采集内容分析数据...")
+                        result = await collect_content_analysis_data(driver, save_data=True)
+                        if result.get("success", False):
+                            success_count += 1
+                            logger.info("✅ 内容分析数据采集完成")
+                        else:
+                            logger.error(f"❌ 内容分析数据采集失败: {result.get('error', '未知错误')}")
+                    except Exception as e:
+                        logger.error(f"❌ 内容分析数据采集失败: {e}")
+                
+                # 采集粉丝数据
+                if collect_fans:
+                    total_count += 1
+                    try:
+                        logger.info("采集粉丝数据...")
+                        result = await run_in_browser(driver, collect_fans_data, driver, save_data=True)
+                        if result.get("success", False):
+                            success_count += 1
+                            logger.info("✅ 粉丝数据采集完成")
+                        else:
+                            logger.error(f"❌ 粉丝数据采集失败: {result.get('error', '未知错误')}")
+                    except Exception as e:
+                        logger.error(f"❌ 粉丝数据采集失败: {e}")
         except Exception as e:
-            logger.error(f"❌ 创建WebDriver失败: {e}")
-            return
+            logger.error(f"❌ 数据采集浏览器会话出错: {e}")
         
-        try:
-            # 采集仪表板数据
-            if collect_dashboard:
-                total_count += 1
-                try:
-                    logger.info("采集仪表板数据...")
-                    result = collect_dashboard_data(driver, save_data=True)
-                    if result.get("success", False):
-                        success_count += 1
-                        logger.info("✅ 仪表板数据采集完成")
-                    else:
-                        logger.error(f"❌ 仪表板数据采集失败: {result.get('error', '未知错误')}")
-                except Exception as e:
-                    logger.error(f"❌ 仪表板数据采集失败: {e}")
-                    
-            # 采集内容分析数据
-            if collect_content:
-                total_count += 1
-                try:
-                    logger.info("采集内容分析数据...")
-                    result = await collect_content_analysis_data(driver, save_data=True)
-                    if result.get("success", False):
-                        success_count += 1
-                        logger.info("✅ 内容分析数据采集完成")
-                    else:
-                        logger.error(f"❌ 内容分析数据采集失败: {result.get('error', '未知错误')}")
-                except Exception as e:
-                    logger.error(f"❌ 内容分析数据采集失败: {e}")
-                    
-            # 采集粉丝数据
-            if collect_fans:
-                total_count += 1
-                try:
-                    logger.info("采集粉丝数据...")
-                    result = collect_fans_data(driver, save_data=True)
-                    if result.get("success", False):
-                        success_count += 1
-                        logger.info("✅ 粉丝数据采集完成")
-                    else:
-                        logger.error(f"❌ 粉丝数据采集失败: {result.get('error', '未知错误')}")
-                except Exception as e:
-                    logger.error(f"❌ 粉丝数据采集失败: {e}")
-                    
-        finally:
-            # 确保关闭WebDriver
-            if driver:
-                try:
-                    driver.quit()
-                    logger.debug("🔒 WebDriver已关闭")
-                except Exception as e:
-                    logger.warning(f"⚠️ 关闭WebDriver时出错: {e}")
+        # 等待写回队列把本次采集的数据写入存储（在线程中等待，不阻塞事件循环）
+        if not await asyncio.get_running_loop().run_in_executor(None, storage_manager.flush, 300):
+            logger.error("❌ 部分采集数据未能写入存储（写入失败或仍在写回队列中），详见上方日志")
+            success_count = 0
                 
         # 记录采集结果
         end_time = datetime.now()
@@ -7,9 +7,13 @@
 from .base import BaseStorage
 from .csv_storage import CSVStorage
 from .pg_storage import PostgreSQLStorage
+from .parquet_storage import ParquetStorage
+from .sqlite_storage import SQLiteStorage
 
 __all__ = [
     'BaseStorage',
     'CSVStorage',
-    'PostgreSQLStorage'
+    'PostgreSQLStorage',
+    'ParquetStorage',
+    'SQLiteStorage'
 ] 
\ No newline at end of file
@@ -9,9 +9,91 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 
+# 各数据类型的字段定义（英文字段名，所有存储后端共用）
+DASHBOARD_FIELDS = [
+    'created_at', 'updated_at', 'timestamp', 'dimension',
+    'views', 'likes', 'collects', 'comments', 'shares', 'interactions'
+]
+CONTENT_ANALYSIS_FIELDS = [
+    'created_at', 'updated_at', 'timestamp', 'title', 'note_type', 'publish_time',
+    'views', 'likes', 'comments', 'collects', 'shares', 'fans_growth', 'avg_watch_time', 'danmu_count',
+    # 观众来源数据
+    'source_recommend', 'source_search', 'source_follow', 'source_other',
+    # 观众分析数据
+    'gender_male', 'gender_female', 'age_18_24', 'age_25_34', 'age_35_44', 'age_45_plus',
+    'city_top1', 'city_top2', 'city_top3', 'interest_top1', 'interest_top2', 'interest_top3'
+]
+FANS_FIELDS = [
+    'created_at', 'updated_at', 'timestamp', 'dimension', 'total_fans', 'new_fans', 'lost_fans'
+]
+
+DATA_TYPE_FIELDS = {
+    'dashboard': DASHBOARD_FIELDS,
+    'content_analysis': CONTENT_ANALYSIS_FIELDS,
+    'fans': FANS_FIELDS
+}
+
+# 数据库存储中各数据类型对应的表名和唯一键（同一天同一维度/同一笔记只保留一条）
+TABLE_DEFINITIONS = {
+    'dashboard': ('dashboard_data', ('date', 'dimension')),
+    'content_analysis': ('content_analysis_data', ('date', 'title')),
+    'fans': ('fans_data', ('date', 'dimension'))
+}
+
+# 文本类字段，缺省值为空字符串
+TEXT_FIELDS = {
+    'created_at', 'updated_at', 'timestamp', 'dimension', 'title', 'note_type',
+    'publish_time', 'avg_watch_time', 'city_top1', 'city_top2', 'city_top3',
+    'interest_top1', 'interest_top2', 'interest_top3'
+}
+
+# 百分比类字段，缺省值为'0%'
+PERCENT_FIELDS = {
+    'source_recommend', 'source_search', 'source_follow', 'source_other',
+    'gender_male', 'gender_female', 'age_18_24', 'age_25_34', 'age_35_44', 'age_45_plus'
+}
+
+
+def field_default(field: str) -> Any:
+    """
+    获取字段的缺省值
+    
+    Args:
+        field: 字段名
+        
+    Returns:
+        Any: 缺省值（文本字段为''，百分比字段为'0%'，其余为0）
+    """
+    if field in PERCENT_FIELDS:
+        return '0%'
+    if field in TEXT_FIELDS:
+        return ''
+    return 0
+
+
+def coerce_int(value: Any) -> int:
+    """
+    将数值字段转换为整数
+    
+    Args:
+        value: 原始值，可能为数字或数字字符串
+        
+    Returns:
+        int: 转换后的整数，无法转换时返回0
+    """
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
 class BaseStorage(ABC):
     """数据存储基础抽象类"""
     
+    # 保存时是否整体替换当天数据（True：同一天多次保存只有最后一次生效；
+    # False：按唯一键upsert，多次保存的结果会合并）
+    REPLACES_DAY = False
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化存储配置
@@ -85,11 +167,46 @@ class BaseStorage(ABC):
         """
         pass
     
+    @abstractmethod
+    async def get_data_range(self, data_type: str, since: Optional[str] = None,
+                             until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按创建时间范围获取数据
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            since: 起始时间（ISO格式，包含），None表示不限
+            until: 结束时间（ISO格式，包含；只给日期时包含当天全部数据），None表示不限
+            
+        Returns:
+            List[Dict[str, Any]]: 按创建时间升序排列的数据列表
+        """
+        pass
+    
     @abstractmethod
     async def close(self) -> None:
         """关闭存储连接"""
         pass
     
+    @staticmethod
+    def _in_time_range(created_at: str, since: Optional[str] = None, until: Optional[str] = None) -> bool:
+        """
+        判断创建时间是否在范围内（ISO格式字符串可直接按字典序比较）
+        
+        Args:
+            created_at: 创建时间
+            since: 起始时间（包含）
+            until: 结束时间（包含，按until的精度比较，只给日期时包含当天全部数据）
+            
+        Returns:
+            bool: 是否在范围内
+        """
+        if since and created_at < since:
+            return False
+        if until and created_at[:len(until)] > until:
+            return False
+        return True
+    
     def _add_timestamp(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         为数据添加时间戳
@@ -116,4 +233,45 @@ class BaseStorage(ABC):
         Returns:
             List[Dict[str, Any]]: 添加时间戳后的数据列表
         """
-        return [self._add_timestamp(item) for item in data_list] 
\ No newline at end of file
+        return [self._add_timestamp(item) for item in data_list]
+    
+    def _row_values(self, data_type: str, data_list: List[Any]) -> List[tuple]:
+        """
+        按数据类型的字段定义取出每条数据的字段值，补齐缺省值并添加时间戳
+        
+        采集记录（src.data.records）的字段顺序与字段定义一致，直接按顺序取值；
+        字典按字段名逐个读取
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            data_list: 采集记录或字典列表
+            
+        Returns:
+            List[tuple]: 按字段定义顺序排列的字段值
+        """
+        # 字段定义均以created_at、updated_at开头，其后为采集记录的字段
+        record_fields = DATA_TYPE_FIELDS[data_type][2:]
+        now = datetime.now().isoformat()
+        stamps = (now, now)
+        
+        rows = []
+        for item in data_list:
+            if getattr(item, 'DATA_TYPE', None) == data_type:
+                rows.append(stamps + item.as_tuple())
+            else:
+                rows.append(stamps + tuple(item.get(field, field_default(field)) for field in record_fields))
+        return rows
+    
+    def _normalize_rows(self, data_type: str, data_list: List[Any]) -> List[Dict[str, Any]]:
+        """
+        按数据类型的字段定义规整数据，补齐缺省值并添加时间戳
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            data_list: 采集记录或字典列表
+            
+        Returns:
+            List[Dict[str, Any]]: 只包含字段定义中字段的数据列表
+        """
+        fields = DATA_TYPE_FIELDS[data_type]
+        return [dict(zip(fields, values)) for values in self._row_values(data_type, data_list)]
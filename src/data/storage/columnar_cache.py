@@ -0,0 +1,223 @@
+"""
+CSV历史数据的二进制列式缓存
+
+导出、趋势分析等读取全部历史数据的操作共用本模块：
+1. 首次读取时解析CSV，将每一列写入一个二进制缓存文件（.<文件名>.colcache）
+2. 之后的读取通过内存映射直接构建DataFrame，数值列零拷贝，文本列以分类编码保存
+3. 缓存记录源CSV的大小和修改时间，CSV变化后自动重建
+4. 同一进程内重复读取复用已加载的数据，不会重复占用内存
+
+缓存文件格式：
+    8字节魔数 | 8字节头部长度(小端) | JSON头部 | 按64字节对齐的各列数据
+"""
+
+import os
+import json
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAGIC = b'XHSCOL1\n'
+CACHE_VERSION = 1
+# 各列数据的对齐字节数
+COLUMN_ALIGNMENT = 64
+
+
+class ColumnarCache:
+    """单个CSV文件的内存映射列式缓存"""
+    
+    def __init__(self, csv_path: Path):
+        """
+        初始化列式缓存
+        
+        Args:
+            csv_path: 源CSV文件路径，缓存文件保存在同目录下的 .<文件名>.colcache
+        """
+        self.csv_path = Path(csv_path)
+        self.cache_path = self.csv_path.with_name(f".{self.csv_path.stem}.colcache")
+        self._lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._source_key: Optional[Tuple[int, int]] = None
+    
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        """获取源CSV的(大小, 修改时间)，文件不存在时返回None"""
+        try:
+            stat = self.csv_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def load(self) -> pd.DataFrame:
+        """
+        读取CSV的全部数据
+        
+        Returns:
+            pd.DataFrame: 数据表（返回浅拷贝，调用方增删列不会影响缓存；数值列为只读视图）
+        """
+        with self._lock:
+            key = self._stat_key()
+            if key is None:
+                self._frame = None
+                self._source_key = None
+                return pd.DataFrame()
+            
+            if self._frame is None or self._source_key != key:
+                frame = self._read_cache(key)
+                if frame is None:
+                    frame = self._rebuild(key)
+                self._frame = frame
+                self._source_key = key
+            
+            return self._frame.copy(deep=False)
+    
+    def _read_cache(self, key: Tuple[int, int]) -> Optional[pd.DataFrame]:
+        """读取缓存文件，缓存不存在或与源CSV不一致时返回None"""
+        if not self.cache_path.exists():
+            return None
+        
+        try:
+            with open(self.cache_path, 'rb') as f:
+                if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                    return None
+                header_length, = struct.unpack('<Q', f.read(8))
+                header = json.loads(f.read(header_length).decode('utf-8'))
+            
+            if header.get('version') != CACHE_VERSION or \
+                    (header.get('source_size'), header.get('source_mtime_ns')) != key:
+                return None
+            
+            rows = header['rows']
+            buffer = np.memmap(self.cache_path, dtype=np.uint8, mode='r') if rows else None
+            columns = {}
+            for column in header['columns']:
+                dtype = np.dtype(column['dtype'])
+                if rows:
+                    start = column['offset']
+                    values = buffer[start:start + rows * dtype.itemsize].view(dtype)
+                else:
+                    values = np.empty(0, dtype=dtype)
+                
+                if column['kind'] == 'category':
+                    columns[column['name']] = pd.Categorical.from_codes(values, column['categories'])
+                else:
+                    columns[column['name']] = values
+            
+            logger.debug(f"📦 读取列式缓存: {self.cache_path.name}，{rows} 行")
+            return pd.DataFrame(columns, copy=False)
+        
+        except Exception as e:
+            logger.debug(f"读取列式缓存失败，将重建: {e}")
+            return None
+    
+    def _rebuild(self, key: Tuple[int, int]) -> pd.DataFrame:
+        """解析CSV并重建缓存文件"""
+        frame = pd.read_csv(self.csv_path)
+        
+        try:
+            self._write_cache(frame, key)
+            cached = self._read_cache(key)
+            if cached is not None:
+                logger.debug(f"📦 重建列式缓存: {self.cache_path.name}，{len(frame)} 行")
+                return cached
+        except Exception as e:
+            logger.warning(f"⚠️ 写入列式缓存失败: {e}")
+        
+        return frame
+    
+    def _write_cache(self, frame: pd.DataFrame, key: Tuple[int, int]) -> None:
+        """将数据表按列写入缓存文件（先写临时文件再原子替换）"""
+        columns = []
+        blocks = []
+        for name in frame.columns:
+            series = frame[name]
+            if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+                values = np.ascontiguousarray(series.to_numpy())
+                columns.append({'name': str(name), 'kind': 'numeric', 'dtype': values.dtype.str})
+            else:
+                # 先转成字符串再编码：混合类型的列（如1与'1'）转成字符串后分类不重复，空值仍编码为-1
+                strings = series.astype(str).where(series.notna())
+                codes, categories = pd.factorize(strings, use_na_sentinel=True)
+                values = codes.astype(np.int32)
+                columns.append({
+                    'name': str(name),
+                    'kind': 'category',
+                    'dtype': values.dtype.str,
+                    'categories': categories.tolist()
+                })
+            blocks.append(values)
+        
+        header = {
+            'version': CACHE_VERSION,
+            'source_size': key[0],
+            'source_mtime_ns': key[1],
+            'rows': len(frame),
+            'columns': columns
+        }
+        
+        # 头部中记录各列的偏移，偏移依赖头部长度，预留足够空间后计算
+        header_bytes = self._encode_header(header)
+        while True:
+            offset = self._align(len(CACHE_MAGIC) + 8 + len(header_bytes))
+            for column, values in zip(columns, blocks):
+                column['offset'] = offset
+                offset = self._align(offset + values.nbytes)
+            encoded = self._encode_header(header)
+            if len(encoded) <= len(header_bytes):
+                header_bytes = encoded.ljust(len(header_bytes))
+                break
+            header_bytes = encoded
+        
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(CACHE_MAGIC)
+                f.write(struct.pack('<Q', len(header_bytes)))
+                f.write(header_bytes)
+                for column, values in zip(columns, blocks):
+                    f.seek(column['offset'])
+                    f.write(values.tobytes())
+            os.replace(tmp_path, self.cache_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    @staticmethod
+    def _encode_header(header: Dict[str, Any]) -> bytes:
+        """编码JSON头部"""
+        return json.dumps(header, ensure_ascii=False).encode('utf-8')
+    
+    @staticmethod
+    def _align(offset: int) -> int:
+        """按COLUMN_ALIGNMENT对齐偏移"""
+        return (offset + COLUMN_ALIGNMENT - 1) // COLUMN_ALIGNMENT * COLUMN_ALIGNMENT
+
+
+# 进程内共享的缓存实例，按CSV路径索引
+_caches: Dict[Path, ColumnarCache] = {}
+_caches_lock = threading.Lock()
+
+
+def read_csv_cached(csv_path: Path) -> pd.DataFrame:
+    """
+    通过列式缓存读取CSV文件的全部数据
+    
+    Args:
+        csv_path: CSV文件路径
+    
+    Returns:
+        pd.DataFrame: 数据表，文件不存在时返回空表
+    """
+    path = Path(csv_path).resolve()
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ColumnarCache(path)
+            _caches[path] = cache
+    return cache.load()
@@ -0,0 +1,225 @@
+"""
+CSV按天索引与倒序读取工具
+
+CSV文件的第一列为created_at（ISO格式），数据按写入顺序追加，
+因此同一天的数据在文件中是连续的。本模块为每个CSV文件维护一个
+按天的字节偏移索引（sidecar JSON文件），用于：
+1. 范围查询时直接定位到目标日期的字节区间，无需读取整个文件
+2. 配合倒序读取，获取最新N条数据时只读取文件末尾
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 倒序读取时每次读取的块大小
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reversed(file_path: Path, stop_offset: int = 0,
+                        block_size: int = READ_BLOCK_SIZE) -> Iterator[str]:
+    """
+    从文件末尾开始倒序逐行读取
+    
+    Args:
+        file_path: 文件路径
+        stop_offset: 读取到该字节偏移为止（通常为表头结束位置）
+        block_size: 每次读取的块大小
+    
+    Yields:
+        str: 去掉换行符的非空行，从最后一行开始
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        
+        while position > stop_offset:
+            read_size = min(block_size, position - stop_offset)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b'\n')
+            # 第一段可能是不完整的行，留到下一次读取时拼接
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line.decode('utf-8').rstrip('\r')
+        
+        if remainder.strip():
+            yield remainder.decode('utf-8').rstrip('\r')
+
+
+class CSVDayIndex:
+    """CSV文件按天字节偏移索引"""
+    
+    def __init__(self, file_path: Path):
+        """
+        初始化索引
+        
+        Args:
+            file_path: CSV文件路径，索引文件保存在同目录下的 .<文件名>.idx.json
+        """
+        self.file_path = Path(file_path)
+        self.index_path = self.file_path.with_name(f".{self.file_path.stem}.idx.json")
+        self.header_end = 0
+        self.days: Dict[str, List[int]] = {}
+        self._size: Optional[int] = None
+        self._mtime_ns: Optional[int] = None
+    
+    def load(self) -> 'CSVDayIndex':
+        """
+        加载索引，如果索引不存在或与CSV文件不一致则重建
+        
+        Returns:
+            CSVDayIndex: 当前索引实例
+        """
+        if not self.file_path.exists():
+            self.header_end = 0
+            self.days = {}
+            return self
+        
+        if self._is_fresh():
+            return self
+        
+        try:
+            if self.index_path.exists():
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                self.header_end = saved['header_end']
+                self.days = saved['days']
+                self._size = saved['size']
+                self._mtime_ns = saved['mtime_ns']
+                if self._is_fresh():
+                    return self
+        except Exception as e:
+            logger.debug(f"读取CSV索引失败，将重建: {e}")
+        
+        return self.rebuild()
+    
+    def _is_fresh(self) -> bool:
+        """检查索引是否与CSV文件当前状态一致"""
+        try:
+            stat = self.file_path.stat()
+        except FileNotFoundError:
+            return False
+        return self._size == stat.st_size and self._mtime_ns == stat.st_mtime_ns
+    
+    def rebuild(self) -> 'CSVDayIndex':
+        """
+        扫描整个CSV文件重建索引
+        
+        Returns:
+            CSVDayIndex: 当前索引实例
+        """
+        self.days = {}
+        self.header_end = 0
+        
+        if self.file_path.exists():
+            with open(self.file_path, 'rb') as f:
+                self.header_end = len(f.readline())
+                self._scan(f, self.header_end)
+        
+        self._save()
+        logger.debug(f"📇 重建CSV索引: {self.file_path.name}，共 {len(self.days)} 天")
+        return self
+    
+    def extend(self, start_offset: int) -> 'CSVDayIndex':
+        """
+        从指定偏移开始扫描新追加的数据并更新索引
+        
+        Args:
+            start_offset: 追加写入前的文件大小
+        
+        Returns:
+            CSVDayIndex: 当前索引实例
+        """
+        if self._size != start_offset:
+            # 追加前的索引已过期，直接重建
+            return self.rebuild()
+        
+        with open(self.file_path, 'rb') as f:
+            if start_offset == 0:
+                self.header_end = len(f.readline())
+                start_offset = self.header_end
+            self._scan(f, start_offset)
+        
+        self._save()
+        return self
+    
+    def truncate(self, offset: int) -> 'CSVDayIndex':
+        """
+        文件在offset处被截断后，移除offset之后的数据（不保存，随后调用extend扫描新写入的数据）
+        
+        Args:
+            offset: 截断位置
+        
+        Returns:
+            CSVDayIndex: 当前索引实例
+        """
+        self.days = {day: span for day, span in self.days.items() if span[0] < offset}
+        for span in self.days.values():
+            span[1] = min(span[1], offset)
+        self._size = offset
+        return self
+    
+    def _scan(self, f, offset: int) -> None:
+        """从offset开始逐行扫描，记录每天数据的起止字节偏移"""
+        f.seek(offset)
+        for line in f:
+            end = offset + len(line)
+            # 第一列为ISO格式的created_at，前10个字符即日期
+            day = line[:10].decode('utf-8', errors='ignore')
+            if line.strip() and len(day) == 10:
+                span = self.days.get(day)
+                if span:
+                    span[0] = min(span[0], offset)
+                    span[1] = max(span[1], end)
+                else:
+                    self.days[day] = [offset, end]
+            offset = end
+    
+    def _save(self) -> None:
+        """保存索引到sidecar文件（先写临时文件再原子替换）"""
+        stat = self.file_path.stat() if self.file_path.exists() else None
+        self._size = stat.st_size if stat else None
+        self._mtime_ns = stat.st_mtime_ns if stat else None
+        
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'header_end': self.header_end,
+                    'size': self._size,
+                    'mtime_ns': self._mtime_ns,
+                    'days': self.days
+                }, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"⚠️ 保存CSV索引失败: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def span(self, since_day: Optional[str] = None,
+             until_day: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """
+        获取日期范围对应的字节区间
+        
+        Args:
+            since_day: 起始日期（YYYY-MM-DD，包含），None表示不限
+            until_day: 结束日期（YYYY-MM-DD，包含），None表示不限
+        
+        Returns:
+            Optional[Tuple[int, int]]: (起始偏移, 结束偏移)，范围内无数据时返回None
+        """
+        spans = [
+            span for day, span in self.days.items()
+            if (since_day is None or day >= since_day) and (until_day is None or day <= until_day)
+        ]
+        if not spans:
+            return None
+        return min(s[0] for s in spans), max(s[1] for s in spans)
@@ -4,22 +4,70 @@ CSV存储实现
 提供基于CSV文件的数据存储功能
 """
 
+import os
+import io
 import csv
 import json
 import logging
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 
-from .base import BaseStorage
+from .base import BaseStorage, DASHBOARD_FIELDS, CONTENT_ANALYSIS_FIELDS, FANS_FIELDS
+from .csv_index import CSVDayIndex, iter_lines_reversed
+from .file_lock import FileLock
+from .columnar_cache import read_csv_cached
 
 logger = logging.getLogger(__name__)
 
+# 按字节复制历史数据时每次复制的块大小
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_prefix(src, dst, length: int) -> None:
+    """
+    将src文件开头length字节复制到dst文件
+    
+    支持copy_file_range的平台上由内核直接复制（部分文件系统上为写时复制），
+    否则按块读写
+    
+    Args:
+        src: 以二进制模式打开的源文件
+        dst: 以二进制模式打开的目标文件
+        length: 复制的字节数
+    """
+    src.seek(0)
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    offset = 0
+    if copy_file_range is not None:
+        try:
+            while offset < length:
+                copied = copy_file_range(src.fileno(), dst.fileno(), length - offset, offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            # 跨文件系统等不支持的情况，从已复制的位置继续按块复制
+            pass
+    
+    src.seek(offset)
+    dst.seek(offset)
+    while offset < length:
+        chunk = src.read(min(COPY_CHUNK_SIZE, length - offset))
+        if not chunk:
+            break
+        dst.write(chunk)
+        offset += len(chunk)
+
 
 class CSVStorage(BaseStorage):
     """CSV存储实现类"""
     
+    # 按日期覆盖保存，同一天只保留最后一次保存的数据
+    REPLACES_DAY = True
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化CSV存储
@@ -36,23 +84,17 @@ class CSVStorage(BaseStorage):
         self.content_analysis_file = self.csv_dir / 'content_analysis_data.csv'
         self.fans_file = self.csv_dir / 'fans_data.csv'
         
+        # CSV文件的按天字节偏移索引
+        self._indexes: Dict[Path, CSVDayIndex] = {}
+        
+        # CSV文件的跨进程写锁（调度器、命令行和MCP服务器可能同时写入）
+        self.lock_timeout = config.get('lock_timeout', 60)
+        self._locks: Dict[Path, FileLock] = {}
+        
         # CSV字段定义（英文字段名，用于代码逻辑和数据库）
-        self.dashboard_fields = [
-            'created_at', 'updated_at', 'timestamp', 'dimension',
-            'views', 'likes', 'collects', 'comments', 'shares', 'interactions'
-        ]
-        self.content_analysis_fields = [
-            'created_at', 'updated_at', 'timestamp', 'title', 'note_type', 'publish_time',
-            'views', 'likes', 'comments', 'collects', 'shares', 'fans_growth', 'avg_watch_time', 'danmu_count',
-            # 观众来源数据
-            'source_recommend', 'source_search', 'source_follow', 'source_other',
-            # 观众分析数据
-            'gender_male', 'gender_female', 'age_18_24', 'age_25_34', 'age_35_44', 'age_45_plus',
-            'city_top1', 'city_top2', 'city_top3', 'interest_top1', 'interest_top2', 'interest_top3'
-        ]
-        self.fans_fields = [
-            'created_at', 'updated_at', 'timestamp', 'dimension', 'total_fans', 'new_fans', 'lost_fans'
-        ]
+        self.dashboard_fields = list(DASHBOARD_FIELDS)
+        self.content_analysis_fields = list(CONTENT_ANALYSIS_FIELDS)
+        self.fans_fields = list(FANS_FIELDS)
         
         # 中文表头映射（用于CSV文件显示）
         self.field_chinese_mapping = {
@@ -154,7 +196,13 @@ class CSVStorage(BaseStorage):
             fields: 英文字段列表（用于代码逻辑）
             chinese_headers: 中文表头列表（用于CSV显示）
         """
-        if not file_path.exists():
+        if file_path.exists():
+            return
+        
+        with self._get_lock(file_path):
+            # 加锁后再次检查，避免覆盖其他进程刚创建的文件
+            if file_path.exists():
+                return
             with open(file_path, 'w', newline='', encoding='utf-8') as f:
                 if chinese_headers:
                     # 使用中文表头
@@ -165,6 +213,49 @@ class CSVStorage(BaseStorage):
                     writer.writeheader()
             logger.debug(f"📄 创建CSV文件: {file_path}")
     
+    def _get_lock(self, file_path: Path) -> FileLock:
+        """获取CSV文件的跨进程写锁"""
+        lock = self._locks.get(file_path)
+        if lock is None:
+            lock = FileLock(file_path, timeout=self.lock_timeout)
+            self._locks[file_path] = lock
+        return lock
+    
+    @contextmanager
+    def locked(self, *data_types: str) -> Iterator[None]:
+        """
+        持有指定数据类型CSV文件的写锁，期间的多次保存不会被其他进程打断
+        
+        锁按文件加，不同数据类型的文件可以被不同的采集进程并行写入。
+        同一线程内可重入，保存方法在锁内会直接复用已持有的锁。
+        
+        Args:
+            data_types: 数据类型 (dashboard, content_analysis, fans)，不指定时锁定全部文件
+            
+        Example:
+            with csv_storage.locked('dashboard', 'fans'):
+                csv_storage.save_dashboard_data(dashboard_rows)
+                csv_storage.save_fans_data(fans_rows)
+        """
+        files = []
+        for data_type in data_types or ('dashboard', 'content_analysis', 'fans'):
+            resolved = self._resolve_data_type(data_type)
+            if not resolved:
+                raise ValueError(f"未知数据类型: {data_type}")
+            files.append(resolved[0])
+        
+        # 按固定顺序加锁，避免多个进程交叉等待
+        locks = [self._get_lock(path) for path in sorted(set(files))]
+        acquired = []
+        try:
+            for lock in locks:
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+    
     def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
         """
         同步保存仪表板数据到CSV
@@ -176,20 +267,8 @@ class CSVStorage(BaseStorage):
             if not self._initialized:
                 self._initialize_sync()
             
-            # 处理数据格式
-            rows = []
-            for item in data:
-                row = self._add_timestamp({
-                    'timestamp': item.get('timestamp', ''),
-                    'dimension': item.get('dimension', ''),
-                    'views': item.get('views', 0),
-                    'likes': item.get('likes', 0),
-                    'collects': item.get('collects', 0),
-                    'comments': item.get('comments', 0),
-                    'shares': item.get('shares', 0),
-                    'interactions': item.get('interactions', 0)
-                })
-                rows.append(row)
+            # 按字段定义规整数据并添加时间戳
+            rows = self._normalize_rows('dashboard', data)
             
             # 按日期覆盖保存
             self._save_with_daily_overwrite(self.dashboard_file, self.dashboard_fields, rows, self.dashboard_chinese_headers)
@@ -211,42 +290,8 @@ class CSVStorage(BaseStorage):
             if not self._initialized:
                 self._initialize_sync()
             
-            # 处理数据格式
-            rows = []
-            for item in data:
-                row = self._add_timestamp({
-                    'timestamp': item.get('timestamp', ''),
-                    'title': item.get('title', ''),
-                    'note_type': item.get('note_type', ''),
-                    'publish_time': item.get('publish_time', ''),
-                    'views': item.get('views', 0),
-                    'likes': item.get('likes', 0),
-                    'comments': item.get('comments', 0),
-                    'collects': item.get('collects', 0),
-                    'shares': item.get('shares', 0),
-                    'fans_growth': item.get('fans_growth', 0),
-                    'avg_watch_time': item.get('avg_watch_time', ''),
-                    'danmu_count': item.get('danmu_count', 0),
-                    # 观众来源数据
-                    'source_recommend': item.get('source_recommend', '0%'),
-                    'source_search': item.get('source_search', '0%'),
-                    'source_follow': item.get('source_follow', '0%'),
-                    'source_other': item.get('source_other', '0%'),
-                    # 观众分析数据
-                    'gender_male': item.get('gender_male', '0%'),
-                    'gender_female': item.get('gender_female', '0%'),
-                    'age_18_24': item.get('age_18_24', '0%'),
-                    'age_25_34': item.get('age_25_34', '0%'),
-                    'age_35_44': item.get('age_35_44', '0%'),
-                    'age_45_plus': item.get('age_45_plus', '0%'),
-                    'city_top1': item.get('city_top1', ''),
-                    'city_top2': item.get('city_top2', ''),
-                    'city_top3': item.get('city_top3', ''),
-                    'interest_top1': item.get('interest_top1', ''),
-                    'interest_top2': item.get('interest_top2', ''),
-                    'interest_top3': item.get('interest_top3', '')
-                })
-                rows.append(row)
+            # 按字段定义规整数据并添加时间戳
+            rows = self._normalize_rows('content_analysis', data)
             
             # 按日期覆盖保存
             self._save_with_daily_overwrite(self.content_analysis_file, self.content_analysis_fields, rows, self.content_analysis_chinese_headers)
@@ -268,17 +313,8 @@ class CSVStorage(BaseStorage):
             if not self._initialized:
                 self._initialize_sync()
             
-            # 处理数据格式
-            rows = []
-            for item in data:
-                row = self._add_timestamp({
-                    'timestamp': item.get('timestamp', ''),
-                    'dimension': item.get('dimension', ''),
-                    'total_fans': item.get('total_fans', 0),
-                    'new_fans': item.get('new_fans', 0),
-                    'lost_fans': item.get('lost_fans', 0)
-                })
-                rows.append(row)
+            # 按字段定义规整数据并添加时间戳
+            rows = self._normalize_rows('fans', data)
             
             # 按日期覆盖保存
             self._save_with_daily_overwrite(self.fans_file, self.fans_fields, rows, self.fans_chinese_headers)
@@ -289,10 +325,79 @@ class CSVStorage(BaseStorage):
             logger.error(f"❌ 保存粉丝数据失败: {e}")
             raise
     
+    def _resolve_data_type(self, data_type: str):
+        """
+        获取数据类型对应的文件路径、字段列表和中文表头
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            
+        Returns:
+            (文件路径, 字段列表, 中文表头)，未知数据类型返回None
+        """
+        if data_type == 'dashboard':
+            return self.dashboard_file, self.dashboard_fields, self.dashboard_chinese_headers
+        elif data_type == 'content_analysis':
+            return self.content_analysis_file, self.content_analysis_fields, self.content_analysis_chinese_headers
+        elif data_type == 'fans':
+            return self.fans_file, self.fans_fields, self.fans_chinese_headers
+        return None
+    
+    def load_frame(self, data_type: str) -> pd.DataFrame:
+        """
+        通过列式缓存读取数据类型的全部历史数据（英文字段名）
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            
+        Returns:
+            pd.DataFrame: 数据表，文件不存在或为空时返回空表
+        """
+        resolved = self._resolve_data_type(data_type)
+        if not resolved:
+            raise ValueError(f"未知数据类型: {data_type}")
+        file_path, fields, chinese_headers = resolved
+        
+        frame = read_csv_cached(file_path)
+        if list(frame.columns) == chinese_headers:
+            frame.columns = fields
+        return frame
+    
+    def _get_index(self, file_path: Path) -> CSVDayIndex:
+        """获取CSV文件的按天索引（已加载并保证与文件一致）"""
+        index = self._indexes.get(file_path)
+        if index is None:
+            index = CSVDayIndex(file_path)
+            self._indexes[file_path] = index
+        return index.load()
+    
+    @staticmethod
+    def _read_header(file_path: Path) -> List[str]:
+        """读取CSV表头"""
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            return next(csv.reader(f), None) or []
+    
+    @staticmethod
+    def _row_keys(headers: List[str], fields: List[str], chinese_headers: List[str]) -> List[str]:
+        """获取数据行对应的字段名，中文表头转换为英文字段名"""
+        if headers == chinese_headers:
+            return fields
+        return headers
+    
+    @staticmethod
+    def _parse_line(line: str, keys: List[str]) -> Optional[Dict[str, Any]]:
+        """解析单行CSV，列数不匹配时返回None"""
+        row = next(csv.reader([line]), [])
+        if len(row) != len(keys):
+            return None
+        return dict(zip(keys, row))
+    
     async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         获取最新数据
         
+        从文件末尾倒序读取，只解析最新的limit条，耗时与文件总大小无关
+        
         Args:
             data_type: 数据类型 (dashboard, content_analysis, fans)
             limit: 返回数据条数限制
@@ -301,54 +406,96 @@ class CSVStorage(BaseStorage):
             List[Dict[str, Any]]: 数据列表
         """
         try:
-            if data_type == 'dashboard':
-                file_path = self.dashboard_file
-                fields = self.dashboard_fields
-                chinese_headers = self.dashboard_chinese_headers
-            elif data_type == 'content_analysis':
-                file_path = self.content_analysis_file
-                fields = self.content_analysis_fields
-                chinese_headers = self.content_analysis_chinese_headers
-            elif data_type == 'fans':
-                file_path = self.fans_file
-                fields = self.fans_fields
-                chinese_headers = self.fans_chinese_headers
-            else:
+            resolved = self._resolve_data_type(data_type)
+            if not resolved:
                 logger.warning(f"⚠️ 未知数据类型: {data_type}")
                 return []
+            file_path, fields, chinese_headers = resolved
             
-            if not file_path.exists():
+            if not file_path.exists() or limit <= 0:
                 return []
             
-            # 读取CSV文件
-            data = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                headers = next(reader, None)  # 读取表头
-                
-                if headers:
-                    # 检查是否为中文表头
-                    if headers == chinese_headers:
-                        # 中文表头，需要转换为英文字段名
-                        for row in reader:
-                            if len(row) == len(fields):
-                                row_dict = {field: value for field, value in zip(fields, row)}
-                                data.append(row_dict)
-                    else:
-                        # 英文表头或其他格式，直接使用
-                        for row in reader:
-                            if len(row) == len(headers):
-                                row_dict = {header: value for header, value in zip(headers, row)}
-                                data.append(row_dict)
+            headers = self._read_header(file_path)
+            if not headers:
+                return []
+            keys = self._row_keys(headers, fields, chinese_headers)
+            header_end = self._get_index(file_path).header_end
             
-            # 按创建时间倒序排列，返回最新的limit条
+            # 从文件末尾倒序读取（文件按写入顺序追加，末尾即最新数据）
+            data = []
+            for line in iter_lines_reversed(file_path, stop_offset=header_end):
+                row_dict = self._parse_line(line, keys)
+                if row_dict is not None:
+                    data.append(row_dict)
+                    if len(data) >= limit:
+                        break
+            
+            # 恢复文件顺序后按创建时间倒序排列（与全量读取排序的结果一致）
+            data.reverse()
             data.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-            return data[:limit]
+            return data
             
         except Exception as e:
             logger.error(f"❌ 获取最新数据失败: {e}")
             return []
     
+    async def get_data_range(self, data_type: str, since: Optional[str] = None,
+                             until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按创建时间范围获取数据
+        
+        通过按天索引直接定位到目标日期的字节区间，只读取范围内的数据
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            since: 起始时间（ISO格式，包含），None表示不限
+            until: 结束时间（ISO格式，包含；只给日期时包含当天全部数据），None表示不限
+            
+        Returns:
+            List[Dict[str, Any]]: 按创建时间升序排列的数据列表
+        """
+        try:
+            resolved = self._resolve_data_type(data_type)
+            if not resolved:
+                logger.warning(f"⚠️ 未知数据类型: {data_type}")
+                return []
+            file_path, fields, chinese_headers = resolved
+            
+            if not file_path.exists():
+                return []
+            
+            headers = self._read_header(file_path)
+            if not headers:
+                return []
+            keys = self._row_keys(headers, fields, chinese_headers)
+            
+            span = self._get_index(file_path).span(
+                since[:10] if since else None,
+                until[:10] if until else None
+            )
+            if not span:
+                return []
+            
+            start, end = span
+            with open(file_path, 'rb') as f:
+                f.seek(start)
+                chunk = f.read(end - start)
+            
+            data = []
+            for line in chunk.decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                row_dict = self._parse_line(line, keys)
+                if row_dict is not None and self._in_time_range(row_dict.get('created_at', ''), since, until):
+                    data.append(row_dict)
+            
+            data.sort(key=lambda x: x.get('created_at', ''))
+            return data
+            
+        except Exception as e:
+            logger.error(f"❌ 按时间范围获取数据失败: {e}")
+            return []
+    
     async def close(self) -> None:
         """关闭存储连接"""
         logger.debug("📁 CSV存储连接已关闭")
@@ -424,6 +571,13 @@ class CSVStorage(BaseStorage):
         """
         按日期覆盖保存数据
         
+        数据按写入顺序追加，当天的数据位于文件末尾。持有文件写锁后通过按天索引
+        找到当天数据的起始偏移，将之前的历史数据按字节复制到临时文件、追加新数据后
+        原子替换原文件。历史数据不会被解析，读取方始终看到完整的旧文件或新文件。
+        
+        当天的数据之后还有其他日期的数据（如系统时间被回拨）时，无法只截断末尾，
+        退回到读取全部数据、去掉当天数据后整体替换文件
+        
         Args:
             file_path: CSV文件路径
             fields: 英文字段列表
@@ -431,54 +585,152 @@ class CSVStorage(BaseStorage):
             chinese_headers: 中文表头列表
         """
         try:
-            today = self._get_today_date()
-            
-            # 读取现有数据
-            existing_data = []
-            if file_path.exists():
+            with self._get_lock(file_path):
+                today = self._get_today_date()
+                index = self._get_index(file_path)
+                size = file_path.stat().st_size
+                
+                today_span = index.days.get(today)
+                cut = today_span[0] if today_span else size
+                if any(span[1] > cut for day, span in index.days.items() if day != today):
+                    self._rewrite_without_day(file_path, fields, new_data, chinese_headers, today)
+                    return
+                
+                replaced = self._replace_tail(file_path, fields, new_data, cut)
+                
+                # 只扫描新写入的部分更新索引
                 try:
-                    df = pd.read_csv(file_path)
-                    if not df.empty:
-                        # 如果CSV使用中文表头，需要转换为英文字段名
-                        if chinese_headers and len(df.columns) == len(chinese_headers):
-                            # 创建中文到英文的映射
-                            chinese_to_english = {chinese: english for chinese, english in zip(chinese_headers, fields)}
-                            df.rename(columns=chinese_to_english, inplace=True)
-                        
-                        # 过滤掉今天的数据
-                        if 'created_at' in df.columns:
-                            df['date'] = pd.to_datetime(df['created_at']).dt.strftime('%Y-%m-%d')
-                            df_filtered = df[df['date'] != today]
-                            existing_data = df_filtered.drop('date', axis=1).to_dict('records')
-                        else:
-                            existing_data = df.to_dict('records')
+                    index.truncate(cut).extend(cut)
                 except Exception as e:
-                    logger.warning(f"⚠️ 读取现有CSV数据失败: {e}")
+                    logger.warning(f"⚠️ 更新CSV索引失败: {e}")
             
-            # 合并数据：保留非今天的数据 + 今天的新数据
-            all_data = existing_data + new_data
+            logger.info(f"💾 数据已按日期覆盖保存: 替换 {replaced} 字节今日数据，新增 {len(new_data)} 条今日记录")
             
-            # 重写整个文件
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        except Exception as e:
+            logger.error(f"❌ 按日期覆盖保存失败: {e}")
+            # 降级到追加模式
+            self._append_to_csv(file_path, fields, new_data)
+    
+    @staticmethod
+    def _replace_tail(file_path: Path, fields: List[str], rows: List[Dict[str, Any]], cut: int) -> int:
+        """
+        将cut之前的内容按字节复制到临时文件并追加新数据行，落盘后通过os.replace原子替换CSV文件
+        
+        原文件不会被原地截断，不加锁的读取只会看到完整的旧文件或新文件；
+        写入中途失败时原文件保持不变。历史部分只做字节复制，不解析CSV
+        
+        Args:
+            file_path: CSV文件路径
+            fields: 英文字段列表
+            rows: 新数据行
+            cut: 保留的前缀长度（当天数据的起始偏移，没有当天数据时为文件大小）
+        
+        Returns:
+            int: 被替换的字节数
+        """
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(file_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                replaced = os.fstat(src.fileno()).st_size - cut
+                _copy_prefix(src, dst, cut)
+                
+                # 保留部分的最后一行没有换行符时补上，避免新数据接在上一行末尾
+                if cut > 0:
+                    src.seek(cut - 1)
+                    if src.read(1) != b'\n':
+                        dst.write(b'\n')
+                
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator='\n')
+                for row in rows:
+                    writer.writerow([row.get(field, '') for field in fields])
+                dst.write(buffer.getvalue().encode('utf-8'))
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, file_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return replaced
+    
+    def _rewrite_without_day(self, file_path: Path, fields: List[str], new_data: List[Dict[str, Any]],
+                             chinese_headers: List[str], day: str) -> None:
+        """
+        读取全部数据，去掉指定日期的数据后与新数据一起整体替换文件（调用方持有文件写锁）
+        
+        新内容先写入临时文件再原子替换，其他进程的读取只会看到完整的旧文件或新文件
+        
+        Args:
+            file_path: CSV文件路径
+            fields: 英文字段列表
+            new_data: 新数据列表
+            chinese_headers: 中文表头列表
+            day: 被替换的日期（YYYY-MM-DD）
+        """
+        existing_data = []
+        if file_path.exists():
+            try:
+                df = pd.read_csv(file_path)
+                if not df.empty:
+                    # 如果CSV使用中文表头，需要转换为英文字段名
+                    if chinese_headers and len(df.columns) == len(chinese_headers):
+                        # 创建中文到英文的映射
+                        chinese_to_english = {chinese: english for chinese, english in zip(chinese_headers, fields)}
+                        df.rename(columns=chinese_to_english, inplace=True)
+                    
+                    # 过滤掉当天的数据
+                    if 'created_at' in df.columns:
+                        df['date'] = pd.to_datetime(df['created_at']).dt.strftime('%Y-%m-%d')
+                        df_filtered = df[df['date'] != day]
+                        existing_data = df_filtered.drop('date', axis=1).to_dict('records')
+                    else:
+                        existing_data = df.to_dict('records')
+            except Exception as e:
+                logger.warning(f"⚠️ 读取现有CSV数据失败: {e}")
+        
+        # 写入临时文件后原子替换原文件
+        self._replace_file(file_path, fields, existing_data + new_data, chinese_headers)
+        
+        # 文件已整体重写，重建按天索引
+        try:
+            self._indexes.setdefault(file_path, CSVDayIndex(file_path)).rebuild()
+        except Exception as e:
+            logger.warning(f"⚠️ 重建CSV索引失败: {e}")
+        
+        logger.info(f"💾 数据已整体重写保存: 保留 {len(existing_data)} 条历史记录，新增 {len(new_data)} 条今日记录")
+    
+    @staticmethod
+    def _replace_file(file_path: Path, fields: List[str], rows: List[Dict[str, Any]], chinese_headers: List[str] = None) -> None:
+        """
+        将全部数据写入临时文件，落盘后通过os.replace原子替换CSV文件
+        
+        Args:
+            file_path: CSV文件路径
+            fields: 英文字段列表
+            rows: 全部数据行
+            chinese_headers: 中文表头列表
+        """
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
                 if chinese_headers:
                     # 使用中文表头
                     f.write(','.join(chinese_headers) + '\n')
                     # 写入数据行，按字段顺序
-                    for row in all_data:
+                    for row in rows:
                         values = [str(row.get(field, '')) for field in fields]
                         f.write(','.join(values) + '\n')
                 else:
                     # 降级到英文表头
                     writer = csv.DictWriter(f, fieldnames=fields)
                     writer.writeheader()
-                    writer.writerows(all_data)
-            
-            logger.info(f"💾 数据已按日期覆盖保存: 保留 {len(existing_data)} 条历史记录，新增 {len(new_data)} 条今日记录")
-            
-        except Exception as e:
-            logger.error(f"❌ 按日期覆盖保存失败: {e}")
-            # 降级到追加模式
-            self._append_to_csv(file_path, fields, new_data)
+                    writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
     
     def _append_to_csv(self, file_path: Path, fields: List[str], data: List[Dict[str, Any]]) -> None:
         """
@@ -490,10 +742,19 @@ class CSVStorage(BaseStorage):
             data: 数据列表
         """
         try:
-            with open(file_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fields)
-                writer.writerows(data)
+            with self._get_lock(file_path):
+                index = self._get_index(file_path)
+                start_offset = file_path.stat().st_size if file_path.exists() else 0
+                with open(file_path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fields)
+                    writer.writerows(data)
+                
+                # 只扫描新追加的部分更新索引
+                try:
+                    index.extend(start_offset)
+                except Exception as e:
+                    logger.warning(f"⚠️ 更新CSV索引失败: {e}")
             logger.info(f"💾 数据已追加保存: {len(data)} 条记录")
         except Exception as e:
             logger.error(f"❌ 追加保存失败: {e}")
-            raise 
\ No newline at end of file
+            raise
@@ -0,0 +1,138 @@
+"""
+跨进程文件锁
+
+定时任务调度器、命令行手动采集和MCP服务器可能同时写入同一个CSV文件。
+本模块基于操作系统的建议锁（POSIX使用fcntl.flock，Windows使用msvcrt.locking）
+实现跨进程互斥，锁加在与数据文件同目录的独立 .<文件名>.lock 文件上，
+因此数据文件本身可以通过写临时文件再os.replace的方式原子替换。
+
+同一进程内的多个线程通过线程锁协调，同一线程可重入，
+便于在持有锁期间连续完成多次写入。
+"""
+
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+# 获取锁失败时的重试间隔（秒）
+LOCK_POLL_INTERVAL = 0.05
+
+
+class FileLockTimeout(TimeoutError):
+    """等待文件锁超时"""
+    pass
+
+
+class FileLock:
+    """跨进程建议锁（同一线程可重入）"""
+    
+    # 每个锁文件对应一个进程内的线程锁和线程本地状态（重入计数、文件描述符），
+    # 由同一路径的所有FileLock实例共享
+    _states: Dict[Path, Tuple[threading.RLock, threading.local]] = {}
+    _registry_lock = threading.Lock()
+    
+    def __init__(self, file_path: Path, timeout: Optional[float] = 60):
+        """
+        初始化文件锁
+        
+        Args:
+            file_path: 要保护的数据文件路径，锁文件为同目录下的 .<文件名>.lock
+            timeout: 等待锁的超时时间（秒），None表示一直等待
+        """
+        self.file_path = Path(file_path)
+        self.lock_path = self.file_path.with_name(f".{self.file_path.name}.lock")
+        self.timeout = timeout
+        
+        key = self.lock_path.resolve()
+        with FileLock._registry_lock:
+            state = FileLock._states.setdefault(key, (threading.RLock(), threading.local()))
+        self._thread_lock, self._local = state
+    
+    @property
+    def _depth(self) -> int:
+        """当前线程持有锁的重入次数"""
+        return getattr(self._local, 'depth', 0)
+    
+    def acquire(self) -> None:
+        """
+        获取锁
+        
+        Raises:
+            FileLockTimeout: 超时仍未获取到锁
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        
+        if not self._thread_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            raise FileLockTimeout(f"等待文件锁超时: {self.lock_path}")
+        
+        # 同一线程重入时只增加计数
+        if self._depth > 0:
+            self._local.depth += 1
+            return
+        
+        try:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            while True:
+                try:
+                    self._lock_fd(fd)
+                    break
+                except OSError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise FileLockTimeout(f"等待文件锁超时: {self.lock_path}")
+                    time.sleep(LOCK_POLL_INTERVAL)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        
+        self._local.fd = fd
+        self._local.depth = 1
+    
+    def release(self) -> None:
+        """释放锁"""
+        if self._depth == 0:
+            return
+        
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            fd = self._local.fd
+            self._local.fd = None
+            try:
+                self._unlock_fd(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+    
+    @staticmethod
+    def _lock_fd(fd: int) -> None:
+        """以非阻塞方式对文件描述符加排他锁，失败时抛出OSError"""
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    
+    @staticmethod
+    def _unlock_fd(fd: int) -> None:
+        """释放文件描述符上的锁"""
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
@@ -0,0 +1,293 @@
+"""
+Parquet列式存储实现
+
+按数据类型、按天分区保存数据，每天一个Parquet文件：
+
+    <data_dir>/creator_parquet/<data_type>/<YYYY-MM-DD>.parquet
+
+保存时只写入当天的分区（先写临时文件再原子替换），
+保存耗时只与当天采集的数据量有关，与历史数据量无关。
+"""
+
+import os
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .base import BaseStorage, DATA_TYPE_FIELDS, TEXT_FIELDS, PERCENT_FIELDS, coerce_int
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 可选依赖
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+
+class ParquetStorage(BaseStorage):
+    """Parquet按天分区存储实现类"""
+    
+    PARTITION_SUFFIX = '.parquet'
+    
+    # 每次保存整体替换当天分区
+    REPLACES_DAY = True
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化Parquet存储
+        
+        Args:
+            config: 配置参数，包含data_dir等
+        
+        Raises:
+            ImportError: 未安装pyarrow时抛出
+        """
+        if pa is None:
+            raise ImportError("Parquet存储需要安装pyarrow: pip install pyarrow")
+        
+        super().__init__(config)
+        self.data_dir = Path(config.get('data_dir', 'src/data'))
+        self.parquet_dir = self.data_dir / 'creator_parquet'
+        
+        # 每种数据类型的Arrow表结构
+        self.schemas = {
+            data_type: self._build_schema(fields)
+            for data_type, fields in DATA_TYPE_FIELDS.items()
+        }
+        
+        # 自动初始化
+        self._initialize_sync()
+    
+    def _initialize_sync(self) -> None:
+        """同步初始化Parquet存储"""
+        try:
+            for data_type in DATA_TYPE_FIELDS:
+                self._partition_dir(data_type).mkdir(parents=True, exist_ok=True)
+            
+            self._initialized = True
+            logger.info(f"📁 Parquet存储初始化成功，数据目录: {self.parquet_dir}")
+        
+        except Exception as e:
+            logger.error(f"❌ Parquet存储初始化失败: {e}")
+            raise
+    
+    async def initialize(self) -> bool:
+        """
+        异步初始化Parquet存储
+        
+        Returns:
+            bool: 初始化是否成功
+        """
+        try:
+            self._initialize_sync()
+            return True
+        except Exception as e:
+            logger.error(f"❌ Parquet存储初始化失败: {e}")
+            return False
+    
+    @staticmethod
+    def _build_schema(fields: List[str]) -> 'pa.Schema':
+        """根据字段定义生成Arrow表结构"""
+        columns = []
+        for field in fields:
+            if field in TEXT_FIELDS or field in PERCENT_FIELDS:
+                columns.append(pa.field(field, pa.string()))
+            else:
+                columns.append(pa.field(field, pa.int64()))
+        return pa.schema(columns)
+    
+    def _partition_dir(self, data_type: str) -> Path:
+        """获取数据类型的分区目录"""
+        return self.parquet_dir / data_type
+    
+    def _partition_file(self, data_type: str, date: str) -> Path:
+        """获取指定日期的分区文件"""
+        return self._partition_dir(data_type) / f"{date}{self.PARTITION_SUFFIX}"
+    
+    def _list_partitions(self, data_type: str) -> List[Path]:
+        """按日期升序列出数据类型的所有分区文件"""
+        partition_dir = self._partition_dir(data_type)
+        if not partition_dir.exists():
+            return []
+        return sorted(partition_dir.glob(f"*{self.PARTITION_SUFFIX}"))
+    
+    def _to_table(self, data_type: str, rows: List[tuple]) -> 'pa.Table':
+        """将按字段定义顺序排列的字段值按列转换为Arrow表，并按表结构转换字段类型"""
+        schema = self.schemas[data_type]
+        values_by_column = list(zip(*rows)) if rows else [()] * len(schema)
+        columns = {}
+        for field, values in zip(schema, values_by_column):
+            if pa.types.is_string(field.type):
+                columns[field.name] = ['' if value is None else str(value) for value in values]
+            else:
+                columns[field.name] = [coerce_int(value) for value in values]
+        return pa.Table.from_pydict(columns, schema=schema)
+    
+    def _replace_partition(self, data_type: str, rows: List[tuple]) -> None:
+        """
+        原子替换当天的分区文件
+        
+        Args:
+            data_type: 数据类型
+            rows: 当天的全部数据（按字段定义顺序排列的字段值）
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        target = self._partition_file(data_type, today)
+        tmp_file = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        
+        try:
+            pq.write_table(self._to_table(data_type, rows), tmp_file)
+            os.replace(tmp_file, target)
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+        
+        logger.info(f"💾 数据已写入分区 {data_type}/{target.name}: {len(rows)} 条记录")
+    
+    def _save(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """规整数据并替换当天分区"""
+        if not self._initialized:
+            self._initialize_sync()
+        self._replace_partition(data_type, self._row_values(data_type, data))
+    
+    def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
+        """
+        同步保存仪表板数据到当天分区
+        
+        Args:
+            data: 仪表板数据列表
+        """
+        try:
+            self._save('dashboard', data)
+        except Exception as e:
+            logger.error(f"❌ 保存仪表板数据失败: {e}")
+            raise
+    
+    def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> None:
+        """
+        同步保存内容分析数据到当天分区
+        
+        Args:
+            data: 内容分析数据列表
+        """
+        try:
+            self._save('content_analysis', data)
+        except Exception as e:
+            logger.error(f"❌ 保存内容分析数据失败: {e}")
+            raise
+    
+    def save_fans_data(self, data: List[Dict[str, Any]]) -> None:
+        """
+        同步保存粉丝数据到当天分区
+        
+        Args:
+            data: 粉丝数据列表
+        """
+        try:
+            self._save('fans', data)
+        except Exception as e:
+            logger.error(f"❌ 保存粉丝数据失败: {e}")
+            raise
+    
+    async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取最新数据，从最新的分区开始倒序读取，读够limit条即停止
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            limit: 返回数据条数限制
+        
+        Returns:
+            List[Dict[str, Any]]: 数据列表
+        """
+        if data_type not in DATA_TYPE_FIELDS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        
+        try:
+            data = []
+            for partition in reversed(self._list_partitions(data_type)):
+                rows = pq.read_table(partition).to_pylist()
+                rows.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+                data.extend(rows[:limit - len(data)])
+                if len(data) >= limit:
+                    break
+            return data
+        
+        except Exception as e:
+            logger.error(f"❌ 获取最新数据失败: {e}")
+            return []
+    
+    async def get_data_range(self, data_type: str, since: Optional[str] = None,
+                             until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按创建时间范围获取数据，只读取范围内日期的分区
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            since: 起始时间（ISO格式，包含），None表示不限
+            until: 结束时间（ISO格式，包含；只给日期时包含当天全部数据），None表示不限
+            
+        Returns:
+            List[Dict[str, Any]]: 按创建时间升序排列的数据列表
+        """
+        if data_type not in DATA_TYPE_FIELDS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        
+        try:
+            since_day = since[:10] if since else None
+            until_day = until[:10] if until else None
+            
+            data = []
+            for partition in self._list_partitions(data_type):
+                day = partition.stem
+                if (since_day and day < since_day) or (until_day and day > until_day):
+                    continue
+                data.extend(
+                    row for row in pq.read_table(partition).to_pylist()
+                    if self._in_time_range(row.get('created_at', ''), since, until)
+                )
+            
+            data.sort(key=lambda x: x.get('created_at', ''))
+            return data
+        
+        except Exception as e:
+            logger.error(f"❌ 按时间范围获取数据失败: {e}")
+            return []
+    
+    async def close(self) -> None:
+        """关闭存储连接"""
+        logger.debug("📁 Parquet存储连接已关闭")
+    
+    def get_storage_info(self) -> Dict[str, Any]:
+        """获取存储信息"""
+        try:
+            info = {
+                'storage_type': 'Parquet',
+                'data_path': str(self.data_dir),
+                'parquet_path': str(self.parquet_dir),
+                'initialized': self._initialized,
+                'partitions': {}
+            }
+            
+            for data_type in DATA_TYPE_FIELDS:
+                partitions = self._list_partitions(data_type)
+                info['partitions'][data_type] = {
+                    'count': len(partitions),
+                    'records': sum(pq.ParquetFile(p).metadata.num_rows for p in partitions),
+                    'size_bytes': sum(p.stat().st_size for p in partitions),
+                    'latest': partitions[-1].stem if partitions else None
+                }
+            
+            return info
+        
+        except Exception as e:
+            logger.error(f"❌ 获取存储信息失败: {e}")
+            return {
+                'storage_type': 'Parquet',
+                'error': str(e)
+            }
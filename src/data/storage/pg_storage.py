@@ -1,59 +1,285 @@
 """
-PostgreSQL数据存储实现（占位代码）
+PostgreSQL数据存储实现
 
-TODO: 等主程序及整体功能测试通过后再实现
+基于asyncpg连接池实现，主要特性：
+1. 连接池运行在独立的后台事件循环线程中，同步和异步调用方都可以安全使用
+2. 批量写入先通过COPY导入临时表，再一次性upsert到目标表，避免逐行往返
+3. 按(日期, 维度)或(日期, 笔记标题)幂等写入，同一天重复采集会覆盖当天数据
 """
 
-from typing import Dict, List, Any, Optional
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Coroutine
 
-from .base import BaseStorage
+from .base import BaseStorage, DATA_TYPE_FIELDS, TABLE_DEFINITIONS, TEXT_FIELDS, PERCENT_FIELDS, coerce_int
 from ...utils.logger import get_logger
 
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - 可选依赖
+    asyncpg = None
+
 logger = get_logger(__name__)
 
+# 时间类型字段
+TIMESTAMP_FIELDS = {'created_at', 'updated_at'}
+
 
 class PostgreSQLStorage(BaseStorage):
-    """PostgreSQL数据存储实现（占位）"""
+    """PostgreSQL数据存储实现"""
     
     def __init__(self, config: Dict[str, Any]):
         """
         初始化PostgreSQL存储
         
         Args:
-            config: 配置参数，包含数据库连接信息
+            config: 配置参数，包含数据库连接信息（database_url或host/port/database/user/password）
+        
+        Raises:
+            ImportError: 未安装asyncpg时抛出
         """
+        if asyncpg is None:
+            raise ImportError("PostgreSQL存储需要安装asyncpg: pip install asyncpg")
+        
         super().__init__(config)
+        self.database_url = config.get('database_url')
         self.host = config.get('host', 'localhost')
         self.port = config.get('port', 5432)
         self.database = config.get('database', 'xhs_toolkit')
-        self.username = config.get('username', 'postgres')
+        self.username = config.get('user', config.get('username', 'postgres'))
         self.password = config.get('password', '')
-        self.connection = None
+        self.pool_min_size = config.get('pool_min_size', 1)
+        self.pool_max_size = config.get('pool_max_size', 10)
+        self.command_timeout = config.get('command_timeout', 30)
+        
+        self.pool: Optional['asyncpg.Pool'] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+    
+    # ==================== 事件循环管理 ====================
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """启动连接池所在的后台事件循环"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever,
+                name="pg-storage-loop",
+                daemon=True
+            )
+            self._loop_thread.start()
+        return self._loop
+    
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        在后台事件循环中执行协程并等待结果（供同步调用方使用）
+        
+        Args:
+            coro: 要执行的协程
+            timeout: 超时时间（秒），默认使用command_timeout的两倍
+        
+        Returns:
+            Any: 协程返回值
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return future.result(timeout or self.command_timeout * 2)
+    
+    async def _on_pool_loop(self, coro: Coroutine) -> Any:
+        """确保协程在连接池所在的事件循环中执行"""
+        loop = self._ensure_loop()
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if running_loop is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+    
+    # ==================== 初始化与建表 ====================
     
     async def initialize(self) -> bool:
         """
-        初始化PostgreSQL连接
+        初始化PostgreSQL连接池并自动建表
         
         Returns:
             bool: 初始化是否成功
         """
-        # TODO: 实现PostgreSQL连接初始化
-        logger.warning("⚠️ PostgreSQL存储暂未实现，请使用CSV存储")
-        return False
+        return await self._on_pool_loop(self._initialize())
+    
+    async def _initialize(self) -> bool:
+        """在连接池事件循环中执行初始化"""
+        if self._initialized:
+            return True
+        
+        try:
+            if self.database_url:
+                self.pool = await asyncpg.create_pool(
+                    dsn=self.database_url,
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    command_timeout=self.command_timeout
+                )
+            else:
+                self.pool = await asyncpg.create_pool(
+                    host=self.host,
+                    port=self.port,
+                    database=self.database,
+                    user=self.username,
+                    password=self.password,
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    command_timeout=self.command_timeout
+                )
+            
+            async with self.pool.acquire() as conn:
+                for data_type in TABLE_DEFINITIONS:
+                    await conn.execute(self._create_table_sql(data_type))
+            
+            self._initialized = True
+            logger.info(f"🐘 PostgreSQL存储初始化成功，连接池大小: {self.pool_min_size}-{self.pool_max_size}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"❌ PostgreSQL存储初始化失败: {e}")
+            if self.pool:
+                await self.pool.close()
+                self.pool = None
+            return False
+    
+    @staticmethod
+    def _column_type(field: str) -> str:
+        """获取字段对应的PostgreSQL类型"""
+        if field in TIMESTAMP_FIELDS:
+            return 'TIMESTAMP'
+        if field in TEXT_FIELDS or field in PERCENT_FIELDS:
+            return 'TEXT'
+        return 'BIGINT'
+    
+    def _columns(self, data_type: str) -> List[str]:
+        """获取表的全部列（date + 字段定义）"""
+        return ['date'] + DATA_TYPE_FIELDS[data_type]
+    
+    def _create_table_sql(self, data_type: str) -> str:
+        """生成建表语句"""
+        table, keys = TABLE_DEFINITIONS[data_type]
+        column_defs = ['date DATE NOT NULL']
+        for field in DATA_TYPE_FIELDS[data_type]:
+            not_null = ' NOT NULL' if field in keys else ''
+            column_defs.append(f"{field} {self._column_type(field)}{not_null}")
+        column_defs.append(f"PRIMARY KEY ({', '.join(keys)})")
+        
+        return (
+            f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+            + ",\n    ".join(column_defs)
+            + "\n);\n"
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at DESC);"
+        )
+    
+    # ==================== 数据写入 ====================
+    
+    def _to_records(self, data_type: str, rows: List[tuple]) -> List[tuple]:
+        """将按字段定义顺序排列的字段值转换为COPY所需的元组"""
+        fields = DATA_TYPE_FIELDS[data_type]
+        records = []
+        for row in rows:
+            created_at = datetime.fromisoformat(row[0])
+            values = [created_at.date()]
+            for field, value in zip(fields, row):
+                if field in TIMESTAMP_FIELDS:
+                    values.append(datetime.fromisoformat(value) if value else created_at)
+                elif field in TEXT_FIELDS or field in PERCENT_FIELDS:
+                    values.append('' if value is None else str(value))
+                else:
+                    values.append(coerce_int(value))
+            records.append(tuple(values))
+        return records
+    
+    def _dedupe_records(self, data_type: str, records: List[tuple]) -> List[tuple]:
+        """
+        同一批次内唯一键重复时只保留最后一条
+        
+        写入合并后的批次中同一天同一维度可能出现多次（后采集的在后），
+        ON CONFLICT不允许在一条语句中重复更新同一行，因此先按输入顺序去重
+        
+        Args:
+            data_type: 数据类型
+            records: COPY所需的元组列表
+        
+        Returns:
+            List[tuple]: 去重后的元组列表（保持各键最后一次出现的数据）
+        """
+        _, keys = TABLE_DEFINITIONS[data_type]
+        columns = self._columns(data_type)
+        key_indexes = [columns.index(key) for key in keys]
+        
+        latest = {}
+        for record in records:
+            latest[tuple(record[i] for i in key_indexes)] = record
+        return list(latest.values())
     
-    async def save_dashboard_data(self, data: Dict[str, Any]) -> bool:
+    async def _upsert(self, data_type: str, data: List[Dict[str, Any]]) -> bool:
         """
-        保存账号概览数据到PostgreSQL
+        批量幂等写入：COPY到临时表，再INSERT ... ON CONFLICT合并到目标表
         
         Args:
-            data: 账号概览数据
+            data_type: 数据类型
+            data: 原始数据列表
+        
+        Returns:
+            bool: 写入是否成功
+        """
+        if not data:
+            return True
+        
+        if not self._initialized and not await self._initialize():
+            return False
+        
+        table, keys = TABLE_DEFINITIONS[data_type]
+        columns = self._columns(data_type)
+        records = self._dedupe_records(data_type, self._to_records(data_type, self._row_values(data_type, data)))
+        staging = f"_stage_{table}"
+        
+        column_list = ', '.join(columns)
+        key_list = ', '.join(keys)
+        updates = ', '.join(
+            f"{col} = EXCLUDED.{col}" for col in columns
+            if col not in keys and col != 'created_at'
+        )
+        
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    await conn.copy_records_to_table(staging, records=records, columns=columns)
+                    await conn.execute(
+                        f"INSERT INTO {table} ({column_list}) "
+                        f"SELECT {column_list} FROM {staging} "
+                        f"ON CONFLICT ({key_list}) DO UPDATE SET {updates}"
+                    )
             
+            logger.info(f"💾 数据已写入PostgreSQL表 {table}: {len(records)} 条记录")
+            return True
+        
+        except Exception as e:
+            logger.error(f"❌ 写入PostgreSQL表 {table} 失败: {e}")
+            return False
+    
+    async def save_dashboard_data(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        保存账号概览数据到PostgreSQL
+        
+        Args:
+            data: 账号概览数据列表
+        
         Returns:
             bool: 保存是否成功
         """
-        # TODO: 实现PostgreSQL数据保存
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return False
+        return await self._on_pool_loop(self._upsert('dashboard', data))
     
     async def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> bool:
         """
@@ -61,27 +287,25 @@ class PostgreSQLStorage(BaseStorage):
         
         Args:
             data: 内容分析数据列表
-            
+        
         Returns:
             bool: 保存是否成功
         """
-        # TODO: 实现PostgreSQL数据保存
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return False
+        return await self._on_pool_loop(self._upsert('content_analysis', data))
     
-    async def save_fans_data(self, data: Dict[str, Any]) -> bool:
+    async def save_fans_data(self, data: List[Dict[str, Any]]) -> bool:
         """
         保存粉丝数据到PostgreSQL
         
         Args:
-            data: 粉丝数据
-            
+            data: 粉丝数据列表
+        
         Returns:
             bool: 保存是否成功
         """
-        # TODO: 实现PostgreSQL数据保存
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return False
+        return await self._on_pool_loop(self._upsert('fans', data))
+    
+    # ==================== 数据查询 ====================
     
     async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -90,60 +314,153 @@ class PostgreSQLStorage(BaseStorage):
         Args:
             data_type: 数据类型 (dashboard, content_analysis, fans)
             limit: 返回数据条数限制
-            
+        
         Returns:
             List[Dict[str, Any]]: 数据列表
         """
-        # TODO: 实现PostgreSQL数据查询
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return []
+        if data_type not in TABLE_DEFINITIONS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        
+        return await self._on_pool_loop(self._fetch_latest(data_type, limit))
+    
+    async def _fetch_latest(self, data_type: str, limit: int) -> List[Dict[str, Any]]:
+        """在连接池事件循环中查询最新数据"""
+        if not self._initialized and not await self._initialize():
+            return []
+        
+        table, _ = TABLE_DEFINITIONS[data_type]
+        fields = DATA_TYPE_FIELDS[data_type]
+        
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    f"SELECT {', '.join(fields)} FROM {table} ORDER BY created_at DESC LIMIT $1",
+                    limit
+                )
+            return [self._row_to_dict(row) for row in rows]
+        
+        except Exception as e:
+            logger.error(f"❌ 查询PostgreSQL表 {table} 失败: {e}")
+            return []
+    
+    async def get_data_range(self, data_type: str, since: Optional[str] = None,
+                             until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按创建时间范围从PostgreSQL获取数据
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            since: 起始时间（ISO格式，包含），None表示不限
+            until: 结束时间（ISO格式，包含；只给日期时包含当天全部数据），None表示不限
+            
+        Returns:
+            List[Dict[str, Any]]: 按创建时间升序排列的数据列表
+        """
+        if data_type not in TABLE_DEFINITIONS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        
+        return await self._on_pool_loop(self._fetch_range(data_type, since, until))
+    
+    async def _fetch_range(self, data_type: str, since: Optional[str],
+                           until: Optional[str]) -> List[Dict[str, Any]]:
+        """在连接池事件循环中按时间范围查询"""
+        if not self._initialized and not await self._initialize():
+            return []
+        
+        table, _ = TABLE_DEFINITIONS[data_type]
+        fields = DATA_TYPE_FIELDS[data_type]
+        
+        conditions = []
+        args = []
+        if since:
+            args.append(datetime.fromisoformat(since))
+            conditions.append(f"created_at >= ${len(args)}")
+        if until:
+            if len(until) <= 10:
+                # 只给日期时包含当天全部数据
+                args.append(datetime.fromisoformat(until).date())
+                conditions.append(f"date <= ${len(args)}")
+            else:
+                args.append(datetime.fromisoformat(until))
+                conditions.append(f"created_at <= ${len(args)}")
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    f"SELECT {', '.join(fields)} FROM {table} {where}ORDER BY created_at",
+                    *args
+                )
+            return [self._row_to_dict(row) for row in rows]
+        
+        except Exception as e:
+            logger.error(f"❌ 查询PostgreSQL表 {table} 失败: {e}")
+            return []
+    
+    @staticmethod
+    def _row_to_dict(row: 'asyncpg.Record') -> Dict[str, Any]:
+        """将查询结果转换为与CSV存储一致的字典格式"""
+        data = dict(row)
+        for field in TIMESTAMP_FIELDS:
+            if isinstance(data.get(field), datetime):
+                data[field] = data[field].isoformat()
+        return data
+    
+    # ==================== 连接管理 ====================
     
     async def close(self) -> None:
-        """关闭PostgreSQL连接"""
-        # TODO: 实现连接关闭
-        if self.connection:
-            # await self.connection.close()
-            pass
+        """关闭PostgreSQL连接池"""
+        if self.pool:
+            await self._on_pool_loop(self.pool.close())
+            self.pool = None
+        self._initialized = False
         logger.debug("🔌 PostgreSQL存储连接已关闭")
-
-
-# TODO: 后续实现计划
-"""
-PostgreSQL实现计划：
-
-1. 数据库表结构设计：
-   - dashboard_data: 账号概览数据表
-   - content_analysis_data: 内容分析数据表  
-   - fans_data: 粉丝数据表
-
-2. 依赖库：
-   - asyncpg: 异步PostgreSQL驱动
-   - sqlalchemy: ORM框架（可选）
-
-3. 功能实现：
-   - 连接池管理
-   - 自动建表
-   - 数据插入/查询
-   - 事务处理
-   - 错误重试
-
-4. 配置项：
-   - 数据库连接参数
-   - 连接池大小
-   - 超时设置
-   - 重试策略
-
-示例配置：
-{
-    "storage_type": "postgresql",
-    "host": "localhost",
-    "port": 5432,
-    "database": "xhs_toolkit",
-    "username": "postgres", 
-    "password": "password",
-    "pool_size": 10,
-    "max_overflow": 20,
-    "pool_timeout": 30,
-    "pool_recycle": 3600
-}
-""" 
\ No newline at end of file
+    
+    def shutdown(self) -> None:
+        """同步关闭连接池并停止后台事件循环"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        
+        try:
+            self.run_sync(self.close())
+        except Exception as e:
+            logger.warning(f"⚠️ 关闭PostgreSQL连接池时出错: {e}")
+        
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._loop_thread:
+            self._loop_thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+    
+    def get_storage_info(self) -> Dict[str, Any]:
+        """获取存储信息"""
+        info = {
+            'storage_type': 'PostgreSQL',
+            'host': self.host if not self.database_url else None,
+            'database': self.database if not self.database_url else None,
+            'initialized': self._initialized,
+            'pool_min_size': self.pool_min_size,
+            'pool_max_size': self.pool_max_size,
+            'tables': {}
+        }
+        
+        if not self._initialized or not self.pool:
+            return info
+        
+        async def _count_rows() -> Dict[str, int]:
+            counts = {}
+            async with self.pool.acquire() as conn:
+                for data_type, (table, _) in TABLE_DEFINITIONS.items():
+                    counts[table] = await conn.fetchval(f"SELECT COUNT(*) FROM {table}")
+            return counts
+        
+        try:
+            info['tables'] = self.run_sync(_count_rows())
+        except Exception as e:
+            logger.error(f"❌ 获取PostgreSQL存储信息失败: {e}")
+            info['error'] = str(e)
+        
+        return info
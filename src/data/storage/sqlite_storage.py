@@ -0,0 +1,312 @@
+"""
+SQLite数据存储实现
+
+使用单个SQLite文件保存全部数据，适合单机部署：
+1. 启用WAL模式，采集写入时MCP查询、趋势分析等读操作不会被阻塞
+2. 每个线程使用独立连接，写入使用预编译的批量upsert语句
+3. 按(日期, 维度)或(日期, 笔记标题)幂等写入，并建立索引支持范围查询
+"""
+
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .base import BaseStorage, DATA_TYPE_FIELDS, TABLE_DEFINITIONS, TEXT_FIELDS, PERCENT_FIELDS, coerce_int
+
+logger = logging.getLogger(__name__)
+
+# 额外的查询索引（唯一键索引由UNIQUE约束自动创建）
+EXTRA_INDEXES = {
+    'content_analysis': [('title', 'date')]
+}
+
+
+class SQLiteStorage(BaseStorage):
+    """SQLite数据存储实现类"""
+    
+    DEFAULT_FILENAME = 'creator_data.sqlite3'
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化SQLite存储
+        
+        Args:
+            config: 配置参数，包含data_dir（数据库文件保存在该目录下）或db_path
+        """
+        super().__init__(config)
+        self.data_dir = Path(config.get('data_dir', 'src/data'))
+        self.db_path = Path(config.get('db_path') or self.data_dir / self.DEFAULT_FILENAME)
+        self.busy_timeout = config.get('busy_timeout', 30)
+        
+        self._local = threading.local()
+        # 所有线程创建的连接，关闭时全部关闭；关闭后递增代数，各线程下次使用时重新连接
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self._upsert_sql = {data_type: self._build_upsert_sql(data_type) for data_type in TABLE_DEFINITIONS}
+        
+        # 自动初始化
+        self._initialize_sync()
+    
+    def _initialize_sync(self) -> None:
+        """同步初始化SQLite存储：启用WAL并建表"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            conn = self._get_connection()
+            with conn:
+                for data_type in TABLE_DEFINITIONS:
+                    conn.executescript(self._create_table_sql(data_type))
+            
+            self._initialized = True
+            logger.info(f"🗄️ SQLite存储初始化成功，数据库文件: {self.db_path}")
+        
+        except Exception as e:
+            logger.error(f"❌ SQLite存储初始化失败: {e}")
+            raise
+    
+    async def initialize(self) -> bool:
+        """
+        异步初始化SQLite存储
+        
+        Returns:
+            bool: 初始化是否成功
+        """
+        try:
+            self._initialize_sync()
+            return True
+        except Exception as e:
+            logger.error(f"❌ SQLite存储初始化失败: {e}")
+            return False
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（WAL模式下多个连接可并发读）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'generation', None) != self._generation:
+            # 连接只在创建它的线程中使用，允许跨线程是为了关闭时统一关闭
+            conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _column_type(field: str) -> str:
+        """获取字段对应的SQLite类型"""
+        if field in TEXT_FIELDS or field in PERCENT_FIELDS:
+            return 'TEXT'
+        return 'INTEGER'
+    
+    def _create_table_sql(self, data_type: str) -> str:
+        """生成建表和建索引语句"""
+        table, keys = TABLE_DEFINITIONS[data_type]
+        column_defs = ['date TEXT NOT NULL']
+        for field in DATA_TYPE_FIELDS[data_type]:
+            column_defs.append(f"{field} {self._column_type(field)}")
+        column_defs.append(f"UNIQUE ({', '.join(keys)})")
+        
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(column_defs)});",
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at);"
+        ]
+        for columns in EXTRA_INDEXES.get(data_type, []):
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)});"
+            )
+        return '\n'.join(statements)
+    
+    @staticmethod
+    def _build_upsert_sql(data_type: str) -> str:
+        """生成批量upsert语句（参数化，由sqlite3缓存预编译结果）"""
+        table, keys = TABLE_DEFINITIONS[data_type]
+        columns = ['date'] + DATA_TYPE_FIELDS[data_type]
+        updates = ', '.join(
+            f"{col} = excluded.{col}" for col in columns
+            if col not in keys and col != 'created_at'
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+        )
+    
+    def _to_records(self, data_type: str, rows: List[tuple]) -> List[tuple]:
+        """将按字段定义顺序排列的字段值转换为参数元组"""
+        text_flags = [field in TEXT_FIELDS or field in PERCENT_FIELDS for field in DATA_TYPE_FIELDS[data_type]]
+        records = []
+        for row in rows:
+            values = [row[0][:10]]
+            for is_text, value in zip(text_flags, row):
+                if is_text:
+                    values.append('' if value is None else str(value))
+                else:
+                    values.append(coerce_int(value))
+            records.append(tuple(values))
+        return records
+    
+    def _save(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """在一个事务内批量upsert数据"""
+        if not self._initialized:
+            self._initialize_sync()
+        
+        records = self._to_records(data_type, self._row_values(data_type, data))
+        conn = self._get_connection()
+        with conn:
+            conn.executemany(self._upsert_sql[data_type], records)
+        
+        logger.info(f"💾 数据已写入SQLite表 {TABLE_DEFINITIONS[data_type][0]}: {len(records)} 条记录")
+    
+    def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
+        """
+        同步保存仪表板数据到SQLite
+        
+        Args:
+            data: 仪表板数据列表
+        """
+        try:
+            self._save('dashboard', data)
+        except Exception as e:
+            logger.error(f"❌ 保存仪表板数据失败: {e}")
+            raise
+    
+    def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> None:
+        """
+        同步保存内容分析数据到SQLite
+        
+        Args:
+            data: 内容分析数据列表
+        """
+        try:
+            self._save('content_analysis', data)
+        except Exception as e:
+            logger.error(f"❌ 保存内容分析数据失败: {e}")
+            raise
+    
+    def save_fans_data(self, data: List[Dict[str, Any]]) -> None:
+        """
+        同步保存粉丝数据到SQLite
+        
+        Args:
+            data: 粉丝数据列表
+        """
+        try:
+            self._save('fans', data)
+        except Exception as e:
+            logger.error(f"❌ 保存粉丝数据失败: {e}")
+            raise
+    
+    def _query(self, data_type: str, where: str = '', args: tuple = (),
+               order: str = 'created_at DESC', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """执行查询并返回字典列表"""
+        table, _ = TABLE_DEFINITIONS[data_type]
+        sql = f"SELECT {', '.join(DATA_TYPE_FIELDS[data_type])} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args = args + (limit,)
+        
+        rows = self._get_connection().execute(sql, args).fetchall()
+        return [dict(row) for row in rows]
+    
+    async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取最新数据
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            limit: 返回数据条数限制
+        
+        Returns:
+            List[Dict[str, Any]]: 数据列表
+        """
+        if data_type not in TABLE_DEFINITIONS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        
+        try:
+            return self._query(data_type, limit=limit)
+        except Exception as e:
+            logger.error(f"❌ 获取最新数据失败: {e}")
+            return []
+    
+    async def get_data_range(self, data_type: str, since: Optional[str] = None,
+                             until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按创建时间范围获取数据
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            since: 起始时间（ISO格式，包含），None表示不限
+            until: 结束时间（ISO格式，包含；只给日期时包含当天全部数据），None表示不限
+        
+        Returns:
+            List[Dict[str, Any]]: 按创建时间升序排列的数据列表
+        """
+        if data_type not in TABLE_DEFINITIONS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        
+        conditions = []
+        args = []
+        if since:
+            conditions.append("created_at >= ?")
+            args.append(since)
+        if until:
+            conditions.append("substr(created_at, 1, ?) <= ?")
+            args.extend([len(until), until])
+        
+        try:
+            return self._query(data_type, ' AND '.join(conditions), tuple(args), order='created_at')
+        except Exception as e:
+            logger.error(f"❌ 按时间范围获取数据失败: {e}")
+            return []
+    
+    async def close(self) -> None:
+        """关闭所有线程的数据库连接"""
+        self.shutdown()
+    
+    def shutdown(self) -> None:
+        """同步关闭所有线程的数据库连接（调用时不应再有进行中的写入）"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ 关闭SQLite连接时出错: {e}")
+        self._local.conn = None
+        logger.debug(f"🗄️ SQLite存储连接已关闭: {len(connections)} 个")
+    
+    def get_storage_info(self) -> Dict[str, Any]:
+        """获取存储信息"""
+        try:
+            info = {
+                'storage_type': 'SQLite',
+                'db_path': str(self.db_path),
+                'initialized': self._initialized,
+                'size_bytes': self.db_path.stat().st_size if self.db_path.exists() else 0,
+                'tables': {}
+            }
+            
+            conn = self._get_connection()
+            for table, _ in TABLE_DEFINITIONS.values():
+                info['tables'][table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            
+            return info
+        
+        except Exception as e:
+            logger.error(f"❌ 获取存储信息失败: {e}")
+            return {
+                'storage_type': 'SQLite',
+                'error': str(e)
+            }
@@ -1,18 +1,32 @@
 """
 数据存储管理器
 
-提供统一的数据存储接口，支持CSV和PostgreSQL存储
+提供统一的数据存储接口，支持CSV、Parquet、SQLite和PostgreSQL存储
 """
 
 import os
+import atexit
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from .storage.base import BaseStorage
 from .storage.csv_storage import CSVStorage
 from .storage.pg_storage import PostgreSQLStorage
+from .storage.parquet_storage import ParquetStorage
+from .storage.sqlite_storage import SQLiteStorage
+from .write_behind import WriteBehindQueue, WriteRequest
+from .aggregates import AggregateStore, AGGREGATE_METRICS
+from .note_fingerprints import NoteFingerprintStore
+from .collection_checkpoint import CollectionCheckpoint
 
 logger = logging.getLogger(__name__)
 
+DATA_TYPE_LABELS = {
+    'dashboard': '仪表板',
+    'content_analysis': '内容分析',
+    'fans': '粉丝'
+}
+
 
 class StorageManager:
     """数据存储管理器"""
@@ -20,16 +34,30 @@ class StorageManager:
     def __init__(self):
         self._csv_storage: Optional[CSVStorage] = None
         self._pg_storage: Optional[PostgreSQLStorage] = None
+        self._parquet_storage: Optional[ParquetStorage] = None
+        self._sqlite_storage: Optional[SQLiteStorage] = None
+        self._write_behind: Optional[WriteBehindQueue] = None
+        self._aggregates: Optional[AggregateStore] = None
+        self._fingerprints: Optional[NoteFingerprintStore] = None
+        self._exit_hook_registered = False
         self._initialized = False
         
     def initialize(self, data_path: Optional[str] = None, 
-                  database_config: Optional[Dict[str, Any]] = None) -> None:
+                  database_config: Optional[Dict[str, Any]] = None,
+                  enable_parquet: Optional[bool] = None,
+                  enable_sqlite: Optional[bool] = None,
+                  write_behind: Optional[bool] = None) -> None:
         """
         初始化存储管理器
         
         Args:
-            data_path: CSV数据存储路径，默认从环境变量DATA_STORAGE_PATH读取
+            data_path: 数据存储路径，默认从环境变量DATA_STORAGE_PATH读取
             database_config: PostgreSQL配置，默认从环境变量读取
+            enable_parquet: 是否启用Parquet存储，默认从环境变量ENABLE_PARQUET_STORAGE读取
+            enable_sqlite: 是否启用SQLite存储（数据库文件保存在data_path下），
+                默认从环境变量ENABLE_SQLITE_STORAGE读取
+            write_behind: 是否启用异步写回队列（保存接口入队后立即返回，由后台批量写入），
+                默认从环境变量ENABLE_WRITE_BEHIND读取
         """
         if self._initialized:
             return
@@ -47,6 +75,44 @@ class StorageManager:
             logger.error(f"CSV存储初始化失败: {e}")
             raise
             
+        # 初始化增量汇总表（首次使用时根据已有的CSV历史数据重建）
+        self._aggregates = AggregateStore(self._csv_storage.csv_dir / '.aggregates.json')
+        if not self._aggregates.exists():
+            try:
+                self._aggregates.rebuild({
+                    data_type: self._csv_storage.load_frame(data_type).to_dict('records')
+                    for data_type in AGGREGATE_METRICS
+                })
+            except Exception as e:
+                logger.warning(f"根据历史数据重建汇总表失败，将从新数据开始累计: {e}")
+        
+        # 笔记指纹表（内容分析增量采集详情数据）
+        self._fingerprints = NoteFingerprintStore(self._csv_storage.csv_dir / '.note_fingerprints.json')
+            
+        # 检查是否启用Parquet列式存储（按天分区，仅追加写入）
+        if enable_parquet is None:
+            enable_parquet = os.getenv('ENABLE_PARQUET_STORAGE', 'false').lower() == 'true'
+        
+        if enable_parquet:
+            try:
+                self._parquet_storage = ParquetStorage({'data_dir': data_path})
+                logger.info("Parquet存储已启用")
+            except Exception as e:
+                logger.warning(f"Parquet存储初始化失败，将不使用Parquet存储: {e}")
+                self._parquet_storage = None
+            
+        # 检查是否启用SQLite存储（单文件，WAL模式）
+        if enable_sqlite is None:
+            enable_sqlite = os.getenv('ENABLE_SQLITE_STORAGE', 'false').lower() == 'true'
+        
+        if enable_sqlite:
+            try:
+                self._sqlite_storage = SQLiteStorage({'data_dir': data_path})
+                logger.info("SQLite存储已启用")
+            except Exception as e:
+                logger.warning(f"SQLite存储初始化失败，将不使用SQLite存储: {e}")
+                self._sqlite_storage = None
+            
         # 检查是否启用PostgreSQL数据库
         enable_database = os.getenv('ENABLE_DATABASE', 'false').lower() == 'true'
         
@@ -55,24 +121,49 @@ class StorageManager:
             if database_config is None:
                 database_config = self._get_database_config_from_env()
                 
-            # 初始化PostgreSQL存储
+            # 初始化PostgreSQL存储（建立连接池并自动建表）
             try:
-                self._pg_storage = PostgreSQLStorage(database_config)
-                logger.info("PostgreSQL存储已启用")
+                pg_storage = PostgreSQLStorage(database_config)
+                if pg_storage.run_sync(pg_storage.initialize()):
+                    self._pg_storage = pg_storage
+                    logger.info("PostgreSQL存储已启用")
+                else:
+                    pg_storage.shutdown()
+                    logger.warning("PostgreSQL连接失败，将仅使用CSV存储")
             except Exception as e:
                 logger.warning(f"PostgreSQL存储初始化失败，将仅使用CSV存储: {e}")
                 self._pg_storage = None
         else:
             logger.info("PostgreSQL存储已禁用，仅使用CSV存储")
             
+        # 检查是否启用异步写回队列
+        if write_behind is None:
+            write_behind = os.getenv('ENABLE_WRITE_BEHIND', 'true').lower() == 'true'
+            
+        if write_behind:
+            batch_window = float(os.getenv('WRITE_BEHIND_BATCH_WINDOW', '0.5'))
+            self._write_behind = WriteBehindQueue(self._write_batch, batch_window=batch_window)
+            self._write_behind.start()
+            # 正常退出时写完队列中的数据（信号退出由MCPServer显式调用drain_on_shutdown）
+            if not self._exit_hook_registered:
+                atexit.register(self.drain_on_shutdown)
+                self._exit_hook_registered = True
+            logger.info(f"异步写回队列已启用，合并窗口: {batch_window}秒")
+            
         self._initialized = True
         
     def _get_database_config_from_env(self) -> Dict[str, Any]:
         """从环境变量获取数据库配置"""
+        # 连接池配置
+        pool_config = {
+            'pool_min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '1')),
+            'pool_max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10'))
+        }
+        
         # 优先使用DATABASE_URL
         database_url = os.getenv('DATABASE_URL')
         if database_url:
-            return {'database_url': database_url}
+            return {'database_url': database_url, **pool_config}
             
         # 使用分离的配置项
         return {
@@ -80,7 +171,8 @@ class StorageManager:
             'port': int(os.getenv('DATABASE_PORT', '5432')),
             'database': os.getenv('DATABASE_NAME', 'xhs_toolkit'),
             'user': os.getenv('DATABASE_USER', 'username'),
-            'password': os.getenv('DATABASE_PASSWORD', 'password')
+            'password': os.getenv('DATABASE_PASSWORD', 'password'),
+            **pool_config
         }
         
     def is_database_enabled(self) -> bool:
@@ -93,60 +185,270 @@ class StorageManager:
             self.initialize()
         return self._csv_storage
         
+    def is_parquet_enabled(self) -> bool:
+        """检查是否启用了Parquet存储"""
+        return self._parquet_storage is not None
+        
+    def get_parquet_storage(self) -> Optional[ParquetStorage]:
+        """获取Parquet存储实例"""
+        if not self._initialized:
+            self.initialize()
+        return self._parquet_storage
+        
+    def is_sqlite_enabled(self) -> bool:
+        """检查是否启用了SQLite存储"""
+        return self._sqlite_storage is not None
+        
+    def get_sqlite_storage(self) -> Optional[SQLiteStorage]:
+        """获取SQLite存储实例"""
+        if not self._initialized:
+            self.initialize()
+        return self._sqlite_storage
+        
     def get_pg_storage(self) -> Optional[PostgreSQLStorage]:
         """获取PostgreSQL存储实例"""
         if not self._initialized:
             self.initialize()
         return self._pg_storage
         
-    def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
-        """保存仪表板数据"""
+    def _backends(self) -> List[Tuple[str, BaseStorage]]:
+        """获取所有已启用的存储后端（名称, 实例）"""
+        backends = [
+            ('CSV', self._csv_storage),
+            ('Parquet', self._parquet_storage),
+            ('SQLite', self._sqlite_storage),
+            ('PostgreSQL', self._pg_storage)
+        ]
+        return [(name, backend) for name, backend in backends if backend is not None]
+        
+    def _save(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """保存数据：启用写回队列时入队后立即返回，否则直接依次写入各存储"""
         if not self._initialized:
             self.initialize()
             
-        # 保存到CSV（始终执行）
-        if self._csv_storage:
-            self._csv_storage.save_dashboard_data(data)
+        if self._write_behind is not None:
+            self._write_behind.submit(data_type, data)
+            return
             
-        # 保存到PostgreSQL（如果启用）
-        if self._pg_storage:
+        self._write_now(data_type, data)
+        
+    def _write_now(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """在调用方线程中依次写入各存储"""
+        label = DATA_TYPE_LABELS[data_type]
+        
+        for name, backend in self._backends():
+            save = getattr(backend, f'save_{data_type}_data')
+            
+            # 保存到CSV（始终执行，失败时抛出异常）
+            if backend is self._csv_storage:
+                save(data)
+                continue
+                
             try:
-                self._pg_storage.save_dashboard_data(data)
+                if backend is self._pg_storage:
+                    if not self._pg_storage.run_sync(save(data)):
+                        logger.error(f"保存{label}数据到{name}失败")
+                else:
+                    save(data)
             except Exception as e:
-                logger.error(f"保存仪表板数据到PostgreSQL失败: {e}")
+                logger.error(f"保存{label}数据到{name}失败: {e}")
+                
+        self._update_aggregates(data_type, data)
+                
+    def _update_aggregates(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """用本次保存的数据更新汇总表（与CSV相同，当天的数据以最后一次保存为准）"""
+        if self._aggregates is None:
+            return
+        try:
+            self._aggregates.update(data_type, data)
+        except Exception as e:
+            logger.error(f"更新{DATA_TYPE_LABELS[data_type]}数据汇总表失败: {e}")
+                
+    async def _write_batch(self, batch: List[WriteRequest]) -> None:
+        """
+        写入写回队列合并后的批次，并发写入所有已启用的存储
+        
+        同一数据类型的多次保存会合并：按天整体替换的存储只写入最后一次的数据，
+        按唯一键upsert的存储合并写入全部数据，汇总表按提交顺序应用每一次的数据，
+        结果与依次保存一致。
+        
+        Args:
+            batch: 写入请求列表（按提交顺序）
+        
+        Raises:
+            Exception: CSV存储写入失败时抛出（与直接写入一致），由写回队列计入flush()的结果
+        """
+        grouped: Dict[str, List[List[Dict[str, Any]]]] = {}
+        for data_type, data in batch:
+            grouped.setdefault(data_type, []).append(data)
+            
+        jobs = []
+        targets = []
+        for name, backend in self._backends():
+            if backend is self._csv_storage:
+                # CSV的多个文件在一次加锁内写入
+                jobs.append(self._run_blocking(self._write_csv, {
+                    data_type: payloads[-1] for data_type, payloads in grouped.items()
+                }))
+                targets.append((name, '、'.join(DATA_TYPE_LABELS[data_type] for data_type in grouped)))
+                continue
+            for data_type, payloads in grouped.items():
+                if backend.REPLACES_DAY:
+                    data = payloads[-1]
+                else:
+                    data = [row for payload in payloads for row in payload]
+                jobs.append(self._write_backend(backend, data_type, data))
+                targets.append((name, DATA_TYPE_LABELS[data_type]))
+                
+        # 汇总表与存储并发更新
+        for data_type, payloads in grouped.items():
+            jobs.append(self._run_blocking(self._apply_aggregates, data_type, payloads))
+            targets.append(('汇总表', DATA_TYPE_LABELS[data_type]))
+                
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        csv_error = None
+        for (name, label), result in zip(targets, results):
+            if isinstance(result, BaseException):
+                logger.error(f"保存{label}数据到{name}失败: {result}")
+                if name == 'CSV':
+                    csv_error = result
+            elif result is False:
+                logger.error(f"保存{label}数据到{name}失败")
+                
+        if csv_error is not None:
+            raise csv_error
+                
+        logger.debug(f"写回队列已写入 {len(batch)} 个请求到 {len(self._backends())} 个存储")
+        
+    def _write_csv(self, writes: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        持有所有相关CSV文件的写锁依次写入，其他进程不会读到只写入了一部分的批次
+        
+        Args:
+            writes: {数据类型: 数据列表}
+        """
+        with self._csv_storage.locked(*writes):
+            for data_type, data in writes.items():
+                getattr(self._csv_storage, f'save_{data_type}_data')(data)
+        
+    def _apply_aggregates(self, data_type: str, payloads: List[List[Dict[str, Any]]]) -> None:
+        """按提交顺序把合并批次中的每一次保存应用到汇总表"""
+        for data in payloads:
+            self._update_aggregates(data_type, data)
+        
+    @staticmethod
+    async def _write_backend(backend: BaseStorage, data_type: str, data: List[Dict[str, Any]]) -> Any:
+        """写入单个存储，同步实现放到线程池中执行"""
+        save = getattr(backend, f'save_{data_type}_data')
+        if asyncio.iscoroutinefunction(save):
+            return await save(data)
+        return await StorageManager._run_blocking(save, data)
+        
+    @staticmethod
+    async def _run_blocking(func, *args) -> Any:
+        """在线程池中执行同步函数"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        except RuntimeError:
+            # 解释器退出阶段线程池已不再接受任务，直接在当前线程执行
+            return func(*args)
+        
+    def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
+        """保存仪表板数据"""
+        self._save('dashboard', data)
                 
     def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> None:
         """保存内容分析数据"""
-        if not self._initialized:
-            self.initialize()
-            
-        # 保存到CSV（始终执行）
-        if self._csv_storage:
-            self._csv_storage.save_content_analysis_data(data)
-            
-        # 保存到PostgreSQL（如果启用）
-        if self._pg_storage:
-            try:
-                self._pg_storage.save_content_analysis_data(data)
-            except Exception as e:
-                logger.error(f"保存内容分析数据到PostgreSQL失败: {e}")
+        self._save('content_analysis', data)
                 
     def save_fans_data(self, data: List[Dict[str, Any]]) -> None:
         """保存粉丝数据"""
+        self._save('fans', data)
+        
+    def get_aggregates(self) -> Optional[AggregateStore]:
+        """获取增量汇总表实例"""
         if not self._initialized:
             self.initialize()
+        return self._aggregates
+        
+    def get_note_fingerprints(self) -> Optional[NoteFingerprintStore]:
+        """获取笔记指纹表实例"""
+        if not self._initialized:
+            self.initialize()
+        return self._fingerprints
+        
+    def get_collection_checkpoint(self, name: str) -> CollectionCheckpoint:
+        """
+        获取分页采集断点
+        
+        Args:
+            name: 采集任务名称（如content_analysis）
+        
+        Returns:
+            CollectionCheckpoint: 断点文件保存在CSV目录下的 .<name>_checkpoint.json
+        """
+        if not self._initialized:
+            self.initialize()
+        return CollectionCheckpoint(self._csv_storage.csv_dir / f'.{name}_checkpoint.json')
+    
+    def get_aggregate_summary(self, data_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取汇总指标（直接读取增量汇总表，无需扫描原始数据）
+        
+        Args:
+            data_type: 数据类型，None表示全部
             
-        # 保存到CSV（始终执行）
-        if self._csv_storage:
-            self._csv_storage.save_fans_data(data)
+        Returns:
+            Dict[str, Any]: {数据类型: {分组: {latest_date, latest, days, average, max}}}，
+                全部数据类型时额外包含notes（已采集过的笔记数）
+        """
+        aggregates = self.get_aggregates()
+        if aggregates is None:
+            return {}
+        if data_type:
+            return aggregates.get_summary(data_type)
+        
+        summary = {data_type: aggregates.get_summary(data_type) for data_type in AGGREGATE_METRICS}
+        summary['notes'] = aggregates.note_count()
+        return summary
+        
+    def is_write_behind_enabled(self) -> bool:
+        """检查是否启用了异步写回队列"""
+        return self._write_behind is not None
+        
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待写回队列中的数据全部写入存储
+        
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
             
-        # 保存到PostgreSQL（如果启用）
-        if self._pg_storage:
-            try:
-                self._pg_storage.save_fans_data(data)
-            except Exception as e:
-                logger.error(f"保存粉丝数据到PostgreSQL失败: {e}")
-                
+        Returns:
+            bool: 是否在超时前全部写入，且CSV存储没有写入失败（未启用写回队列时直接返回True）
+        """
+        if self._write_behind is None:
+            return True
+        return self._write_behind.flush(timeout)
+        
+    def drain_on_shutdown(self, timeout: Optional[float] = 30) -> bool:
+        """
+        进程退出前写完写回队列中的数据并关闭所有存储连接
+        
+        Args:
+            timeout: 等待写入的超时时间（秒）
+            
+        Returns:
+            bool: 队列中的数据是否全部写入
+        """
+        flushed = True
+        if self._write_behind is not None:
+            logger.info("等待写回队列中的数据写入存储...")
+            flushed = self._write_behind.stop(timeout)
+            self._write_behind = None
+            
+        self.close()
+        return flushed
+        
     def get_storage_info(self) -> Dict[str, Any]:
         """获取存储信息"""
         if not self._initialized:
@@ -154,7 +456,10 @@ class StorageManager:
             
         info = {
             'csv_enabled': self._csv_storage is not None,
+            'parquet_enabled': self._parquet_storage is not None,
+            'sqlite_enabled': self._sqlite_storage is not None,
             'postgresql_enabled': self._pg_storage is not None,
+            'write_behind_enabled': self._write_behind is not None,
             'storage_types': []
         }
         
@@ -162,6 +467,14 @@ class StorageManager:
             info['storage_types'].append('CSV')
             info['csv_info'] = self._csv_storage.get_storage_info()
             
+        if self._parquet_storage:
+            info['storage_types'].append('Parquet')
+            info['parquet_info'] = self._parquet_storage.get_storage_info()
+            
+        if self._sqlite_storage:
+            info['storage_types'].append('SQLite')
+            info['sqlite_info'] = self._sqlite_storage.get_storage_info()
+            
         if self._pg_storage:
             info['storage_types'].append('PostgreSQL')
             info['postgresql_info'] = self._pg_storage.get_storage_info()
@@ -169,6 +482,20 @@ class StorageManager:
         return info
 
 
+    def close(self) -> None:
+        """关闭所有存储连接"""
+        if self._write_behind is not None:
+            self._write_behind.stop()
+            self._write_behind = None
+        if self._sqlite_storage:
+            self._sqlite_storage.shutdown()
+            self._sqlite_storage = None
+        if self._pg_storage:
+            self._pg_storage.shutdown()
+            self._pg_storage = None
+        self._initialized = False
+        
+        
 # 全局存储管理器实例
 storage_manager = StorageManager()
 
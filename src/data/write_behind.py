@@ -0,0 +1,173 @@
+"""
+异步写回队列
+
+采集器调用保存接口时只把数据放入队列立即返回，由后台事件循环中的
+刷新任务按时间窗口合并批次后统一写入存储，避免浏览器采集步骤被磁盘I/O阻塞。
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 队列中的一条写入请求：(数据类型, 数据列表)
+WriteRequest = Tuple[str, List[Dict[str, Any]]]
+
+
+class WriteBehindQueue:
+    """异步写回队列，运行在独立的后台事件循环线程中"""
+    
+    def __init__(self, writer: Callable[[List[WriteRequest]], Awaitable[None]],
+                 batch_window: float = 0.5, max_batch_size: int = 100):
+        """
+        初始化写回队列
+        
+        Args:
+            writer: 批量写入协程函数，接收一个批次的写入请求列表
+            batch_window: 收到第一条请求后继续等待合并的时间（秒）
+            max_batch_size: 单个批次最多合并的请求数
+        """
+        self._writer = writer
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        # 上次flush以来写入失败的请求数和最近一次错误（只在后台事件循环中读写）
+        self._failed = 0
+        self._last_error: Optional[BaseException] = None
+    
+    def is_running(self) -> bool:
+        """检查刷新任务是否在运行"""
+        return self._loop is not None and not self._loop.is_closed()
+    
+    def start(self) -> None:
+        """启动后台事件循环和刷新任务"""
+        with self._lock:
+            if self.is_running():
+                return
+            
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            
+            def _run_loop():
+                asyncio.set_event_loop(loop)
+                self._queue = asyncio.Queue()
+                self._task = loop.create_task(self._flush_loop())
+                ready.set()
+                loop.run_forever()
+            
+            self._thread = threading.Thread(target=_run_loop, name="storage-write-behind", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            logger.debug("存储写回队列已启动")
+    
+    def submit(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """
+        提交写入请求（立即返回）
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            data: 数据列表
+        """
+        if not self.is_running():
+            self.start()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (data_type, list(data)))
+    
+    async def _flush_loop(self) -> None:
+        """刷新任务：取出请求，在时间窗口内合并成批次后写入"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_window
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._writer(batch)
+            except Exception as e:
+                logger.error(f"写回队列批量写入失败: {e}")
+                self._failed += len(batch)
+                self._last_error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _cancel_flush_task(self) -> None:
+        """取消刷新任务并等待其结束"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+    
+    async def _join(self) -> Tuple[int, Optional[BaseException]]:
+        """等待队列清空，返回并清零期间写入失败的请求数和最近一次错误"""
+        await self._queue.join()
+        failed, error = self._failed, self._last_error
+        self._failed, self._last_error = 0, None
+        return failed, error
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待队列中所有请求写入完成
+        
+        写入失败的请求不会重试，在下一次flush的结果中报告一次
+        
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
+        
+        Returns:
+            bool: 是否在超时前全部写入，且上次flush以来没有写入失败的请求
+        """
+        if not self.is_running():
+            return True
+        
+        future = asyncio.run_coroutine_threadsafe(self._join(), self._loop)
+        try:
+            failed, error = future.result(timeout)
+        except FutureTimeoutError:
+            logger.warning(f"写回队列刷新超时，仍有 {self._queue.qsize()} 条请求未写入")
+            return False
+        
+        if failed:
+            logger.error(f"写回队列中有 {failed} 条请求写入失败: {error}")
+            return False
+        return True
+    
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        写完剩余请求后停止后台事件循环
+        
+        Args:
+            timeout: 等待写入的超时时间（秒）
+        
+        Returns:
+            bool: 剩余请求是否全部写入
+        """
+        with self._lock:
+            if not self.is_running():
+                return True
+            
+            flushed = self.flush(timeout)
+            asyncio.run_coroutine_threadsafe(self._cancel_flush_task(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            logger.debug("存储写回队列已停止")
+            return flushed
@@ -10,107 +10,25 @@ import asyncio
 import signal
 import sys
 import socket
-import uuid
 import time
 from pathlib import Path
-from typing import Dict, Any
-from dataclasses import dataclass, asdict
 
 from fastmcp import FastMCP
 
 from ..core.config import XHSConfig
-from ..core.exceptions import format_error_message, XHSToolkitError
+from ..core.exceptions import format_error_message, XHSToolkitError, TaskQueueFullError
+from ..core.driver_pool import shutdown_driver_pool
 from ..xiaohongshu.client import XHSClient
 from ..xiaohongshu.models import XHSNote
 from ..utils.logger import get_logger, setup_logger
+from ..utils.video_preflight import is_preflight_enabled, prepare_video
 from ..data import storage_manager, data_scheduler
 from ..auth.smart_auth_server import SmartAuthServer, create_smart_auth_server
+from .task_manager import TaskManager
 
 logger = get_logger(__name__)
 
 
-@dataclass
-class PublishTask:
-    """发布任务数据类"""
-    task_id: str
-    status: str  # "pending", "uploading", "filling", "publishing", "completed", "failed"
-    note: XHSNote
-    progress: int  # 0-100
-    message: str
-    result: Dict[str, Any] = None
-    start_time: float = None
-    end_time: float = None
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        data = asdict(self)
-        # 移除note对象，避免序列化问题
-        if 'note' in data:
-            data['note_title'] = self.note.title
-            data['note_has_images'] = bool(self.note.images)
-            data['note_has_videos'] = bool(self.note.videos)
-            del data['note']
-        return data
-
-
-class TaskManager:
-    """任务管理器"""
-    
-    def __init__(self):
-        self.tasks: Dict[str, PublishTask] = {}
-        self.running_tasks: Dict[str, asyncio.Task] = {}
-    
-    def create_task(self, note: XHSNote) -> str:
-        """创建新任务"""
-        task_id = str(uuid.uuid4())[:8]  # 使用短ID
-        task = PublishTask(
-            task_id=task_id,
-            status="pending",
-            note=note,
-            progress=0,
-            message="任务已创建，准备开始",
-            start_time=time.time()
-        )
-        self.tasks[task_id] = task
-        logger.info(f"📋 创建新任务: {task_id} - {note.title}")
-        return task_id
-    
-    def get_task(self, task_id: str) -> PublishTask:
-        """获取任务"""
-        return self.tasks.get(task_id)
-    
-    def update_task(self, task_id: str, status: str = None, progress: int = None, message: str = None, result: Dict = None):
-        """更新任务状态"""
-        if task_id in self.tasks:
-            task = self.tasks[task_id]
-            if status:
-                task.status = status
-            if progress is not None:
-                task.progress = progress
-            if message:
-                task.message = message
-            if result:
-                task.result = result
-            if status in ["completed", "failed"]:
-                task.end_time = time.time()
-            logger.info(f"📋 更新任务 {task_id}: {status} ({progress}%) - {message}")
-    
-    def remove_old_tasks(self, max_age_seconds: int = 3600):
-        """移除超过指定时间的旧任务"""
-        current_time = time.time()
-        expired_tasks = []
-        for task_id, task in self.tasks.items():
-            if task.end_time and (current_time - task.end_time) > max_age_seconds:
-                expired_tasks.append(task_id)
-        
-        for task_id in expired_tasks:
-            del self.tasks[task_id]
-            if task_id in self.running_tasks:
-                self.running_tasks[task_id].cancel()
-                del self.running_tasks[task_id]
-            logger.info(f"🗑️ 清理过期任务: {task_id}")
-
-
 class MCPServer:
     """MCP服务器管理器"""
     
@@ -124,7 +42,14 @@ class MCPServer:
         self.config = config
         self.xhs_client = XHSClient(config)
         self.mcp = FastMCP("小红书MCP服务器")
-        self.task_manager = TaskManager()  # 添加任务管理器
+        # 发布任务执行器：并发数默认与浏览器会话池大小一致
+        max_workers = config.publish_max_workers or (config.driver_pool_max_size if config.enable_driver_pool else 1)
+        self.task_manager = TaskManager(
+            self._execute_publish_task,
+            max_workers=max_workers,
+            max_queue_size=config.publish_queue_size,
+            task_timeout=config.publish_task_timeout
+        )
         self.scheduler_initialized = False  # 调度器初始化标志
         self.auth_server = create_smart_auth_server(config)  # 智能认证服务器
         self._setup_tools()
@@ -234,7 +159,7 @@ class MCPServer:
         
         @self.mcp.tool()
         async def smart_publish_note(title: str, content: str, images=None, videos=None, 
-                                   topics=None, location: str = "") -> str:
+                                   topics=None, location: str = "", priority: int = 0) -> str:
             """
             发布小红书笔记（支持多种输入格式）
             
@@ -251,9 +176,10 @@ class MCPServer:
                 videos: 视频路径（目前仅支持本地文件）
                 topics: 话题，支持字符串或数组格式
                 location (str, optional): 位置信息
+                priority (int, optional): 任务优先级，数值越大越先执行，默认0
             
             Returns:
-                str: 任务ID和状态信息
+                str: 任务ID和状态信息（任务先进入发布队列，按优先级依次执行）
                 
             示例:
                 # 使用网络图片
@@ -281,18 +207,15 @@ class MCPServer:
                 # 记录解析结果
                 logger.info(f"✅ 智能解析结果: 图片{len(note.images) if note.images else 0}张, 视频{len(note.videos) if note.videos else 0}个, 话题{len(note.topics) if note.topics else 0}个")
                 
-                # 创建异步任务
-                task_id = self.task_manager.create_task(note)
-                
-                # 启动后台任务
-                async_task = asyncio.create_task(self._execute_publish_task(task_id))
-                self.task_manager.running_tasks[task_id] = async_task
+                # 加入发布队列，由执行器按优先级执行
+                task_id = self.task_manager.create_task(note, priority=priority)
                 
                 result = {
                     "success": True,
                     "task_id": task_id,
-                    "message": f"发布任务已启动，任务ID: {task_id}",
+                    "message": f"发布任务已加入队列，任务ID: {task_id}",
                     "next_step": f"请使用 check_task_status('{task_id}') 查看进度",
+                    "queue": self.task_manager.get_queue_info(task_id),
                     "parsing_result": {
                         "images_parsed": note.images if note.images else [],
                         "videos_parsed": note.videos if note.videos else [],
@@ -306,6 +229,16 @@ class MCPServer:
                 
                 return json.dumps(result, ensure_ascii=False, indent=2)
                 
+            except TaskQueueFullError as e:
+                logger.warning(f"⚠️ {e.message}")
+                return json.dumps({
+                    "success": False,
+                    "error_type": "queue_full",
+                    "message": e.message,
+                    "retry_after_seconds": e.details["retry_after"],
+                    "executor": self.task_manager.get_stats()
+                }, ensure_ascii=False, indent=2)
+                
             except Exception as e:
                 error_msg = f"发布任务启动失败: {str(e)}"
                 logger.error(f"❌ {error_msg}")
@@ -347,9 +280,22 @@ class MCPServer:
                 "progress": task.progress,
                 "message": task.message,
                 "elapsed_seconds": elapsed_time,
-                "is_completed": task.status in ["completed", "failed"]
+                "eta_seconds": self.task_manager.estimate_remaining(task_id),
+                "is_completed": task.is_finished
             }
             
+            # 上传中的任务返回页面上的上传进度和预计剩余时间
+            if task.upload_percent is not None:
+                result["upload"] = {
+                    "percent": task.upload_percent,
+                    "eta_seconds": task.upload_eta_seconds
+                }
+            
+            # 排队中的任务返回队列位置和预计开始时间
+            queue_info = self.task_manager.get_queue_info(task_id)
+            if queue_info:
+                result["queue"] = queue_info
+            
             # 如果任务完成，包含结果
             if task.result:
                 result["result"] = task.result
@@ -376,7 +322,7 @@ class MCPServer:
                     "message": f"任务 {task_id} 不存在"
                 }, ensure_ascii=False, indent=2)
             
-            if task.status not in ["completed", "failed"]:
+            if not task.is_finished:
                 return json.dumps({
                     "success": False,
                     "message": f"任务 {task_id} 尚未完成，当前状态: {task.status}",
@@ -398,6 +344,40 @@ class MCPServer:
             
             return json.dumps(result, ensure_ascii=False, indent=2)
         
+        @self.mcp.tool()
+        async def cancel_publish_task(task_id: str) -> str:
+            """
+            取消排队中或执行中的发布任务
+            
+            Args:
+                task_id (str): 任务ID
+            
+            Returns:
+                str: 取消结果
+            """
+            logger.info(f"🛑 取消发布任务: {task_id}")
+            
+            task = self.task_manager.get_task(task_id)
+            if not task:
+                return json.dumps({
+                    "success": False,
+                    "message": f"任务 {task_id} 不存在"
+                }, ensure_ascii=False, indent=2)
+            
+            if not self.task_manager.cancel_task(task_id):
+                return json.dumps({
+                    "success": False,
+                    "message": f"任务 {task_id} 已结束，当前状态: {task.status}",
+                    "status": task.status
+                }, ensure_ascii=False, indent=2)
+            
+            return json.dumps({
+                "success": True,
+                "task_id": task_id,
+                "message": f"已请求取消任务 {task_id}",
+                "status": task.status
+            }, ensure_ascii=False, indent=2)
+        
         @self.mcp.tool()
         async def login_xiaohongshu(force_relogin: bool = False, quick_mode: bool = False) -> str:
             """
@@ -464,10 +444,14 @@ class MCPServer:
                 }, ensure_ascii=False, indent=2)
         
         @self.mcp.tool()
-        async def get_creator_data_analysis() -> str:
+        async def get_creator_data_analysis(since: str = "", until: str = "") -> str:
             """
             获取创作者数据用于分析
             
+            Args:
+                since (str, optional): 起始日期（如"2025-01-01"），为空时返回最新100条
+                until (str, optional): 结束日期（包含当天），为空表示不限
+            
             Returns:
                 str: 包含所有创作者数据的详细信息用于数据分析
             """
@@ -493,10 +477,15 @@ class MCPServer:
                 # 获取存储管理器
                 csv_storage = storage_manager.get_csv_storage()
                 
-                # 读取所有数据
-                dashboard_data = await csv_storage.get_latest_data('dashboard', limit=100)
-                content_data = await csv_storage.get_latest_data('content_analysis', limit=100)
-                fans_data = await csv_storage.get_latest_data('fans', limit=100)
+                # 读取数据：指定时间范围时按范围查询，否则返回最新数据
+                if since or until:
+                    dashboard_data = await csv_storage.get_data_range('dashboard', since or None, until or None)
+                    content_data = await csv_storage.get_data_range('content_analysis', since or None, until or None)
+                    fans_data = await csv_storage.get_data_range('fans', since or None, until or None)
+                else:
+                    dashboard_data = await csv_storage.get_latest_data('dashboard', limit=100)
+                    content_data = await csv_storage.get_latest_data('content_analysis', limit=100)
+                    fans_data = await csv_storage.get_latest_data('fans', limit=100)
                 
                 # 获取存储信息
                 storage_info = storage_manager.get_storage_info()
@@ -508,7 +497,8 @@ class MCPServer:
                         "dashboard_records": len(dashboard_data),
                         "content_records": len(content_data),
                         "fans_records": len(fans_data),
-                        "storage_info": storage_info
+                        "storage_info": storage_info,
+                        "aggregates": storage_manager.get_aggregate_summary()
                     },
                     "dashboard_data": dashboard_data,
                     "content_analysis_data": content_data,
@@ -516,7 +506,8 @@ class MCPServer:
                     "analysis_tips": {
                         "dashboard": "仪表板数据包含账号整体表现指标",
                         "content": "内容分析数据包含每篇笔记的详细表现",
-                        "fans": "粉丝数据包含粉丝增长趋势"
+                        "fans": "粉丝数据包含粉丝增长趋势",
+                        "aggregates": "汇总指标包含全部历史的按天平均值和历史最大值"
                     },
                     "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
                 }
@@ -531,6 +522,54 @@ class MCPServer:
                     "message": error_msg
                 }, ensure_ascii=False, indent=2)
         
+        @self.mcp.tool()
+        async def get_creator_trend_analysis(since: str = "", until: str = "", top_n: int = 5) -> str:
+            """
+            分析已采集的创作者数据趋势
+            
+            包括仪表板和粉丝数据的日环比、7天/30天滚动窗口，
+            以及每篇笔记的互动率、指标分位数和增长排行
+            
+            Args:
+                since (str, optional): 起始日期（如"2025-01-01"），为空表示不限
+                until (str, optional): 结束日期（包含当天），为空表示不限
+                top_n (int, optional): 笔记排行榜返回的数量，默认5
+            
+            Returns:
+                str: 趋势分析结果
+            """
+            logger.info(f"📈 分析创作者数据趋势 (since={since or '不限'}, until={until or '不限'})")
+            
+            try:
+                from ..data.analytics import TrendAnalyzer
+                
+                analyzer = TrendAnalyzer(storage_manager.get_csv_storage())
+                # 分析在线程中执行，不阻塞事件循环
+                analysis = await asyncio.get_running_loop().run_in_executor(
+                    None, analyzer.analyze, since or None, until or None, top_n
+                )
+                
+                if not any(analysis[key] for key in ('dashboard', 'fans', 'content')):
+                    return json.dumps({
+                        "success": False,
+                        "message": "没有找到可分析的数据",
+                        "suggestion": "请先采集数据: python xhs_toolkit.py manual collect"
+                    }, ensure_ascii=False, indent=2)
+                
+                return json.dumps({
+                    "success": True,
+                    "message": "创作者数据趋势分析完成",
+                    "analysis": analysis
+                }, ensure_ascii=False, indent=2)
+                
+            except Exception as e:
+                error_msg = f"趋势分析失败: {str(e)}"
+                logger.error(f"❌ {error_msg}")
+                return json.dumps({
+                    "success": False,
+                    "message": error_msg
+                }, ensure_ascii=False, indent=2)
+        
     
     async def _execute_publish_task(self, task_id: str) -> None:
         """
@@ -586,16 +625,28 @@ class MCPServer:
                 )
                 return
             
+            # 视频预检：探测编码和码率，必要时在ffmpeg进程中重新封装或转码
+            if task.note.videos and is_preflight_enabled():
+                self.task_manager.update_task(task_id, status="preparing", progress=12, message="正在检查视频格式...")
+                reporter = self.task_manager.progress_reporter(task_id, "preparing", 12, 19)
+                task.note.videos = [
+                    await prepare_video(video, progress_callback=reporter)
+                    for video in task.note.videos
+                ]
+            
             # 阶段1：初始化浏览器
-            # 创建新的客户端实例，避免并发冲突
+            # 创建新的客户端实例，避免并发冲突（浏览器从共享的会话池租用，无需冷启动）
             client = XHSClient(self.config)
             
             # 阶段2：上传文件
             if task.note.images or task.note.videos:
                 self.task_manager.update_task(task_id, status="uploading", progress=20, message="正在上传文件...")
                 
-                # 执行发布过程
-                result = await client.publish_note(task.note)
+                # 执行发布过程，上传进度映射到任务进度的20%-70%
+                result = await client.publish_note(
+                    task.note,
+                    upload_progress_callback=self.task_manager.upload_progress_reporter(task_id, 20, 70)
+                )
                 
                 if result.success:
                     self.task_manager.update_task(
@@ -646,10 +697,6 @@ class MCPServer:
                 message=error_msg,
                 result={"success": False, "message": error_msg}
             )
-        finally:
-            # 清理运行任务记录
-            if task_id in self.task_manager.running_tasks:
-                del self.task_manager.running_tasks[task_id]
 
     def _setup_resources(self) -> None:
         """设置MCP资源"""
@@ -693,6 +740,11 @@ class MCPServer:
 - 参数:
   - task_id: 任务ID
 
+### 4.1 cancel_publish_task
+- 功能: 取消排队中或执行中的发布任务
+- 参数:
+  - task_id: 任务ID
+
 ### 5. close_browser
 - 功能: 关闭浏览器
 
@@ -773,6 +825,12 @@ class MCPServer:
                 if hasattr(self.xhs_client, 'browser_manager') and self.xhs_client.browser_manager.is_initialized:
                     logger.info("🧹 清理残留的浏览器实例...")
                     self.xhs_client.browser_manager.close_driver()
+                
+                # 关闭浏览器会话池中的常驻浏览器
+                shutdown_driver_pool()
+                
+                # 写完写回队列中的数据并关闭存储连接
+                storage_manager.drain_on_shutdown()
             except Exception as cleanup_error:
                 logger.warning(f"⚠️ 清理资源时出错: {cleanup_error}")
             
@@ -813,7 +871,8 @@ class MCPServer:
         # 工具已在__init__中注册
         logger.info(f"🎯 MCP工具列表:")
         for tool in ["test_connection", "smart_publish_note", "check_task_status", 
-                    "get_task_result", "login_xiaohongshu", "get_creator_data_analysis"]:
+                    "get_task_result", "login_xiaohongshu", "get_creator_data_analysis",
+                    "get_creator_trend_analysis", "cancel_publish_task"]:
             logger.info(f"   • {tool}")
         
         # 初始化数据采集（如果启用）
@@ -877,8 +936,10 @@ class MCPServer:
         logger.info("   • smart_publish_note - 发布小红书笔记（支持智能路径解析）")
         logger.info("   • check_task_status - 检查发布任务状态")
         logger.info("   • get_task_result - 获取已完成任务的结果")
+        logger.info("   • cancel_publish_task - 取消排队中或执行中的发布任务")
         logger.info("   • login_xiaohongshu - 智能登录小红书")
         logger.info("   • get_creator_data_analysis - 获取创作者数据用于分析")
+        logger.info("   • get_creator_trend_analysis - 创作者数据趋势分析")
         
         logger.info("🔧 按 Ctrl+C 停止服务器")
         logger.info("💡 终止时的ASGI错误信息是正常现象，可以忽略")
@@ -919,6 +980,12 @@ class MCPServer:
                 if hasattr(self.xhs_client, 'browser_manager') and self.xhs_client.browser_manager.is_initialized:
                     logger.info("🧹 清理残留的浏览器实例...")
                     self.xhs_client.browser_manager.close_driver()
+                
+                # 关闭浏览器会话池中的常驻浏览器
+                shutdown_driver_pool()
+                
+                # 写完写回队列中的数据并关闭存储连接
+                storage_manager.drain_on_shutdown()
             except Exception as cleanup_error:
                 logger.warning(f"⚠️ 清理资源时出错: {cleanup_error}")
             
@@ -0,0 +1,396 @@
+"""
+发布任务管理模块
+
+发布任务按优先级排队，由固定数量的工作协程执行（数量与浏览器会话池大小一致），
+避免同时启动过多浏览器：
+1. 队列已满时拒绝新任务，并给出预计可重试的时间
+2. 排队中的任务可查询队列位置和预计开始时间
+3. 每个任务有执行超时，超时后取消
+4. 排队中和执行中的任务都可以取消
+5. 已结束的任务保留一段时间后自动清理
+"""
+
+import asyncio
+import itertools
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..core.exceptions import TaskQueueFullError
+from ..xiaohongshu.models import XHSNote
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 任务结束状态
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# 还没有完成过任务时，单个任务的预估耗时（秒）
+DEFAULT_TASK_DURATION = 120.0
+
+
+@dataclass
+class PublishTask:
+    """发布任务数据类"""
+    task_id: str
+    status: str  # "queued", "validating", "preparing", "uploading", "publishing", "completed", "failed", "cancelled"
+    note: XHSNote
+    progress: int  # 0-100
+    message: str
+    result: Dict[str, Any] = None
+    start_time: float = None
+    end_time: float = None
+    priority: int = 0
+    run_start_time: float = None
+    upload_percent: int = None  # 页面上的文件上传进度（0-100）
+    upload_eta_seconds: int = None  # 文件上传预计剩余秒数
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        data = asdict(self)
+        # 移除note对象，避免序列化问题
+        if 'note' in data:
+            data['note_title'] = self.note.title
+            data['note_has_images'] = bool(self.note.images)
+            data['note_has_videos'] = bool(self.note.videos)
+            del data['note']
+        return data
+    
+    @property
+    def is_finished(self) -> bool:
+        """任务是否已结束"""
+        return self.status in FINISHED_STATUSES
+
+
+class TaskManager:
+    """任务管理器（带优先级队列和并发上限的发布执行器）"""
+    
+    def __init__(self, runner: Callable[[str], Awaitable[None]],
+                 max_workers: int = 1,
+                 max_queue_size: int = 20,
+                 task_timeout: float = 600,
+                 retention_seconds: int = 3600):
+        """
+        初始化任务管理器
+        
+        Args:
+            runner: 执行单个任务的协程函数，参数为任务ID
+            max_workers: 同时执行的任务数
+            max_queue_size: 排队任务数上限，超过时拒绝新任务
+            task_timeout: 单个任务的执行超时（秒），0表示不限
+            retention_seconds: 已结束任务的保留时间（秒）
+        """
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max_queue_size
+        self.task_timeout = task_timeout
+        self.retention_seconds = retention_seconds
+        
+        self.tasks: Dict[str, PublishTask] = {}
+        self.running_tasks: Dict[str, asyncio.Task] = {}
+        
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        # 排队中任务的排序键（优先级越高越先执行，同优先级先提交先执行）
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._sequence = itertools.count()
+        # 用户请求取消的执行中任务
+        self._cancel_requested: Set[str] = set()
+        # 已完成任务耗时的滑动平均，用于估算等待时间
+        self._avg_duration = DEFAULT_TASK_DURATION
+    
+    def _ensure_workers(self) -> None:
+        """在当前事件循环中启动工作协程"""
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._workers and self._workers[0].get_loop() is loop:
+            return
+        
+        self._queue = asyncio.PriorityQueue()
+        for task_id, key in sorted(self._pending.items(), key=lambda item: item[1]):
+            self._queue.put_nowait((key, task_id))
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"xhs-publish-worker-{index}")
+            for index in range(self.max_workers)
+        ]
+        logger.info(f"🧵 发布执行器已启动: {self.max_workers} 个并发, 队列上限 {self.max_queue_size}")
+    
+    def create_task(self, note: XHSNote, priority: int = 0) -> str:
+        """
+        创建任务并加入执行队列（需要在事件循环中调用）
+        
+        Args:
+            note: 要发布的笔记
+            priority: 优先级，数值越大越先执行
+        
+        Returns:
+            str: 任务ID
+        
+        Raises:
+            TaskQueueFullError: 排队任务数已达上限
+        """
+        self.remove_old_tasks(self.retention_seconds)
+        
+        if len(self._pending) >= self.max_queue_size:
+            # 队首任务开始执行后队列即有空位
+            retry_after = max(1, int(self._estimate_wait(1)))
+            raise TaskQueueFullError(
+                f"发布队列已满（{len(self._pending)} 个任务排队中），请约 {retry_after} 秒后重试",
+                queued=len(self._pending),
+                retry_after=retry_after
+            )
+        
+        self._ensure_workers()
+        
+        task_id = str(uuid.uuid4())[:8]  # 使用短ID
+        task = PublishTask(
+            task_id=task_id,
+            status="queued",
+            note=note,
+            progress=0,
+            message="任务已创建，正在排队",
+            start_time=time.time(),
+            priority=priority
+        )
+        self.tasks[task_id] = task
+        
+        key = (-priority, next(self._sequence))
+        self._pending[task_id] = key
+        self._queue.put_nowait((key, task_id))
+        
+        queue_info = self.get_queue_info(task_id)
+        logger.info(f"📋 创建新任务: {task_id} - {note.title}（优先级 {priority}，排队第 {queue_info['position']} 位）")
+        return task_id
+    
+    async def _worker(self, index: int) -> None:
+        """工作协程：按优先级取出任务并执行"""
+        while True:
+            _, task_id = await self._queue.get()
+            try:
+                if self._pending.pop(task_id, None) is None:
+                    # 排队期间已被取消或清理
+                    continue
+                await self._run(task_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 发布工作协程 {index} 执行任务 {task_id} 出错: {e}")
+            finally:
+                self._queue.task_done()
+    
+    async def _run(self, task_id: str) -> None:
+        """执行单个任务，处理超时和取消"""
+        task = self.tasks.get(task_id)
+        if task is None:
+            return
+        
+        task.run_start_time = time.time()
+        job = asyncio.create_task(self.runner(task_id))
+        self.running_tasks[task_id] = job
+        try:
+            await asyncio.wait_for(job, timeout=self.task_timeout or None)
+        except asyncio.TimeoutError:
+            self.update_task(
+                task_id,
+                status="failed",
+                message=f"❌ 任务执行超时（{self.task_timeout:.0f}秒），已取消",
+                result={"success": False, "error_type": "timeout", "message": "任务执行超时"}
+            )
+        except asyncio.CancelledError:
+            if task_id not in self._cancel_requested:
+                # 工作协程本身被取消（事件循环关闭）
+                raise
+            self.update_task(task_id, status="cancelled", message="任务已取消")
+        finally:
+            self.running_tasks.pop(task_id, None)
+            self._cancel_requested.discard(task_id)
+        
+        if task.status == "completed":
+            duration = time.time() - task.run_start_time
+            self._avg_duration = self._avg_duration * 0.7 + duration * 0.3
+    
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        取消排队中或执行中的任务
+        
+        Args:
+            task_id: 任务ID
+        
+        Returns:
+            bool: 是否已取消（任务不存在或已结束时返回False）
+        """
+        task = self.tasks.get(task_id)
+        if task is None or task.is_finished:
+            return False
+        
+        if self._pending.pop(task_id, None) is not None:
+            self.update_task(task_id, status="cancelled", message="任务已在排队中取消")
+            return True
+        
+        job = self.running_tasks.get(task_id)
+        if job is not None:
+            self._cancel_requested.add(task_id)
+            job.cancel()
+            return True
+        return False
+    
+    def _estimate_wait(self, position: int) -> float:
+        """估算排在第position位（从1开始）的任务需要等待的秒数"""
+        now = time.time()
+        # 各执行位置空出的时间：空闲位置为0，执行中的任务按平均耗时估算剩余时间
+        running = [
+            max(0.0, self._avg_duration - (now - self.tasks[task_id].run_start_time))
+            for task_id in self.running_tasks
+            if task_id in self.tasks and self.tasks[task_id].run_start_time
+        ]
+        slots = sorted([0.0] * max(0, self.max_workers - len(running)) + running)[:self.max_workers]
+        
+        # 排队的任务依次轮流占用最先空出的位置
+        ahead = max(0, position - 1)
+        return slots[ahead % len(slots)] + (ahead // len(slots)) * self._avg_duration
+    
+    def get_queue_info(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取排队中任务的队列位置和预计开始时间
+        
+        Args:
+            task_id: 任务ID
+        
+        Returns:
+            Optional[Dict[str, Any]]: {position, queued, eta_seconds}，任务不在排队中时返回None
+        """
+        key = self._pending.get(task_id)
+        if key is None:
+            return None
+        position = sum(1 for other in self._pending.values() if other <= key)
+        return {
+            "position": position,
+            "queued": len(self._pending),
+            "eta_seconds": int(self._estimate_wait(position))
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取执行器状态"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "running": len(self.running_tasks),
+            "queued": len(self._pending),
+            "task_timeout": self.task_timeout,
+            "avg_task_seconds": round(self._avg_duration, 1)
+        }
+    
+    def get_task(self, task_id: str) -> PublishTask:
+        """获取任务"""
+        return self.tasks.get(task_id)
+    
+    def update_task(self, task_id: str, status: str = None, progress: int = None, message: str = None, result: Dict = None):
+        """更新任务状态"""
+        if task_id in self.tasks:
+            task = self.tasks[task_id]
+            if task.is_finished:
+                # 已结束（例如已取消）的任务不再更新
+                return
+            if status:
+                task.status = status
+            if progress is not None:
+                task.progress = progress
+            if message:
+                task.message = message
+            if result:
+                task.result = result
+            if status in FINISHED_STATUSES:
+                task.end_time = time.time()
+            logger.info(f"📋 更新任务 {task_id}: {status} ({progress}%) - {message}")
+    
+    def progress_reporter(self, task_id: str, status: str, start: int, end: int) -> Callable[[int, str], None]:
+        """
+        创建阶段进度回调，把阶段内的进度（0-100）映射到任务进度的[start, end]区间
+        
+        Args:
+            task_id: 任务ID
+            status: 阶段对应的任务状态
+            start: 阶段开始时的任务进度
+            end: 阶段结束时的任务进度
+        
+        Returns:
+            Callable[[int, str], None]: 进度回调，参数为(阶段内百分比, 说明)
+        """
+        def report(percent: int, message: str) -> None:
+            percent = max(0, min(100, percent))
+            self.update_task(task_id, status=status, progress=start + (end - start) * percent // 100, message=message)
+        return report
+    
+    def upload_progress_reporter(self, task_id: str, start: int, end: int) -> Callable[[int, Optional[int]], None]:
+        """
+        创建上传进度回调，记录上传百分比和预计剩余时间，并把上传进度映射到任务进度的[start, end]区间
+        
+        上传完成（100%）后任务进入publishing状态
+        
+        Args:
+            task_id: 任务ID
+            start: 开始上传时的任务进度
+            end: 上传完成时的任务进度
+        
+        Returns:
+            Callable[[int, Optional[int]], None]: 上传进度回调，参数为(上传百分比, 预计剩余秒数)
+        """
+        def report(percent: int, eta_seconds: Optional[int]) -> None:
+            task = self.tasks.get(task_id)
+            if task is None or task.is_finished:
+                return
+            task.upload_percent = max(0, min(100, percent))
+            task.upload_eta_seconds = eta_seconds
+            progress = start + (end - start) * task.upload_percent // 100
+            if task.upload_percent >= 100:
+                self.update_task(task_id, status="publishing", progress=progress, message="文件上传完成，正在发布笔记...")
+                return
+            
+            message = f"正在上传文件 {task.upload_percent}%"
+            if eta_seconds is not None:
+                message += f"，预计还需 {eta_seconds} 秒"
+            self.update_task(task_id, status="uploading", progress=progress, message=message)
+        return report
+    
+    def estimate_remaining(self, task_id: str) -> Optional[int]:
+        """
+        估算任务完成还需要的秒数
+        
+        排队中的任务为预计开始时间加平均耗时；执行中的任务按已用时间和当前进度线性估算，
+        还没有进度时按平均耗时估算。
+        
+        Args:
+            task_id: 任务ID
+        
+        Returns:
+            Optional[int]: 预计剩余秒数，任务不存在或已结束时返回None
+        """
+        task = self.tasks.get(task_id)
+        if task is None or task.is_finished:
+            return None
+        
+        queue_info = self.get_queue_info(task_id)
+        if queue_info:
+            return int(queue_info["eta_seconds"] + self._avg_duration)
+        if not task.run_start_time:
+            return None
+        
+        elapsed = time.time() - task.run_start_time
+        if task.progress > 0:
+            return int(elapsed * (100 - task.progress) / task.progress)
+        return int(max(0.0, self._avg_duration - elapsed))
+    
+    def remove_old_tasks(self, max_age_seconds: int = 3600):
+        """移除超过指定时间的旧任务"""
+        current_time = time.time()
+        expired_tasks = []
+        for task_id, task in self.tasks.items():
+            if task.end_time and (current_time - task.end_time) > max_age_seconds:
+                expired_tasks.append(task_id)
+        
+        for task_id in expired_tasks:
+            del self.tasks[task_id]
+            if task_id in self.running_tasks:
+                self.running_tasks[task_id].cancel()
+                del self.running_tasks[task_id]
+            logger.info(f"🗑️ 清理过期任务: {task_id}")
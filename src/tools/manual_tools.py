@@ -16,6 +16,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 from src.core.config import XHSConfig
+from src.data.storage.columnar_cache import read_csv_cached
 from src.core.browser import ChromeDriverManager
 from src.auth.cookie_manager import CookieManager
 # 数据收集函数会在需要时动态导入
@@ -124,6 +125,10 @@ class ManualTools:
         finally:
             if self.browser_manager:
                 self.browser_manager.close_driver()
+            # 等待写回队列中的采集数据写入存储
+            from src.data.storage_manager import get_storage_manager
+            if not get_storage_manager().flush():
+                safe_print("❌ 部分采集数据未能写入存储，详见日志")
     
     def open_browser(self, page: str = "home", stay_open: bool = True) -> bool:
         """
@@ -225,8 +230,9 @@ class ManualTools:
         safe_print(f"📤 导出数据为{format}格式")
         
         try:
-            # 确定数据目录
-            data_dir = Path(self.config.data_path) / "creator_db"
+            # 确定数据目录（与采集写入的存储目录一致）
+            from src.data.storage_manager import get_storage_manager
+            data_dir = get_storage_manager().get_csv_storage().csv_dir
             if not data_dir.exists():
                 safe_print("❌ 未找到数据文件，请先收集数据")
                 return False
@@ -255,7 +261,7 @@ class ManualTools:
                     exported_sheets = []
                     for sheet_name, csv_file in data_files.items():
                         if csv_file.exists():
-                            df = pd.read_csv(csv_file)
+                            df = read_csv_cached(csv_file)
                             df.to_excel(writer, sheet_name=sheet_name, index=False)
                             exported_sheets.append(sheet_name)
                             safe_print(f"  ✅ 导出{sheet_name}数据")
@@ -281,7 +287,7 @@ class ManualTools:
                 exported_files = []
                 for name, csv_file in data_files.items():
                     if csv_file.exists():
-                        df = pd.read_csv(csv_file)
+                        df = read_csv_cached(csv_file)
                         json_file = json_dir / f"{name}.json"
                         df.to_json(json_file, orient='records', force_ascii=False, indent=2)
                         exported_files.append(name)
@@ -304,68 +310,89 @@ class ManualTools:
             logger.exception("导出数据异常")
             return False
     
-    def analyze_trends(self) -> bool:
+    def analyze_trends(self, since: Optional[str] = None, until: Optional[str] = None,
+                       as_json: bool = False) -> bool:
         """
         分析数据趋势
         
+        Args:
+            since: 起始日期（如2025-01-01），为空表示不限
+            until: 结束日期（包含当天），为空表示不限
+            as_json: 是否输出完整的JSON分析结果
+        
         Returns:
             是否成功
         """
-        safe_print("📈 分析数据趋势")
+        if not as_json:
+            safe_print("📈 分析数据趋势")
         
         try:
-            # 读取数据
-            data_dir = Path(self.config.data_path) / "creator_db"
+            from src.data.analytics import TrendAnalyzer
+            from src.data.storage_manager import get_storage_manager
+            
+            result = TrendAnalyzer(get_storage_manager().get_csv_storage()).analyze(since, until)
+            
+            if as_json:
+                safe_print(json.dumps(result, ensure_ascii=False, indent=2))
+                return True
+            
+            if not any(result[key] for key in ('dashboard', 'fans', 'content')):
+                safe_print("❌ 没有找到可分析的数据，请先收集数据")
+                return False
+            
+            def signed(value, suffix=''):
+                if value is None:
+                    return '-'
+                return f"{'+' if value >= 0 else ''}{value:.0f}{suffix}"
             
             # Dashboard数据分析
-            dashboard_file = data_dir / "dashboard_data.csv"
-            if dashboard_file.exists():
-                safe_print("\n📊 Dashboard数据分析:")
-                df = pd.read_csv(dashboard_file)
-                if not df.empty:
-                    latest = df.iloc[-1]
-                    safe_print(f"  最新数据时间: {latest['采集时间']}")
-                    safe_print(f"  时间维度: {latest['时间维度']}")
-                    safe_print(f"  总浏览量: {latest['浏览']}")
-                    safe_print(f"  总点赞量: {latest['点赞']}")
-                    safe_print(f"  互动率: {latest['互动']}")
-                    
-                    # 计算趋势
-                    if len(df) > 1:
-                        prev = df.iloc[-2]
-                        view_change = int(latest['浏览']) - int(prev['浏览'])
-                        like_change = int(latest['点赞']) - int(prev['点赞'])
-                        safe_print(f"  浏览量变化: {'+' if view_change >= 0 else ''}{view_change}")
-                        safe_print(f"  点赞量变化: {'+' if like_change >= 0 else ''}{like_change}")
+            for dimension, trend in result['dashboard'].items():
+                latest = trend['latest']
+                change = trend['day_over_day']
+                rate = latest['engagement_rate']
+                safe_print(f"\n📊 Dashboard数据分析 ({dimension}):")
+                safe_print(f"  数据区间: {trend['first_date']} ~ {trend['latest_date']} ({trend['days']}天)")
+                safe_print(f"  浏览量: {latest['views']:.0f} (日环比 {signed(change['views'])})")
+                safe_print(f"  点赞量: {latest['likes']:.0f} (日环比 {signed(change['likes'])})")
+                safe_print(f"  互动量: {latest['interactions']:.0f} (日环比 {signed(change['interactions'])})")
+                safe_print(f"  互动率: {rate * 100:.2f}%" if rate is not None else "  互动率: -")
+                for window in (7, 30):
+                    safe_print(f"  近{window}天平均浏览量: {trend[f'rolling_{window}d_mean']['views']:.0f}")
             
             # 粉丝数据分析
-            fans_file = data_dir / "fans_data.csv"
-            if fans_file.exists():
-                safe_print("\n👥 粉丝数据分析:")
-                df = pd.read_csv(fans_file)
-                if not df.empty:
-                    latest = df.iloc[-1]
-                    safe_print(f"  总粉丝数: {latest['总粉丝数']}")
-                    safe_print(f"  新增粉丝: {latest['新增粉丝']}")
-                    safe_print(f"  流失粉丝: {latest['流失粉丝']}")
-                    safe_print(f"  净增长: {int(latest['新增粉丝']) - int(latest['流失粉丝'])}")
+            for dimension, trend in result['fans'].items():
+                latest = trend['latest']
+                safe_print(f"\n👥 粉丝数据分析 ({dimension}):")
+                safe_print(f"  总粉丝数: {latest['total_fans']:.0f} (日环比 {signed(trend['day_over_day']['total_fans'])})")
+                safe_print(f"  新增粉丝: {latest['new_fans']:.0f}")
+                safe_print(f"  流失粉丝: {latest['lost_fans']:.0f}")
+                safe_print(f"  净增长: {signed(latest['net_fans'])}")
+                safe_print(f"  近7天粉丝增长: {signed(trend['total_fans_growth_7d'])}")
+                safe_print(f"  近30天粉丝增长: {signed(trend['total_fans_growth_30d'])}")
             
             # 内容数据分析
-            content_file = data_dir / "content_analysis_data.csv"
-            if content_file.exists():
+            content = result['content']
+            if content:
+                views = content['percentiles']['views']
+                rate = content['engagement_rate']
                 safe_print("\n📝 内容数据分析:")
-                df = pd.read_csv(content_file)
-                if not df.empty:
-                    safe_print(f"  总笔记数: {len(df)}")
-                    safe_print(f"  平均浏览量: {df['浏览'].astype(int).mean():.0f}")
-                    safe_print(f"  平均点赞量: {df['点赞'].astype(int).mean():.0f}")
-                    
-                    # 找出表现最好的笔记
-                    best_note = df.loc[df['浏览'].astype(int).idxmax()]
-                    safe_print(f"\n  🏆 表现最佳笔记:")
-                    safe_print(f"    标题: {best_note['标题']}")
-                    safe_print(f"    浏览: {best_note['浏览']}")
-                    safe_print(f"    点赞: {best_note['点赞']}")
+                safe_print(f"  总笔记数: {content['notes']} (共 {content['note_days']} 条笔记日数据)")
+                safe_print(f"  总浏览量: {content['totals']['views']:.0f}")
+                safe_print(f"  整体互动率: {rate * 100:.2f}%" if rate is not None else "  整体互动率: -")
+                safe_print(f"  浏览量分位数: P50={views['p50']:.0f} P90={views['p90']:.0f} P99={views['p99']:.0f}")
+                growth = content['daily_growth']
+                if growth:
+                    safe_print(f"  近7天笔记浏览增长: {signed(growth['rolling_7d_sum']['views'])}")
+                    safe_print(f"  近30天笔记浏览增长: {signed(growth['rolling_30d_sum']['views'])}")
+                
+                for label, key in (("🏆 浏览量最高", 'top_by_views'), ("💬 互动率最高", 'top_by_engagement'),
+                                   ("🚀 增长最快", 'top_by_growth')):
+                    if content[key]:
+                        safe_print(f"\n  {label}的笔记:")
+                        for note in content[key][:3]:
+                            note_rate = note['engagement_rate']
+                            rate_text = f"{note_rate * 100:.2f}%" if note_rate is not None else '-'
+                            safe_print(f"    • {note['title']} | 浏览 {note['views']} | 互动率 {rate_text}")
             
             return True
             
@@ -0,0 +1,289 @@
+"""
+网络图片缓存
+
+重试发布、重复发布或用同一组图片发布多篇笔记时，同样的网络图片会被反复下载。
+本模块把下载过的图片按内容寻址保存：
+1. 文件：以图片内容的SHA-256命名（如 <sha256>.jpg），内容相同的图片只保存一份
+2. 索引：URL → SHA-256、ETag、Last-Modified、最近访问时间
+
+命中缓存时：
+- 在新鲜期内（IMAGE_CACHE_FRESH_SECONDS）直接使用缓存文件，不访问网络
+- 超过新鲜期后携带 If-None-Match / If-Modified-Since 重新验证，服务器返回304时继续使用缓存文件
+
+缓存总大小超过预算（IMAGE_CACHE_MAX_MB）时按最近访问时间淘汰最久未使用的文件。
+索引保存在缓存目录下的 index.json，先写临时文件再原子替换。
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+
+# 默认缓存目录（与下载临时目录分开，不受cleanup_old_files清理）
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "xhs_images" / "cache"
+
+
+class ImageCache:
+    """内容寻址的网络图片缓存（按字节预算LRU淘汰）"""
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = 500 * 1024 * 1024,
+                 fresh_seconds: float = 3600):
+        """
+        初始化图片缓存
+        
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存文件总大小上限（字节）
+            fresh_seconds: 新鲜期（秒），期内命中不重新验证
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._stat_key = None
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evicted': 0}
+    
+    def _current_stat_key(self):
+        """获取索引文件的(大小, 修改时间)"""
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _reload(self) -> None:
+        """索引文件被其他进程更新后重新加载"""
+        key = self._current_stat_key()
+        if key is None or key == self._stat_key:
+            return
+        
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = data.get('entries', {}) if data.get('version') == INDEX_VERSION else {}
+            self._stat_key = key
+        except Exception as e:
+            logger.warning(f"⚠️ 读取图片缓存索引失败: {e}")
+    
+    def _save(self) -> None:
+        """保存索引（先写临时文件再原子替换）"""
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'entries': self._entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+            self._stat_key = self._current_stat_key()
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查找URL对应的缓存条目
+        
+        Args:
+            url: 图片URL
+        
+        Returns:
+            Optional[Dict[str, Any]]: 缓存条目（含path字段）；未缓存或缓存文件已被删除时返回None
+        """
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(url)
+        
+        if not entry:
+            return None
+        path = self.cache_dir / entry['file']
+        if not path.exists():
+            return None
+        return dict(entry, path=str(path))
+    
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """缓存条目是否在新鲜期内（无需重新验证）"""
+        return time.time() - entry.get('validated_at', 0) < self.fresh_seconds
+    
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        生成重新验证用的条件请求头
+        
+        Args:
+            entry: 缓存条目
+        
+        Returns:
+            Dict[str, str]: If-None-Match / If-Modified-Since 请求头
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def new_part_path(self) -> Path:
+        """下载中的临时文件路径（与缓存文件同目录，便于原子改名）"""
+        return self.cache_dir / f"{uuid.uuid4().hex}.part"
+    
+    def hit(self, url: str, revalidated: bool = False) -> Optional[str]:
+        """
+        记录一次缓存命中
+        
+        Args:
+            url: 图片URL
+            revalidated: 是否经服务器重新验证（304）
+        
+        Returns:
+            Optional[str]: 缓存文件路径；条目已失效时返回None
+        """
+        now = time.time()
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(url)
+            if not entry or not (self.cache_dir / entry['file']).exists():
+                return None
+            
+            entry['last_access'] = now
+            if revalidated:
+                entry['validated_at'] = now
+                self._stats['revalidated'] += 1
+            self._stats['hits'] += 1
+            self._save()
+            return str(self.cache_dir / entry['file'])
+    
+    def store(self, url: str, part_path: Path, sha256: str, ext: str,
+              headers: Optional[Mapping[str, str]] = None) -> str:
+        """
+        把下载完成的临时文件存入缓存
+        
+        Args:
+            url: 图片URL
+            part_path: 下载完成的临时文件（由new_part_path生成）
+            sha256: 图片内容的SHA-256
+            ext: 文件扩展名
+            headers: 响应头（用于保存ETag、Last-Modified）
+        
+        Returns:
+            str: 缓存文件路径
+        """
+        headers = headers or {}
+        filename = f"{sha256}{ext}"
+        path = self.cache_dir / filename
+        now = time.time()
+        
+        with self._lock:
+            self._reload()
+            if path.exists():
+                # 内容相同的图片已缓存（可能来自其他URL），丢弃本次下载
+                Path(part_path).unlink()
+            else:
+                os.replace(part_path, path)
+            
+            self._entries[url] = {
+                'file': filename,
+                'size': path.stat().st_size,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'validated_at': now,
+                'last_access': now
+            }
+            self._stats['misses'] += 1
+            self._evict(keep=filename)
+            self._save()
+        return str(path)
+    
+    def _evict(self, keep: str) -> None:
+        """
+        缓存总大小超过预算时淘汰最久未访问的文件（调用方持有锁）
+        
+        Args:
+            keep: 不淘汰的文件（本次刚存入的文件）
+        """
+        files: Dict[str, Dict[str, float]] = {}
+        for entry in self._entries.values():
+            info = files.setdefault(entry['file'], {'size': entry.get('size', 0), 'last_access': 0})
+            info['last_access'] = max(info['last_access'], entry.get('last_access', 0))
+        
+        total = sum(info['size'] for info in files.values())
+        if total <= self.max_bytes:
+            return
+        
+        for filename, info in sorted(files.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if filename == keep:
+                continue
+            try:
+                (self.cache_dir / filename).unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"⚠️ 淘汰缓存图片失败: {filename}, 错误: {e}")
+                continue
+            
+            total -= info['size']
+            self._entries = {url: entry for url, entry in self._entries.items() if entry['file'] != filename}
+            self._stats['evicted'] += 1
+            logger.debug(f"🧹 淘汰缓存图片: {filename}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计（命中、重新验证、未命中、淘汰次数为本进程内的计数）
+        
+        Returns:
+            Dict[str, Any]: 缓存统计信息
+        """
+        with self._lock:
+            self._reload()
+            files = {entry['file']: entry.get('size', 0) for entry in self._entries.values()}
+            stats = dict(self._stats)
+        
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'entries': len(self._entries),
+            'files': len(files),
+            'total_bytes': sum(files.values()),
+            'max_bytes': self.max_bytes,
+            'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0
+        })
+        return stats
+
+
+_image_cache: Optional[ImageCache] = None
+_image_cache_lock = threading.Lock()
+
+
+def is_cache_enabled() -> bool:
+    """是否启用网络图片缓存"""
+    return os.getenv('IMAGE_CACHE_ENABLED', 'true').lower() == 'true'
+
+
+def get_image_cache() -> ImageCache:
+    """
+    获取全局图片缓存实例
+    
+    Returns:
+        ImageCache: 图片缓存实例
+    """
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = ImageCache(
+                cache_dir=Path(os.getenv('IMAGE_CACHE_DIR') or DEFAULT_CACHE_DIR),
+                max_bytes=int(float(os.getenv('IMAGE_CACHE_MAX_MB', '500')) * 1024 * 1024),
+                fresh_seconds=float(os.getenv('IMAGE_CACHE_FRESH_SECONDS', '3600'))
+            )
+        return _image_cache
@@ -0,0 +1,224 @@
+"""
+图片预处理
+
+手机原图和PNG截图动辄数MB，直接交给浏览器上传时上传和页面处理都很慢。
+本模块在上传前统一处理图片：
+1. 按EXIF方向旋转图片
+2. 缩放到平台可用的最大分辨率（最长边 IMAGE_OPTIMIZE_MAX_SIDE）
+3. 去除EXIF等元数据
+4. 按指定质量重新编码为JPEG或WebP
+
+同一篇笔记的多张图片在进程池中并行处理（进程池在首次使用时创建，各次发布共用，进程退出时关闭）。处理结果写入图片临时目录，
+文件名由源文件和处理参数决定，重复发布同一组图片时直接复用。
+需要安装Pillow（pip install Pillow），未安装时跳过预处理。
+"""
+
+import os
+import atexit
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - 可选依赖
+    Image = None
+    ImageOps = None
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 输出格式对应的Pillow格式名和扩展名
+OUTPUT_FORMATS = {
+    'jpeg': ('JPEG', '.jpg'),
+    'webp': ('WEBP', '.webp')
+}
+
+# 各次发布共用的预处理进程池
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_exit_hook_registered = False
+
+
+@dataclass(frozen=True)
+class OptimizeOptions:
+    """图片预处理参数"""
+    max_side: int = 2560
+    quality: int = 85
+    output_format: str = 'jpeg'
+    
+    @classmethod
+    def from_env(cls) -> "OptimizeOptions":
+        """从环境变量读取预处理参数"""
+        output_format = os.getenv('IMAGE_OPTIMIZE_FORMAT', 'jpeg').lower()
+        if output_format not in OUTPUT_FORMATS:
+            logger.warning(f"⚠️ 不支持的图片输出格式: {output_format}，使用jpeg")
+            output_format = 'jpeg'
+        return cls(
+            max_side=int(os.getenv('IMAGE_OPTIMIZE_MAX_SIDE', '2560')),
+            quality=int(os.getenv('IMAGE_OPTIMIZE_QUALITY', '85')),
+            output_format=output_format
+        )
+
+
+def is_optimize_enabled() -> bool:
+    """是否启用图片预处理"""
+    return os.getenv('IMAGE_OPTIMIZE', 'false').lower() == 'true'
+
+
+def is_optimize_available() -> bool:
+    """是否已安装Pillow"""
+    return Image is not None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """获取共用的进程池（首次调用时创建，进程数由IMAGE_OPTIMIZE_WORKERS指定，默认为CPU核数）"""
+    global _pool, _exit_hook_registered
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv('IMAGE_OPTIMIZE_WORKERS', '0')) or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            if not _exit_hook_registered:
+                atexit.register(shutdown_pool)
+                _exit_hook_registered = True
+        return _pool
+
+
+def shutdown_pool(wait: bool = True) -> None:
+    """
+    关闭预处理进程池（进程退出时自动调用，不要在事件循环线程中等待）
+    
+    Args:
+        wait: 是否等待正在处理的图片完成
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """工作进程异常退出后进程池不可再用，丢弃后下次使用时重新创建（不等待，不阻塞事件循环）"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _output_path(src: str, output_dir: str, options: OptimizeOptions) -> Path:
+    """由源文件（路径、大小、修改时间）和处理参数确定输出路径"""
+    stat = os.stat(src)
+    key = f"{os.path.abspath(src)}|{stat.st_size}|{stat.st_mtime_ns}|{options}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return Path(output_dir) / f"optimized_{digest}{OUTPUT_FORMATS[options.output_format][1]}"
+
+
+def optimize_image(src: str, output_dir: str, options: OptimizeOptions) -> str:
+    """
+    预处理单张图片（在进程池中执行）
+    
+    Args:
+        src: 源图片路径
+        output_dir: 输出目录
+        options: 预处理参数
+    
+    Returns:
+        str: 处理后的图片路径；动图原样返回源路径
+    """
+    output_path = _output_path(src, output_dir, options)
+    if output_path.exists():
+        return str(output_path)
+    
+    pil_format, _ = OUTPUT_FORMATS[options.output_format]
+    with Image.open(src) as img:
+        # 动图重新编码会丢帧，原样上传
+        if getattr(img, 'is_animated', False):
+            return src
+        
+        img = ImageOps.exif_transpose(img)
+        if max(img.size) > options.max_side:
+            img.thumbnail((options.max_side, options.max_side), Image.LANCZOS)
+        
+        if pil_format == 'JPEG' and img.mode in ('RGBA', 'LA', 'P'):
+            # JPEG不支持透明通道，铺白色背景
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB')
+        
+        # 不传exif参数，保存时即去除EXIF（含GPS位置等）元数据
+        part_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.part")
+        try:
+            if pil_format == 'JPEG':
+                img.save(part_path, pil_format, quality=options.quality, optimize=True, progressive=True)
+            else:
+                img.save(part_path, pil_format, quality=options.quality, method=4)
+            os.replace(part_path, output_path)
+        finally:
+            if part_path.exists():
+                part_path.unlink()
+    
+    return str(output_path)
+
+
+async def optimize_images(paths: List[str], output_dir: Path, options: OptimizeOptions = None,
+                          max_workers: int = None) -> List[str]:
+    """
+    并行预处理一组图片
+    
+    Args:
+        paths: 图片路径列表
+        output_dir: 输出目录
+        options: 预处理参数，默认从环境变量读取
+        max_workers: 同时处理的图片数，默认不限（受进程池大小限制）
+    
+    Returns:
+        List[str]: 处理后的图片路径列表（与输入顺序一致，处理失败的图片保留原路径）
+    """
+    if not paths:
+        return []
+    if not is_optimize_available():
+        logger.warning("⚠️ 图片预处理需要安装Pillow: pip install Pillow，本次跳过预处理")
+        return list(paths)
+    
+    options = options or OptimizeOptions.from_env()
+    loop = asyncio.get_running_loop()
+    
+    if len(paths) == 1:
+        # 单张图片不值得启动进程池
+        futures = [loop.run_in_executor(None, optimize_image, paths[0], str(output_dir), options)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+    else:
+        executor = _get_pool()
+        semaphore = asyncio.Semaphore(max_workers or len(paths))
+        
+        async def run(path: str) -> str:
+            async with semaphore:
+                return await loop.run_in_executor(executor, optimize_image, path, str(output_dir), options)
+        
+        results = await asyncio.gather(*(run(path) for path in paths), return_exceptions=True)
+        if any(isinstance(result, BrokenProcessPool) for result in results):
+            _discard_pool(executor)
+    
+    optimized = []
+    for path, result in zip(paths, results):
+        if isinstance(result, Exception):
+            logger.warning(f"⚠️ 图片预处理失败，使用原图: {path}, 错误: {result}")
+            optimized.append(path)
+            continue
+        
+        if result != path:
+            before, after = os.path.getsize(path), os.path.getsize(result)
+            logger.info(f"🗜️ 图片预处理: {Path(path).name} {before // 1024}KB -> {after // 1024}KB")
+        optimized.append(result)
+    return optimized
@@ -8,27 +8,103 @@
 
 import os
 import asyncio
+import hashlib
+import shutil
+import weakref
 import aiohttp
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Union, Optional
+from typing import AsyncIterator, List, Union, Optional
 import uuid
 
 from .logger import get_logger
+from .image_cache import ImageCache, get_image_cache, is_cache_enabled
+from .image_optimizer import optimize_images, is_optimize_enabled
 
 logger = get_logger(__name__)
 
+# 同时下载的图片数量
+DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "4"))
+
+# 单张图片下载超时（秒）
+DOWNLOAD_TIMEOUT = 30
+
+# 流式写盘的分块大小（字节）
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 每个事件循环共享一个HTTP会话（连接池 + keep-alive，同一主机的下载复用TLS连接）
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+# 每个事件循环中正在使用共享会话的处理批次数，最后一个批次结束时关闭会话
+_session_users: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = weakref.WeakKeyDictionary()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    获取当前事件循环共享的HTTP会话（必须在事件循环中调用）
+    
+    Returns:
+        aiohttp.ClientSession: 带连接池的会话
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=DOWNLOAD_CONCURRENCY * 2,
+            limit_per_host=DOWNLOAD_CONCURRENCY,
+            keepalive_timeout=30,
+            ttl_dns_cache=300
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_http_session() -> None:
+    """关闭当前事件循环共享的HTTP会话"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+@asynccontextmanager
+async def http_session_scope() -> AsyncIterator[None]:
+    """
+    在一批下载期间保持共享的HTTP会话，最后一个并发的批次结束时关闭会话
+    
+    同一时间处理多篇笔记的图片时共用连接池，全部处理完后释放连接，不会遗留未关闭的会话
+    """
+    loop = asyncio.get_running_loop()
+    _session_users[loop] = _session_users.get(loop, 0) + 1
+    try:
+        yield
+    finally:
+        _session_users[loop] -= 1
+        if _session_users[loop] == 0:
+            del _session_users[loop]
+            await close_http_session()
+
 
 class ImageProcessor:
     """图片处理器，支持本地路径和URL下载"""
     
-    def __init__(self, temp_dir: str = None):
+    def __init__(self, temp_dir: str = None, max_concurrency: int = DOWNLOAD_CONCURRENCY,
+                 optimize: Optional[bool] = None):
         """
         初始化图片处理器
         
         Args:
             temp_dir: 临时文件目录路径
+            max_concurrency: 同时下载的图片数量
+            optimize: 是否在上传前预处理图片（缩放、去除EXIF、重新编码），默认从环境变量IMAGE_OPTIMIZE读取
         """
+        self.max_concurrency = max(1, max_concurrency)
+        self.optimize = is_optimize_enabled() if optimize is None else optimize
+        
         # 设置临时目录
         if temp_dir:
             self.temp_dir = Path(temp_dir)
@@ -60,17 +136,27 @@ class ImageProcessor:
         # 统一转换为列表格式
         images_list = self._normalize_to_list(images_input)
         
-        # 处理每个图片
-        local_paths = []
-        for idx, img in enumerate(images_list):
-            try:
-                local_path = await self._process_single_image(img, idx)
-                if local_path:
-                    local_paths.append(local_path)
-                    logger.info(f"✅ 处理图片成功 [{idx+1}/{len(images_list)}]: {local_path}")
-            except Exception as e:
-                logger.error(f"❌ 处理图片失败 [{idx+1}/{len(images_list)}]: {e}")
-                continue
+        # 并发处理所有图片（网络图片同时下载，数量受信号量限制），结果保持输入顺序
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def process(idx: int, img: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    local_path = await self._process_single_image(img, idx)
+                    if local_path:
+                        logger.info(f"✅ 处理图片成功 [{idx+1}/{len(images_list)}]: {local_path}")
+                    return local_path
+                except Exception as e:
+                    logger.error(f"❌ 处理图片失败 [{idx+1}/{len(images_list)}]: {e}")
+                    return None
+        
+        async with http_session_scope():
+            results = await asyncio.gather(*(process(idx, img) for idx, img in enumerate(images_list)))
+        local_paths = [path for path in results if path]
+        
+        # 预处理图片（进程池并行），减小上传体积
+        if self.optimize and local_paths:
+            local_paths = await optimize_images(local_paths, self.temp_dir)
         
         logger.info(f"📸 图片处理完成，共处理 {len(local_paths)}/{len(images_list)} 张")
         return local_paths
@@ -128,39 +214,103 @@ class ImageProcessor:
         Returns:
             Optional[str]: 本地文件路径，失败返回None
         """
+        cache = get_image_cache() if is_cache_enabled() else None
+        entry = cache.lookup(url) if cache else None
+        if entry and cache.is_fresh(entry):
+            local_path = self._checkout(cache.hit(url), index)
+            if local_path:
+                logger.info(f"💾 使用缓存图片: {url} -> {local_path}")
+                return local_path
+            entry = None
+        
         try:
             logger.info(f"⬇️ 开始下载图片: {url}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status != 200:
-                        logger.error(f"❌ 下载图片失败: {url}, 状态码: {response.status}")
-                        return None
-                    
-                    # 获取文件扩展名
-                    content_type = response.headers.get('content-type', '')
-                    ext = self._get_extension_from_content_type(content_type)
-                    if not ext:
-                        # 从URL中尝试获取扩展名
-                        url_path = Path(url.split('?')[0])
-                        ext = url_path.suffix or '.jpg'
-                    
-                    # 生成唯一文件名
-                    filename = f"download_{index}_{uuid.uuid4().hex[:8]}{ext}"
-                    filepath = self.temp_dir / filename
-                    
-                    # 保存文件
-                    content = await response.read()
-                    filepath.write_bytes(content)
-                    
-                    logger.info(f"✅ 下载图片成功: {url} -> {filepath}")
-                    return str(filepath)
-                    
+            session = get_http_session()
+            headers = ImageCache.conditional_headers(entry) if entry else None
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry:
+                    local_path = self._checkout(cache.hit(url, revalidated=True), index)
+                    if local_path:
+                        logger.info(f"💾 缓存图片未变化: {url} -> {local_path}")
+                        return local_path
+                    # 重新验证期间缓存文件被淘汰，不带条件头重新下载
+                    return await self._download_from_url(url, index)
+                
+                if response.status != 200:
+                    logger.error(f"❌ 下载图片失败: {url}, 状态码: {response.status}")
+                    return None
+                
+                # 获取文件扩展名
+                content_type = response.headers.get('content-type', '')
+                ext = self._get_extension_from_content_type(content_type)
+                if not ext:
+                    # 从URL中尝试获取扩展名
+                    url_path = Path(url.split('?')[0])
+                    ext = url_path.suffix or '.jpg'
+                
+                # 生成唯一文件名
+                filename = f"download_{index}_{uuid.uuid4().hex[:8]}{ext}"
+                filepath = self.temp_dir / filename
+                
+                # 分块写入临时文件，完成后再改名，避免整张图片读入内存和留下不完整的文件
+                part_path = cache.new_part_path() if cache else filepath.with_name(filepath.name + '.part')
+                digest = hashlib.sha256()
+                try:
+                    with open(part_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            digest.update(chunk)
+                    if cache:
+                        # 存入缓存（按内容SHA-256命名），上传使用临时目录中的链接
+                        cached_path = cache.store(url, part_path, digest.hexdigest(), ext, response.headers)
+                        filepath = self._checkout(cached_path, index)
+                        if not filepath:
+                            raise FileNotFoundError(f"缓存图片已被淘汰: {cached_path}")
+                    else:
+                        os.replace(part_path, filepath)
+                finally:
+                    if part_path.exists():
+                        part_path.unlink()
+                
+                logger.info(f"✅ 下载图片成功: {url} -> {filepath}")
+                return str(filepath)
+        
         except asyncio.TimeoutError:
             raise Exception(f"下载图片超时: {url}")
         except Exception as e:
             raise Exception(f"下载图片失败: {url}, 错误: {str(e)}")
     
+    def _checkout(self, cached_path: Optional[str], index: int) -> Optional[str]:
+        """
+        把缓存文件硬链接（跨文件系统时复制）到临时目录
+        
+        缓存文件可能在上传前被其他下载触发的淘汰删除，上传使用临时目录中的文件
+        
+        Args:
+            cached_path: 缓存文件路径
+            index: 图片索引
+            
+        Returns:
+            Optional[str]: 临时目录中的文件路径，缓存文件已不存在时返回None
+        """
+        if not cached_path:
+            return None
+        
+        source = Path(cached_path)
+        target = self.temp_dir / f"download_{index}_{uuid.uuid4().hex[:8]}{source.suffix}"
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            # 不支持硬链接（如跨文件系统）时复制
+            try:
+                shutil.copyfile(source, target)
+            except FileNotFoundError:
+                return None
+        return str(target)
+    
     def _get_extension_from_content_type(self, content_type: str) -> str:
         """根据content-type获取文件扩展名"""
         mapping = {
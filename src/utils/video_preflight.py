@@ -0,0 +1,342 @@
+"""
+视频上传前预检
+
+视频上传后平台需要转码，发布流程要等待 VIDEO_PROCESSING_TIME 才能继续；
+码率过高或编码不兼容的视频上传慢、平台处理也慢。本模块在上传前用ffprobe探测视频：
+1. 已是 MP4/MOV + H.264(yuv420p) + AAC 且码率、分辨率不超标：原样上传
+2. 编码兼容但容器不是MP4（如MKV、FLV）：只重新封装为MP4（不重新编码，很快）
+3. 其他情况：转码为 H.264 High/yuv420p + AAC 的MP4，码率不超过目标码率
+
+转码在独立的ffmpeg进程中执行，通过回调报告进度。处理结果写入视频临时目录，
+文件名由源文件和处理参数决定，重复发布同一视频时直接复用。
+每次生成新的处理结果前清理过期（VIDEO_PREFLIGHT_MAX_AGE_HOURS）的结果，
+并在总大小超过上限（VIDEO_PREFLIGHT_MAX_MB）时删除最久未使用的结果。
+需要安装ffmpeg（含ffprobe），未安装时跳过预检。
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 预检处理结果目录
+DEFAULT_OUTPUT_DIR = Path(tempfile.gettempdir()) / "xhs_videos"
+
+# 无需处理即可上传的容器、视频编码、像素格式、音频编码
+COMPATIBLE_CONTAINERS = {'.mp4', '.mov', '.m4v'}
+COMPATIBLE_VIDEO_CODECS = {'h264'}
+COMPATIBLE_PIXEL_FORMATS = {'yuv420p', 'yuvj420p'}
+COMPATIBLE_AUDIO_CODECS = {'aac'}
+
+# 码率超过目标码率的倍数时才转码（避免为少量超标重新编码）
+BITRATE_TOLERANCE = 1.25
+
+# 进度回调的最小间隔（百分比）
+PROGRESS_STEP = 5
+
+# 预检方案
+PLAN_NONE = "none"
+PLAN_REMUX = "remux"
+PLAN_TRANSCODE = "transcode"
+
+
+@dataclass
+class VideoProbe:
+    """ffprobe探测结果"""
+    duration: float = 0.0
+    bit_rate: int = 0
+    video_codec: str = ""
+    pix_fmt: str = ""
+    width: int = 0
+    height: int = 0
+    audio_codec: str = ""
+    
+    @classmethod
+    def from_ffprobe(cls, data: dict) -> "VideoProbe":
+        """由ffprobe的JSON输出创建"""
+        fmt = data.get('format', {})
+        probe = cls(
+            duration=float(fmt.get('duration') or 0),
+            bit_rate=int(fmt.get('bit_rate') or 0)
+        )
+        for stream in data.get('streams', []):
+            if stream.get('codec_type') == 'video' and not probe.video_codec:
+                probe.video_codec = stream.get('codec_name', '')
+                probe.pix_fmt = stream.get('pix_fmt', '')
+                probe.width = int(stream.get('width') or 0)
+                probe.height = int(stream.get('height') or 0)
+            elif stream.get('codec_type') == 'audio' and not probe.audio_codec:
+                probe.audio_codec = stream.get('codec_name', '')
+        return probe
+
+
+@dataclass(frozen=True)
+class PreflightOptions:
+    """视频预检参数"""
+    target_bitrate_kbps: int = 8000
+    max_side: int = 1920
+    audio_bitrate_kbps: int = 128
+    
+    @classmethod
+    def from_env(cls) -> "PreflightOptions":
+        """从环境变量读取预检参数"""
+        return cls(
+            target_bitrate_kbps=int(os.getenv('VIDEO_TARGET_BITRATE_KBPS', '8000')),
+            max_side=int(os.getenv('VIDEO_MAX_SIDE', '1920'))
+        )
+
+
+def cleanup_old_outputs(output_dir: Path = None, max_age_hours: float = None,
+                        max_bytes: int = None) -> int:
+    """
+    清理预检处理结果：删除超过保留时间的文件，总大小超过上限时再按最近使用时间删除最旧的文件
+    
+    Args:
+        output_dir: 处理结果目录，默认为系统临时目录下的 xhs_videos
+        max_age_hours: 最长保留时间（小时），默认从环境变量VIDEO_PREFLIGHT_MAX_AGE_HOURS读取
+        max_bytes: 总大小上限（字节），默认从环境变量VIDEO_PREFLIGHT_MAX_MB读取
+    
+    Returns:
+        int: 删除的文件数
+    """
+    output_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
+    if max_age_hours is None:
+        max_age_hours = float(os.getenv('VIDEO_PREFLIGHT_MAX_AGE_HOURS', '24'))
+    if max_bytes is None:
+        max_bytes = int(float(os.getenv('VIDEO_PREFLIGHT_MAX_MB', '2048')) * 1024 * 1024)
+    
+    try:
+        files = [(path, path.stat()) for path in output_dir.glob('preflight_*') if path.is_file()]
+    except FileNotFoundError:
+        return 0
+    
+    now = time.time()
+    total = sum(stat.st_size for _, stat in files)
+    removed = 0
+    # 按最近使用时间从旧到新处理（复用结果时会更新修改时间）
+    for path, stat in sorted(files, key=lambda item: item[1].st_mtime):
+        expired = (now - stat.st_mtime) / 3600 > max_age_hours
+        # 处理中的临时文件（.part）只在过期（进程异常退出后遗留）时删除
+        if not expired and (total <= max_bytes or '.part.' in path.name):
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ 清理视频预检结果失败: {path}, 错误: {e}")
+            continue
+        total -= stat.st_size
+        removed += 1
+    
+    if removed:
+        logger.info(f"🧹 清理了 {removed} 个视频预检结果")
+    return removed
+
+
+def is_preflight_enabled() -> bool:
+    """是否启用视频预检"""
+    return os.getenv('VIDEO_PREFLIGHT', 'false').lower() == 'true'
+
+
+def is_preflight_available() -> bool:
+    """是否已安装ffmpeg和ffprobe"""
+    return bool(shutil.which('ffprobe') and shutil.which('ffmpeg'))
+
+
+async def probe_video(path: str) -> VideoProbe:
+    """
+    探测视频的编码、码率和时长
+    
+    Args:
+        path: 视频文件路径
+    
+    Returns:
+        VideoProbe: 探测结果
+    
+    Raises:
+        RuntimeError: ffprobe执行失败（文件损坏或不是视频文件）
+    """
+    process = await asyncio.create_subprocess_exec(
+        'ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe探测失败: {stderr.decode('utf-8', 'ignore').strip()}")
+    return VideoProbe.from_ffprobe(json.loads(stdout or b'{}'))
+
+
+def plan_preflight(path: str, probe: VideoProbe, options: PreflightOptions) -> str:
+    """
+    根据探测结果决定预检方案
+    
+    Args:
+        path: 视频文件路径
+        probe: 探测结果
+        options: 预检参数
+    
+    Returns:
+        str: PLAN_NONE（原样上传）、PLAN_REMUX（重新封装）或 PLAN_TRANSCODE（转码）
+    """
+    codecs_ok = (
+        probe.video_codec in COMPATIBLE_VIDEO_CODECS
+        and probe.pix_fmt in COMPATIBLE_PIXEL_FORMATS
+        and (not probe.audio_codec or probe.audio_codec in COMPATIBLE_AUDIO_CODECS)
+    )
+    size_ok = max(probe.width, probe.height) <= options.max_side
+    bitrate_ok = not probe.bit_rate or probe.bit_rate <= options.target_bitrate_kbps * 1000 * BITRATE_TOLERANCE
+    
+    if not (codecs_ok and size_ok and bitrate_ok):
+        return PLAN_TRANSCODE
+    if Path(path).suffix.lower() not in COMPATIBLE_CONTAINERS:
+        return PLAN_REMUX
+    return PLAN_NONE
+
+
+def _output_path(src: str, output_dir: Path, plan: str, options: PreflightOptions) -> Path:
+    """由源文件（路径、大小、修改时间）和处理参数确定输出路径"""
+    stat = os.stat(src)
+    key = f"{os.path.abspath(src)}|{stat.st_size}|{stat.st_mtime_ns}|{plan}|{options}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return output_dir / f"preflight_{digest}.mp4"
+
+
+def _ffmpeg_args(src: str, dst: str, plan: str, probe: VideoProbe, options: PreflightOptions) -> list:
+    """生成ffmpeg命令行参数"""
+    args = ['ffmpeg', '-y', '-v', 'error', '-nostats', '-progress', 'pipe:1', '-i', src]
+    if plan == PLAN_REMUX:
+        args += ['-map', '0:v:0', '-map', '0:a:0?', '-c', 'copy']
+    else:
+        bitrate = options.target_bitrate_kbps
+        if probe.bit_rate:
+            # 原视频码率低于目标码率时不提高码率
+            bitrate = min(bitrate, max(500, probe.bit_rate // 1000))
+        args += [
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'high', '-pix_fmt', 'yuv420p',
+            '-b:v', f'{bitrate}k', '-maxrate', f'{bitrate}k', '-bufsize', f'{bitrate * 2}k',
+            '-c:a', 'aac', '-b:a', f'{options.audio_bitrate_kbps}k'
+        ]
+        if max(probe.width, probe.height) > options.max_side:
+            # 按最长边等比缩放，宽高取偶数
+            side = options.max_side
+            args += ['-vf', f"scale='if(gt(iw,ih),{side},-2)':'if(gt(iw,ih),-2,{side})'"]
+    args += ['-movflags', '+faststart', dst]
+    return args
+
+
+async def _run_ffmpeg(args: list, duration: float,
+                      progress_callback: Optional[Callable[[int, str], None]]) -> None:
+    """
+    在独立进程中执行ffmpeg并报告进度
+    
+    Raises:
+        RuntimeError: ffmpeg执行失败
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        reported = 0
+        # -progress 每隔一段时间输出一组 key=value，out_time_us 为已处理的时长（微秒）
+        async for line in process.stdout:
+            key, _, value = line.decode('utf-8', 'ignore').strip().partition('=')
+            if key != 'out_time_us' or not duration or not progress_callback:
+                continue
+            try:
+                percent = min(99, int(int(value) / 1_000_000 / duration * 100))
+            except ValueError:
+                continue
+            if percent >= reported + PROGRESS_STEP:
+                reported = percent
+                progress_callback(percent, f"正在处理视频 {percent}%...")
+        
+        stderr = await process.stderr.read()
+        if await process.wait() != 0:
+            raise RuntimeError(f"ffmpeg处理失败: {stderr.decode('utf-8', 'ignore').strip()[-500:]}")
+    finally:
+        if process.returncode is None:
+            # 任务被取消时结束ffmpeg进程
+            process.kill()
+            await process.wait()
+
+
+async def prepare_video(path: str, output_dir: Path = None, options: PreflightOptions = None,
+                        progress_callback: Optional[Callable[[int, str], None]] = None) -> str:
+    """
+    预检单个视频，必要时重新封装或转码
+    
+    Args:
+        path: 视频文件路径
+        output_dir: 处理结果目录，默认为系统临时目录下的 xhs_videos
+        options: 预检参数，默认从环境变量读取
+        progress_callback: 进度回调，参数为(百分比, 说明)
+    
+    Returns:
+        str: 用于上传的视频路径（无需处理或处理失败时为原路径）
+    
+    Raises:
+        ValueError: 文件中没有视频流
+    """
+    if not is_preflight_available():
+        logger.warning("⚠️ 视频预检需要安装ffmpeg（含ffprobe），本次跳过预检")
+        return path
+    
+    options = options or PreflightOptions.from_env()
+    output_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
+    
+    try:
+        probe = await probe_video(path)
+    except Exception as e:
+        logger.warning(f"⚠️ 视频探测失败，使用原视频: {e}")
+        return path
+    
+    if not probe.video_codec:
+        raise ValueError(f"视频文件中没有视频流: {path}")
+    
+    plan = plan_preflight(path, probe, options)
+    logger.info(f"🎬 视频探测: {probe.video_codec}/{probe.audio_codec or '无音频'} "
+                f"{probe.width}x{probe.height} {probe.bit_rate // 1000}kbps {probe.duration:.1f}秒 -> {plan}")
+    if plan == PLAN_NONE:
+        return path
+    
+    output_path = _output_path(path, output_dir, plan, options)
+    if output_path.exists():
+        # 更新修改时间，清理时按最近使用时间保留
+        output_path.touch()
+        logger.info(f"✅ 复用已处理的视频: {output_path}")
+        return str(output_path)
+    
+    cleanup_old_outputs(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    part_path = output_path.with_name(f"{output_path.stem}.{os.getpid()}.part.mp4")
+    try:
+        await _run_ffmpeg(_ffmpeg_args(path, str(part_path), plan, probe, options),
+                          probe.duration, progress_callback)
+        os.replace(part_path, output_path)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"⚠️ 视频预检处理失败，使用原视频: {e}")
+        return path
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+    
+    before, after = os.path.getsize(path), os.path.getsize(output_path)
+    logger.info(f"✅ 视频预检完成: {Path(path).name} {before // 1024 // 1024}MB -> {after // 1024 // 1024}MB")
+    return str(output_path)
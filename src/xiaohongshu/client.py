@@ -6,25 +6,36 @@
 
 import asyncio
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Callable
 import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
 
 from ..core.config import XHSConfig
-from ..core.browser import ChromeDriverManager
+from ..core.browser import ChromeDriverManager, PROFILE_DEFAULT, PROFILE_COLLECTOR
+from ..core.driver_pool import get_driver_pool
+from ..core.browser_executor import run_in_browser
+from ..core.dom_waiter import DomCondition, DomWaiter, WaitBudget
 from ..core.exceptions import PublishError, NetworkError, handle_exception
 from ..auth.cookie_manager import CookieManager
 from ..utils.text_utils import clean_text_for_browser, truncate_text
 from ..utils.logger import get_logger
 from .models import XHSNote, XHSSearchResult, XHSUser, XHSPublishResult
 from .components.content_filler import XHSContentFiller
+from .components.file_uploader import UploadProgressMonitor
 
 logger = get_logger(__name__)
 
+# 发布按钮可用的条件
+PUBLISH_READY_CONDITIONS = [
+    DomCondition.of_css(".publishBtn", enabled=True),
+    DomCondition.of_xpath("//button[contains(text(), '发布')]", enabled=True)
+]
+
 
 class XHSClient:
     """小红书客户端类"""
@@ -39,8 +50,12 @@ class XHSClient:
         self.config = config
         self.browser_manager = ChromeDriverManager(config)
         self.cookie_manager = CookieManager(config)
+        # 浏览器会话池（未启用时每次新建浏览器）
+        self.driver_pool = get_driver_pool(config)
         self.session = requests.Session()
         self.content_filler = None  # 延迟初始化，需要browser_manager运行时才能创建
+        self.waiter: Optional[DomWaiter] = None  # 当前发布的页面等待器（共享一次发布的等待时间预算）
+        self.upload_progress_callback: Optional[Callable[[int, Optional[int]], None]] = None  # 上传进度回调
         self._setup_session()
     
     def _setup_session(self) -> None:
@@ -58,13 +73,60 @@ class XHSClient:
         except Exception as e:
             logger.warning(f"设置会话cookies失败: {e}")
     
+    @asynccontextmanager
+    async def browser_session(self, profile: str = PROFILE_DEFAULT) -> AsyncIterator[Any]:
+        """
+        获取已加载cookies的浏览器会话，退出时归还或关闭
+        
+        启用会话池时从池中租用，驱动关联到browser_manager供各组件使用；
+        否则新建浏览器并在退出时关闭
+        
+        Args:
+            profile: 浏览器配置档，数据采集使用PROFILE_COLLECTOR（屏蔽图片、字体、媒体的轻量浏览器）
+        
+        Yields:
+            Chrome WebDriver实例
+        """
+        pool = self.driver_pool if profile == PROFILE_DEFAULT else get_driver_pool(self.config, profile)
+        if pool is not None:
+            async with pool.lease_async() as driver:
+                self.browser_manager.attach(driver)
+                try:
+                    yield driver
+                finally:
+                    self.browser_manager.detach()
+            return
+        
+        manager = self.browser_manager if profile == PROFILE_DEFAULT else ChromeDriverManager(self.config, profile)
+        
+        # 启动和关闭浏览器都是阻塞操作，放到线程池中执行
+        loop = asyncio.get_running_loop()
+        try:
+            yield await loop.run_in_executor(None, self._open_browser, manager)
+        finally:
+            # 确保浏览器被关闭
+            await loop.run_in_executor(None, manager.close_driver)
+    
+    def _open_browser(self, manager: Optional[ChromeDriverManager] = None) -> Any:
+        """新建浏览器，导航到创作者中心后加载cookies"""
+        manager = manager or self.browser_manager
+        driver = manager.create_driver()
+        
+        manager.navigate_to_creator_center()
+        cookies = self.cookie_manager.load_cookies()
+        cookie_result = manager.load_cookies(cookies)
+        logger.info(f"🍪 Cookies加载结果: {cookie_result}")
+        return driver
+    
     @handle_exception
-    async def publish_note(self, note: XHSNote) -> XHSPublishResult:
+    async def publish_note(self, note: XHSNote,
+                           upload_progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> XHSPublishResult:
         """
         发布小红书笔记
         
         Args:
             note: 笔记对象
+            upload_progress_callback: 上传进度回调，参数为(百分比, 预计剩余秒数)
             
         Returns:
             发布结果
@@ -73,70 +135,90 @@ class XHSClient:
             PublishError: 当发布过程出错时
         """
         logger.info(f"📝 开始发布小红书笔记: {note.title}")
+        self.upload_progress_callback = upload_progress_callback
         
         try:
-            # 创建浏览器驱动
-            driver = self.browser_manager.create_driver()
-            
-            # 导航到创作者中心
-            self.browser_manager.navigate_to_creator_center()
-            
-            # 加载cookies
-            cookies = self.cookie_manager.load_cookies()
-            cookie_result = self.browser_manager.load_cookies(cookies)
-            
-            logger.info(f"🍪 Cookies加载结果: {cookie_result}")
-            
-            # 访问发布页面
-            return await self._publish_note_process(note)
+            async with self.browser_session():
+                # 访问发布页面
+                return await self._publish_note_process(note)
             
         except Exception as e:
             if isinstance(e, PublishError):
                 raise
             else:
                 raise PublishError(f"发布笔记过程出错: {str(e)}", publish_step="初始化") from e
-        finally:
-            # 确保浏览器被关闭
-            self.browser_manager.close_driver()
     
     async def _publish_note_process(self, note: XHSNote) -> XHSPublishResult:
         """执行发布笔记的具体流程"""
-        driver = self.browser_manager.driver
+        browser = self.browser_manager.executor
+        # 本次发布的所有页面等待共享一个时间预算
+        self.waiter = DomWaiter(browser, WaitBudget(self.config.publish_wait_budget))
         
         try:
             logger.info("🌐 直接访问小红书发布页面...")
-            driver.get("https://creator.xiaohongshu.com/publish/publish?from=menu")
-            await asyncio.sleep(5)  # 等待页面基本加载
-            
-            if "publish" not in driver.current_url:
-                raise PublishError("无法访问发布页面，可能需要重新登录", publish_step="页面访问")
+            await browser.get("https://creator.xiaohongshu.com/publish/publish?from=menu")
             
+            # 发布类型选项卡或上传控件出现即说明页面已渲染（未登录时会跳转到登录页，不会出现）
             logger.info("⏳ 等待页面元素完全渲染...")
-            await asyncio.sleep(3)  # 等待页面元素完全渲染
+            rendered = await self.waiter.wait_for([
+                DomCondition.of_css(".creator-tab"),
+                DomCondition.of_css("input[type='file']", visible=False)
+            ], timeout=15)
+            
+            if "publish" not in await browser.current_url():
+                raise PublishError("无法访问发布页面，可能需要重新登录", publish_step="页面访问")
+            if rendered is None:
+                logger.warning("⚠️ 等待发布页面渲染超时，继续执行...")
             
             # 根据内容类型切换发布模式
             await self._switch_publish_mode(note)
             
             # 处理文件上传（图片/视频）
             await self._handle_file_upload(note)
+            self._check_wait_budget("文件上传")
             
             # 填写笔记内容
             await self._fill_note_content(note)
+            self._check_wait_budget("填写内容")
             
             # 发布笔记
-            return await self._submit_note(note)
+            result = await self._submit_note(note)
+            logger.info(f"⏱️ 本次发布页面等待共 {self.waiter.budget.elapsed:.1f} 秒")
+            return result
             
         except Exception as e:
-            self.browser_manager.take_screenshot("publish_error_screenshot.png")
+            await browser.run(self.browser_manager.take_screenshot, "publish_error_screenshot.png")
             if isinstance(e, PublishError):
                 raise
             else:
                 raise PublishError(f"发布流程执行失败: {str(e)}", publish_step="流程执行") from e
 
+    def _dom_waiter(self) -> DomWaiter:
+        """当前发布的页面等待器（不在发布流程中调用时新建，使用完整的时间预算）"""
+        browser = self.browser_manager.executor
+        if self.waiter is None or self.waiter.browser is not browser:
+            self.waiter = DomWaiter(browser, WaitBudget(self.config.publish_wait_budget))
+        return self.waiter
+    
+    def _check_wait_budget(self, step: str) -> None:
+        """
+        检查本次发布的等待时间预算
+        
+        Raises:
+            PublishError: 时间预算已用完
+        """
+        budget = self._dom_waiter().budget
+        if budget.exhausted:
+            raise PublishError(
+                f"发布等待超时：页面等待已用完 {budget.total_seconds:.0f} 秒的时间预算",
+                publish_step=step
+            )
+    
     async def _switch_publish_mode(self, note: XHSNote) -> None:
         """根据笔记内容类型切换发布模式（图文/视频）"""
         try:
             driver = self.browser_manager.driver
+            browser = self.browser_manager.executor
             
             # 判断内容类型
             has_images = note.images and len(note.images) > 0
@@ -146,22 +228,13 @@ class XHSClient:
                 logger.info("🔄 切换到图文发布模式...")
                 # 查找"上传图文"选项卡
                 try:
-                    # 查找所有creator-tab元素
-                    tabs = driver.find_elements(By.CSS_SELECTOR, ".creator-tab")
-                    image_tab = None
-                    
-                    for tab in tabs:
-                        if tab.is_displayed() and "上传图文" in tab.text:
-                            # 确保元素在可见区域内（不是负坐标）
-                            rect = tab.rect
-                            if rect['x'] > 0 and rect['y'] > 0:
-                                image_tab = tab
-                                break
+                    image_tab = await browser.run(self._find_publish_tab, driver, "上传图文")
                     
                     if image_tab:
-                        image_tab.click()
+                        await browser.click(image_tab)
                         logger.info("✅ 已切换到图文发布模式")
-                        await asyncio.sleep(2)  # 等待界面切换完成
+                        # 等待选项卡激活，界面切换完成
+                        await self._dom_waiter().wait_for_css(".creator-tab.active", timeout=5, text="上传图文")
                     else:
                         logger.warning("⚠️ 未找到图文发布选项卡，可能已经在图文模式")
                         
@@ -172,20 +245,12 @@ class XHSClient:
                 logger.info("🔄 切换到视频发布模式...")
                 # 页面默认就是视频模式，检查是否需要切换
                 try:
-                    tabs = driver.find_elements(By.CSS_SELECTOR, ".creator-tab")
-                    video_tab = None
-                    
-                    for tab in tabs:
-                        if tab.is_displayed() and "上传视频" in tab.text:
-                            rect = tab.rect
-                            if rect['x'] > 0 and rect['y'] > 0:
-                                video_tab = tab
-                                break
+                    video_tab = await browser.run(self._find_publish_tab, driver, "上传视频")
                     
-                    if video_tab and "active" not in video_tab.get_attribute("class"):
-                        video_tab.click()
+                    if video_tab and "active" not in await browser.run(video_tab.get_attribute, "class"):
+                        await browser.click(video_tab)
                         logger.info("✅ 已切换到视频发布模式")
-                        await asyncio.sleep(2)
+                        await self._dom_waiter().wait_for_css(".creator-tab.active", timeout=5, text="上传视频")
                     else:
                         logger.info("✅ 已在视频发布模式")
                         
@@ -195,11 +260,22 @@ class XHSClient:
         except Exception as e:
             logger.warning(f"⚠️ 模式切换过程出错: {e}，继续执行...")
 
+    @staticmethod
+    def _find_publish_tab(driver, label: str) -> Any:
+        """查找可见的发布类型选项卡（在浏览器线程中执行）"""
+        for tab in driver.find_elements(By.CSS_SELECTOR, ".creator-tab"):
+            if tab.is_displayed() and label in tab.text:
+                # 确保元素在可见区域内（不是负坐标）
+                rect = tab.rect
+                if rect['x'] > 0 and rect['y'] > 0:
+                    return tab
+        return None
+    
     async def _handle_file_upload(self, note: XHSNote) -> None:
         """统一处理文件上传（图片/视频）"""
         try:
             driver = self.browser_manager.driver
-            wait = WebDriverWait(driver, 30)
+            browser = self.browser_manager.executor
             
             # 合并图片和视频文件
             files_to_upload = []
@@ -214,68 +290,89 @@ class XHSClient:
                 logger.info(f"🎬 准备上传 {len(note.videos)} 个视频...")
             
             if files_to_upload:
-                # 尝试多个可能的选择器查找上传元素
-                upload_input = None
-                upload_selectors = [
-                    ".upload-input",
-                    "input[type='file']",
-                    "[class*='upload'][type='file']",
-                    ".file-input",
-                    ".uploader-input",
-                    "[accept*='image']",
-                    "[accept*='video']"
-                ]
-                
                 logger.info("🔍 查找上传元素...")
-                for selector in upload_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        for element in elements:
-                            if element.is_displayed():
-                                upload_input = element
-                                logger.info(f"✅ 找到可见的上传元素: {selector}")
-                                break
-                        if upload_input:
-                            break
-                    except Exception:
-                        continue
-                
-                # 如果还是没找到，用xpath方式
+                upload_input = await browser.run(self._find_upload_input, driver)
                 if not upload_input:
-                    try:
-                        upload_input = driver.find_element(By.XPATH, "//input[@type='file']")
-                        logger.info("✅ 通过XPath找到上传元素")
-                    except Exception:
-                        logger.error("❌ 无法找到任何文件上传元素")
-                        # 继续执行，可能页面结构已改变
-                        return
+                    logger.error("❌ 无法找到任何文件上传元素")
+                    # 继续执行，可能页面结构已改变
+                    return
                 
                 # 发送文件路径
-                upload_input.send_keys('\n'.join(files_to_upload))
+                await browser.send_keys(upload_input, '\n'.join(files_to_upload))
                 logger.info("✅ 文件上传指令已发送")
                 
-                # 给时间让上传开始
-                await asyncio.sleep(3)
-                
-                # 如果有视频，等待上传完成
-                if has_video:
-                    await self._wait_for_video_upload_complete()
-                else:
-                    # 图片上传给少量时间
-                    await asyncio.sleep(2)
+                # 等待上传完成，同时上报页面上的上传进度
+                async with UploadProgressMonitor(self.browser_manager, self.upload_progress_callback,
+                                                 ready_check=self._publish_button_ready) as monitor:
+                    if has_video:
+                        if await self._wait_for_video_upload_complete():
+                            monitor.mark_complete()
+                    else:
+                        # 编辑区出现时图片仍在上传，进度条走完或消失、发布按钮可用后才算上传完成
+                        if await monitor.wait_complete(self._dom_waiter().budget.cap(60)):
+                            logger.info("✅ 图片上传完成！")
+                        else:
+                            logger.warning("⚠️ 等待图片上传完成超时，继续执行...")
                     
         except Exception as e:
             logger.warning(f"⚠️ 处理文件上传时出错: {e}")
             # 不抛出异常，继续后续流程
-            
-    async def _wait_for_video_upload_complete(self) -> None:
-        """等待视频上传完成"""
+    
+    @staticmethod
+    def _find_upload_input(driver) -> Any:
+        """查找文件上传元素（在浏览器线程中执行）"""
+        # 尝试多个可能的选择器查找上传元素
+        upload_selectors = [
+            ".upload-input",
+            "input[type='file']",
+            "[class*='upload'][type='file']",
+            ".file-input",
+            ".uploader-input",
+            "[accept*='image']",
+            "[accept*='video']"
+        ]
+        
+        for selector in upload_selectors:
+            try:
+                for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                    if element.is_displayed():
+                        logger.info(f"✅ 找到可见的上传元素: {selector}")
+                        return element
+            except Exception:
+                continue
+        
+        # 如果还是没找到，用xpath方式
+        try:
+            upload_input = driver.find_element(By.XPATH, "//input[@type='file']")
+            logger.info("✅ 通过XPath找到上传元素")
+            return upload_input
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _publish_button_ready(driver) -> bool:
+        """发布按钮是否已可用（文件上传完成后才可点击，在浏览器线程中执行）"""
+        for by, selector in ((By.CSS_SELECTOR, ".publishBtn"), (By.XPATH, "//button[contains(text(), '发布')]")):
+            for button in driver.find_elements(by, selector):
+                if button.is_displayed() and button.is_enabled() and 'disabled' not in (button.get_attribute('class') or ''):
+                    return True
+        return False
+    
+    async def _wait_for_video_upload_complete(self) -> bool:
+        """
+        等待视频上传完成
+        
+        Returns:
+            bool: 是否检测到上传成功标识
+        """
+        success_found = False
         try:
             driver = self.browser_manager.driver
+            browser = self.browser_manager.executor
             
             logger.info("⏳ 等待视频上传完成...")
             
-            # 等待上传成功标识出现 - 使用轮询方式
+            # 等待上传成功标识出现（页面出现标识时立即返回）
             success_selectors = [
                 "//div[contains(text(), '上传成功')]",
                 "//span[contains(text(), '上传成功')]", 
@@ -284,59 +381,44 @@ class XHSClient:
             ]
             
             max_wait_time = 120  # 最大等待2分钟，避免MCP超时
-            check_interval = 2   # 每2秒检查一次
-            elapsed_time = 0
-            success_found = False
-            
-            while elapsed_time < max_wait_time and not success_found:
-                # 检查所有可能的成功标识
-                for selector in success_selectors:
-                    try:
-                        elements = driver.find_elements(By.XPATH, selector)
-                        for element in elements:
-                            if element.is_displayed() and "上传成功" in element.text:
-                                logger.info("✅ 视频上传完成！")
-                                success_found = True
-                                break
-                        if success_found:
-                            break
-                    except Exception:
-                        continue
-                
-                if not success_found:
-                    logger.debug(f"⏳ 继续等待上传完成... ({elapsed_time}s/{max_wait_time}s)")
-                    await asyncio.sleep(check_interval)
-                    elapsed_time += check_interval
+            success_found = await self._dom_waiter().wait_for(
+                [DomCondition.of_xpath(selector, text="上传成功") for selector in success_selectors],
+                timeout=max_wait_time
+            ) is not None
             
-            if not success_found:
+            if success_found:
+                logger.info("✅ 视频上传完成！")
+            else:
                 logger.warning(f"⚠️ 等待{max_wait_time}秒后未检测到上传成功标识，继续流程")
             
             # 尝试获取视频信息
             try:
-                video_info_elements = driver.find_elements(
-                    By.XPATH, "//div[contains(text(), '视频大小') or contains(text(), '视频时长')]"
-                )
-                for info in video_info_elements:
-                    if info.is_displayed():
-                        logger.info(f"📹 {info.text}")
+                video_info_texts = await browser.run(lambda: [
+                    info.text
+                    for info in driver.find_elements(
+                        By.XPATH, "//div[contains(text(), '视频大小') or contains(text(), '视频时长')]"
+                    )
+                    if info.is_displayed()
+                ])
+                for text in video_info_texts:
+                    logger.info(f"📹 {text}")
             except:
                 pass  # 视频信息获取失败不影响主流程
                 
         except Exception as e:
             logger.warning(f"⚠️ 等待视频上传完成时出错: {e}")
             # 即使等待失败，也继续后续流程
+        return success_found
     
     async def _fill_note_content(self, note: XHSNote) -> None:
         """填写笔记内容"""
         driver = self.browser_manager.driver
-        wait = WebDriverWait(driver, 15)
+        browser = self.browser_manager.executor
         
         # 初始化content_filler（如果还没初始化）
         if not self.content_filler:
             self.content_filler = XHSContentFiller(self.browser_manager)
         
-        await asyncio.sleep(2)  # 等待上传完成
-        
         # 填写标题
         try:
             logger.info("✏️ 填写标题...")
@@ -352,21 +434,15 @@ class XHSClient:
                 ".input"
             ]
             
-            title_input = None
-            for selector in title_selectors:
-                try:
-                    title_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    if title_input.is_displayed():
-                        logger.info(f"✅ 找到标题输入框: {selector}")
-                        break
-                except:
-                    continue
+            title_input, selector = await browser.run(self._find_input, driver, title_selectors, 15)
+            if selector:
+                logger.info(f"✅ 找到标题输入框: {selector}")
             
             if not title_input:
                 raise PublishError("无法找到标题输入框", publish_step="查找标题输入框")
             
-            title_input.clear()
-            title_input.send_keys(title)
+            await browser.clear(title_input)
+            await browser.send_keys(title_input, title)
             logger.info(f"✅ 标题已填写: {title}")
             
         except Exception as e:
@@ -386,20 +462,14 @@ class XHSClient:
                 ".editor"
             ]
             
-            content_input = None
-            for selector in content_selectors:
-                try:
-                    content_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    if content_input.is_displayed():
-                        logger.info(f"✅ 找到内容输入框: {selector}")
-                        break
-                except:
-                    continue
+            content_input, selector = await browser.run(self._find_input, driver, content_selectors, 15)
+            if selector:
+                logger.info(f"✅ 找到内容输入框: {selector}")
             
             if not content_input:
                 raise PublishError("无法找到内容输入框", publish_step="查找内容输入框")
             
-            content_input.clear()
+            await browser.clear(content_input)
             
             # 处理内容，支持换行
             from selenium.webdriver.common.keys import Keys
@@ -408,9 +478,9 @@ class XHSClient:
             # 分段输入，正确处理换行
             lines = cleaned_content.split('\n')
             for i, line in enumerate(lines):
-                content_input.send_keys(line)
+                await browser.send_keys(content_input, line)
                 if i < len(lines) - 1:
-                    content_input.send_keys(Keys.ENTER)
+                    await browser.send_keys(content_input, Keys.ENTER)
                 await asyncio.sleep(0.1)  # 短暂等待
             
             logger.info("✅ 内容已填写")
@@ -432,11 +502,52 @@ class XHSClient:
         else:
             logger.info("📋 没有话题需要填写")
         
-        await asyncio.sleep(2)
+        # 等待发布按钮可用（内容校验和上传处理完成后按钮才可点击）
+        if await self._dom_waiter().wait_for(PUBLISH_READY_CONDITIONS, timeout=10) is None:
+            logger.warning("⚠️ 等待发布按钮可用超时，继续尝试发布")
+    
+    @staticmethod
+    def _find_input(driver, selectors: List[str], timeout: float) -> Tuple[Any, Optional[str]]:
+        """
+        依次尝试选择器查找输入框（在浏览器线程中执行）
+        
+        Returns:
+            (元素, 命中的选择器)，没有可见元素时返回最后找到的元素和None
+        """
+        wait = WebDriverWait(driver, timeout)
+        element = None
+        for selector in selectors:
+            try:
+                element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+                if element.is_displayed():
+                    return element, selector
+            except Exception:
+                continue
+        return element, None
+    
+    @staticmethod
+    def _find_submit_button(driver, selectors: List[str]) -> Tuple[Any, Optional[str]]:
+        """
+        依次尝试选择器查找发布按钮（在浏览器线程中执行）
+        
+        Returns:
+            (元素, 命中的选择器)，没有可用按钮时返回最后找到的元素和None
+        """
+        button = None
+        for selector in selectors:
+            try:
+                by = By.XPATH if selector.startswith("//") else By.CSS_SELECTOR
+                button = driver.find_element(by, selector)
+                if button.is_displayed() and button.is_enabled():
+                    return button, selector
+            except Exception:
+                continue
+        return button, None
     
     async def _submit_note(self, note: XHSNote) -> XHSPublishResult:
         """提交发布笔记"""
         driver = self.browser_manager.driver
+        browser = self.browser_manager.executor
         
         try:
             logger.info("🚀 点击发布按钮...")
@@ -450,30 +561,31 @@ class XHSClient:
                 "//button[contains(text(), '提交')]"
             ]
             
-            submit_btn = None
-            for selector in publish_selectors:
-                try:
-                    if selector.startswith("//"):
-                        submit_btn = driver.find_element(By.XPATH, selector)
-                    else:
-                        submit_btn = driver.find_element(By.CSS_SELECTOR, selector)
-                    
-                    if submit_btn.is_displayed() and submit_btn.is_enabled():
-                        logger.info(f"✅ 找到发布按钮: {selector}")
-                        break
-                except:
-                    continue
+            submit_btn, selector = await browser.run(self._find_submit_button, driver, publish_selectors)
+            if selector:
+                logger.info(f"✅ 找到发布按钮: {selector}")
             
             if not submit_btn:
                 raise PublishError("无法找到发布按钮", publish_step="查找发布按钮")
             
-            submit_btn.click()
+            editor_url = await browser.current_url()
+            await browser.click(submit_btn)
             logger.info("✅ 发布按钮已点击")
-            await asyncio.sleep(3)
+            published = await self._wait_for_publish_result(submit_btn, selector, editor_url)
             
-            current_url = driver.current_url
+            current_url = await browser.current_url()
             logger.info(f"📍 发布后页面URL: {current_url}")
             
+            if not published:
+                logger.warning("⚠️ 未检测到发布成功提示，页面仍停留在编辑页")
+                return XHSPublishResult(
+                    success=False,
+                    message=f"未确认笔记发布成功，请在页面上检查: {note.title}",
+                    note_title=note.title,
+                    final_url=current_url,
+                    error_type="unconfirmed"
+                )
+            
             return XHSPublishResult(
                 success=True,
                 message=f"笔记发布成功！标题: {note.title}",
@@ -578,12 +690,52 @@ class XHSClient:
                 final_url=""
             )
     
+    async def _wait_for_publish_result(self, submit_btn: Any, selector: Optional[str], editor_url: str) -> bool:
+        """
+        等待发布结果
+        
+        出现发布成功提示、点击的发布按钮从页面移除或失效、页面跳转离开编辑页时视为发布成功；
+        都没有出现时不把点击本身当作发布成功
+        
+        Args:
+            submit_btn: 被点击的发布按钮
+            selector: 查找发布按钮时命中的选择器
+            editor_url: 点击前的编辑页URL
+        
+        Returns:
+            bool: 是否确认发布成功
+        """
+        conditions = [DomCondition.of_xpath("//*[contains(text(), '发布成功')]")]
+        if selector:
+            # 只观察实际点击的按钮，其他选择器匹配不到元素不代表已发布
+            condition = DomCondition.of_xpath if selector.startswith("//") else DomCondition.of_css
+            conditions.append(condition(selector, visible=False, absent=True))
+        
+        if await self._dom_waiter().wait_for(conditions, timeout=10) is not None:
+            return True
+        
+        browser = self.browser_manager.executor
+        return await browser.run(self._left_editor, self.browser_manager.driver, submit_btn, editor_url)
+    
+    @staticmethod
+    def _left_editor(driver, submit_btn: Any, editor_url: str) -> bool:
+        """检查点击发布后是否已离开编辑页：URL已变化，或点击的按钮已失效/隐藏（在浏览器线程中执行）"""
+        try:
+            if driver.current_url != editor_url:
+                return True
+            return not submit_btn.is_displayed()
+        except StaleElementReferenceException:
+            return True
+        except WebDriverException:
+            return False
+    
     async def _fill_note_content_existing(self) -> None:
         """填写已上传文件的笔记内容（从用户输入获取）"""
         driver = self.browser_manager.driver
-        wait = WebDriverWait(driver, 15)
+        browser = self.browser_manager.executor
         
-        await asyncio.sleep(2)  # 等待页面稳定
+        # 等待编辑区渲染完成
+        await self._dom_waiter().wait_for([DomCondition.of_css(".d-text"), DomCondition.of_css(".ql-editor")], timeout=5)
         
         # 由于这是分阶段操作，内容需要从页面现有的输入框获取或提示用户
         # 这里先做基础检查，确保页面状态正常
@@ -598,15 +750,9 @@ class XHSClient:
                 ".input"
             ]
             
-            title_input = None
-            for selector in title_selectors:
-                try:
-                    title_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    if title_input.is_displayed():
-                        logger.info(f"✅ 确认标题输入框可用: {selector}")
-                        break
-                except:
-                    continue
+            title_input, selector = await browser.run(self._find_input, driver, title_selectors, 15)
+            if selector:
+                logger.info(f"✅ 确认标题输入框可用: {selector}")
             
             if not title_input:
                 raise PublishError("无法找到标题输入框", publish_step="检查标题输入框")
@@ -621,15 +767,9 @@ class XHSClient:
                 ".editor"
             ]
             
-            content_input = None
-            for selector in content_selectors:
-                try:
-                    content_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    if content_input.is_displayed():
-                        logger.info(f"✅ 确认内容输入框可用: {selector}")
-                        break
-                except:
-                    continue
+            content_input, selector = await browser.run(self._find_input, driver, content_selectors, 15)
+            if selector:
+                logger.info(f"✅ 确认内容输入框可用: {selector}")
             
             if not content_input:
                 raise PublishError("无法找到内容输入框", publish_step="检查内容输入框")
@@ -642,6 +782,7 @@ class XHSClient:
     async def _submit_note_existing(self) -> XHSPublishResult:
         """提交发布已准备好的笔记"""
         driver = self.browser_manager.driver
+        browser = self.browser_manager.executor
         
         try:
             logger.info("🚀 检查发布按钮状态...")
@@ -655,31 +796,32 @@ class XHSClient:
                 "//button[contains(text(), '提交')]"
             ]
             
-            submit_btn = None
-            for selector in publish_selectors:
-                try:
-                    if selector.startswith("//"):
-                        submit_btn = driver.find_element(By.XPATH, selector)
-                    else:
-                        submit_btn = driver.find_element(By.CSS_SELECTOR, selector)
-                    
-                    if submit_btn.is_displayed() and submit_btn.is_enabled():
-                        logger.info(f"✅ 确认发布按钮可用: {selector}")
-                        break
-                except:
-                    continue
+            submit_btn, selector = await browser.run(self._find_submit_button, driver, publish_selectors)
+            if selector:
+                logger.info(f"✅ 确认发布按钮可用: {selector}")
             
             if not submit_btn:
                 raise PublishError("无法找到可用的发布按钮", publish_step="检查发布按钮")
             
             # 点击发布
-            submit_btn.click()
+            editor_url = await browser.current_url()
+            await browser.click(submit_btn)
             logger.info("✅ 发布按钮已点击")
-            await asyncio.sleep(3)
+            published = await self._wait_for_publish_result(submit_btn, selector, editor_url)
             
-            current_url = driver.current_url
+            current_url = await browser.current_url()
             logger.info(f"📍 发布后页面URL: {current_url}")
             
+            if not published:
+                logger.warning("⚠️ 未检测到发布成功提示，页面仍停留在编辑页")
+                return XHSPublishResult(
+                    success=False,
+                    message="未确认笔记发布成功，请在页面上检查",
+                    note_title="",
+                    final_url=current_url,
+                    error_type="unconfirmed"
+                )
+            
             return XHSPublishResult(
                 success=True,
                 message="笔记发布成功！",
@@ -709,57 +851,47 @@ class XHSClient:
         logger.info("📊 开始采集创作者数据中心数据...")
         
         try:
-            # 创建浏览器驱动
-            driver = self.browser_manager.create_driver()
-            
-            # 加载cookies
-            cookies = self.cookie_manager.load_cookies()
-            cookie_result = self.browser_manager.load_cookies(cookies)
-            logger.info(f"🍪 Cookies加载结果: {cookie_result}")
-            
-            # 采集结果
-            result = {
-                "success": True,
-                "collect_time": datetime.now().isoformat(),
-                "date": date or datetime.now().strftime("%Y-%m-%d"),
-                "data": {}
-            }
-            
-            try:
-                # 采集账号概览数据
-                logger.info("🏠 开始采集账号概览数据...")
-                dashboard_data = collect_dashboard_data(driver, date)
-                result["data"]["dashboard"] = dashboard_data
-                
-                # 等待间隔，遵守采集规范
-                await asyncio.sleep(3)
+            async with self.browser_session(PROFILE_COLLECTOR) as driver:
+                # 采集结果
+                result = {
+                    "success": True,
+                    "collect_time": datetime.now().isoformat(),
+                    "date": date or datetime.now().strftime("%Y-%m-%d"),
+                    "data": {}
+                }
                 
-                # 采集内容分析数据
-                logger.info("📊 开始采集内容分析数据...")
-                content_data = collect_content_analysis_data(driver, date)
-                result["data"]["content_analysis"] = content_data
-                
-                # 等待间隔
-                await asyncio.sleep(3)
-                
-                # 采集粉丝数据
-                logger.info("👥 开始采集粉丝数据...")
-                fans_data = collect_fans_data(driver, date)
-                result["data"]["fans"] = fans_data
-                
-                logger.info("✅ 创作者数据采集完成")
-                
-            except Exception as e:
-                logger.error(f"❌ 数据采集过程出错: {e}")
-                result["success"] = False
-                result["error"] = str(e)
+                try:
+                    # 采集账号概览数据
+                    logger.info("🏠 开始采集账号概览数据...")
+                    dashboard_data = await run_in_browser(driver, collect_dashboard_data, driver)
+                    result["data"]["dashboard"] = dashboard_data
+                    
+                    # 等待间隔，遵守采集规范
+                    await asyncio.sleep(3)
+                    
+                    # 采集内容分析数据
+                    logger.info("📊 开始采集内容分析数据...")
+                    content_data = await collect_content_analysis_data(driver, date)
+                    result["data"]["content_analysis"] = content_data
+                    
+                    # 等待间隔
+                    await asyncio.sleep(3)
+                    
+                    # 采集粉丝数据
+                    logger.info("👥 开始采集粉丝数据...")
+                    fans_data = await run_in_browser(driver, collect_fans_data, driver)
+                    result["data"]["fans"] = fans_data
+                    
+                    logger.info("✅ 创作者数据采集完成")
                 
+                except Exception as e:
+                    logger.error(f"❌ 数据采集过程出错: {e}")
+                    result["success"] = False
+                    result["error"] = str(e)
+        
         except Exception as e:
             logger.error(f"❌ 初始化数据采集环境失败: {e}")
             return {"success": False, "error": str(e)}
-        finally:
-            # 确保浏览器被关闭
-            self.browser_manager.close_driver()
         
         return result
     
@@ -780,17 +912,12 @@ class XHSClient:
         logger.info("🏠 开始采集账号概览数据...")
         
         try:
-            driver = self.browser_manager.create_driver()
-            cookies = self.cookie_manager.load_cookies()
-            self.browser_manager.load_cookies(cookies)
-            
-            result = await collect_dashboard_data(driver, date, save_data)
+            async with self.browser_session(PROFILE_COLLECTOR) as driver:
+                result = await run_in_browser(driver, collect_dashboard_data, driver, save_data)
             
         except Exception as e:
             logger.error(f"❌ 采集账号概览数据失败: {e}")
             return {"success": False, "error": str(e)}
-        finally:
-            self.browser_manager.close_driver()
         
         return result
     
@@ -813,17 +940,12 @@ class XHSClient:
         logger.info("📊 开始采集内容分析数据...")
         
         try:
-            driver = self.browser_manager.create_driver()
-            cookies = self.cookie_manager.load_cookies()
-            self.browser_manager.load_cookies(cookies)
-            
-            result = await collect_content_analysis_data(driver, date, limit, save_data)
+            async with self.browser_session(PROFILE_COLLECTOR) as driver:
+                result = await collect_content_analysis_data(driver, date, limit, save_data)
             
         except Exception as e:
             logger.error(f"❌ 采集内容分析数据失败: {e}")
             return {"success": False, "error": str(e)}
-        finally:
-            self.browser_manager.close_driver()
         
         return result
     
@@ -844,17 +966,12 @@ class XHSClient:
         logger.info("👥 开始采集粉丝数据...")
         
         try:
-            driver = self.browser_manager.create_driver()
-            cookies = self.cookie_manager.load_cookies()
-            self.browser_manager.load_cookies(cookies)
-            
-            result = await collect_fans_data(driver, date, save_data)
+            async with self.browser_session(PROFILE_COLLECTOR) as driver:
+                result = await run_in_browser(driver, collect_fans_data, driver, save_data)
             
         except Exception as e:
             logger.error(f"❌ 采集粉丝数据失败: {e}")
             return {"success": False, "error": str(e)}
-        finally:
-            self.browser_manager.close_driver()
         
         return result
     
@@ -874,21 +991,16 @@ class XHSClient:
         logger.info(f"📋 开始采集笔记详细数据: {note_title}")
         
         try:
-            driver = self.browser_manager.create_driver()
-            cookies = self.cookie_manager.load_cookies()
-            self.browser_manager.load_cookies(cookies)
-            
-            # 先访问内容分析页面
-            driver.get("https://creator.xiaohongshu.com/statistics/data-analysis")
-            await asyncio.sleep(3)
-            
-            result = collect_note_detail_data(driver, note_title)
+            async with self.browser_session(PROFILE_COLLECTOR) as driver:
+                # 先访问内容分析页面
+                await run_in_browser(driver, driver.get, "https://creator.xiaohongshu.com/statistics/data-analysis")
+                await asyncio.sleep(3)
+                
+                result = await run_in_browser(driver, collect_note_detail_data, driver, note_title)
             
         except Exception as e:
             logger.error(f"❌ 采集笔记详细数据失败: {e}")
             return {"success": False, "error": str(e)}
-        finally:
-            self.browser_manager.close_driver()
         
         return result
 
@@ -7,7 +7,6 @@
 import asyncio
 from typing import List
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException
@@ -186,18 +185,18 @@ class XHSContentFiller(IContentFiller):
         Returns:
             标题输入元素，如果未找到返回None
         """
-        driver = self.browser_manager.driver
-        wait = WebDriverWait(driver, XHSConfig.DEFAULT_WAIT_TIME)
+        browser = self.browser_manager.executor
         
         # 尝试多个选择器
         for selector in get_title_input_selectors():
             try:
                 logger.debug(f"🔍 尝试标题选择器: {selector}")
-                title_input = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+                title_input = await browser.wait_until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector)),
+                    XHSConfig.DEFAULT_WAIT_TIME
                 )
                 
-                if title_input and title_input.is_enabled():
+                if title_input and await browser.run(title_input.is_enabled):
                     logger.info(f"✅ 找到标题输入框: {selector}")
                     return title_input
                     
@@ -218,16 +217,16 @@ class XHSContentFiller(IContentFiller):
         Returns:
             内容编辑器元素，如果未找到返回None
         """
-        driver = self.browser_manager.driver
-        wait = WebDriverWait(driver, XHSConfig.DEFAULT_WAIT_TIME)
+        browser = self.browser_manager.executor
         
         try:
             logger.debug(f"🔍 查找内容编辑器: {XHSSelectors.CONTENT_EDITOR}")
-            content_editor = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, XHSSelectors.CONTENT_EDITOR))
+            content_editor = await browser.wait_until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, XHSSelectors.CONTENT_EDITOR)),
+                XHSConfig.DEFAULT_WAIT_TIME
             )
             
-            if content_editor and content_editor.is_enabled():
+            if content_editor and await browser.run(content_editor.is_enabled):
                 logger.info("✅ 找到内容编辑器")
                 return content_editor
             
@@ -251,17 +250,19 @@ class XHSContentFiller(IContentFiller):
             填写是否成功
         """
         try:
+            browser = self.browser_manager.executor
+            
             # 清空现有内容
-            title_input.clear()
+            await browser.clear(title_input)
             await asyncio.sleep(0.5)
             
             # 输入标题
             cleaned_title = clean_text_for_browser(title)
-            title_input.send_keys(cleaned_title)
+            await browser.send_keys(title_input, cleaned_title)
             
             # 验证输入是否成功
             await asyncio.sleep(1)
-            current_value = title_input.get_attribute("value") or title_input.text
+            current_value = await browser.run(lambda: title_input.get_attribute("value") or title_input.text)
             
             if cleaned_title in current_value or len(current_value) > 0:
                 logger.info("✅ 标题填写成功")
@@ -286,17 +287,19 @@ class XHSContentFiller(IContentFiller):
             填写是否成功
         """
         try:
+            browser = self.browser_manager.executor
+            
             # 点击编辑器以获得焦点
-            content_editor.click()
+            await browser.click(content_editor)
             await asyncio.sleep(0.5)
             
             # 清空现有内容
-            content_editor.clear()
+            await browser.clear(content_editor)
             
             # 尝试使用Ctrl+A全选然后删除
-            content_editor.send_keys(Keys.CONTROL + "a")
+            await browser.send_keys(content_editor, Keys.CONTROL + "a")
             await asyncio.sleep(0.2)
-            content_editor.send_keys(Keys.DELETE)
+            await browser.send_keys(content_editor, Keys.DELETE)
             await asyncio.sleep(0.5)
             
             # 输入内容
@@ -305,14 +308,16 @@ class XHSContentFiller(IContentFiller):
             # 分段输入，避免一次输入过多内容
             lines = cleaned_content.split('\n')
             for i, line in enumerate(lines):
-                content_editor.send_keys(line)
+                await browser.send_keys(content_editor, line)
                 if i < len(lines) - 1:
-                    content_editor.send_keys(Keys.ENTER)
+                    await browser.send_keys(content_editor, Keys.ENTER)
                 await asyncio.sleep(0.1)  # 短暂等待
             
             # 验证输入是否成功
             await asyncio.sleep(1)
-            current_text = content_editor.text or content_editor.get_attribute("textContent") or ""
+            current_text = await browser.run(
+                lambda: content_editor.text or content_editor.get_attribute("textContent") or ""
+            )
             
             # 简单验证：检查是否包含部分内容
             if (len(current_text) > 0 and 
@@ -349,8 +354,7 @@ class XHSContentFiller(IContentFiller):
             填写是否成功
         """
         try:
-            driver = self.browser_manager.driver
-            wait = WebDriverWait(driver, XHSConfig.DEFAULT_WAIT_TIME)
+            browser = self.browser_manager.executor
             
             # 1. 查找内容编辑器
             content_editor = await self._find_content_editor()
@@ -361,13 +365,13 @@ class XHSContentFiller(IContentFiller):
             logger.info(f"✅ 找到内容编辑器，开始添加 {len(topics)} 个话题")
             
             # 2. 确保编辑器获得焦点并移动到末尾
-            content_editor.click()
+            await browser.click(content_editor)
             await asyncio.sleep(0.3)
-            content_editor.send_keys(Keys.END)
+            await browser.send_keys(content_editor, Keys.END)
             await asyncio.sleep(0.2)
             
             # 3. 添加换行确保话题在新行
-            content_editor.send_keys(Keys.ENTER)
+            await browser.send_keys(content_editor, Keys.ENTER)
             await asyncio.sleep(0.2)
             
             success_count = 0
@@ -393,7 +397,7 @@ class XHSContentFiller(IContentFiller):
                     
                     # 4.3 添加空格分隔下一个话题
                     if i < len(topics) - 1:
-                        content_editor.send_keys(" ")
+                        await browser.send_keys(content_editor, " ")
                         await asyncio.sleep(0.2)
                         
                 except Exception as e:
@@ -428,6 +432,7 @@ class XHSContentFiller(IContentFiller):
         Returns:
             输入是否成功
         """
+        browser = self.browser_manager.executor
         try:
             driver = self.browser_manager.driver
             from selenium.webdriver.common.action_chains import ActionChains
@@ -445,7 +450,7 @@ class XHSContentFiller(IContentFiller):
                     actions.send_keys(char)
                     await asyncio.sleep(0.05)  # 短暂间隔模拟打字速度
                 
-                actions.perform()
+                await browser.run(actions.perform)
                 await asyncio.sleep(0.5)  # 等待输入完成
                 
                 logger.debug("✅ Actions逐字符输入完成")
@@ -502,7 +507,7 @@ class XHSContentFiller(IContentFiller):
                 return true;
                 """
                 
-                driver.execute_script(script, content_editor, topic_text)
+                await browser.execute_script(script, content_editor, topic_text)
                 await asyncio.sleep(0.5)
             
             # 等待可能的下拉菜单出现（但不强制要求）
@@ -510,7 +515,7 @@ class XHSContentFiller(IContentFiller):
             
             # 按回车键触发转换
             logger.debug("🔄 按回车键触发话题转换")
-            content_editor.send_keys(Keys.ENTER)
+            await browser.send_keys(content_editor, Keys.ENTER)
             await asyncio.sleep(0.8)  # 增加等待时间让转换完成
             
             return True
@@ -521,11 +526,11 @@ class XHSContentFiller(IContentFiller):
             # 最后的备用方法：简单直接输入
             try:
                 logger.debug("🔄 使用最简单的备用输入方法")
-                content_editor.clear()
+                await browser.clear(content_editor)
                 await asyncio.sleep(0.1)
-                content_editor.send_keys(topic_text)
+                await browser.send_keys(content_editor, topic_text)
                 await asyncio.sleep(0.3)
-                content_editor.send_keys(Keys.ENTER)
+                await browser.send_keys(content_editor, Keys.ENTER)
                 await asyncio.sleep(0.5)
                 return True
             except:
@@ -545,6 +550,7 @@ class XHSContentFiller(IContentFiller):
         """
         try:
             driver = self.browser_manager.driver
+            browser = self.browser_manager.executor
             
             # 可能的下拉菜单选择器（根据小红书可能的实现）
             possible_selectors = [
@@ -563,14 +569,9 @@ class XHSContentFiller(IContentFiller):
                 try:
                     await asyncio.sleep(0.2)  # 短暂等待
                     
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            # 检查是否包含话题相关内容
-                            text_content = element.text.lower()
-                            if any(keyword in text_content for keyword in ['话题', '#', 'topic', '浏览']):
-                                logger.debug(f"✅ 发现话题下拉菜单: {selector}")
-                                return True
+                    if await browser.run(self._has_topic_dropdown, driver, selector):
+                        logger.debug(f"✅ 发现话题下拉菜单: {selector}")
+                        return True
                 except:
                     continue
             
@@ -581,6 +582,17 @@ class XHSContentFiller(IContentFiller):
             logger.debug(f"⚠️ 检查话题下拉菜单时出错: {e}")
             return False
     
+    @staticmethod
+    def _has_topic_dropdown(driver, selector: str) -> bool:
+        """检查选择器匹配的可见元素中是否有话题下拉菜单（在浏览器线程中执行）"""
+        for element in driver.find_elements(By.CSS_SELECTOR, selector):
+            if element.is_displayed():
+                # 检查是否包含话题相关内容
+                text_content = element.text.lower()
+                if any(keyword in text_content for keyword in ['话题', '#', 'topic', '浏览']):
+                    return True
+        return False
+    
     async def _wait_for_topic_dropdown(self, timeout: float = 2.0) -> bool:
         """
         等待话题下拉菜单出现（保留旧方法以兼容）
@@ -611,53 +623,23 @@ class XHSContentFiller(IContentFiller):
         """
         try:
             driver = self.browser_manager.driver
+            browser = self.browser_manager.executor
             
             # 增加等待时间确保DOM完全更新
             await asyncio.sleep(1.0)
             
             logger.debug(f"🔍 开始验证话题 '{topic}' 的转换...")
             
-            # 先获取页面上所有可能相关的元素进行调试
-            all_mentions = driver.find_elements(By.CSS_SELECTOR, 'a[class*="mention"], [class*="mention"], [data-topic]')
-            if all_mentions:
-                logger.debug(f"📊 页面上发现 {len(all_mentions)} 个mention相关元素")
-                for i, mention in enumerate(all_mentions[:3]):  # 只显示前3个避免日志过多
-                    try:
-                        logger.debug(f"  元素{i+1}: class='{mention.get_attribute('class')}', text='{mention.text[:50]}'")
-                    except:
-                        pass
-            
-            # 方法1: 最宽松的验证 - 检查是否页面上有包含话题的任何元素
-            broad_search_patterns = [
-                f"//*[contains(text(), '{topic}')]",
-                f"//*[contains(text(), '#{topic}')]",
-                f"//*[contains(text(), '{topic}[话题]')]",
-                f"//*[contains(@data-topic, '{topic}')]"
-            ]
-            
-            for pattern in broad_search_patterns:
-                try:
-                    elements = driver.find_elements(By.XPATH, pattern)
-                    if elements:
-                        logger.debug(f"✅ 宽松验证成功：找到 {len(elements)} 个包含 '{topic}' 的元素")
-                        
-                        # 进一步检查是否是真正的话题元素
-                        for element in elements:
-                            try:
-                                class_name = element.get_attribute('class') or ''
-                                if 'mention' in class_name.lower() or element.get_attribute('data-topic'):
-                                    logger.debug(f"✅ 话题 '{topic}' 验证成功 - 找到有效mention元素")
-                                    return True
-                            except:
-                                continue
-                except:
-                    continue
+            # 方法1: 最宽松的验证 - 检查是否页面上有包含话题的mention元素
+            if await browser.run(self._find_topic_mention, driver, topic):
+                logger.debug(f"✅ 话题 '{topic}' 验证成功 - 找到有效mention元素")
+                return True
             
             # 方法2: 检查编辑器内容是否包含话题文本
             try:
                 content_editor = await self._find_content_editor()
                 if content_editor:
-                    editor_text = content_editor.text or ''
+                    editor_text = await browser.run(lambda: content_editor.text or '')
                     if topic in editor_text or f'#{topic}' in editor_text:
                         logger.debug(f"✅ 话题 '{topic}' 在编辑器文本中找到")
                         
@@ -673,7 +655,7 @@ class XHSContentFiller(IContentFiller):
             
             # 方法3: 检查页面源码是否包含话题相关内容
             try:
-                page_source = driver.page_source
+                page_source = await browser.page_source()
                 if f'data-topic' in page_source and topic in page_source:
                     logger.debug(f"✅ 话题 '{topic}' 在页面源码中发现data-topic")
                     return True
@@ -687,6 +669,53 @@ class XHSContentFiller(IContentFiller):
             logger.warning(f"⚠️ 验证话题 '{topic}' 转换时出错: {e}")
             return False
     
+    @staticmethod
+    def _find_topic_mention(driver, topic: str) -> bool:
+        """
+        查找包含话题的mention元素（在浏览器线程中执行）
+        
+        Args:
+            driver: WebDriver实例
+            topic: 话题名
+        
+        Returns:
+            是否找到有效的mention元素
+        """
+        # 先获取页面上所有可能相关的元素进行调试
+        all_mentions = driver.find_elements(By.CSS_SELECTOR, 'a[class*="mention"], [class*="mention"], [data-topic]')
+        if all_mentions:
+            logger.debug(f"📊 页面上发现 {len(all_mentions)} 个mention相关元素")
+            for i, mention in enumerate(all_mentions[:3]):  # 只显示前3个避免日志过多
+                try:
+                    logger.debug(f"  元素{i+1}: class='{mention.get_attribute('class')}', text='{mention.text[:50]}'")
+                except:
+                    pass
+        
+        broad_search_patterns = [
+            f"//*[contains(text(), '{topic}')]",
+            f"//*[contains(text(), '#{topic}')]",
+            f"//*[contains(text(), '{topic}[话题]')]",
+            f"//*[contains(@data-topic, '{topic}')]"
+        ]
+        
+        for pattern in broad_search_patterns:
+            try:
+                elements = driver.find_elements(By.XPATH, pattern)
+                if elements:
+                    logger.debug(f"✅ 宽松验证成功：找到 {len(elements)} 个包含 '{topic}' 的元素")
+                    
+                    # 进一步检查是否是真正的话题元素
+                    for element in elements:
+                        try:
+                            class_name = element.get_attribute('class') or ''
+                            if 'mention' in class_name.lower() or element.get_attribute('data-topic'):
+                                return True
+                        except:
+                            continue
+            except:
+                continue
+        return False
+    
     async def get_current_topics(self) -> List[str]:
         """
         获取当前已添加的所有话题标签
@@ -698,6 +727,10 @@ class XHSContentFiller(IContentFiller):
         Returns:
             当前话题列表
         """
+        return await self.browser_manager.executor.run(self._read_current_topics)
+    
+    def _read_current_topics(self) -> List[str]:
+        """读取当前话题列表（在浏览器线程中执行）"""
         try:
             driver = self.browser_manager.driver
             topics = []
@@ -801,4 +834,4 @@ class XHSContentFiller(IContentFiller):
             
         except Exception as e:
             logger.warning(f"⚠️ 获取当前内容失败: {e}")
-            return {"error": str(e)} 
\ No newline at end of file
+            return {"error": str(e)} 
\ No newline at end of file
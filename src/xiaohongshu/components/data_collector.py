@@ -14,6 +14,7 @@ from ..data_collector import (
     collect_content_analysis_data,
     collect_fans_data
 )
+from ...core.browser_executor import run_in_browser
 from ...core.exceptions import handle_exception
 from ...utils.logger import get_logger
 
@@ -46,10 +47,8 @@ class XHSDataCollector:
         logger.info(f"🔍 开始采集账号概览数据: {date or '当前日期'}")
         
         try:
-            data = await collect_dashboard_data(
-                driver=self.browser_manager.driver,
-                date=date
-            )
+            driver = self.browser_manager.driver
+            data = await run_in_browser(driver, collect_dashboard_data, driver)
             
             logger.info("✅ 账号概览数据采集完成")
             return data
@@ -98,10 +97,8 @@ class XHSDataCollector:
         logger.info(f"👥 开始采集粉丝数据: {date or '当前日期'}")
         
         try:
-            data = await collect_fans_data(
-                driver=self.browser_manager.driver,
-                date=date
-            )
+            driver = self.browser_manager.driver
+            data = await run_in_browser(driver, collect_fans_data, driver)
             
             logger.info("✅ 粉丝数据采集完成")
             return data
@@ -187,4 +184,4 @@ class XHSDataCollector:
             datetime.strptime(date, '%Y-%m-%d')
             return True
         except ValueError:
-            return False 
\ No newline at end of file
+            return False 
\ No newline at end of file
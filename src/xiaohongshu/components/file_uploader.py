@@ -4,11 +4,11 @@
 专门负责文件上传处理，遵循单一职责原则
 """
 
-import asyncio
 import os
-from typing import List
+import asyncio
+import time
+from typing import Any, Callable, List, Optional
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
@@ -16,23 +16,222 @@ from ..interfaces import IFileUploader, IBrowserManager
 from ..constants import (XHSConfig, XHSSelectors, XHSMessages, 
                         get_file_upload_selectors, is_supported_image_format, 
                         is_supported_video_format)
+from ...core.dom_waiter import DomCondition, DomWaiter, WaitBudget
 from ...core.exceptions import PublishError, handle_exception
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 上传进度的采样间隔（秒）
+PROGRESS_SAMPLE_INTERVAL = 1.0
+
+# 两次上报上传进度的最小间隔（秒），避免频繁更新任务状态
+PROGRESS_REPORT_INTERVAL = 2.0
+
+# 除<progress>和role=progressbar外，可能显示上传进度的元素
+PROGRESS_SELECTORS = [
+    XHSSelectors.UPLOAD_PROGRESS,
+    "[class*='progress']",
+    "[class*='uploading']"
+]
+
+# 页面内读取上传进度的脚本：收集所有可见进度条的百分比
+# （<progress>的value/max、aria-valuenow、样式宽度百分比、文字中的百分比），返回平均值
+UPLOAD_PROGRESS_SCRIPT = """
+var selectors = arguments[0];
+var seen = new Set();
+var values = [];
+
+function isVisible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+
+function add(el, value) {
+    if (seen.has(el) || !isFinite(value)) return;
+    seen.add(el);
+    values.push(Math.max(0, Math.min(100, value)));
+}
+
+document.querySelectorAll('progress').forEach(function(el) {
+    if (isVisible(el) && el.max) add(el, el.value / el.max * 100);
+});
+document.querySelectorAll('[role="progressbar"]').forEach(function(el) {
+    var now = parseFloat(el.getAttribute('aria-valuenow'));
+    var max = parseFloat(el.getAttribute('aria-valuemax')) || 100;
+    if (isVisible(el) && !isNaN(now)) add(el, now / max * 100);
+});
+selectors.forEach(function(selector) {
+    document.querySelectorAll(selector).forEach(function(el) {
+        if (seen.has(el) || !isVisible(el)) return;
+        var width = el.style && el.style.width;
+        if (width && width.slice(-1) === '%') {
+            add(el, parseFloat(width));
+            return;
+        }
+        var match = (el.innerText || '').match(/(\\d{1,3}(?:\\.\\d+)?)\\s*%/);
+        if (match) add(el, parseFloat(match[1]));
+    });
+});
+
+if (!values.length) return null;
+var total = values.reduce(function(sum, value) { return sum + value; }, 0);
+return {bars: values.length, percent: total / values.length};
+"""
+
+
+def sample_upload_progress(driver) -> Optional[dict]:
+    """
+    读取页面上的上传进度（在浏览器线程中执行）
+    
+    Returns:
+        Optional[dict]: {bars: 进度条数量, percent: 平均百分比}，页面上没有进度条时返回None
+    """
+    return driver.execute_script(UPLOAD_PROGRESS_SCRIPT, PROGRESS_SELECTORS)
+
+
+class UploadProgressMonitor:
+    """
+    上传进度监视器
+    
+    在等待上传完成期间于后台定期采样页面上的上传进度，按限定频率通过回调上报进度和预计剩余时间。
+    进度条全部走完或出现后又消失、或ready_check返回真值时视为上传完成，上报100%并结束采样。
+    
+    使用方式:
+        async with UploadProgressMonitor(browser_manager, callback) as monitor:
+            await monitor.wait_complete(timeout=60)
+    """
+    
+    def __init__(self, browser_manager: IBrowserManager,
+                 callback: Optional[Callable[[int, Optional[int]], None]],
+                 sample_interval: float = PROGRESS_SAMPLE_INTERVAL,
+                 report_interval: float = PROGRESS_REPORT_INTERVAL,
+                 ready_check: Optional[Callable[[Any], bool]] = None):
+        """
+        初始化上传进度监视器
+        
+        Args:
+            browser_manager: 浏览器管理器
+            callback: 进度回调，参数为(百分比, 预计剩余秒数)，为None时只判断上传是否完成
+            sample_interval: 采样间隔（秒）
+            report_interval: 两次上报的最小间隔（秒）
+            ready_check: 接收driver的函数（在浏览器线程中执行），返回真值表示上传已完成
+        """
+        self.browser_manager = browser_manager
+        self.callback = callback
+        self.sample_interval = sample_interval
+        self.report_interval = report_interval
+        self.ready_check = ready_check
+        self.percent = 0
+        self.completed = asyncio.Event()
+        self._seen_bars = False
+        self._task: Optional[asyncio.Task] = None
+    
+    async def __aenter__(self) -> 'UploadProgressMonitor':
+        self._task = asyncio.create_task(self._run())
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    async def wait_complete(self, timeout: float) -> bool:
+        """
+        等待上传完成
+        
+        Args:
+            timeout: 超时时间（秒）
+        
+        Returns:
+            bool: 是否在超时前完成
+        """
+        try:
+            await asyncio.wait_for(self.completed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def mark_complete(self) -> None:
+        """标记上传完成（由调用方通过其他方式确认时调用），上报100%"""
+        if self.completed.is_set():
+            return
+        self.completed.set()
+        self.percent = 100
+        self._report(100, 0)
+    
+    def _report(self, percent: int, eta_seconds: Optional[int]) -> None:
+        """通过回调上报进度"""
+        if self.callback is None:
+            return
+        try:
+            self.callback(percent, eta_seconds)
+        except Exception as e:
+            logger.warning(f"⚠️ 上报上传进度失败: {e}")
+    
+    def _estimate_eta(self, started: float, percent: float) -> Optional[int]:
+        """按已用时间和当前进度线性估算剩余秒数"""
+        if percent <= 0:
+            return None
+        elapsed = time.monotonic() - started
+        return int(elapsed * (100 - percent) / percent)
+    
+    def _is_finished(self, sample: Optional[dict]) -> bool:
+        """根据采样判断上传是否完成：进度条全部走完，或出现过的进度条已全部消失"""
+        if sample:
+            self._seen_bars = True
+            return sample['percent'] >= 100
+        return self._seen_bars
+    
+    async def _run(self) -> None:
+        """采样循环"""
+        driver = self.browser_manager.driver
+        browser = self.browser_manager.executor
+        started = time.monotonic()
+        last_report = 0.0
+        reported_percent = -1
+        
+        while not self.completed.is_set():
+            await asyncio.sleep(self.sample_interval)
+            try:
+                sample = await browser.run(sample_upload_progress, driver)
+                ready = self.ready_check is not None and await browser.run(self.ready_check, driver)
+            except Exception as e:
+                logger.debug(f"读取上传进度失败: {e}")
+                continue
+            
+            if ready or self._is_finished(sample):
+                self.mark_complete()
+                return
+            if not sample:
+                continue
+            
+            # 多个文件的进度条完成后会陆续消失，进度只增不减
+            self.percent = max(self.percent, min(99, int(sample['percent'])))
+            now = time.monotonic()
+            if self.callback is None or self.percent == reported_percent or now - last_report < self.report_interval:
+                continue
+            
+            last_report, reported_percent = now, self.percent
+            self._report(self.percent, self._estimate_eta(started, self.percent))
+
 
 class XHSFileUploader(IFileUploader):
     """小红书文件上传器"""
     
-    def __init__(self, browser_manager: IBrowserManager):
+    def __init__(self, browser_manager: IBrowserManager,
+                 progress_callback: Optional[Callable[[int, Optional[int]], None]] = None):
         """
         初始化文件上传器
         
         Args:
             browser_manager: 浏览器管理器
+            progress_callback: 上传进度回调，参数为(百分比, 预计剩余秒数)
         """
         self.browser_manager = browser_manager
+        self.progress_callback = progress_callback
     
     @handle_exception
     async def upload_files(self, files: List[str], file_type: str) -> bool:
@@ -121,19 +320,19 @@ class XHSFileUploader(IFileUploader):
         Returns:
             文件输入元素，如果未找到返回None
         """
-        driver = self.browser_manager.driver
-        wait = WebDriverWait(driver, XHSConfig.DEFAULT_WAIT_TIME)
+        browser = self.browser_manager.executor
         
         # 尝试多个选择器
         for selector in get_file_upload_selectors():
             try:
                 logger.debug(f"🔍 尝试选择器: {selector}")
-                file_input = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                file_input = await browser.wait_until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector)),
+                    XHSConfig.DEFAULT_WAIT_TIME
                 )
                 
                 # 验证元素是否可用
-                if file_input and file_input.is_enabled():
+                if file_input and await browser.run(file_input.is_enabled):
                     logger.info(f"✅ 找到文件上传控件: {selector}")
                     return file_input
                     
@@ -168,10 +367,13 @@ class XHSFileUploader(IFileUploader):
             logger.debug(f"文件列表: {files_string}")
             
             # 发送文件路径到输入控件
-            file_input.send_keys(files_string)
+            await self.browser_manager.executor.send_keys(file_input, files_string)
             
-            # 等待上传完成
-            success = await self._wait_for_upload_completion(file_type)
+            # 等待上传完成，同时上报页面上的上传进度
+            async with UploadProgressMonitor(self.browser_manager, self.progress_callback) as monitor:
+                success = await self._wait_for_upload_completion(file_type)
+                if success:
+                    monitor.mark_complete()
             
             if success:
                 logger.info(f"✅ {file_type}文件上传成功")
@@ -195,55 +397,37 @@ class XHSFileUploader(IFileUploader):
             上传是否成功完成
         """
         driver = self.browser_manager.driver
+        browser = self.browser_manager.executor
         
         # 根据文件类型设置不同的等待时间
         if file_type == "video":
             max_wait_time = XHSConfig.VIDEO_PROCESSING_TIME
-            check_interval = 5
         else:
             max_wait_time = XHSConfig.FILE_UPLOAD_TIME
-            check_interval = 2
         
-        waited_time = 0
+        # 同时等待成功和错误标识，页面出现任一标识时立即返回
+        conditions = [
+            DomCondition.of_css(XHSSelectors.UPLOAD_SUCCESS),
+            DomCondition.of_css(XHSSelectors.UPLOAD_ERROR)
+        ]
+        if file_type == "video":
+            # 视频处理完成标识（仅视频文件）
+            conditions.append(DomCondition.of_css(XHSSelectors.VIDEO_COMPLETE))
         
-        while waited_time < max_wait_time:
-            try:
-                # 检查上传成功标识
-                success_elements = driver.find_elements(By.CSS_SELECTOR, XHSSelectors.UPLOAD_SUCCESS)
-                if success_elements and any(elem.is_displayed() for elem in success_elements):
-                    logger.info("✅ 检测到上传成功标识")
-                    return True
-                
-                # 检查上传错误标识
-                error_elements = driver.find_elements(By.CSS_SELECTOR, XHSSelectors.UPLOAD_ERROR)
-                if error_elements and any(elem.is_displayed() for elem in error_elements):
-                    logger.error("❌ 检测到上传错误标识")
-                    return False
-                
-                # 检查视频处理完成标识（仅视频文件）
-                if file_type == "video":
-                    complete_elements = driver.find_elements(By.CSS_SELECTOR, XHSSelectors.VIDEO_COMPLETE)
-                    if complete_elements and any(elem.is_displayed() for elem in complete_elements):
-                        logger.info("✅ 视频处理完成")
-                        return True
-                    
-                    # 检查视频处理中标识
-                    processing_elements = driver.find_elements(By.CSS_SELECTOR, XHSSelectors.VIDEO_PROCESSING)
-                    if processing_elements and any(elem.is_displayed() for elem in processing_elements):
-                        logger.info("🔄 视频处理中...")
-                
-                # 等待检查间隔
-                await asyncio.sleep(check_interval)
-                waited_time += check_interval
-                
-                # 每10秒打印一次进度
-                if waited_time % 10 == 0:
-                    logger.info(f"⏳ 上传进行中... 已等待{waited_time}秒")
-                
-            except Exception as e:
-                logger.warning(f"⚠️ 检查上传状态时出错: {e}")
-                await asyncio.sleep(check_interval)
-                waited_time += check_interval
+        logger.info(f"⏳ 等待上传完成（最长{max_wait_time}秒）...")
+        try:
+            index = await DomWaiter(browser, WaitBudget(max_wait_time)).wait_for(conditions)
+            if index == 0:
+                logger.info("✅ 检测到上传成功标识")
+                return True
+            if index == 1:
+                logger.error("❌ 检测到上传错误标识")
+                return False
+            if index == 2:
+                logger.info("✅ 视频处理完成")
+                return True
+        except Exception as e:
+            logger.warning(f"⚠️ 检查上传状态时出错: {e}")
         
         # 超时后的最后检查
         logger.warning(f"⏰ 等待上传超时({max_wait_time}秒)，进行最后检查...")
@@ -251,8 +435,7 @@ class XHSFileUploader(IFileUploader):
         try:
             # 通过页面状态判断是否成功
             # 如果页面没有明显的错误提示，则认为上传成功
-            error_elements = driver.find_elements(By.CSS_SELECTOR, XHSSelectors.UPLOAD_ERROR)
-            if not error_elements or not any(elem.is_displayed() for elem in error_elements):
+            if not await browser.run(self._is_visible, driver, XHSSelectors.UPLOAD_ERROR):
                 logger.info("✅ 未发现错误标识，认为上传成功")
                 return True
         except Exception as e:
@@ -261,6 +444,12 @@ class XHSFileUploader(IFileUploader):
         logger.error("❌ 上传超时失败")
         return False
     
+    @staticmethod
+    def _is_visible(driver, selector: str) -> bool:
+        """选择器是否匹配到可见元素（在浏览器线程中执行）"""
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        return any(elem.is_displayed() for elem in elements)
+    
     def get_upload_progress(self) -> dict:
         """
         获取上传进度信息
@@ -269,23 +458,13 @@ class XHSFileUploader(IFileUploader):
             包含上传进度信息的字典
         """
         try:
-            driver = self.browser_manager.driver
-            
-            # 查找进度条元素
-            progress_elements = driver.find_elements(By.CSS_SELECTOR, XHSSelectors.UPLOAD_PROGRESS)
+            sample = sample_upload_progress(self.browser_manager.driver)
             
-            if progress_elements:
-                progress_element = progress_elements[0]
-                
-                # 尝试获取进度值
-                progress_value = progress_element.get_attribute("value") or "0"
-                progress_text = progress_element.text or "上传中..."
-                
+            if sample:
                 return {
                     "has_progress": True,
-                    "value": progress_value,
-                    "text": progress_text,
-                    "visible": progress_element.is_displayed()
+                    "percent": round(sample['percent'], 1),
+                    "bars": sample['bars']
                 }
             else:
                 return {
@@ -298,4 +477,4 @@ class XHSFileUploader(IFileUploader):
             return {
                 "has_progress": False,
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
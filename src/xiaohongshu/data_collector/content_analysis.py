@@ -7,6 +7,8 @@
 3. 观众分析数据：性别分布、年龄分布、城市分布、兴趣分布
 """
 
+import asyncio
+import os
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List
@@ -20,8 +22,13 @@ from .utils import (
     clean_number, wait_for_element, extract_text_safely, 
     find_element_by_selectors, wait_for_page_load, safe_click, scroll_to_element
 )
+from .network_capture import NetworkCapture, start_capture, parse_note_list
+from src.core.browser_executor import get_browser_executor
 from src.utils.logger import get_logger
 from src.data.storage_manager import get_storage_manager
+from src.data.records import NoteAnalyticsRecord
+from src.data.note_fingerprints import NoteFingerprintStore
+from src.data.collection_checkpoint import CollectionCheckpoint
 
 logger = get_logger(__name__)
 
@@ -59,6 +66,127 @@ COLUMN_MAPPING = {
     11: 'actions'         # 操作列（包含详情数据按钮）
 }
 
+# 数值列（清理并转换为整数）
+NUMERIC_FIELDS = ['exposure', 'views', 'likes', 'comments',
+                  'collects', 'fans_growth', 'shares', 'danmu_count']
+
+# 表头行关键字
+HEADER_KEYWORDS = ['笔记基础信息', '曝光', '观看', '点赞', '评论', '收藏', '涨粉', '分享', '操作']
+
+# 单元格、标题、发布时间、详情按钮的选择器（逐个元素查找和批量脚本共用）
+CELL_SELECTORS = ['td', '.d-table__cell', '.el-table__cell', '[class*="cell"]']
+TITLE_SELECTORS = ['.note-title', '.note-header span', '.note-info-content .note-header']
+TIME_SELECTORS = ['.time', '.publish-time', '.note-info-content .time']
+DETAIL_BUTTON_SELECTORS = ['.note-detail', 'span.note-detail', '[class*="note-detail"]', '[class*="detail"]']
+
+# 批量采集脚本：一次execute_script读取当前页整张表格，返回每行的标题、发布时间、
+# 所有单元格文本和详情按钮元素，避免逐行逐单元格的WebDriver往返
+SCRAPE_TABLE_SCRIPT = """
+var rowSelectors = arguments[0], cellSelectors = arguments[1], titleSelectors = arguments[2],
+    timeSelectors = arguments[3], buttonSelectors = arguments[4], headerKeywords = arguments[5];
+
+function isVisible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+
+function textOf(el) {
+    return el && isVisible(el) ? (el.innerText || '').trim() : '';
+}
+
+function firstText(root, selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var text = textOf(root.querySelector(selectors[i]));
+        if (text) return text;
+    }
+    return '';
+}
+
+function findButton(root) {
+    for (var i = 0; i < buttonSelectors.length; i++) {
+        var button = root.querySelector(buttonSelectors[i]);
+        if (button && isVisible(button)) return button;
+    }
+    var nodes = root.querySelectorAll('*');
+    for (var j = 0; j < nodes.length; j++) {
+        var own = Array.prototype.some.call(nodes[j].childNodes, function(n) {
+            return n.nodeType === 3 && n.textContent.indexOf('详情') >= 0;
+        });
+        if (own && isVisible(nodes[j])) return nodes[j];
+    }
+    return null;
+}
+
+var rows = [];
+for (var i = 0; i < rowSelectors.length; i++) {
+    rows = document.querySelectorAll(rowSelectors[i]);
+    if (rows.length) break;
+}
+
+var result = [];
+for (var r = 0; r < rows.length; r++) {
+    var rowText = textOf(rows[r]);
+    if (!rowText) continue;
+    if (headerKeywords.some(function(k) { return rowText.indexOf(k) >= 0; })) continue;
+
+    var cells = [];
+    for (var c = 0; c < cellSelectors.length; c++) {
+        cells = rows[r].querySelectorAll(cellSelectors[c]);
+        if (cells.length) break;
+    }
+    var first = cells.length ? cells[0] : null;
+    var last = cells.length ? cells[cells.length - 1] : null;
+    result.push({
+        cells: Array.prototype.map.call(cells, textOf),
+        title: first ? firstText(first, titleSelectors) : '',
+        publish_time: first ? firstText(first, timeSelectors) : '',
+        detail_button: last ? findButton(last) : null
+    });
+}
+return result;
+"""
+
+# 详情页字段及未采集到时的默认值
+DETAIL_DEFAULTS = {
+    # 观众来源数据
+    "source_recommend": "0%",
+    "source_search": "0%", 
+    "source_follow": "0%",
+    "source_other": "0%",
+    # 观众分析数据
+    "gender_male": "0%",
+    "gender_female": "0%",
+    "age_18_24": "0%",
+    "age_25_34": "0%",
+    "age_35_44": "0%",
+    "age_45_plus": "0%",
+    "city_top1": "",
+    "city_top2": "",
+    "city_top3": "",
+    "interest_top1": "",
+    "interest_top2": "",
+    "interest_top3": ""
+}
+
+# 详情页新标签打开后的加载等待（秒），同一批标签共用一次等待
+DETAIL_PAGE_LOAD_WAIT = 3
+
+# 点击详情按钮后等待新标签出现的最长时间（秒）
+NEW_TAB_TIMEOUT = 3
+
+# 按标题查找详情按钮的脚本（一次调用代替逐行读取文本）
+FIND_DETAIL_BUTTON_SCRIPT = """
+var title = arguments[0], buttonSelectors = arguments[1];
+var rows = document.querySelectorAll('tr');
+for (var r = 0; r < rows.length; r++) {
+    if ((rows[r].innerText || '').indexOf(title) < 0) continue;
+    for (var i = 0; i < buttonSelectors.length; i++) {
+        var button = rows[r].querySelector(buttonSelectors[i]);
+        if (button && (button.offsetWidth || button.offsetHeight)) return button;
+    }
+}
+return null;
+"""
+
 
 async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] = None, 
                                  limit: int = 50, save_data: bool = True) -> Dict[str, Any]:
@@ -76,23 +204,46 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
     """
     logger.info("📊 开始采集内容分析数据...")
     
+    # WebDriver调用都在浏览器会话的专用线程中执行，不阻塞事件循环
+    browser = get_browser_executor(driver)
+    
     # 导航到内容分析页面
     content_url = "https://creator.xiaohongshu.com/statistics/data-analysis"
     try:
-        driver.get(content_url)
+        # 启用接口响应捕获时，在打开页面前开始记录
+        capture = await browser.run(start_capture, driver)
+        
+        await browser.get(content_url)
         logger.info(f"📍 访问内容分析页面: {content_url}")
         
         # 等待页面加载
-        if not wait_for_page_load(driver, timeout=30):
+        if not await browser.run(wait_for_page_load, driver, timeout=30):
             logger.warning("⚠️ 页面加载超时，继续尝试采集")
         
         # 增加等待时间，确保数据完全加载
-        time.sleep(10)  # 从5秒增加到10秒
+        await asyncio.sleep(10)  # 从5秒增加到10秒
         
     except Exception as e:
         logger.error(f"❌ 访问内容分析页面失败: {e}")
         return {"success": False, "error": str(e)}
     
+    return await browser.run(_collect_content_data, driver, limit, save_data, capture)
+
+
+def _collect_content_data(driver: WebDriver, limit: int, save_data: bool,
+                          capture: Optional[NetworkCapture] = None) -> Dict[str, Any]:
+    """
+    采集内容分析页面的笔记数据（同步执行，在浏览器线程中调用）
+    
+    Args:
+        driver: 已打开内容分析页面的WebDriver实例
+        limit: 最大采集笔记数量
+        save_data: 是否保存数据到存储
+        capture: 接口响应捕获，为空时从页面表格解析
+    
+    Returns:
+        包含内容分析数据的字典
+    """
     # 采集数据
     content_data = {
         "success": True,
@@ -127,7 +278,7 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
         
         # 逐页采集笔记列表数据和详情数据
         # 避免分页后元素引用失效的问题
-        enhanced_notes_data = _collect_notes_with_details_paginated(driver, limit)
+        enhanced_notes_data = _collect_notes_with_details_paginated(driver, limit, capture, save_data)
 
         content_data["notes"] = enhanced_notes_data
         
@@ -135,17 +286,7 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
         content_data["summary"] = _generate_summary(enhanced_notes_data)
         
         logger.info(f"✅ 内容分析数据采集完成，共采集 {len(enhanced_notes_data)} 篇笔记")
-        
-        # 保存数据到存储
-        if save_data and enhanced_notes_data:
-            try:
-                # 格式化数据用于存储
-                formatted_notes = _format_notes_for_storage(enhanced_notes_data)
-                storage_manager = get_storage_manager()
-                storage_manager.save_content_analysis_data(formatted_notes)
-                logger.info("💾 内容分析数据已保存到存储")
-            except Exception as e:
-                logger.error(f"❌ 保存内容分析数据时出错: {e}")
+        # 数据已在逐页采集过程中保存到存储
         
     except Exception as e:
         logger.error(f"❌ 采集内容分析数据时出错: {e}")
@@ -334,10 +475,129 @@ def _wait_for_table_data_refresh(driver: WebDriver, timeout: int = 10) -> bool:
         return False
 
 
-def _collect_current_page_notes(driver: WebDriver) -> List[Dict[str, Any]]:
+def _batch_scrape_enabled() -> bool:
+    """是否使用批量脚本采集表格（COLLECT_BATCH_SCRAPE，默认启用）"""
+    return os.getenv('COLLECT_BATCH_SCRAPE', 'true').lower() == 'true'
+
+
+def _collect_current_page_notes(driver: WebDriver, capture: Optional[NetworkCapture] = None) -> List[Dict[str, Any]]:
     """
     采集当前页面的笔记数据
 
+    启用接口响应捕获时直接解析当前页的接口数据；否则默认用一次execute_script读取整页表格，
+    脚本执行失败时回退到逐个元素查找
+
+    Args:
+        driver: WebDriver实例
+        capture: 接口响应捕获，为空时从页面表格解析
+
+    Returns:
+        当前页面的笔记数据列表
+    """
+    if capture is not None:
+        notes_data = capture.wait_for(parse_note_list, timeout=5)
+        if notes_data:
+            logger.debug(f"从接口响应读取到 {len(notes_data)} 条笔记")
+            return notes_data
+        logger.warning("⚠️ 接口响应中未找到笔记数据，使用页面解析")
+
+    if _batch_scrape_enabled():
+        try:
+            return _scrape_current_page_notes(driver)
+        except Exception as e:
+            logger.warning(f"⚠️ 批量采集表格失败，回退到逐个元素查找: {e}")
+
+    return _collect_current_page_notes_by_elements(driver)
+
+
+def _scrape_current_page_notes(driver: WebDriver) -> List[Dict[str, Any]]:
+    """
+    一次往返读取当前页整张表格，Python端只做解析
+
+    Returns:
+        当前页面的笔记数据列表
+    """
+    rows = driver.execute_script(
+        SCRAPE_TABLE_SCRIPT,
+        CONTENT_ANALYSIS_SELECTORS['note_rows'], CELL_SELECTORS, TITLE_SELECTORS,
+        TIME_SELECTORS, DETAIL_BUTTON_SELECTORS, HEADER_KEYWORDS
+    ) or []
+    logger.debug(f"批量读取到 {len(rows)} 行有效数据")
+
+    notes_data = []
+    for i, row in enumerate(rows):
+        note_data = _parse_scraped_row(row, i)
+        if note_data:
+            notes_data.append(note_data)
+            logger.debug(f"📝 笔记: {note_data.get('title', 'Unknown')[:20]}...")
+
+    return notes_data
+
+
+def _parse_scraped_row(row: Dict[str, Any], row_index: int) -> Optional[Dict[str, Any]]:
+    """
+    解析批量脚本返回的一行数据（字段与逐个元素查找的结果一致）
+
+    Args:
+        row: 脚本返回的行数据（cells、title、publish_time、detail_button）
+        row_index: 行序号
+
+    Returns:
+        笔记数据，没有标题时返回None
+    """
+    cells = row.get('cells') or []
+    if len(cells) < 3:  # 至少需要几列数据
+        logger.warning(f"⚠️ 行 {row_index} 单元格数量不足: {len(cells)}")
+        return None
+
+    note_data = {
+        "row_index": row_index,
+        "extract_time": datetime.now().isoformat()
+    }
+
+    for col_index, cell_text in enumerate(cells):
+        field_name = COLUMN_MAPPING.get(col_index, f"column_{col_index}")
+
+        if field_name == 'note_info':
+            title = row.get('title') or ''
+            publish_time = row.get('publish_time') or ''
+            if publish_time.startswith('发布于'):
+                publish_time = publish_time[3:]
+            # 备用方案：从整个单元格文本解析
+            if not title and cell_text:
+                if '发布于' in cell_text:
+                    parts = cell_text.split('发布于')
+                    title = parts[0]
+                    if len(parts) > 1:
+                        publish_time = parts[1]
+                else:
+                    title = cell_text
+            note_data['title'] = title.strip()
+            note_data['publish_time'] = publish_time.strip()
+
+        elif field_name == 'actions':
+            detail_button = row.get('detail_button')
+            note_data['has_detail_button'] = detail_button is not None
+            if detail_button is not None:
+                note_data['detail_button_element'] = detail_button
+
+        elif field_name in NUMERIC_FIELDS:
+            if cell_text:
+                note_data[field_name] = clean_number(cell_text)
+
+        elif field_name == 'cover_click_rate':
+            note_data[field_name] = cell_text if cell_text else '0%'
+
+        elif field_name == 'avg_watch_time':
+            note_data[field_name] = cell_text
+
+    return note_data if note_data.get('title') else None
+
+
+def _collect_current_page_notes_by_elements(driver: WebDriver) -> List[Dict[str, Any]]:
+    """
+    逐个元素查找采集当前页面的笔记数据（每行每个单元格各一次WebDriver调用）
+
     Returns:
         当前页面的笔记数据列表
     """
@@ -359,14 +619,13 @@ def _collect_current_page_notes(driver: WebDriver) -> List[Dict[str, Any]]:
             return notes_data
 
         # 过滤掉表头行
-        header_keywords = ['笔记基础信息', '曝光', '观看', '点赞', '评论', '收藏', '涨粉', '分享', '操作']
         filtered_rows = []
 
         for row in note_rows:
             try:
                 row_text = row.text.strip()
                 # 检查是否为表头行
-                is_header = any(keyword in row_text for keyword in header_keywords)
+                is_header = any(keyword in row_text for keyword in HEADER_KEYWORDS)
                 if not is_header and row_text:  # 不是表头且有内容
                     filtered_rows.append(row)
             except:
@@ -392,21 +651,30 @@ def _collect_current_page_notes(driver: WebDriver) -> List[Dict[str, Any]]:
     return notes_data
 
 
-def _collect_notes_with_details_paginated(driver: WebDriver, limit: int) -> List[Dict[str, Any]]:
+def _collect_notes_with_details_paginated(driver: WebDriver, limit: int,
+                                          capture: Optional[NetworkCapture] = None,
+                                          save_data: bool = False) -> List[Dict[str, Any]]:
     """
     逐页采集笔记列表数据和详情数据
 
     每采集完一页的列表数据后，立即采集该页笔记的详情数据，
     然后再跳转到下一页。这样可以避免分页后元素引用失效的问题。
 
+    每页完成后保存采集断点，并把截至当前的数据保存到存储；
+    同一天再次采集时从断点的下一页继续，全部完成后删除断点。
+
     Args:
         driver: WebDriver实例
         limit: 最大采集笔记数量
+        capture: 接口响应捕获，为空时从页面表格解析
+        save_data: 是否在每页完成后保存数据到存储
 
     Returns:
         包含详情数据的笔记列表
     """
     all_notes_data = []
+    fingerprints = _get_fingerprint_store()
+    checkpoint = _get_checkpoint()
 
     try:
         # 获取总页数
@@ -415,11 +683,23 @@ def _collect_notes_with_details_paginated(driver: WebDriver, limit: int) -> List
 
         current_page = 1
 
+        # 从当天的断点继续
+        saved = checkpoint.load() if checkpoint is not None else None
+        if saved and saved.get('page', 0) < total_pages:
+            resume_page = saved['page'] + 1
+            if _skip_to_page(driver, resume_page, capture):
+                all_notes_data = saved.get('notes', [])
+                current_page = resume_page
+                logger.info(f"⏩ 从断点继续：第 {resume_page} 页，已采集 {len(all_notes_data)} 条")
+            else:
+                logger.warning("⚠️ 无法跳转到断点页，重新开始采集")
+
+        completed = False
         while current_page <= total_pages and len(all_notes_data) < limit:
             logger.info(f"📄 正在采集第 {current_page}/{total_pages} 页...")
 
             # 采集当前页面的笔记列表数据
-            page_notes = _collect_current_page_notes(driver)
+            page_notes = _collect_current_page_notes(driver, capture)
 
             if page_notes:
                 # 计算还需要采集多少条
@@ -428,32 +708,50 @@ def _collect_notes_with_details_paginated(driver: WebDriver, limit: int) -> List
 
                 logger.info(f"✅ 第 {current_page} 页采集到 {len(page_notes)} 条笔记基础数据")
 
-                # 立即采集当前页笔记的详情数据
-                enhanced_page_notes = _enhance_notes_with_detail_data(driver, page_notes)
+                # 立即采集当前页笔记的详情数据（指标未变化的笔记沿用上次的详情）
+                enhanced_page_notes = _enhance_notes_incrementally(driver, page_notes, fingerprints)
                 all_notes_data.extend(enhanced_page_notes)
 
                 logger.info(f"✅ 第 {current_page} 页详情采集完成，累计 {len(all_notes_data)} 条")
+
+                # 保存截至当前页的数据（存储按天覆盖，每次保存当天的全部笔记）
+                if save_data:
+                    _save_notes(all_notes_data)
             else:
                 logger.warning(f"⚠️ 第 {current_page} 页未采集到数据")
 
+            if checkpoint is not None:
+                try:
+                    checkpoint.save(current_page, all_notes_data)
+                except Exception as e:
+                    logger.warning(f"⚠️ 保存采集断点失败: {e}")
+
             # 检查是否需要继续采集下一页
             if len(all_notes_data) >= limit:
                 logger.info(f"📊 已达到采集上限 {limit} 条")
+                completed = True
                 break
 
             if current_page < total_pages:
+                # 丢弃当前页的接口响应，下一页只解析翻页后的新响应
+                if capture is not None:
+                    capture.reset()
                 # 跳转到下一页
                 if _go_to_next_page(driver):
                     # 等待数据刷新
                     _wait_for_table_data_refresh(driver)
                     current_page += 1
                 else:
-                    logger.warning("⚠️ 无法跳转到下一页，停止采集")
+                    logger.warning("⚠️ 无法跳转到下一页，停止采集（下次采集从断点继续）")
                     break
             else:
                 # 已经是最后一页
+                completed = True
                 break
 
+        if completed and checkpoint is not None:
+            checkpoint.clear()
+
         logger.info(f"📊 笔记采集完成，共 {len(all_notes_data)} 条（含详情数据）")
 
     except Exception as e:
@@ -462,13 +760,52 @@ def _collect_notes_with_details_paginated(driver: WebDriver, limit: int) -> List
     return all_notes_data
 
 
-def _collect_notes_list_data(driver: WebDriver, limit: int) -> List[Dict[str, Any]]:
+def _get_checkpoint() -> Optional[CollectionCheckpoint]:
+    """获取内容分析采集断点（COLLECTION_CHECKPOINT=false时不启用）"""
+    if os.getenv('COLLECTION_CHECKPOINT', 'true').lower() != 'true':
+        return None
+    try:
+        return get_storage_manager().get_collection_checkpoint('content_analysis')
+    except Exception as e:
+        logger.warning(f"⚠️ 加载采集断点失败，本次不保存断点: {e}")
+        return None
+
+
+def _skip_to_page(driver: WebDriver, page: int, capture: Optional[NetworkCapture] = None) -> bool:
+    """
+    从第1页逐页翻到指定页（只翻页，不采集）
+
+    Returns:
+        是否成功到达指定页
+    """
+    for _ in range(page - 1):
+        if capture is not None:
+            capture.reset()
+        if not _go_to_next_page(driver):
+            return False
+        _wait_for_table_data_refresh(driver)
+    return True
+
+
+def _save_notes(notes_data: List[Dict[str, Any]]) -> None:
+    """保存笔记数据到存储"""
+    try:
+        formatted_notes = _format_notes_for_storage(notes_data)
+        get_storage_manager().save_content_analysis_data(formatted_notes)
+        logger.info(f"💾 已保存 {len(formatted_notes)} 条内容分析数据")
+    except Exception as e:
+        logger.error(f"❌ 保存内容分析数据时出错: {e}")
+
+
+def _collect_notes_list_data(driver: WebDriver, limit: int,
+                             capture: Optional[NetworkCapture] = None) -> List[Dict[str, Any]]:
     """
     采集笔记列表数据（支持分页，不含详情）
 
     Args:
         driver: WebDriver实例
         limit: 最大采集笔记数量
+        capture: 接口响应捕获，为空时从页面表格解析
 
     Returns:
         笔记数据列表
@@ -486,7 +823,7 @@ def _collect_notes_list_data(driver: WebDriver, limit: int) -> List[Dict[str, An
             logger.info(f"📄 正在采集第 {current_page}/{total_pages} 页...")
 
             # 采集当前页面数据
-            page_notes = _collect_current_page_notes(driver)
+            page_notes = _collect_current_page_notes(driver, capture)
 
             if page_notes:
                 # 计算还需要采集多少条
@@ -504,6 +841,9 @@ def _collect_notes_list_data(driver: WebDriver, limit: int) -> List[Dict[str, An
                 break
 
             if current_page < total_pages:
+                # 丢弃当前页的接口响应，下一页只解析翻页后的新响应
+                if capture is not None:
+                    capture.reset()
                 # 跳转到下一页
                 if _go_to_next_page(driver):
                     # 等待数据刷新
@@ -543,8 +883,7 @@ def _extract_note_info_from_cell(cell) -> Dict[str, str]:
 
     try:
         # 尝试使用精确选择器提取标题
-        title_selectors = ['.note-title', '.note-header span', '.note-info-content .note-header']
-        for selector in title_selectors:
+        for selector in TITLE_SELECTORS:
             try:
                 title_elem = cell.find_element(By.CSS_SELECTOR, selector)
                 if title_elem:
@@ -556,8 +895,7 @@ def _extract_note_info_from_cell(cell) -> Dict[str, str]:
                 continue
 
         # 尝试使用精确选择器提取发布时间
-        time_selectors = ['.time', '.publish-time', '.note-info-content .time']
-        for selector in time_selectors:
+        for selector in TIME_SELECTORS:
             try:
                 time_elem = cell.find_element(By.CSS_SELECTOR, selector)
                 if time_elem:
@@ -636,10 +974,9 @@ def _extract_note_data_from_row(row, row_index: int) -> Optional[Dict[str, Any]]
     """从表格行中提取笔记数据（基于实际DOM结构，共12列）"""
     try:
         # 查找行中的所有单元格
-        cell_selectors = ['td', '.d-table__cell', '.el-table__cell', '[class*="cell"]']
         cells = []
 
-        for selector in cell_selectors:
+        for selector in CELL_SELECTORS:
             cells = row.find_elements(By.CSS_SELECTOR, selector)
             if cells:
                 logger.debug(f"使用选择器 {selector} 找到 {len(cells)} 个单元格")
@@ -675,8 +1012,7 @@ def _extract_note_data_from_row(row, row_index: int) -> Optional[Dict[str, Any]]
                         note_data['has_detail_button'] = False
                         logger.debug(f"⚠️ 行 {row_index} 未找到详情按钮")
 
-                elif field_name in ['exposure', 'views', 'likes', 'comments',
-                                    'collects', 'fans_growth', 'shares', 'danmu_count']:
+                elif field_name in NUMERIC_FIELDS:
                     # 数值列，清理并转换为整数
                     cell_text = extract_text_safely(cell)
                     if cell_text:
@@ -704,12 +1040,229 @@ def _extract_note_data_from_row(row, row_index: int) -> Optional[Dict[str, Any]]
         return None
 
 
+def _get_fingerprint_store() -> Optional[NoteFingerprintStore]:
+    """获取笔记指纹表（INCREMENTAL_DETAIL_COLLECTION=false时不启用增量采集）"""
+    if os.getenv('INCREMENTAL_DETAIL_COLLECTION', 'true').lower() != 'true':
+        return None
+    try:
+        return get_storage_manager().get_note_fingerprints()
+    except Exception as e:
+        logger.warning(f"⚠️ 加载笔记指纹表失败，采集全部笔记详情: {e}")
+        return None
+
+
+def _enhance_notes_incrementally(driver: WebDriver, notes_data: List[Dict[str, Any]],
+                                 fingerprints: Optional[NoteFingerprintStore]) -> List[Dict[str, Any]]:
+    """
+    只为新笔记和列表指标有变化的笔记采集详情，其余笔记沿用上次采集的详情数据
+
+    Args:
+        driver: 已打开内容分析列表页的WebDriver实例
+        notes_data: 当前页的笔记列表数据
+        fingerprints: 笔记指纹表，为空时采集全部笔记详情
+
+    Returns:
+        与输入顺序一致的笔记数据
+    """
+    if fingerprints is None:
+        return _enhance_notes_with_detail_data(driver, notes_data)
+
+    threshold = float(os.getenv('DETAIL_REFRESH_THRESHOLD', '0.05'))
+    max_age_days = float(os.getenv('DETAIL_REFRESH_MAX_AGE_DAYS', '7'))
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(notes_data)
+    changed = []
+    for index, note in enumerate(notes_data):
+        detail = fingerprints.carried_detail(note, threshold, max_age_days)
+        if detail:
+            results[index] = _merge_detail(note, detail)
+        else:
+            changed.append(index)
+
+    logger.info(f"♻️ {len(notes_data) - len(changed)} 篇笔记指标未变化，沿用上次详情；{len(changed)} 篇需要采集详情")
+
+    if changed:
+        fresh_notes = _enhance_notes_with_detail_data(driver, [notes_data[index] for index in changed])
+        for index, enhanced_note in zip(changed, fresh_notes):
+            results[index] = enhanced_note
+
+        # 只记录成功采集到详情的笔记（全部为默认值说明详情页未能解析）
+        collected = [
+            note for note in fresh_notes
+            if any(note.get(field, default) != default for field, default in DETAIL_DEFAULTS.items())
+        ]
+        try:
+            fingerprints.record(collected, list(DETAIL_DEFAULTS))
+        except Exception as e:
+            logger.warning(f"⚠️ 保存笔记指纹失败: {e}")
+
+    return [note for note in results if note is not None]
+
+
+def _detail_concurrency() -> int:
+    """同时打开的详情页标签数（DETAIL_COLLECT_CONCURRENCY，默认3，1为逐篇采集）"""
+    return max(1, int(os.getenv('DETAIL_COLLECT_CONCURRENCY', '3')))
+
+
+def _detail_retries() -> int:
+    """单篇笔记详情采集失败后的重试次数（DETAIL_COLLECT_RETRIES，默认1）"""
+    return max(0, int(os.getenv('DETAIL_COLLECT_RETRIES', '1')))
+
+
 def _enhance_notes_with_detail_data(driver: WebDriver, notes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     为每篇笔记采集详细数据
 
+    并发数大于1时，每批同时在多个新标签中打开详情页，页面加载并行进行；
+    详情页不在新标签中打开时自动回退到逐篇采集
+
     注意：此函数只处理当前页面的笔记，每次采集详情后需要重新获取笔记列表元素
     """
+    concurrency = _detail_concurrency()
+    if concurrency > 1 and len(notes_data) > 1:
+        return _enhance_notes_in_tabs(driver, notes_data, concurrency, _detail_retries())
+    return _enhance_notes_one_by_one(driver, notes_data)
+
+
+def _enhance_notes_in_tabs(driver: WebDriver, notes_data: List[Dict[str, Any]],
+                           concurrency: int, retries: int) -> List[Dict[str, Any]]:
+    """
+    分批在多个标签中并行加载详情页并采集
+
+    Args:
+        driver: 已打开内容分析列表页的WebDriver实例
+        notes_data: 当前页的笔记列表数据
+        concurrency: 每批同时打开的标签数
+        retries: 单篇笔记失败后的重试次数
+
+    Returns:
+        与输入顺序一致的笔记数据（采集失败的笔记不含详情字段）
+    """
+    original_window = driver.current_window_handle
+    results: List[Optional[Dict[str, Any]]] = [None] * len(notes_data)
+    attempts = [0] * len(notes_data)
+    pending = list(range(len(notes_data)))
+
+    while pending:
+        batch, pending = pending[:concurrency], pending[concurrency:]
+        opened = []  # (笔记序号, 标签句柄)
+
+        # 依次点击本批笔记的详情按钮，详情页在各自标签中同时加载
+        for index in batch:
+            note = notes_data[index]
+            attempts[index] += 1
+            handle = _open_detail_tab(driver, note.get('title', ''))
+            if handle == original_window:
+                # 详情页在当前窗口打开，无法并行：本篇就地采集，其余笔记逐篇采集
+                logger.info("ℹ️ 详情页未在新标签中打开，改为逐篇采集")
+                results[index] = _merge_detail(note, _collect_detail_page_data(driver))
+                _return_to_list_page(driver)
+                for other_index, other_handle in opened:
+                    other_note = notes_data[other_index]
+                    results[other_index] = (_collect_detail_in_tab(driver, other_handle, original_window, other_note)
+                                            or _merge_detail(other_note, {}))
+                rest = batch[batch.index(index) + 1:] + pending
+                rest_notes = _enhance_notes_one_by_one(driver, [notes_data[j] for j in rest])
+                for j, enhanced_note in zip(rest, rest_notes):
+                    results[j] = enhanced_note
+                return [note for note in results if note is not None]
+            if handle:
+                opened.append((index, handle))
+            elif attempts[index] <= retries:
+                pending.append(index)
+            else:
+                logger.warning(f"⚠️ 笔记 {note.get('title')} 找不到详情按钮")
+                results[index] = _merge_detail(note, {})
+
+        if opened:
+            logger.info(f"📑 已同时打开 {len(opened)} 个详情页标签")
+            time.sleep(DETAIL_PAGE_LOAD_WAIT)
+
+        # 逐个标签采集并关闭
+        for index, handle in opened:
+            note = notes_data[index]
+            enhanced_note = _collect_detail_in_tab(driver, handle, original_window, note)
+            if enhanced_note is not None:
+                results[index] = enhanced_note
+            elif attempts[index] <= retries:
+                logger.info(f"🔁 笔记 {note.get('title')} 详情采集失败，稍后重试")
+                pending.append(index)
+            else:
+                results[index] = _merge_detail(note, {})
+
+    return [note for note in results if note is not None]
+
+
+def _open_detail_tab(driver: WebDriver, title: str) -> Optional[str]:
+    """
+    点击笔记的详情按钮并返回新打开的标签句柄
+
+    Returns:
+        新标签句柄；详情页在当前窗口打开时返回当前窗口句柄；未找到按钮或未打开页面时返回None
+    """
+    detail_button = _find_detail_button_by_title(driver, title)
+    if not detail_button:
+        return None
+
+    original_window = driver.current_window_handle
+    original_windows = set(driver.window_handles)
+    original_url = driver.current_url
+    try:
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", detail_button)
+        driver.execute_script("arguments[0].click();", detail_button)
+    except Exception as e:
+        logger.warning(f"⚠️ 点击详情数据按钮失败: {e}")
+        return None
+
+    deadline = time.monotonic() + NEW_TAB_TIMEOUT
+    while time.monotonic() < deadline:
+        new_windows = set(driver.window_handles) - original_windows
+        if new_windows:
+            return new_windows.pop()
+        if driver.current_url != original_url:
+            return original_window
+        time.sleep(0.2)
+    return None
+
+
+def _collect_detail_in_tab(driver: WebDriver, handle: str, original_window: str,
+                           note: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    切换到详情页标签采集数据，完成后关闭标签并切回列表页
+
+    Returns:
+        合并详情后的笔记数据，采集出错时返回None
+    """
+    try:
+        driver.switch_to.window(handle)
+        detail_data = _collect_detail_page_data(driver, load_wait=0)
+        return _merge_detail(note, detail_data)
+    except Exception as e:
+        logger.error(f"❌ 采集笔记 {note.get('title')} 详细数据时出错: {e}")
+        return None
+    finally:
+        try:
+            if driver.current_window_handle == handle:
+                driver.close()
+        except Exception:
+            pass
+        try:
+            driver.switch_to.window(original_window)
+        except Exception:
+            pass
+
+
+def _merge_detail(note: Dict[str, Any], detail_data: Dict[str, Any]) -> Dict[str, Any]:
+    """合并详情数据，并移除元素引用避免序列化问题"""
+    enhanced_note = {**note, **detail_data}
+    enhanced_note.pop('detail_button_element', None)
+    return enhanced_note
+
+
+def _enhance_notes_one_by_one(driver: WebDriver, notes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    逐篇打开详情页采集详细数据
+    """
     enhanced_notes = []
     original_window = driver.current_window_handle
 
@@ -799,6 +1352,12 @@ def _find_detail_button_by_title(driver: WebDriver, title: str):
     if not title:
         return None
 
+    if _batch_scrape_enabled():
+        try:
+            return driver.execute_script(FIND_DETAIL_BUTTON_SCRIPT, title, DETAIL_BUTTON_SELECTORS[:3])
+        except Exception as e:
+            logger.debug(f"批量查找详情按钮失败，回退到逐行查找: {e}")
+
     try:
         # 查找所有笔记行
         rows = driver.find_elements(By.CSS_SELECTOR, 'tr')
@@ -835,32 +1394,21 @@ def _find_detail_button_by_title(driver: WebDriver, title: str):
         return None
 
 
-def _collect_detail_page_data(driver: WebDriver) -> Dict[str, Any]:
-    """采集详情页面数据"""
-    detail_data = {
-        # 观众来源数据
-        "source_recommend": "0%",
-        "source_search": "0%", 
-        "source_follow": "0%",
-        "source_other": "0%",
-        # 观众分析数据
-        "gender_male": "0%",
-        "gender_female": "0%",
-        "age_18_24": "0%",
-        "age_25_34": "0%",
-        "age_35_44": "0%",
-        "age_45_plus": "0%",
-        "city_top1": "",
-        "city_top2": "",
-        "city_top3": "",
-        "interest_top1": "",
-        "interest_top2": "",
-        "interest_top3": ""
-    }
+def _collect_detail_page_data(driver: WebDriver, load_wait: float = 3) -> Dict[str, Any]:
+    """
+    采集详情页面数据
+
+    Args:
+        driver: 已打开详情页的WebDriver实例
+        load_wait: 采集前的页面加载等待（秒），批量打开的标签已统一等待过时传0
+    """
+    detail_data = dict(DETAIL_DEFAULTS)
     
     try:
         # 等待页面加载
-        time.sleep(3)
+        if load_wait > 0:
+            time.sleep(load_wait)
+        wait_for_page_load(driver, timeout=15)
         
         # 采集观众来源数据
         source_data = _collect_audience_source_data(driver)
@@ -1028,58 +1576,13 @@ def _return_to_list_page(driver: WebDriver) -> None:
         logger.warning(f"⚠️ 返回列表页面失败: {e}")
 
 
-def _format_notes_for_storage(notes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """格式化笔记数据用于存储"""
+def _format_notes_for_storage(notes_data: List[Dict[str, Any]]) -> List[NoteAnalyticsRecord]:
+    """将采集到的笔记数据转换为存储记录"""
     formatted_notes = []
     
     for note in notes_data:
         try:
-            # 提取基础字段
-            def get_field_value(field_name: str, default: Any = 0) -> Any:
-                value = note.get(field_name, default)
-                if isinstance(value, str) and value.isdigit():
-                    return int(value)
-                return value
-            
-            formatted_note = {
-                "timestamp": note.get("extract_time", datetime.now().isoformat()),
-                "title": note.get("title", ""),
-                "note_type": "图文",  # 默认类型，后续可以根据内容判断
-                "publish_time": note.get("publish_time", ""),
-                # 新增字段
-                "exposure": get_field_value("exposure"),
-                "cover_click_rate": note.get("cover_click_rate", "0%"),
-                # 原有字段
-                "views": get_field_value("views"),
-                "likes": get_field_value("likes"),
-                "comments": get_field_value("comments"),
-                "collects": get_field_value("collects"),
-                "shares": get_field_value("shares"),
-                "fans_growth": get_field_value("fans_growth"),
-                "avg_watch_time": note.get("avg_watch_time", ""),
-                "danmu_count": get_field_value("danmu_count"),
-                # 观众来源数据
-                "source_recommend": note.get("source_recommend", "0%"),
-                "source_search": note.get("source_search", "0%"),
-                "source_follow": note.get("source_follow", "0%"),
-                "source_other": note.get("source_other", "0%"),
-                # 观众分析数据
-                "gender_male": note.get("gender_male", "0%"),
-                "gender_female": note.get("gender_female", "0%"),
-                "age_18_24": note.get("age_18_24", "0%"),
-                "age_25_34": note.get("age_25_34", "0%"),
-                "age_35_44": note.get("age_35_44", "0%"),
-                "age_45_plus": note.get("age_45_plus", "0%"),
-                "city_top1": note.get("city_top1", ""),
-                "city_top2": note.get("city_top2", ""),
-                "city_top3": note.get("city_top3", ""),
-                "interest_top1": note.get("interest_top1", ""),
-                "interest_top2": note.get("interest_top2", ""),
-                "interest_top3": note.get("interest_top3", "")
-            }
-            
-            formatted_notes.append(formatted_note)
-            
+            formatted_notes.append(NoteAnalyticsRecord.from_note(note))
         except Exception as e:
             logger.warning(f"⚠️ 格式化笔记数据时出错: {e}")
             continue
@@ -15,8 +15,10 @@ from .utils import (
     clean_number, wait_for_element, extract_text_safely, 
     find_element_by_selectors, wait_for_page_load, wait_for_dashboard_data
 )
+from .network_capture import start_capture, parse_overview
 from src.utils.logger import get_logger
 from src.data.storage_manager import get_storage_manager
+from src.data.records import DashboardRecord
 
 logger = get_logger(__name__)
 
@@ -28,6 +30,9 @@ def collect_dashboard_data(driver, save_data=True):
     logger.info("开始采集仪表板数据...")
     
     try:
+        # 启用接口响应捕获时，在打开页面前开始记录
+        capture = start_capture(driver)
+        
         # 导航到仪表板页面
         driver.get("https://creator.xiaohongshu.com/new/home")
         wait_for_page_load(driver)
@@ -40,7 +45,7 @@ def collect_dashboard_data(driver, save_data=True):
         
         # 采集7天数据
         logger.info("开始采集7天维度数据...")
-        seven_day_data = _collect_dimension_data(driver, "7天")
+        seven_day_data = _collect_dimension_data(driver, "7天", capture)
         if seven_day_data:
             all_data.append(seven_day_data)
             logger.info(f"✅ 7天数据采集成功: 观看{seven_day_data.get('views', 0)}, 点赞{seven_day_data.get('likes', 0)}")
@@ -49,9 +54,12 @@ def collect_dashboard_data(driver, save_data=True):
         
         # 切换到30天维度并采集数据
         logger.info("开始切换到30天维度...")
+        if capture is not None:
+            # 丢弃7天维度的接口响应，只解析切换后的新响应
+            capture.reset()
         if _switch_to_30day_dimension(driver):
             logger.info("30天维度切换成功，开始采集30天数据...")
-            thirty_day_data = _collect_dimension_data(driver, "30天")
+            thirty_day_data = _collect_dimension_data(driver, "30天", capture)
             if thirty_day_data:
                 all_data.append(thirty_day_data)
                 logger.info(f"✅ 30天数据采集成功: 观看{thirty_day_data.get('views', 0)}, 点赞{thirty_day_data.get('likes', 0)}")
@@ -71,7 +79,7 @@ def collect_dashboard_data(driver, save_data=True):
         # 保存数据
         if save_data and all_data:
             storage_manager = get_storage_manager()
-            storage_manager.save_dashboard_data(all_data)
+            storage_manager.save_dashboard_data([DashboardRecord.from_dict(item) for item in all_data])
             logger.info(f"✅ 仪表板数据保存成功，共保存 {len(all_data)} 个维度的数据")
         
         return {
@@ -88,16 +96,20 @@ def collect_dashboard_data(driver, save_data=True):
             "data": []
         }
 
-def _collect_dimension_data(driver, dimension):
-    """采集指定维度的数据"""
+def _collect_dimension_data(driver, dimension, capture=None):
+    """采集指定维度的数据（启用接口响应捕获时优先解析接口数据）"""
     logger.info(f"采集{dimension}维度数据...")
     
     try:
-        # 等待数据加载完成
-        time.sleep(3)
-        
-        # 采集笔记总览数据
-        overview_data = _collect_overview_data(driver)
+        overview_data = capture.wait_for(parse_overview, timeout=5) if capture is not None else None
+        if overview_data:
+            logger.info(f"从接口响应读取笔记总览数据: {overview_data}")
+        else:
+            # 等待数据加载完成
+            time.sleep(3)
+            
+            # 采集笔记总览数据
+            overview_data = _collect_overview_data(driver)
         
         # 合并数据
         dashboard_data = {
@@ -21,7 +21,9 @@ from selenium.webdriver.remote.webdriver import WebDriver
 
 from src.utils.logger import get_logger
 from .utils import wait_for_fans_data, extract_text_safely
+from .network_capture import NetworkCapture, start_capture, parse_fans
 from src.data.storage_manager import get_storage_manager
+from src.data.records import FansRecord
 
 logger = get_logger(__name__)
 
@@ -40,13 +42,15 @@ def collect_fans_data(driver: WebDriver, save_data: bool = True) -> Dict[str, An
         # 访问粉丝数据页面
         fans_url = "https://creator.xiaohongshu.com/creator/fans"
         logger.info(f"📍 访问粉丝数据页面: {fans_url}")
+        # 启用接口响应捕获时，在打开页面前开始记录
+        capture = start_capture(driver)
         driver.get(fans_url)
         
         # 等待页面加载
         wait_for_fans_data(driver)
         
         # 采集两个维度的粉丝数据
-        fans_data["data"] = _collect_multi_dimension_fans_data(driver)
+        fans_data["data"] = _collect_multi_dimension_fans_data(driver, capture)
         
         if fans_data["data"]:
             fans_data["success"] = True
@@ -58,22 +62,23 @@ def collect_fans_data(driver: WebDriver, save_data: bool = True) -> Dict[str, An
         if save_data and fans_data["success"]:
             try:
                 storage_manager = get_storage_manager()
-                storage_data = []
-                for item in fans_data["data"]:
-                    storage_data.append({
-                        'timestamp': fans_data["collect_time"],
-                        'dimension': item.get('dimension', ''),
-                        'total_fans': item.get('total_fans', 0),
-                        'new_fans': item.get('new_fans', 0),
-                        'lost_fans': item.get('lost_fans', 0)
-                    })
+                storage_data = [
+                    FansRecord(
+                        timestamp=fans_data["collect_time"],
+                        dimension=item.get('dimension', ''),
+                        total_fans=item.get('total_fans', 0),
+                        new_fans=item.get('new_fans', 0),
+                        lost_fans=item.get('lost_fans', 0)
+                    )
+                    for item in fans_data["data"]
+                ]
                 
                 if storage_data:
                     storage_manager.save_fans_data(storage_data)
                     logger.info("💾 粉丝数据已保存到存储")
                     
                     for item in storage_data:
-                        logger.info(f"💾 {item['dimension']}维度: 总粉丝{item['total_fans']}, 新增{item['new_fans']}, 流失{item['lost_fans']}")
+                        logger.info(f"💾 {item.dimension}维度: 总粉丝{item.total_fans}, 新增{item.new_fans}, 流失{item.lost_fans}")
                 else:
                     logger.warning("⚠️ 没有有效的粉丝数据需要保存")
             except Exception as e:
@@ -86,22 +91,25 @@ def collect_fans_data(driver: WebDriver, save_data: bool = True) -> Dict[str, An
     
     return fans_data
 
-def _collect_multi_dimension_fans_data(driver: WebDriver) -> List[Dict[str, Any]]:
+def _collect_multi_dimension_fans_data(driver: WebDriver, capture: Optional[NetworkCapture] = None) -> List[Dict[str, Any]]:
     """采集多维度粉丝数据"""
     all_fans_data = []
     
     try:
         # 先采集7天维度的数据
         logger.info("📅 开始采集7天维度的粉丝数据")
-        seven_day_data = _collect_single_dimension_data(driver, '7天')
+        seven_day_data = _collect_single_dimension_data(driver, '7天', capture)
         if seven_day_data:
             all_fans_data.append(seven_day_data)
             logger.info("✅ 7天维度数据采集完成")
         
         # 尝试切换到30天维度
+        if capture is not None:
+            # 丢弃7天维度的接口响应，只解析切换后的新响应
+            capture.reset()
         if _switch_to_30day_dimension(driver):
             logger.info("📅 开始采集30天维度的粉丝数据")
-            thirty_day_data = _collect_single_dimension_data(driver, '30天')
+            thirty_day_data = _collect_single_dimension_data(driver, '30天', capture)
             if thirty_day_data:
                 all_fans_data.append(thirty_day_data)
                 logger.info("✅ 30天维度数据采集完成")
@@ -157,11 +165,18 @@ def _switch_to_30day_dimension(driver: WebDriver) -> bool:
         logger.error(f"❌ 切换到30天维度失败: {e}")
         return False
 
-def _collect_single_dimension_data(driver: WebDriver, dimension_name: str) -> Optional[Dict[str, Any]]:
-    """采集单个维度的粉丝数据"""
+def _collect_single_dimension_data(driver: WebDriver, dimension_name: str,
+                                   capture: Optional[NetworkCapture] = None) -> Optional[Dict[str, Any]]:
+    """采集单个维度的粉丝数据（启用接口响应捕获时优先解析接口数据）"""
     try:
         dimension_data = {'dimension': dimension_name}
         
+        api_data = capture.wait_for(parse_fans, timeout=5) if capture is not None else None
+        if api_data:
+            logger.debug(f"📊 {dimension_name}维度 从接口响应读取: {api_data}")
+            dimension_data.update(api_data)
+            return dimension_data
+        
         fans_data_mapping = {
             '总粉丝数': 'total_fans',
             '新增粉丝数': 'new_fans', 
@@ -0,0 +1,392 @@
+"""
+创作者中心接口响应捕获模块
+
+创作者中心页面的数据都来自前端请求的JSON接口。开启网络捕获后（ENABLE_NETWORK_CAPTURE=true），
+浏览器记录performance日志，采集器直接从接口响应中读取数据：
+1. 不依赖页面渲染和DOM结构，一次页面加载即可拿到全部指标
+2. 接口返回精确数值，避免"1.2万"等展示文本的精度损失
+3. 接口响应中找不到数据时，采集器自动回退到DOM解析
+
+也可以从录制的HAR文件回放响应（load_har），离线验证解析逻辑。
+"""
+
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from .utils import clean_number
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+# 需要捕获的接口URL特征
+API_URL_MARKERS = ['/api/']
+
+# 轮询performance日志的间隔（秒）
+DRAIN_INTERVAL = 0.5
+
+# 接口字段名 -> 存储字段名（与内容分析表格列对应，字段名见COLUMN_MAPPING注释）
+NOTE_FIELD_MAPPING = {
+    'exposure': ['impCount', 'imp_count'],
+    'views': ['readCount', 'read_count', 'viewCount'],
+    'cover_click_rate': ['coverClickRate', 'cover_click_rate'],
+    'likes': ['likeCount', 'like_count'],
+    'comments': ['commentCount', 'comment_count'],
+    'collects': ['favCount', 'fav_count', 'collectCount'],
+    'fans_growth': ['increaseFansCount', 'increase_fans_count', 'riseFansCount'],
+    'shares': ['shareCount', 'share_count'],
+    'avg_watch_time': ['viewTimeAvg', 'view_time_avg'],
+    'danmu_count': ['danmakuCount', 'danmaku_count'],
+}
+NOTE_TITLE_KEYS = ['title', 'noteTitle', 'note_title', 'displayTitle']
+NOTE_TIME_KEYS = ['postTime', 'publishTime', 'publish_time', 'createTime', 'time']
+
+# 账号概览接口字段
+OVERVIEW_FIELD_MAPPING = {
+    'views': ['viewCount', 'readCount', 'view_count', 'read_count'],
+    'likes': ['likeCount', 'like_count'],
+    'collects': ['collectCount', 'favCount', 'collect_count', 'fav_count'],
+    'comments': ['commentCount', 'comment_count'],
+    'shares': ['shareCount', 'share_count'],
+    'interactions': ['interactionCount', 'interactCount', 'interaction_count'],
+}
+
+# 粉丝数据接口字段
+FANS_FIELD_MAPPING = {
+    'total_fans': ['fansCount', 'totalFans', 'fans_count', 'total_fans'],
+    'new_fans': ['riseFansCount', 'newFansCount', 'increaseFansCount', 'new_fans'],
+    'lost_fans': ['leaveFansCount', 'lostFansCount', 'decreaseFansCount', 'lost_fans'],
+}
+
+# 非数值字段
+TEXT_FIELDS = {'cover_click_rate', 'avg_watch_time'}
+
+# 比率类接口字段的数值单位：ratio 为比例（0.052 表示5.2%），percent 为百分数（5.2 表示5.2%）。
+# 按字段确定单位，不能按数值大小猜测（0.8%的百分数与80%的比例无法区分）
+RATE_FIELD_UNITS = {
+    'coverClickRate': 'ratio',
+    'cover_click_rate': 'percent',
+}
+
+
+@dataclass
+class CapturedResponse:
+    """捕获到的JSON接口响应"""
+    url: str
+    status: int
+    body: Any
+
+
+def is_capture_enabled() -> bool:
+    """是否启用接口响应捕获（ENABLE_NETWORK_CAPTURE，需在创建浏览器前设置）"""
+    return os.getenv('ENABLE_NETWORK_CAPTURE', 'false').lower() == 'true'
+
+
+class NetworkCapture:
+    """从浏览器performance日志中提取JSON接口响应（同步执行，在浏览器线程中调用）"""
+    
+    def __init__(self, driver: WebDriver, url_markers: Optional[List[str]] = None):
+        """
+        初始化网络捕获
+        
+        Args:
+            driver: 启用了performance日志的WebDriver实例
+            url_markers: 需要捕获的接口URL特征，默认为API_URL_MARKERS
+        """
+        self.driver = driver
+        self.url_markers = url_markers or API_URL_MARKERS
+        # 已收到响应头、尚未加载完成的请求: requestId -> (url, status)
+        self._pending: Dict[str, tuple] = {}
+        self.responses: List[CapturedResponse] = []
+    
+    def start(self) -> None:
+        """开启网络事件记录，并丢弃此前的日志"""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.reset()
+    
+    def reset(self) -> None:
+        """丢弃已捕获和尚未读取的响应（切换页面或维度前调用）"""
+        self.drain()
+        self._pending.clear()
+        self.responses.clear()
+    
+    def drain(self) -> List[CapturedResponse]:
+        """
+        读取performance日志中新完成的接口响应
+        
+        Returns:
+            List[CapturedResponse]: 本次新捕获的响应（同时追加到responses）
+        """
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                url = response.get('url', '')
+                if 'json' in response.get('mimeType', '') and any(marker in url for marker in self.url_markers):
+                    self._pending[params.get('requestId')] = (url, response.get('status', 0))
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                finished.append(params['requestId'])
+        
+        captured = []
+        for request_id in finished:
+            url, status = self._pending.pop(request_id)
+            body = self._read_body(request_id)
+            if body is not None:
+                captured.append(CapturedResponse(url=url, status=status, body=body))
+                logger.debug(f"🛰️ 捕获接口响应: {url}")
+        
+        self.responses.extend(captured)
+        return captured
+    
+    def _read_body(self, request_id: str) -> Any:
+        """读取响应体并解析为JSON，读取失败（如已被浏览器释放）时返回None"""
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException as e:
+            logger.debug(f"读取响应体失败: {e}")
+            return None
+        
+        text = result.get('body', '')
+        if result.get('base64Encoded'):
+            text = base64.b64decode(text).decode('utf-8', errors='replace')
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+    
+    def wait_for(self, parser: Callable[[List[CapturedResponse]], Optional[T]], timeout: float = 10) -> Optional[T]:
+        """
+        持续读取日志，直到解析函数从已捕获的响应中得到结果
+        
+        Args:
+            parser: 解析函数，接收响应列表，未找到数据时返回None或空值
+            timeout: 超时时间（秒）
+        
+        Returns:
+            Optional[T]: 解析结果，超时返回None
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.drain()
+            result = parser(self.responses)
+            if result:
+                return result
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(DRAIN_INTERVAL)
+
+
+def start_capture(driver: WebDriver) -> Optional[NetworkCapture]:
+    """
+    在打开采集页面之前开始捕获接口响应
+    
+    Args:
+        driver: WebDriver实例
+    
+    Returns:
+        Optional[NetworkCapture]: 未启用或浏览器不支持时返回None（采集器使用DOM解析）
+    """
+    if not is_capture_enabled():
+        return None
+    
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        logger.warning("⚠️ 当前浏览器不支持CDP命令（如远程浏览器），使用页面解析采集")
+        return None
+    
+    try:
+        capture = NetworkCapture(driver)
+        capture.start()
+        return capture
+    except Exception as e:
+        logger.warning(f"⚠️ 开启接口响应捕获失败，使用页面解析采集: {e}")
+        return None
+
+
+def load_har(path: str) -> List[CapturedResponse]:
+    """
+    从HAR文件加载接口响应（用于回放录制的页面请求）
+    
+    Args:
+        path: HAR文件路径
+    
+    Returns:
+        List[CapturedResponse]: 文件中的JSON接口响应
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        har = json.load(f)
+    
+    responses = []
+    for entry in har.get('log', {}).get('entries', []):
+        url = entry.get('request', {}).get('url', '')
+        response = entry.get('response', {})
+        content = response.get('content', {})
+        if 'json' not in content.get('mimeType', '') or not any(marker in url for marker in API_URL_MARKERS):
+            continue
+        
+        text = content.get('text', '')
+        if content.get('encoding') == 'base64':
+            text = base64.b64decode(text).decode('utf-8', errors='replace')
+        try:
+            responses.append(CapturedResponse(url=url, status=response.get('status', 0), body=json.loads(text)))
+        except ValueError:
+            continue
+    
+    return responses
+
+
+def _iter_dicts(obj: Any) -> Iterator[Dict[str, Any]]:
+    """递归遍历JSON中的所有对象"""
+    if isinstance(obj, dict):
+        yield obj
+        for value in obj.values():
+            yield from _iter_dicts(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _iter_dicts(item)
+
+
+def _pick(data: Dict[str, Any], keys: List[str]) -> Any:
+    """按候选字段名取第一个存在的值"""
+    return _pick_item(data, keys)[1]
+
+
+def _pick_item(data: Dict[str, Any], keys: List[str]) -> tuple:
+    """按候选字段名取第一个存在的(字段名, 值)，都不存在时返回(None, None)"""
+    for key in keys:
+        if data.get(key) is not None:
+            return key, data[key]
+    return None, None
+
+
+def _to_int(value: Any) -> int:
+    """接口数值转整数（字符串形式的展示值用clean_number解析）"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    return clean_number(str(value))
+
+
+def _format_rate(value: Any, unit: str = 'percent') -> str:
+    """
+    比率格式化为与页面一致的百分比文本
+    
+    Args:
+        value: 接口返回的比率
+        unit: 数值单位，ratio为比例，percent为百分数（见RATE_FIELD_UNITS）
+    
+    Returns:
+        str: 百分比文本（如"5.2%"）
+    """
+    if isinstance(value, str):
+        return value if value.endswith('%') else f"{value}%"
+    rate = float(value)
+    if unit == 'ratio':
+        rate *= 100
+    return f"{round(rate, 2)}%"
+
+
+def _format_time(value: Any) -> str:
+    """发布时间格式化为与页面一致的文本（YYYY-MM-DD HH:MM）"""
+    if isinstance(value, (int, float)):
+        # 毫秒时间戳
+        seconds = value / 1000 if value > 1e11 else value
+        return datetime.fromtimestamp(seconds).strftime('%Y-%m-%d %H:%M')
+    text = str(value).strip()
+    return text[3:] if text.startswith('发布于') else text
+
+
+def _map_metrics(data: Dict[str, Any], mapping: Dict[str, List[str]]) -> Dict[str, Any]:
+    """按字段映射提取指标，缺失的字段不写入"""
+    metrics = {}
+    for field_name, keys in mapping.items():
+        key, value = _pick_item(data, keys)
+        if value is None:
+            continue
+        if field_name == 'cover_click_rate':
+            metrics[field_name] = _format_rate(value, RATE_FIELD_UNITS.get(key, 'percent'))
+        elif field_name in TEXT_FIELDS:
+            metrics[field_name] = str(value)
+        else:
+            metrics[field_name] = _to_int(value)
+    return metrics
+
+
+def parse_note_list(responses: List[CapturedResponse]) -> List[Dict[str, Any]]:
+    """
+    从接口响应中解析笔记列表（取最近一个包含笔记数据的响应，即当前页）
+    
+    Returns:
+        List[Dict[str, Any]]: 与表格解析结果字段一致的笔记数据，未找到时返回空列表
+    """
+    for response in reversed(responses):
+        notes = []
+        for item in _iter_dicts(response.body):
+            title = _pick(item, NOTE_TITLE_KEYS)
+            if not isinstance(title, str) or not title.strip():
+                continue
+            metrics = _map_metrics(item, NOTE_FIELD_MAPPING)
+            # 至少包含两项指标才视为笔记数据行
+            if len(metrics) < 2:
+                continue
+            
+            publish_time = _pick(item, NOTE_TIME_KEYS)
+            notes.append({
+                "row_index": len(notes),
+                "extract_time": datetime.now().isoformat(),
+                "title": title.strip(),
+                "publish_time": _format_time(publish_time) if publish_time is not None else '',
+                **metrics
+            })
+        if notes:
+            return notes
+    return []
+
+
+def _parse_metrics(responses: List[CapturedResponse], mapping: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+    """从最近的响应中找到包含最多映射字段的对象"""
+    for response in reversed(responses):
+        best: Dict[str, Any] = {}
+        for item in _iter_dicts(response.body):
+            metrics = _map_metrics(item, mapping)
+            if len(metrics) > len(best):
+                best = metrics
+        if len(best) >= 2:
+            return {field_name: best.get(field_name, 0) for field_name in mapping}
+    return None
+
+
+def parse_overview(responses: List[CapturedResponse]) -> Optional[Dict[str, Any]]:
+    """
+    从接口响应中解析账号概览数据
+    
+    Returns:
+        Optional[Dict[str, Any]]: 与页面解析结果字段一致的概览数据，未找到时返回None
+    """
+    return _parse_metrics(responses, OVERVIEW_FIELD_MAPPING)
+
+
+def parse_fans(responses: List[CapturedResponse]) -> Optional[Dict[str, Any]]:
+    """
+    从接口响应中解析粉丝数据
+    
+    Returns:
+        Optional[Dict[str, Any]]: 包含total_fans、new_fans、lost_fans的数据，未找到时返回None
+    """
+    return _parse_metrics(responses, FANS_FIELD_MAPPING)
@@ -88,6 +88,12 @@ class IBrowserManager(ABC):
     def load_cookies(self, cookies: List[Dict[str, Any]]) -> Dict[str, Any]:
         """加载cookies"""
         pass
+    
+    @property
+    @abstractmethod
+    def executor(self):
+        """当前驱动的专用执行线程（WebDriver调用通过它执行，不阻塞事件循环）"""
+        pass
 
 
 class IXHSClient(ABC):
@@ -101,4 +107,4 @@ class IXHSClient(ABC):
     @abstractmethod
     async def collect_creator_data(self, date: Optional[str] = None) -> Dict[str, Any]:
         """采集创作者数据"""
-        pass 
\ No newline at end of file
+        pass 
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+测试公共配置
+"""
+
+import sys
+from pathlib import Path
+
+# 从仓库根目录导入 src 包
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
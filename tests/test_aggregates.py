@@ -0,0 +1,89 @@
+"""
+增量汇总表的测试
+"""
+
+import pytest
+
+from src.data import aggregates
+from src.data.aggregates import AggregateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AggregateStore(tmp_path / '.aggregates.json')
+
+
+def _views_max(store, group='all'):
+    return store.get_summary('dashboard')[group]['max']['views']
+
+
+def test_same_day_replace_recomputes_max(store):
+    store.update('dashboard', [{'dimension': 'all', 'views': 50}], day='2024-01-01')
+    store.update('dashboard', [{'dimension': 'all', 'views': 100}], day='2024-01-02')
+    assert _views_max(store) == {'value': 100, 'date': '2024-01-02'}
+    
+    # 当天重新采集后数值变小，历史最大值回到其他日期
+    store.update('dashboard', [{'dimension': 'all', 'views': 30}], day='2024-01-02')
+    assert _views_max(store) == {'value': 50, 'date': '2024-01-01'}
+    assert store.get_summary('dashboard')['all']['average']['views'] == 40
+    
+    store.update('dashboard', [{'dimension': 'all', 'views': 80}], day='2024-01-02')
+    assert _views_max(store) == {'value': 80, 'date': '2024-01-02'}
+
+
+def test_replaced_day_without_group_drops_its_max(store):
+    store.update('fans', [{'dimension': '7d', 'new_fans': 9}], day='2024-01-01')
+    store.update('fans', [{'dimension': '30d', 'new_fans': 3}], day='2024-01-01')
+    
+    summary = store.get_summary('fans')
+    assert set(summary) == {'30d'}
+    assert summary['30d']['max']['new_fans'] == {'value': 3, 'date': '2024-01-01'}
+
+
+def test_same_day_replace_recomputes_note_max(store):
+    store.update('content_analysis', [{'title': '笔记', 'views': 10}], day='2024-01-01')
+    store.update('content_analysis', [{'title': '笔记', 'views': 40}], day='2024-01-02')
+    store.update('content_analysis', [{'title': '笔记', 'views': 20}], day='2024-01-02')
+    
+    note = store.get_note_summary('笔记')
+    assert note['max']['views'] == 20
+    assert note['days'] == 2
+    assert note['average']['views'] == 15
+
+
+def test_updates_append_to_journal_until_compaction(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(aggregates, 'COMPACT_EVERY', 3)
+    
+    store.update('dashboard', [{'dimension': 'all', 'views': 1}], day='2024-01-01')
+    store.update('dashboard', [{'dimension': 'all', 'views': 2}], day='2024-01-02')
+    # 汇总表文件尚未写入，只追加了日志
+    assert not store.path.exists()
+    assert len(store.journal_path.read_text(encoding='utf-8').splitlines()) == 2
+    
+    # 其他进程（新实例）通过重放日志得到相同的汇总
+    other = AggregateStore(tmp_path / '.aggregates.json')
+    assert other.exists()
+    assert other.get_summary('dashboard') == store.get_summary('dashboard')
+    
+    store.update('dashboard', [{'dimension': 'all', 'views': 3}], day='2024-01-03')
+    assert store.path.exists()
+    assert store.journal_path.read_bytes() == b''
+    
+    other.update('dashboard', [{'dimension': 'all', 'views': 6}], day='2024-01-03')
+    summary = store.get_summary('dashboard')['all']
+    assert summary['days'] == 3
+    assert summary['average']['views'] == 3
+    assert summary['max']['views'] == {'value': 6, 'date': '2024-01-03'}
+
+
+def test_torn_journal_record_is_discarded(store, tmp_path):
+    store.update('dashboard', [{'dimension': 'all', 'views': 5}], day='2024-01-01')
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'{"seq": 2, "type": "dash')
+    
+    other = AggregateStore(tmp_path / '.aggregates.json')
+    assert other.get_summary('dashboard')['all']['days'] == 1
+    
+    other.update('dashboard', [{'dimension': 'all', 'views': 7}], day='2024-01-02')
+    fresh = AggregateStore(tmp_path / '.aggregates.json')
+    assert fresh.get_summary('dashboard')['all']['max']['views'] == {'value': 7, 'date': '2024-01-02'}
@@ -0,0 +1,127 @@
+"""
+内容分析采集断点的测试
+"""
+
+import json
+
+import pytest
+
+from src.data.collection_checkpoint import CollectionCheckpoint
+from src.xiaohongshu.data_collector import content_analysis
+
+
+class FakeTable:
+    """分页表格替身：记录当前页码，可在指定页之后翻页失败（模拟浏览器崩溃）"""
+    
+    def __init__(self, total_pages, fail_after=None):
+        self.total_pages = total_pages
+        self.fail_after = fail_after
+        self.page = 1
+        self.collected_pages = []
+    
+    def next_page(self, driver):
+        if self.fail_after is not None and self.page >= self.fail_after:
+            return False
+        self.page += 1
+        return True
+    
+    def notes(self, driver, capture=None):
+        self.collected_pages.append(self.page)
+        return [{'title': f'笔记{self.page}-{i}', 'publish_time': '2024-01-01', 'views': self.page}
+                for i in range(2)]
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return CollectionCheckpoint(tmp_path / '.content_analysis_checkpoint.json')
+
+
+def _collect(monkeypatch, checkpoint, table, limit=100):
+    monkeypatch.setattr(content_analysis, '_get_checkpoint', lambda: checkpoint)
+    monkeypatch.setattr(content_analysis, '_get_fingerprint_store', lambda: None)
+    monkeypatch.setattr(content_analysis, '_get_total_pages', lambda driver: table.total_pages)
+    monkeypatch.setattr(content_analysis, '_go_to_next_page', table.next_page)
+    monkeypatch.setattr(content_analysis, '_wait_for_table_data_refresh', lambda driver: None)
+    monkeypatch.setattr(content_analysis, '_collect_current_page_notes', table.notes)
+    monkeypatch.setattr(content_analysis, '_enhance_notes_incrementally',
+                        lambda driver, notes, fingerprints: [{**note, 'source_search': f"{note['views']}0%"}
+                                                             for note in notes])
+    return content_analysis._collect_notes_with_details_paginated(None, limit)
+
+
+def test_save_load_round_trip(checkpoint):
+    assert checkpoint.load() is None
+    notes = [{'title': '笔记', 'source_search': '30%', 'element': object()}]
+    checkpoint.save(2, notes)
+    
+    saved = checkpoint.load()
+    assert saved['page'] == 2
+    assert saved['notes'][0]['source_search'] == '30%'
+    # 不可序列化的值按字符串保存
+    assert isinstance(saved['notes'][0]['element'], str)
+    
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    checkpoint.clear()
+
+
+def test_stale_checkpoint_is_discarded(checkpoint):
+    checkpoint.save(1, [{'title': '笔记'}])
+    data = json.loads(checkpoint.path.read_text(encoding='utf-8'))
+    data['date'] = '2000-01-01'
+    checkpoint.path.write_text(json.dumps(data), encoding='utf-8')
+    assert checkpoint.load() is None
+
+
+def test_corrupt_checkpoint_starts_fresh(checkpoint, monkeypatch):
+    checkpoint.path.write_text('{"version": 1, "page": 2, "no', encoding='utf-8')
+    assert checkpoint.load() is None
+    
+    table = FakeTable(total_pages=2)
+    notes = _collect(monkeypatch, checkpoint, table)
+    assert table.collected_pages == [1, 2]
+    assert len(notes) == 4
+    assert not checkpoint.path.exists()
+
+
+def test_interrupted_collection_resumes_from_checkpoint(checkpoint, monkeypatch):
+    # 第一次采集在第2页之后无法翻页
+    first = _collect(monkeypatch, checkpoint, FakeTable(total_pages=3, fail_after=2))
+    assert len(first) == 4
+    assert checkpoint.load()['page'] == 2
+    
+    table = FakeTable(total_pages=3)
+    notes = _collect(monkeypatch, checkpoint, table)
+    
+    # 只采集剩下的第3页，翻页时跳过前两页
+    assert table.collected_pages == [3]
+    assert [note['title'] for note in notes] == ['笔记1-0', '笔记1-1', '笔记2-0', '笔记2-1', '笔记3-0', '笔记3-1']
+    # 断点中已采集的详情字段原样保留
+    assert [note['source_search'] for note in notes] == ['10%', '10%', '20%', '20%', '30%', '30%']
+    assert not checkpoint.path.exists()
+
+
+def test_finished_checkpoint_is_not_resumed(checkpoint, monkeypatch):
+    checkpoint.save(2, [{'title': '旧笔记'}])
+    table = FakeTable(total_pages=2)
+    notes = _collect(monkeypatch, checkpoint, table)
+    
+    assert table.collected_pages == [1, 2]
+    assert '旧笔记' not in [note['title'] for note in notes]
+
+
+def test_skip_to_page_resets_capture_and_reports_failure(monkeypatch):
+    resets = []
+    capture = type('Capture', (), {'reset': lambda self: resets.append(1)})()
+    monkeypatch.setattr(content_analysis, '_wait_for_table_data_refresh', lambda driver: None)
+    
+    table = FakeTable(total_pages=5)
+    monkeypatch.setattr(content_analysis, '_go_to_next_page', table.next_page)
+    assert content_analysis._skip_to_page(None, 4, capture)
+    assert table.page == 4
+    assert len(resets) == 3
+    
+    table = FakeTable(total_pages=5, fail_after=2)
+    monkeypatch.setattr(content_analysis, '_go_to_next_page', table.next_page)
+    assert not content_analysis._skip_to_page(None, 4)
+    assert table.page == 2
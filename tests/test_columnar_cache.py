@@ -0,0 +1,40 @@
+"""
+列式缓存的测试
+"""
+
+import pandas as pd
+
+from src.data.storage.columnar_cache import ColumnarCache
+
+
+def test_mixed_type_column_is_cached(tmp_path):
+    csv_path = tmp_path / 'data.csv'
+    csv_path.write_text('a,b\n1,x\n2,y\n', encoding='utf-8')
+    cache = ColumnarCache(csv_path)
+    key = cache._stat_key()
+    
+    # 同一列中既有数字1又有字符串'1'，转成字符串后是同一个分类
+    frame = pd.DataFrame({'a': [1, 2, 3, 4], 'b': [1, '1', None, 'x']})
+    cache._write_cache(frame, key)
+    cached = cache._read_cache(key)
+    
+    assert cached is not None
+    assert cached['b'].tolist()[:2] == ['1', '1']
+    assert pd.isna(cached['b'].iloc[2])
+    assert list(cached['b'].cat.categories) == ['1', 'x']
+    assert cached['a'].tolist() == [1, 2, 3, 4]
+
+
+def test_load_reuses_cache_file(tmp_path):
+    csv_path = tmp_path / 'data.csv'
+    csv_path.write_text('title,views\n笔记,1\n,2\n笔记,3\n', encoding='utf-8')
+    
+    frame = ColumnarCache(csv_path).load()
+    assert (tmp_path / '.data.colcache').exists()
+    
+    reloaded = ColumnarCache(csv_path)
+    cached = reloaded._read_cache(reloaded._stat_key())
+    assert cached is not None
+    assert cached['views'].tolist() == frame['views'].tolist() == [1, 2, 3]
+    assert cached['title'].tolist()[0] == '笔记'
+    assert pd.isna(cached['title'].iloc[1])
@@ -0,0 +1,115 @@
+"""
+CSV存储按天覆盖保存的测试
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.data.storage.csv_storage import CSVStorage
+
+
+def _history_line(day: str, views: int) -> str:
+    return f"{day}T08:00:00,{day}T08:00:00,{day},all,{views},1,1,1,1,1\n"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return CSVStorage({'data_dir': str(tmp_path)})
+
+
+def _write_history(storage, days):
+    with open(storage.dashboard_file, 'a', encoding='utf-8') as f:
+        for i, day in enumerate(days):
+            f.write(_history_line(day, i))
+
+
+def test_same_day_save_replaces_only_today(storage):
+    _write_history(storage, ['2024-01-01', '2024-01-02'])
+    history = storage.dashboard_file.read_bytes()
+    
+    storage.save_dashboard_data([{'views': 10}])
+    storage.save_dashboard_data([{'views': 20}, {'views': 30}])
+    
+    content = storage.dashboard_file.read_bytes()
+    # 历史数据原样保留在文件开头
+    assert content.startswith(history)
+    
+    frame = storage.load_frame('dashboard')
+    today = datetime.now().strftime('%Y-%m-%d')
+    today_rows = frame[frame['created_at'].str.startswith(today)]
+    assert sorted(today_rows['views'].tolist()) == [20, 30]
+    assert len(frame) == 4
+
+
+def test_save_does_not_rewrite_history(storage, monkeypatch):
+    _write_history(storage, ['2024-01-01'])
+    storage.save_dashboard_data([{'views': 1}])
+    
+    # 正常路径不应整体重写文件
+    def fail(*args, **kwargs):
+        raise AssertionError("不应整体重写CSV文件")
+    monkeypatch.setattr(CSVStorage, '_replace_file', staticmethod(fail))
+    
+    storage.save_dashboard_data([{'views': 2}])
+    frame = storage.load_frame('dashboard')
+    assert frame['views'].tolist() == [0, 2]
+
+
+def test_index_tracks_replaced_day(storage):
+    _write_history(storage, ['2024-01-01'])
+    storage.save_dashboard_data([{'views': 5}])
+    storage.save_dashboard_data([{'views': 6}])
+    
+    index = storage._get_index(storage.dashboard_file)
+    today = datetime.now().strftime('%Y-%m-%d')
+    assert set(index.days) == {'2024-01-01', today}
+    assert index.days[today][1] == storage.dashboard_file.stat().st_size
+
+
+def test_later_day_after_today_falls_back_to_rewrite(storage):
+    # 当天数据之后还有更晚日期的数据（系统时间被回拨）
+    _write_history(storage, ['2999-01-01'])
+    storage.save_dashboard_data([{'views': 7}])
+    storage.save_dashboard_data([{'views': 8}])
+    
+    frame = storage.load_frame('dashboard')
+    assert sorted(frame['views'].tolist()) == [0, 8]
+
+
+@pytest.mark.asyncio
+async def test_range_query_after_replace(storage):
+    _write_history(storage, ['2024-01-01', '2024-01-02'])
+    storage.save_dashboard_data([{'views': 9}])
+    
+    rows = await storage.get_data_range('dashboard', since='2024-01-02', until='2024-01-02')
+    assert [row['views'] for row in rows] == ['1']
+    
+    latest = await storage.get_latest_data('dashboard', limit=1)
+    assert latest[0]['views'] == '9'
+
+
+class _CrashingRow(dict):
+    """写入新数据行时抛出异常，模拟保存中途进程崩溃"""
+    
+    def get(self, *args, **kwargs):
+        raise RuntimeError("模拟写入中断")
+
+
+def test_interrupted_save_keeps_original_file(storage, tmp_path):
+    _write_history(storage, ['2024-01-01'])
+    storage.save_dashboard_data([{'views': 3}])
+    before = storage.dashboard_file.read_bytes()
+    
+    # 历史数据已复制、当天新数据尚未写完时中断
+    index = storage._get_index(storage.dashboard_file)
+    cut = index.days[datetime.now().strftime('%Y-%m-%d')][0]
+    with pytest.raises(RuntimeError):
+        CSVStorage._replace_tail(storage.dashboard_file, ['views'], [_CrashingRow()], cut)
+    
+    # 原文件既没有被截断也没有丢失当天数据，临时文件已清理
+    assert storage.dashboard_file.read_bytes() == before
+    assert not list(tmp_path.glob('*.tmp'))
+    
+    storage.save_dashboard_data([{'views': 4}])
+    assert storage.load_frame('dashboard')['views'].tolist() == [0, 4]
@@ -0,0 +1,36 @@
+"""
+页面等待器的测试
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.core.dom_waiter import DomWaiter
+
+
+class FakeDriver:
+    """记录脚本超时设置的驱动替身"""
+    
+    def __init__(self, result):
+        self.timeouts = SimpleNamespace(script=30)
+        self.result = result
+        self.script_timeouts = []
+    
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+        self.timeouts.script = seconds
+    
+    def execute_async_script(self, script, *args):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.parametrize('result, expected', [(1, 1), (TimeoutException(), -1)])
+def test_observe_restores_script_timeout(result, expected):
+    driver = FakeDriver(result)
+    assert DomWaiter._observe(driver, [], 2.0) == expected
+    assert driver.script_timeouts == [7.0, 30]
+    assert driver.timeouts.script == 30
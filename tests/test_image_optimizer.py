@@ -0,0 +1,39 @@
+"""
+图片预处理的测试（需要安装Pillow）
+"""
+
+import pytest
+
+from src.utils import image_optimizer
+from src.utils.image_optimizer import OptimizeOptions, optimize_images, shutdown_pool
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f'photo_{index}.png'
+        Image.new('RGB', (400 + index, 300), (index * 40, 100, 200)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.asyncio
+async def test_pool_is_shared_between_notes(images, tmp_path):
+    options = OptimizeOptions(max_side=200, quality=80)
+    try:
+        first = await optimize_images(images, tmp_path, options)
+        pool = image_optimizer._pool
+        second = await optimize_images(images[:2], tmp_path, options)
+        
+        # 同一进程池处理多篇笔记，处理结果按输入顺序返回并复用
+        assert pool is not None and image_optimizer._pool is pool
+        assert second == first[:2]
+        assert all(path.endswith('.jpg') for path in first)
+        with Image.open(first[0]) as img:
+            assert max(img.size) == 200
+    finally:
+        shutdown_pool()
+    assert image_optimizer._pool is None
@@ -0,0 +1,107 @@
+"""
+图片并发下载的测试（本地aiohttp测试服务器）
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.utils import image_processor
+from src.utils.image_processor import ImageProcessor
+
+IMAGE_COUNT = 6
+
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    monkeypatch.setenv('IMAGE_CACHE_ENABLED', 'false')
+
+
+@pytest_asyncio.fixture
+async def server():
+    state = {'active': 0, 'max_active': 0, 'peers': set()}
+    
+    async def handle(request):
+        index = int(request.match_info['index'])
+        state['active'] += 1
+        state['max_active'] = max(state['max_active'], state['active'])
+        state['peers'].add(request.transport.get_extra_info('peername'))
+        try:
+            # 序号越小响应越慢，下载完成顺序与输入顺序相反
+            await asyncio.sleep(0.05 * (IMAGE_COUNT - index))
+        finally:
+            state['active'] -= 1
+        return web.Response(body=f'image-{index}'.encode() * 1000, content_type='image/png')
+    
+    app = web.Application()
+    app.router.add_get('/img/{index}', handle)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    test_server.state = state
+    yield test_server
+    await test_server.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_downloads_keep_input_order(server, no_cache, tmp_path):
+    processor = ImageProcessor(temp_dir=str(tmp_path), max_concurrency=3, optimize=False)
+    urls = [str(server.make_url(f'/img/{index}')) for index in range(IMAGE_COUNT)]
+    
+    paths = await processor.process_images(urls)
+    
+    assert len(paths) == IMAGE_COUNT
+    for index, path in enumerate(paths):
+        with open(path, 'rb') as f:
+            assert f.read() == f'image-{index}'.encode() * 1000
+        assert path.endswith('.png')
+    # 同时下载的数量受信号量限制，连接在同一会话中复用
+    assert server.state['max_active'] == 3
+    assert len(server.state['peers']) <= 3
+    assert not list(tmp_path.glob('*.part'))
+
+
+@pytest.mark.asyncio
+async def test_session_closed_after_last_batch(server, no_cache, tmp_path):
+    processor = ImageProcessor(temp_dir=str(tmp_path), max_concurrency=2, optimize=False)
+    first = [str(server.make_url('/img/4')), str(server.make_url('/img/5'))]
+    second = [str(server.make_url('/img/0'))]
+    
+    loop = asyncio.get_running_loop()
+    slow = asyncio.create_task(processor.process_images(second))
+    await asyncio.sleep(0.05)
+    session = image_processor._sessions[loop]
+    
+    # 并发的批次共用同一个会话，先结束的批次不会关闭仍在使用的会话
+    assert len(await processor.process_images(first)) == 2
+    assert not session.closed
+    
+    assert len(await slow) == 1
+    assert session.closed
+    assert loop not in image_processor._sessions
+
+
+@pytest.mark.asyncio
+async def test_cached_image_survives_eviction(server, tmp_path, monkeypatch):
+    from src.utils.image_cache import ImageCache
+    
+    cache = ImageCache(tmp_path / 'cache', max_bytes=10 * 1024)
+    monkeypatch.setattr(image_processor, 'get_image_cache', lambda: cache)
+    monkeypatch.setenv('IMAGE_CACHE_ENABLED', 'true')
+    processor = ImageProcessor(temp_dir=str(tmp_path / 'images'), optimize=False)
+    
+    first, = await processor.process_images([str(server.make_url('/img/1'))])
+    # 再下载一张图片，缓存超出预算淘汰第一张
+    await processor.process_images([str(server.make_url('/img/2'))])
+    assert cache.get_stats()['evicted'] == 1
+    
+    # 交给上传的是临时目录中的文件，不受缓存淘汰影响
+    assert not first.startswith(str(cache.cache_dir))
+    with open(first, 'rb') as f:
+        assert f.read() == b'image-1' * 1000
+    
+    again, = await processor.process_images([str(server.make_url('/img/2'))])
+    assert again != first
+    assert cache.get_stats()['hits'] == 1
@@ -0,0 +1,67 @@
+"""
+创作者中心接口响应解析的测试（回放录制的HAR文件）
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.xiaohongshu.data_collector.network_capture import (
+    load_har, parse_note_list, parse_overview, parse_fans, _format_rate
+)
+
+HAR_PATH = Path(__file__).parent / 'fixtures' / 'creator_center.har'
+
+
+@pytest.fixture(scope='module')
+def responses():
+    return load_har(str(HAR_PATH))
+
+
+def _by_path(responses, marker):
+    return [response for response in responses if marker in response.url]
+
+
+def test_load_har_keeps_json_api_responses(responses):
+    # 页面HTML和图片不是接口响应；base64编码的响应体被解码
+    assert len(responses) == 5
+    assert all('/api/' in response.url for response in responses)
+    assert _by_path(responses, '/data/overview')[0].body['data']['seven']['viewCount'] == 15600
+
+
+def test_parse_note_list_uses_latest_page(responses):
+    pages = _by_path(responses, '/note_stats/')
+    
+    notes = parse_note_list(pages[:1])
+    assert [note['title'] for note in notes] == ['春日穿搭分享', '周末探店']
+    first = notes[0]
+    assert first['row_index'] == 0
+    assert first['publish_time'] == datetime.fromtimestamp(1716170400).strftime('%Y-%m-%d %H:%M')
+    assert (first['exposure'], first['views'], first['likes'], first['comments']) == (96000, 12000, 1200, 240)
+    assert (first['collects'], first['fans_growth'], first['shares']) == (600, 120, 150)
+    assert first['avg_watch_time'] == '25秒'
+    # coverClickRate 为比例：0.008 是 0.8%，不是 80%
+    assert first['cover_click_rate'] == '0.8%'
+    assert notes[1]['cover_click_rate'] == '12.5%'
+    
+    assert [note['title'] for note in parse_note_list(pages)] == ['旧笔记']
+
+
+def test_parse_overview(responses):
+    assert parse_overview(responses) == {
+        'views': 15600, 'likes': 1520, 'collects': 780,
+        'comments': 212, 'shares': 95, 'interactions': 2607
+    }
+    assert parse_overview(_by_path(responses, '/personal_info')) is None
+
+
+def test_parse_fans(responses):
+    assert parse_fans(responses) == {'total_fans': 10523, 'new_fans': 88, 'lost_fans': 12}
+    assert parse_fans(_by_path(responses, '/note_stats/')) is None
+
+
+def test_rate_unit_is_chosen_per_field():
+    assert _format_rate(0.8, 'percent') == '0.8%'
+    assert _format_rate(0.8, 'ratio') == '80.0%'
+    assert _format_rate('5.2%', 'ratio') == '5.2%'
@@ -0,0 +1,98 @@
+"""
+笔记指纹表与增量详情采集的测试
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.data.note_fingerprints import FINGERPRINT_METRICS, NoteFingerprintStore
+from src.xiaohongshu.data_collector import content_analysis
+
+DETAIL_FIELDS = ['source_search', 'gender_male']
+
+
+def _note(title='笔记A', **metrics):
+    row = {'title': title, 'publish_time': '2024-01-01 10:00'}
+    row.update({metric: 100 for metric in FINGERPRINT_METRICS})
+    row.update(metrics)
+    return row
+
+
+def _collected(note, search='30%'):
+    return {**note, 'source_search': search, 'gender_male': '40%'}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NoteFingerprintStore(tmp_path / '.note_fingerprints.json')
+
+
+def test_unchanged_metrics_carry_detail(store):
+    assert store.record([_collected(_note())], DETAIL_FIELDS) == 1
+    
+    # 列表行中的数值可能是字符串，指纹比较按整数进行
+    row = _note(views='100', likes='100')
+    assert store.carried_detail(row) == {'source_search': '30%', 'gender_male': '40%'}
+    assert store.carried_detail(row) == store.carried_detail(_note())
+
+
+@pytest.mark.parametrize('metric', FINGERPRINT_METRICS)
+def test_metric_change_forces_refetch(store, metric):
+    store.record([_collected(_note())], DETAIL_FIELDS)
+    
+    assert store.carried_detail(_note(**{metric: 120})) is None
+    # 阈值为0时任何变化都需要重新采集
+    assert store.carried_detail(_note(**{metric: 101}), threshold=0) is None
+    # 阈值内的小幅变化沿用详情
+    assert store.carried_detail(_note(**{metric: 101}), threshold=0.05) is not None
+
+
+def test_new_or_expired_note_needs_detail(store):
+    store.record([_collected(_note())], DETAIL_FIELDS)
+    assert store.carried_detail(_note(title='笔记B')) is None
+    assert store.carried_detail({**_note(), 'publish_time': '2024-02-01 10:00'}) is None
+    
+    data = json.loads(store.path.read_text(encoding='utf-8'))
+    for entry in data['notes'].values():
+        entry['collected_at'] = (datetime.now() - timedelta(days=8)).isoformat()
+    store.path.write_text(json.dumps(data), encoding='utf-8')
+    assert store.carried_detail(_note(), max_age_days=7) is None
+
+
+def test_store_persists_across_runs(store, tmp_path):
+    store.record([_collected(_note()), _collected(_note(title='笔记B'), search='10%')], DETAIL_FIELDS)
+    
+    reloaded = NoteFingerprintStore(tmp_path / '.note_fingerprints.json')
+    assert reloaded.note_count() == 2
+    assert reloaded.carried_detail(_note(title='笔记B'))['source_search'] == '10%'
+    
+    # 另一个实例写入后，原实例重新加载看到更新
+    reloaded.record([_collected(_note(title='笔记C'))], DETAIL_FIELDS)
+    assert store.note_count() == 3
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_version_mismatch_starts_fresh(store):
+    store.path.write_text(json.dumps({'version': -1, 'notes': {'x|y': {}}}), encoding='utf-8')
+    assert store.note_count() == 0
+
+
+def test_incremental_collection_fetches_only_new_and_changed(store, monkeypatch):
+    store.record([_collected(_note()), _collected(_note(title='笔记B'))], DETAIL_FIELDS)
+    fetched = []
+    
+    def fake_enhance(driver, notes):
+        fetched.extend(note['title'] for note in notes)
+        return [_collected(note, search='50%') for note in notes]
+    
+    monkeypatch.setattr(content_analysis, '_enhance_notes_with_detail_data', fake_enhance)
+    page = [_note(), _note(title='笔记B', views=500), _note(title='笔记C')]
+    results = content_analysis._enhance_notes_incrementally(None, page, store)
+    
+    assert fetched == ['笔记B', '笔记C']
+    assert [row['title'] for row in results] == ['笔记A', '笔记B', '笔记C']
+    assert [row['source_search'] for row in results] == ['30%', '50%', '50%']
+    # 新采集的笔记记录了指纹，下次运行沿用
+    assert store.carried_detail(_note(title='笔记C'))['source_search'] == '50%'
@@ -0,0 +1,222 @@
+"""
+PostgreSQL存储的测试
+
+本地没有PostgreSQL服务，用内存中的连接池替身实现存储用到的asyncpg接口
+（execute、copy_records_to_table、fetch、fetchval、transaction）。
+替身与PostgreSQL一样，在一条 ON CONFLICT 语句中重复更新同一行时报错。
+"""
+
+import copy
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.data.storage import pg_storage
+from src.data.storage.base import TABLE_DEFINITIONS
+from src.data.storage.pg_storage import PostgreSQLStorage
+
+
+class FakeDatabase:
+    """内存中的表：表名 -> {唯一键: 行}"""
+    
+    def __init__(self):
+        self.tables = {}
+        self.copy_calls = []
+
+
+class FakeConnection:
+    """asyncpg.Connection 替身"""
+    
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+        self.temp_tables = {}
+    
+    async def execute(self, sql, *args):
+        for name in re.findall(r"CREATE TABLE IF NOT EXISTS (\w+)", sql):
+            self.db.tables.setdefault(name, {})
+        
+        match = re.match(r"CREATE TEMP TABLE (\w+)", sql)
+        if match:
+            self.temp_tables[match.group(1)] = []
+            return
+        
+        match = re.match(r"INSERT INTO (\w+) \((.*?)\) SELECT .*? FROM (\w+) ON CONFLICT \((.*?)\) DO UPDATE", sql)
+        if match:
+            table, _, staging, key_list = match.groups()
+            keys = [key.strip() for key in key_list.split(',')]
+            rows = self.db.tables[table]
+            touched = set()
+            for row in self.temp_tables[staging]:
+                key = tuple(row[k] for k in keys)
+                if key in touched:
+                    raise RuntimeError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+                touched.add(key)
+                if key in rows:
+                    rows[key].update({k: v for k, v in row.items() if k not in keys and k != 'created_at'})
+                else:
+                    rows[key] = dict(row)
+    
+    async def copy_records_to_table(self, table, records, columns):
+        self.db.copy_calls.append((table, len(records)))
+        self.temp_tables[table].extend(dict(zip(columns, record)) for record in records)
+    
+    async def fetch(self, sql, *args):
+        match = re.match(r"SELECT (.*?) FROM (\w+) (?:WHERE (.*?) )?ORDER BY created_at( DESC LIMIT \$1)?$", sql)
+        fields, table, where, latest = match.groups()
+        rows = list(self.db.tables[table].values())
+        
+        for column, op, index in re.findall(r"(\w+) (>=|<=) \$(\d+)", where or ''):
+            value = args[int(index) - 1]
+            if op == '>=':
+                rows = [row for row in rows if row[column] >= value]
+            else:
+                rows = [row for row in rows if row[column] <= value]
+        
+        rows.sort(key=lambda row: row['created_at'], reverse=bool(latest))
+        if latest:
+            rows = rows[:args[0]]
+        return [{field: row[field] for field in fields.split(', ')} for row in rows]
+    
+    async def fetchval(self, sql, *args):
+        table = re.match(r"SELECT COUNT\(\*\) FROM (\w+)", sql).group(1)
+        return len(self.db.tables[table])
+    
+    @asynccontextmanager
+    async def transaction(self):
+        snapshot = copy.deepcopy(self.db.tables)
+        try:
+            yield
+        except BaseException:
+            self.db.tables = snapshot
+            raise
+        finally:
+            # ON COMMIT DROP
+            self.temp_tables.clear()
+
+
+class FakePool:
+    """asyncpg.Pool 替身"""
+    
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+    
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self.db)
+    
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = FakeDatabase()
+    
+    async def create_pool(**kwargs):
+        return FakePool(database)
+    
+    monkeypatch.setattr(pg_storage, 'asyncpg', SimpleNamespace(create_pool=create_pool))
+    return database
+
+
+@pytest.fixture
+def storage(db):
+    instance = PostgreSQLStorage({'database_url': 'postgresql://localhost/test'})
+    yield instance
+    instance.shutdown()
+
+
+def _rows(db, data_type):
+    table, _ = TABLE_DEFINITIONS[data_type]
+    return list(db.tables[table].values())
+
+
+@pytest.mark.asyncio
+async def test_reupsert_is_idempotent(storage, db):
+    data = [{'dimension': 'all', 'views': 10}, {'dimension': '7d', 'views': 3}]
+    assert await storage.save_dashboard_data(data)
+    first = {row['dimension']: row for row in copy.deepcopy(_rows(db, 'dashboard'))}
+    
+    assert await storage.save_dashboard_data(data)
+    assert await storage.save_dashboard_data([{'dimension': 'all', 'views': 12}])
+    
+    rows = {row['dimension']: row for row in _rows(db, 'dashboard')}
+    assert len(rows) == 2
+    assert rows['all']['views'] == 12
+    assert rows['7d']['views'] == 3
+    # 覆盖当天数据时保留首次写入时间
+    assert rows['all']['created_at'] == first['all']['created_at']
+
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_in_one_batch_keep_last(storage, db):
+    # 写入合并后的批次：同一维度先后采集了两次
+    data = [
+        {'dimension': 'all', 'views': 1},
+        {'dimension': '7d', 'views': 5},
+        {'dimension': 'all', 'views': 2},
+    ]
+    assert await storage.save_dashboard_data(data)
+    
+    rows = {row['dimension']: row['views'] for row in _rows(db, 'dashboard')}
+    assert rows == {'all': 2, '7d': 5}
+
+
+@pytest.mark.asyncio
+async def test_batch_is_copied_in_one_call(storage, db):
+    notes = [{'title': f'笔记{i}', 'views': i, 'source_search': '10%'} for i in range(500)]
+    assert await storage.save_content_analysis_data(notes)
+    
+    assert db.copy_calls == [('_stage_content_analysis_data', 500)]
+    rows = _rows(db, 'content_analysis')
+    assert len(rows) == 500
+    assert {row['source_search'] for row in rows} == {'10%'}
+    assert storage.get_storage_info()['tables']['content_analysis_data'] == 500
+
+
+@pytest.mark.asyncio
+async def test_failed_upsert_rolls_back(storage, db, monkeypatch):
+    assert await storage.save_fans_data([{'dimension': 'all', 'total_fans': 100}])
+    
+    async def broken_copy(self, table, records, columns):
+        raise RuntimeError("copy failed")
+    
+    monkeypatch.setattr(FakeConnection, 'copy_records_to_table', broken_copy)
+    assert not await storage.save_fans_data([{'dimension': 'all', 'total_fans': 200}])
+    assert [row['total_fans'] for row in _rows(db, 'fans')] == [100]
+
+
+def _seed_dashboard(db, days):
+    table, _ = TABLE_DEFINITIONS['dashboard']
+    rows = db.tables.setdefault(table, {})
+    for i, day in enumerate(days):
+        created_at = datetime.fromisoformat(f"{day}T08:00:00")
+        rows[(created_at.date(), 'all')] = {
+            'date': created_at.date(), 'created_at': created_at, 'updated_at': created_at,
+            'timestamp': created_at.isoformat(), 'dimension': 'all', 'views': i,
+            'likes': 0, 'collects': 0, 'comments': 0, 'shares': 0, 'interactions': 0
+        }
+
+
+@pytest.mark.asyncio
+async def test_get_data_range(storage, db):
+    assert await storage.initialize()
+    _seed_dashboard(db, ['2024-01-03', '2024-01-01', '2024-01-02', '2024-01-04'])
+    
+    rows = await storage.get_data_range('dashboard', since='2024-01-02', until='2024-01-03')
+    assert [row['timestamp'][:10] for row in rows] == ['2024-01-02', '2024-01-03']
+    # 与CSV存储一致，时间字段以ISO字符串返回
+    assert rows[0]['created_at'] == '2024-01-02T08:00:00'
+    
+    rows = await storage.get_data_range('dashboard', until='2024-01-02T07:00:00')
+    assert [row['timestamp'][:10] for row in rows] == ['2024-01-01']
+    
+    rows = await storage.get_data_range('dashboard')
+    assert len(rows) == 4
+    assert await storage.get_data_range('unknown') == []
+    
+    latest = await storage.get_latest_data('dashboard', limit=2)
+    assert [row['timestamp'][:10] for row in latest] == ['2024-01-04', '2024-01-03']
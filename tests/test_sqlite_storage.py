@@ -0,0 +1,42 @@
+"""
+SQLite存储的测试
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.data.storage.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    instance = SQLiteStorage({'data_dir': str(tmp_path)})
+    yield instance
+    instance.shutdown()
+
+
+def test_close_closes_connections_of_all_threads(storage):
+    connections = [storage._get_connection()]
+    
+    def worker():
+        storage.save_dashboard_data([{'dimension': 'all', 'views': 1}])
+        connections.append(storage._get_connection())
+    
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len({id(conn) for conn in connections}) == 4
+    storage.shutdown()
+    
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    
+    # 关闭后再次使用时重新连接
+    storage.save_dashboard_data([{'dimension': 'all', 'views': 2}])
+    assert len(storage._connections) == 1
@@ -0,0 +1,66 @@
+"""
+存储管理器异步写回队列的测试
+"""
+
+import pytest
+
+from src.data.storage_manager import StorageManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setenv('ENABLE_DATABASE', 'false')
+    monkeypatch.setenv('WRITE_BEHIND_BATCH_WINDOW', '0.2')
+    instance = StorageManager()
+    instance.initialize(data_path=str(tmp_path), enable_parquet=False, enable_sqlite=False, write_behind=True)
+    yield instance
+    instance.drain_on_shutdown(timeout=5)
+
+
+def test_flush_reports_csv_failure(manager, monkeypatch):
+    def broken_save(data):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(manager.get_csv_storage(), 'save_dashboard_data', broken_save)
+    manager.save_dashboard_data([{'views': 1}])
+    assert manager.flush(timeout=5) is False
+    
+    # 失败只报告一次，之后成功的写入不受影响
+    monkeypatch.undo()
+    manager.save_dashboard_data([{'views': 2}])
+    assert manager.flush(timeout=5) is True
+    assert manager.get_csv_storage().load_frame('dashboard')['views'].tolist() == [2]
+
+
+def test_coalesced_batch_applies_every_payload_to_aggregates(manager, monkeypatch):
+    applied = []
+    monkeypatch.setattr(manager.get_aggregates(), 'update',
+                        lambda data_type, data: applied.append((data_type, [row.get('views') for row in data])))
+    
+    manager.save_dashboard_data([{'views': 1}])
+    manager.save_dashboard_data([{'views': 2}])
+    manager.save_fans_data([{'total_fans': 5}])
+    manager.save_dashboard_data([{'views': 3}])
+    assert manager.flush(timeout=5)
+    
+    assert [views for data_type, views in applied if data_type == 'dashboard'] == [[1], [2], [3]]
+    # 按天整体替换的CSV只写入最后一次的数据
+    assert manager.get_csv_storage().load_frame('dashboard')['views'].tolist() == [3]
+
+
+def test_batch_writes_csv_files_under_one_lock(manager, monkeypatch):
+    csv_storage = manager.get_csv_storage()
+    original = csv_storage.locked
+    locked_calls = []
+    
+    def tracking_locked(*data_types):
+        locked_calls.append(set(data_types))
+        return original(*data_types)
+    
+    monkeypatch.setattr(csv_storage, 'locked', tracking_locked)
+    manager.save_dashboard_data([{'views': 1}])
+    manager.save_fans_data([{'total_fans': 5}])
+    assert manager.flush(timeout=5)
+    
+    assert locked_calls == [{'dashboard', 'fans'}]
+    assert csv_storage.load_frame('fans')['total_fans'].tolist() == [5]
@@ -0,0 +1,172 @@
+"""
+发布任务管理器的测试
+
+用可控的替身执行函数代替真实发布：每个任务开始后等待测试放行才完成
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.core.exceptions import TaskQueueFullError
+from src.server.task_manager import TaskManager
+from src.xiaohongshu.models import XHSNote
+
+
+class StubRunner:
+    """记录任务开始顺序和最大并发数，任务在release后完成"""
+    
+    def __init__(self):
+        self.manager = None
+        self.started = []
+        self.active = 0
+        self.max_active = 0
+        self.gates = {}
+    
+    def release(self, task_id):
+        self.gates.setdefault(task_id, asyncio.Event()).set()
+    
+    async def __call__(self, task_id):
+        self.started.append(task_id)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.gates.setdefault(task_id, asyncio.Event()).wait()
+            self.manager.update_task(task_id, status="completed", progress=100, message="发布成功！")
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def runner():
+    return StubRunner()
+
+
+@pytest_asyncio.fixture
+async def make_manager(runner):
+    managers = []
+    
+    def make(**kwargs):
+        manager = TaskManager(runner, **kwargs)
+        runner.manager = manager
+        managers.append(manager)
+        return manager
+    
+    yield make
+    for manager in managers:
+        for worker in manager._workers:
+            worker.cancel()
+        await asyncio.gather(*manager._workers, return_exceptions=True)
+
+
+async def _until(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "等待条件超时"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def note(tmp_path):
+    image = tmp_path / "cover.jpg"
+    image.write_bytes(b"\xff\xd8\xff")
+    return lambda: XHSNote(title="测试笔记", content="测试内容", images=[str(image)])
+
+
+@pytest.mark.asyncio
+async def test_priority_order_with_fifo_among_equals(make_manager, runner, note):
+    manager = make_manager(max_workers=1)
+    first = manager.create_task(note())
+    await _until(lambda: runner.started == [first])
+    
+    low_a = manager.create_task(note(), priority=0)
+    high_a = manager.create_task(note(), priority=5)
+    low_b = manager.create_task(note(), priority=0)
+    high_b = manager.create_task(note(), priority=5)
+    assert manager.get_queue_info(high_a)["position"] == 1
+    assert manager.get_queue_info(low_b)["position"] == 4
+    
+    for task_id in [first, high_a, high_b, low_a, low_b]:
+        runner.release(task_id)
+    await _until(lambda: len(runner.started) == 5 and runner.active == 0)
+    assert runner.started == [first, high_a, high_b, low_a, low_b]
+
+
+@pytest.mark.asyncio
+async def test_running_tasks_bounded_by_max_workers(make_manager, runner, note):
+    manager = make_manager(max_workers=2)
+    task_ids = [manager.create_task(note()) for _ in range(5)]
+    await _until(lambda: len(runner.started) == 2)
+    await asyncio.sleep(0.05)
+    assert len(runner.started) == 2
+    assert manager.get_stats()["running"] == 2
+    assert manager.get_stats()["queued"] == 3
+    
+    for task_id in task_ids:
+        runner.release(task_id)
+    await _until(lambda: all(manager.get_task(task_id).status == "completed" for task_id in task_ids))
+    assert runner.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_after(make_manager, runner, note):
+    manager = make_manager(max_workers=1, max_queue_size=2)
+    first = manager.create_task(note())
+    await _until(lambda: runner.started == [first])
+    manager.create_task(note())
+    manager.create_task(note())
+    
+    with pytest.raises(TaskQueueFullError) as excinfo:
+        manager.create_task(note())
+    assert excinfo.value.details["queued"] == 2
+    assert excinfo.value.details["retry_after"] >= 1
+    assert len(manager.tasks) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_task_never_runs(make_manager, runner, note):
+    manager = make_manager(max_workers=1)
+    first = manager.create_task(note())
+    await _until(lambda: runner.started == [first])
+    queued = manager.create_task(note())
+    
+    assert manager.cancel_task(queued)
+    assert manager.get_task(queued).status == "cancelled"
+    assert manager.get_queue_info(queued) is None
+    
+    runner.release(first)
+    await _until(lambda: manager.get_task(first).status == "completed")
+    await asyncio.sleep(0.05)
+    assert runner.started == [first]
+    assert manager.get_task(queued).status == "cancelled"
+    assert not manager.cancel_task(queued)
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_task(make_manager, runner, note):
+    manager = make_manager(max_workers=1)
+    first = manager.create_task(note())
+    await _until(lambda: runner.started == [first])
+    
+    assert manager.cancel_task(first)
+    await _until(lambda: manager.get_task(first).status == "cancelled")
+    await _until(lambda: not manager.running_tasks)
+    
+    # 工作协程不受取消影响，继续执行后续任务
+    second = manager.create_task(note())
+    runner.release(second)
+    await _until(lambda: manager.get_task(second).status == "completed")
+
+
+@pytest.mark.asyncio
+async def test_timeout_marks_task_failed(make_manager, runner, note):
+    manager = make_manager(max_workers=1, task_timeout=0.05)
+    task_id = manager.create_task(note())
+    await _until(lambda: manager.get_task(task_id).is_finished)
+    
+    task = manager.get_task(task_id)
+    assert task.status == "failed"
+    assert task.result["error_type"] == "timeout"
+    assert not manager.running_tasks
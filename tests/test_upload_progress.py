@@ -0,0 +1,65 @@
+"""
+上传进度监视器的测试
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.xiaohongshu.components.file_uploader import UploadProgressMonitor
+
+
+class FakeDriver:
+    """依次返回给定的上传进度采样，用完后保持最后一个"""
+    
+    def __init__(self, samples):
+        self.samples = list(samples)
+    
+    def execute_script(self, script, *args):
+        return self.samples.pop(0) if len(self.samples) > 1 else self.samples[0]
+
+
+class FakeExecutor:
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+def _manager(samples):
+    return SimpleNamespace(driver=FakeDriver(samples), executor=FakeExecutor())
+
+
+def _bar(percent):
+    return {'bars': 1, 'percent': percent}
+
+
+@pytest.mark.asyncio
+async def test_monitor_waits_until_bars_disappear():
+    reports = []
+    manager = _manager([None, _bar(30), _bar(80), None])
+    async with UploadProgressMonitor(manager, lambda *args: reports.append(args),
+                                     sample_interval=0.01, report_interval=0) as monitor:
+        assert await monitor.wait_complete(timeout=5)
+    
+    # 进度条出现之前的空采样不算完成，进度条消失后上报100%
+    assert [percent for percent, _ in reports] == [30, 80, 100]
+
+
+@pytest.mark.asyncio
+async def test_monitor_completes_when_ready_check_passes():
+    reports = []
+    checks = iter([False, False, True])
+    manager = _manager([_bar(40)])
+    async with UploadProgressMonitor(manager, lambda *args: reports.append(args),
+                                     sample_interval=0.01, report_interval=0,
+                                     ready_check=lambda driver: next(checks)) as monitor:
+        assert await monitor.wait_complete(timeout=5)
+    
+    assert reports[-1] == (100, 0)
+
+
+@pytest.mark.asyncio
+async def test_monitor_times_out_while_uploading():
+    manager = _manager([_bar(50)])
+    async with UploadProgressMonitor(manager, None, sample_interval=0.01) as monitor:
+        assert not await monitor.wait_complete(timeout=0.1)
+    assert monitor.percent == 50
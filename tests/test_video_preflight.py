@@ -0,0 +1,43 @@
+"""
+视频预检结果清理的测试
+"""
+
+import os
+import time
+
+from src.utils.video_preflight import cleanup_old_outputs
+
+
+def _output(directory, name, size, age_hours):
+    path = directory / name
+    path.write_bytes(b'0' * size)
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_cleanup_removes_expired_outputs(tmp_path):
+    old = _output(tmp_path, 'preflight_old.mp4', 10, age_hours=30)
+    recent = _output(tmp_path, 'preflight_recent.mp4', 10, age_hours=1)
+    stale_part = _output(tmp_path, 'preflight_x.123.part.mp4', 10, age_hours=30)
+    other = _output(tmp_path, 'source.mp4', 10, age_hours=30)
+    
+    assert cleanup_old_outputs(tmp_path, max_age_hours=24, max_bytes=1024) == 2
+    assert not old.exists() and not stale_part.exists()
+    assert recent.exists() and other.exists()
+
+
+def test_cleanup_enforces_size_budget_oldest_first(tmp_path):
+    oldest = _output(tmp_path, 'preflight_a.mp4', 400, age_hours=3)
+    middle = _output(tmp_path, 'preflight_b.mp4', 400, age_hours=2)
+    newest = _output(tmp_path, 'preflight_c.mp4', 400, age_hours=1)
+    in_progress = _output(tmp_path, 'preflight_d.456.part.mp4', 400, age_hours=4)
+    
+    assert cleanup_old_outputs(tmp_path, max_age_hours=24, max_bytes=900) == 2
+    assert not oldest.exists() and not middle.exists()
+    # 正在转码的临时文件不受大小上限影响
+    assert newest.exists() and in_progress.exists()
+
+
+def test_cleanup_missing_directory(tmp_path):
+    assert cleanup_old_outputs(tmp_path / 'missing') == 0
@@ -466,6 +466,10 @@ def main():
             elif args.manual_action == "export":
                 kwargs['format'] = args.format
                 kwargs['output_dir'] = args.output_dir
+            elif args.manual_action == "analyze":
+                kwargs['since'] = args.since
+                kwargs['until'] = args.until
+                kwargs['as_json'] = args.as_json
             elif args.manual_action == "backup":
                 kwargs['include_cookies'] = args.include_cookies
             elif args.manual_action == "restore":